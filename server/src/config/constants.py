@@ -15,6 +15,11 @@ POLARIZATION = "VV"
 WAVELENGTH = 56
 COARSEN = (1, 4)
 SUBSWATH = 123
+# start reframe and alignment for every date while the rest of the scenes are downloading
+PIPELINED_INGEST = True
+INGEST_QUEUE_SIZE = 2
+# unwrap the interferogram in-process to save the quick LOS displacement preview
+QUICK_UNWRAP = True
 PERP_BASELINE_MIN = 10
 PERP_BASELINE_MAX = 150
 TEMP_BASELINE = 60
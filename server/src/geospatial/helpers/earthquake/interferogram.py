@@ -4,7 +4,6 @@ import psutil
 import shutil
 import argparse
 
-import numpy as np
 import dask
 from dask.distributed import Client
 
@@ -18,18 +17,33 @@ from src.config import (
     WAVELENGTH,
     COARSEN,
     SUBSWATH,
+    PIPELINED_INGEST,
+    INGEST_QUEUE_SIZE,
+    QUICK_UNWRAP,
 )
 from src.database import get_db
 from src.utils.logger import logger
 from src.crud.task import get_tasks, update_task_status
 from src.geospatial.lib.pygmtsar import Stack, tqdm_dask, Tiles
 from src.geospatial.io.uploader.s3_client import copy_files_to_s3
-from src.geospatial.io.downloader.asf_client import download_data
+from src.geospatial.io.downloader.asf_client import download_data, ingest_data
 from src.geospatial.helpers.dataconversion import save_xarray_to_png
 from src.geospatial.helpers.asf import process_asf_params
 from src.geospatial.helpers.common import revised_aoi
 
 
+def _start_dask_client():
+    dask.config.set({"logging.distributed": "info"})
+
+    client = Client(
+        n_workers=max(1, psutil.cpu_count() // 4),
+        threads_per_worker=min(4, psutil.cpu_count()),
+        memory_limit=max(4e9, psutil.virtual_memory().available),
+    )
+    logger.print_log("info", "Dask Client dashboard: %s", client.dashboard_link)
+    return client
+
+
 def _generate_interferogram(params, product="1s"):
     """
     Generate and process an interferogram using Sentinel-1 data.
@@ -90,58 +104,78 @@ def _generate_interferogram(params, product="1s"):
     startdate = params.get("startdate")
     enddate = params.get("enddate")
 
-    logger.print_log("info", "Downloading Data")
-    S1, aoi_gdf = download_data(
-        eventdate,
-        workdir,
-        datadir,
-        credentials,
-        asf_params,
-        SUBSWATH,
-        startdate,
-        enddate,
-        eventid=eventid,
-        eventtype="earthquake",
-    )
-
-    logger.print_log("info", f"AOI:{aoi_gdf.unary_union.minimum_rotated_rectangle}")
-    aoi_gdf = revised_aoi(aoi_gdf, eventdate)
+    slc_params = {"datadir": datadir, "orbit": orbit, "subswath": SUBSWATH}
+    slc_params = {key: value for key, value in slc_params.items() if value is not None}
+    logger.print_log("info", f"slc params: {slc_params}")
 
-    aoi = aoi_gdf.unary_union.minimum_rotated_rectangle
-    logger.print_log("info", f"Revised aoi: {aoi} type: {type(aoi)}")
+    if PIPELINED_INGEST:
+        client = _start_dask_client()
+
+        def get_aoi(scenes):
+            aoi_gdf = revised_aoi(scenes, eventdate)
+            if aoi_gdf is None:
+                return None
+            return aoi_gdf.unary_union.minimum_rotated_rectangle
+
+        logger.print_log("info", "Downloading and processing Data")
+        sbas, aoi = ingest_data(
+            eventdate,
+            workdir,
+            datadir,
+            credentials,
+            asf_params,
+            SUBSWATH,
+            startdate,
+            enddate,
+            get_aoi=get_aoi,
+            dem=dem,
+            landmask=landmask,
+            slc_params=slc_params,
+            product=product,
+            queue_size=INGEST_QUEUE_SIZE,
+            eventid=eventid,
+            eventtype="earthquake",
+        )
+    else:
+        logger.print_log("info", "Downloading Data")
+        S1, aoi_gdf = download_data(
+            eventdate,
+            workdir,
+            datadir,
+            credentials,
+            asf_params,
+            SUBSWATH,
+            startdate,
+            enddate,
+            eventid=eventid,
+            eventtype="earthquake",
+        )
 
-    logger.print_log("info", "Downloading Tiles")
-    Tiles().download_dem(aoi, filename=dem, product=product)
-    Tiles().download_landmask(aoi, filename=landmask, product=product)
+        logger.print_log("info", f"AOI:{aoi_gdf.unary_union.minimum_rotated_rectangle}")
+        aoi_gdf = revised_aoi(aoi_gdf, eventdate)
 
-    if "client" in globals():
-        client.close()
+        aoi = aoi_gdf.unary_union.minimum_rotated_rectangle
+        logger.print_log("info", f"Revised aoi: {aoi} type: {type(aoi)}")
 
-    dask.config.set({"logging.distributed": "info"})
+        logger.print_log("info", "Downloading Tiles")
+        Tiles().download_dem(aoi, filename=dem, product=product)
+        Tiles().download_landmask(aoi, filename=landmask, product=product)
 
-    client = Client(
-        n_workers=max(1, psutil.cpu_count() // 4),
-        threads_per_worker=min(4, psutil.cpu_count()),
-        memory_limit=max(4e9, psutil.virtual_memory().available),
-    )
-    logger.print_log("info", "Dask Client dashboard: %s", client.dashboard_link)
+        client = _start_dask_client()
 
-    slc_params = {"datadir": datadir, "orbit": orbit, "subswath": SUBSWATH}
-    slc_params = {key: value for key, value in slc_params.items() if value is not None}
-    logger.print_log("info", f"slc params: {slc_params}")
-    scenes = S1.scan_slc(**slc_params)
+        scenes = S1.scan_slc(**slc_params)
 
-    sbas = Stack(workdir, drop_if_exists=True).set_scenes(scenes)
+        sbas = Stack(workdir, drop_if_exists=True).set_scenes(scenes)
 
-    logger.print_log("info", "Processing reframe")
-    sbas.compute_reframe(aoi)
+        logger.print_log("info", "Processing reframe")
+        sbas.compute_reframe(aoi)
 
-    logger.print_log("info", "Processing DEM")
-    sbas.load_dem(dem, aoi)
-    sbas.load_landmask(landmask, aoi)
+        logger.print_log("info", "Processing DEM")
+        sbas.load_dem(dem, aoi)
+        sbas.load_landmask(landmask, aoi)
 
-    logger.print_log("info", "Processing alignment")
-    sbas.compute_align()
+        logger.print_log("info", "Processing alignment")
+        sbas.compute_align()
 
     logger.print_log("info", "Processing geocode")
     sbas.compute_geocode()
@@ -151,18 +185,13 @@ def _generate_interferogram(params, product="1s"):
     logger.print_log("info", "Processing topo")
     topo = sbas.get_topo()
     data = sbas.open_data()
-    intensity = sbas.multilooking(
-        np.square(np.abs(data)), wavelength=WAVELENGTH, coarsen=COARSEN
-    )
-
-    logger.print_log("info", "Processing phasediff")
-    phase = sbas.phasediff(pairs, data, topo)
-
-    logger.print_log("info", "Processing multilooking")
-    phase = sbas.multilooking(phase, wavelength=WAVELENGTH, coarsen=COARSEN)
 
-    logger.print_log("info", "Processing correlation")
-    corr = sbas.correlation(phase, intensity)
+    logger.print_log("info", "Processing phasediff, multilooking and correlation")
+    product = sbas.phasediff_multilooking(
+        pairs, data, topo, wavelength=WAVELENGTH, coarsen=COARSEN
+    )
+    phase = product.phase
+    corr = product.correlation
 
     logger.print_log("info", "Processing goldstein")
     phase_goldstein = sbas.goldstein(phase, corr, 32)
@@ -185,6 +214,11 @@ def _generate_interferogram(params, product="1s"):
     filepath_intf_png = os.path.join(outputdir, f"{filename}.png")
     save_xarray_to_png(intf_ll, filepath_intf_png)
 
+    if QUICK_UNWRAP:
+        logger.print_log("info", "Processing quick unwrapping")
+        filepath_los_png = os.path.join(outputdir, f"{filename}_los.png")
+        quick_los_displacement(sbas, intf, corr, filepath_los_png)
+
     # TODO: it will be used later.
     # unwrap_filepath = os.path.join(outputdir, f"unwrap.nc")
     # unwrap = unwrapping(intf, landmask, corr, sbas, unwrap_filepath)
@@ -225,6 +259,17 @@ def unwrapping(intf, landmask, corr, sbas, unwrap_filepath):
     return unwrap
 
 
+def quick_los_displacement(sbas, intf, corr, filepath_png):
+    # The quality-guided unwrapper runs in-process in seconds for the multilooked grids and it is
+    # good enough for the preview while SNAPHU unwrapping is reserved for the final high-quality results.
+    unwrap = sbas.unwrap_quality(intf, corr).phase.compute()
+    # set the median displacement as the reference
+    los_disp_mm = sbas.los_displacement_mm(unwrap - unwrap.median())
+    los_disp_mm_ll = sbas.ra2ll(los_disp_mm).compute()
+    save_xarray_to_png(los_disp_mm_ll, filepath_png)
+    return los_disp_mm_ll
+
+
 def los_displacement(sbas, unwrap, losdis_filepath):
     tqdm_dask(
         detrend := (
@@ -1,5 +1,8 @@
 import os
 import time
+import queue
+import shutil
+import threading
 import geopandas as gpd
 from shapely import wkt
 
@@ -54,8 +57,33 @@ def download_data(
     logger.print_log("info", "Searching Scenes")
     asf = ASF(**credentials)
 
-    eventid = kwargs.get("eventid")
-    eventtype = kwargs.get("eventtype")
+    file_names = _select_scenes(
+        asf_params,
+        kwargs.get("eventid"),
+        kwargs.get("eventtype"),
+        eventdate,
+        startdate,
+        enddate,
+    )
+
+    logger.print_log("info", f"Start downloading scenes: {file_names}")
+    session = asf._get_asf_session()
+    for index, swath in enumerate(str(subswaths)):
+        logger.print_log("info", f"Processing for swath:{index}")
+        asf.download_scenes(datadir, file_names, swath, session=session)
+
+    logger.print_log("info", f"Downloading Orbits")
+    S1.download_orbits(datadir, S1.scan_slc(datadir))
+
+    aoi = S1.scan_slc(datadir)
+
+    return S1, aoi
+
+
+def _select_scenes(asf_params, eventid, eventtype, eventdate, startdate, enddate):
+    """
+    Returns the predefined scenes for the event or searches the best matching scenes on ASF.
+    """
     file_names = SCENES.get(eventid)
 
     if not file_names:
@@ -70,19 +98,266 @@ def download_data(
 
     logger.print_log("info", f"Selected scenes: {len(file_names)}")
     print(f"Selected scenes: {len(file_names)}", file_names)
+    return file_names
 
-    logger.print_log("info", f"Start downloading scenes: {file_names}")
+
+def ingest_data(
+    eventdate,
+    workdir,
+    datadir,
+    credentials,
+    asf_params,
+    subswaths,
+    startdate,
+    enddate,
+    get_aoi,
+    dem,
+    landmask,
+    slc_params=None,
+    product="1s",
+    queue_size=2,
+    **kwargs,
+):
+    """
+    Downloads the scenes and orbits date by date and reframes and aligns every date as soon as it is downloaded.
+
+    The AOI is defined from the subswath footprints of all the selected scenes before the downloading starts,
+    so it does not depend on the download order, and the DEM and landmask downloading starts in background
+    right away. The footprints are read from the scene annotations the same way as by `S1.scan_slc`.
+    The downloading runs as a producer thread which moves each completed date from a staging directory
+    into `datadir` and puts it on a bounded queue, so at most `queue_size` downloaded dates wait for processing.
+    The consumer builds the stack incrementally: as soon as two dates are available they are reframed and the
+    reference scene is prepared, and every next date is reframed and aligned right after its arrival.
+
+    Parameters:
+    - eventdate, workdir, datadir, credentials, asf_params, subswaths, startdate, enddate: see `download_data`.
+    - get_aoi (callable): Returns the AOI geometry for the scenes footprints GeoDataFrame or None.
+    - dem (str): The DEM NetCDF filename to download.
+    - landmask (str): The landmask NetCDF filename to download.
+    - slc_params (dict, optional): Filters for `S1.scan_slc`.
+    - product (str, optional): The DEM and landmask product resolution. Default is "1s".
+    - queue_size (int, optional): The maximum number of downloaded dates waiting for processing. Default is 2.
+
+    Returns:
+    - tuple: A tuple containing:
+        - Stack : The reframed and aligned stack
+        - aoi : The area of interest (AOI) geometry
+    """
+    os.makedirs(workdir, exist_ok=True)
+    os.makedirs(datadir, exist_ok=True)
+    slc_params = {**(slc_params or {}), "datadir": datadir}
+
+    logger.print_log("info", "Searching Scenes")
+    asf = ASF(**credentials)
+    file_names = _select_scenes(
+        asf_params,
+        kwargs.get("eventid"),
+        kwargs.get("eventtype"),
+        eventdate,
+        startdate,
+        enddate,
+    )
+
+    # the AOI is defined by all the selected scenes, not only by the first downloaded ones
     session = asf._get_asf_session()
-    for index, swath in enumerate(str(subswaths)):
-        logger.print_log("info", f"Processing for swath:{index}")
-        asf.download_scenes(datadir, file_names, swath, session=session)
+    # hidden directories are ignored by S1.scan_slc recursive search
+    annotations = os.path.join(datadir, ".annotations")
+    _download_annotations(file_names, subswaths, annotations, session)
+    footprints = _scene_footprints(annotations, file_names)
+    aoi = get_aoi(footprints.copy())
+    if aoi is None:
+        raise ValueError("ERROR: Two or more scenes covering the AOI required")
+    logger.print_log("info", f"AOI: {aoi}")
 
-    logger.print_log("info", f"Downloading Orbits")
-    S1.download_orbits(datadir, S1.scan_slc(datadir))
+    # every date is reframed by the subswaths geometries of the complete stack
+    if slc_params.get("orbit") is not None:
+        footprints = footprints[footprints.orbit == slc_params["orbit"]]
+    geometries = {
+        subswath: footprints[footprints.subswath == subswath].geometry.union_all()
+        for subswath in footprints.subswath.unique()
+    }
 
-    aoi = S1.scan_slc(datadir)
+    # group scenes by acquisition date, the earliest date becomes the stack reference
+    dates = {}
+    for scene in sorted(file_names, key=lambda name: name.split("_")[5]):
+        dates.setdefault(scene.split("_")[5][:8], []).append(scene)
 
-    return S1, aoi
+    staging = os.path.join(datadir, ".incoming")
+    dates_queue = queue.Queue(maxsize=queue_size)
+    # the consumer sets the event on exit to stop the producer
+    stop = threading.Event()
+
+    def publish(item):
+        while not stop.is_set():
+            try:
+                dates_queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for date, scenes in dates.items():
+                if stop.is_set():
+                    return
+                logger.print_log("info", f"Downloading scenes for {date}: {scenes}")
+                for swath in str(subswaths):
+                    asf.download_scenes(staging, scenes, swath, session=session)
+                S1.download_orbits(staging, scenes)
+                # publish the completed date
+                for name in os.listdir(staging):
+                    if not os.path.exists(os.path.join(datadir, name)):
+                        shutil.move(os.path.join(staging, name), datadir)
+                if not publish(date):
+                    return
+            publish(None)
+        except Exception as e:
+            publish(e)
+
+    tiles = {}
+
+    def download_tiles(aoi):
+        try:
+            logger.print_log("info", "Downloading Tiles")
+            Tiles().download_dem(aoi, filename=dem, product=product)
+            Tiles().download_landmask(aoi, filename=landmask, product=product)
+        except Exception as e:
+            tiles["error"] = e
+
+    tiles_thread = threading.Thread(target=download_tiles, args=(aoi,), daemon=True)
+    tiles_thread.start()
+
+    producer = threading.Thread(target=produce, name="ingest-producer", daemon=True)
+    producer.start()
+
+    sbas = None
+    aligned = []
+    try:
+        while True:
+            item = dates_queue.get()
+            if isinstance(item, Exception):
+                raise item
+            if item is None:
+                break
+            logger.print_log("info", f"Downloaded scenes for {item}")
+
+            if sbas is None:
+                try:
+                    scenes = S1.scan_slc(**slc_params)
+                except (AssertionError, ValueError) as e:
+                    # two or more dates required to scan the scenes
+                    logger.print_log("info", f"Waiting for more scenes: {e}")
+                    continue
+
+                sbas = Stack(workdir, drop_if_exists=True).set_scenes(scenes)
+                logger.print_log("info", "Processing reframe")
+                sbas.compute_reframe(aoi, geometries=geometries)
+                logger.print_log("info", "Processing reference alignment")
+                sbas.align_date(sbas.reference)
+                aligned.append(sbas.reference)
+
+                # the repeat scenes alignment requires DEM
+                tiles_thread.join()
+                if "error" in tiles:
+                    raise tiles["error"]
+                logger.print_log("info", "Processing DEM")
+                sbas.load_dem(dem, aoi)
+                sbas.load_landmask(landmask, aoi)
+            else:
+                scenes = S1.scan_slc(**slc_params)
+                new_dates = scenes.index.difference(sbas.df.index).unique()
+                sbas.add_scenes(scenes)
+                logger.print_log("info", f"Processing reframe for {list(new_dates)}")
+                sbas.compute_reframe(aoi, dates=new_dates, geometries=geometries)
+
+            for date in sbas.df.index.unique():
+                if date in aligned:
+                    continue
+                logger.print_log("info", f"Processing alignment for {date}")
+                sbas.align_date(date)
+                aligned.append(date)
+    finally:
+        # stop the producer and release it when it waits on the full queue
+        stop.set()
+        while True:
+            try:
+                dates_queue.get_nowait()
+            except queue.Empty:
+                break
+
+    producer.join()
+    if sbas is None:
+        raise ValueError("ERROR: Two or more scenes covering the AOI required")
+    sbas._merge_subswaths()
+    return sbas, aoi
+
+
+def _download_annotations(file_names, subswaths, basedir, session, polarization="VV"):
+    """
+    Downloads only the XML annotations of the scenes subswaths keeping the SAFE directory structure.
+    """
+    import fnmatch
+    import asf_search
+
+    patterns = [
+        f"*.SAFE/annotation/s1?-iw{subswath}-slc-{polarization.lower()}-*.xml"
+        for subswath in str(subswaths)
+    ]
+    for scene in file_names:
+        url = ASF.template_url.format(satellite=scene[2:3], scene=scene)
+        with asf_search.remotezip(url, session) as remotezip:
+            for filename in remotezip.namelist():
+                if not any(fnmatch.fnmatch(filename, pattern) for pattern in patterns):
+                    continue
+                fullname = os.path.join(basedir, filename)
+                if os.path.exists(fullname):
+                    continue
+                os.makedirs(os.path.dirname(fullname), exist_ok=True)
+                with open(fullname + ".tmp", "wb") as file:
+                    file.write(remotezip.read(filename))
+                os.replace(fullname + ".tmp", fullname)
+
+
+def _scene_footprints(basedir, file_names):
+    """
+    Returns the subswaths bursts footprints and acquisition times of the scenes as a GeoDataFrame.
+
+    The footprints are built from the downloaded XML annotations by `S1.geoloc2bursts` the same way
+    as the `S1.scan_slc` geometries, with one record per scene subswath.
+    """
+    import glob
+    import pandas as pd
+
+    records = []
+    missed = []
+    for scene in file_names:
+        metapaths = sorted(
+            glob.glob(os.path.join(basedir, f"{scene}.SAFE", "annotation", "*.xml"))
+        )
+        if len(metapaths) == 0:
+            missed.append(scene)
+        for metapath in metapaths:
+            name = os.path.splitext(os.path.basename(metapath))[0]
+            annotation = S1.read_annotation(metapath)
+            records.append(
+                {
+                    "scene": scene,
+                    "datetime": pd.to_datetime(
+                        name.split("-")[4], format="%Y%m%dt%H%M%S"
+                    ),
+                    "subswath": int(name.split("-")[1][-1]),
+                    "orbit": annotation["product"]["generalAnnotation"][
+                        "productInformation"
+                    ]["pass"][:1],
+                    "geometry": S1.geoloc2bursts(annotation),
+                }
+            )
+    if missed:
+        raise ValueError(f"ERROR: Scenes annotations not found: {sorted(missed)}")
+    return gpd.GeoDataFrame(records, geometry="geometry", crs="EPSG:4326").sort_values(
+        ["datetime", "subswath"], ignore_index=True
+    )
 
 
 def download_dem(area_of_interest, filename_nc):
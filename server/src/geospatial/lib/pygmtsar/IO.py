@@ -204,6 +204,100 @@ class IO(datagrid):
         filename = os.path.join(self.basedir, f"{prefix}{name}.grd")
         return filename
 
+    def get_storename(self, name, add_subswath=False):
+        """
+        Get the Zarr store path for a 2D/3D cube or a stack, see datagrid.storage_backend.
+        """
+        import os
+
+        if add_subswath:
+            subswath = self.get_subswath()
+            prefix = f"F{subswath}_"
+        else:
+            prefix = ""
+
+        storename = os.path.join(self.basedir, f"{prefix}{name}.zarr")
+        return storename
+
+    def is_store(self, storename):
+        """
+        Check the Zarr store exists and it is complete.
+
+        The stores are written to temporary directories and renamed when all the data is saved,
+        and the consolidated metadata is required to exclude the partially written stores.
+        """
+        import os
+
+        return os.path.exists(os.path.join(storename, ".zmetadata"))
+
+    def get_cubename(self, name):
+        """
+        Get the 2D/3D cube path used by open_cube(), the complete Zarr store or the NetCDF file otherwise.
+        """
+        storename = self.get_storename(name)
+        if self.is_store(storename):
+            return storename
+        return self.get_filename(name)
+
+    def _save_zarr(self, batches, storename, encoding, append_dim=None, is_dask=False):
+        """
+        Save the datasets to a new Zarr store and replace the existing store when all the data is written.
+
+        Parameters
+        ----------
+        batches : iterable
+            The (dataset, caption) pairs, the first dataset creates the store and the next ones
+            are appended along append_dim.
+        storename : str
+            The target Zarr store path.
+        encoding : dict
+            The variables encoding, see datagrid._zarr_compression().
+        append_dim : str, optional
+            The dimension to append the next datasets.
+        is_dask : bool, optional
+            Compute lazy datasets on Dask cluster with progress bar.
+        """
+        import dask
+        import os
+        import shutil
+        from dask.distributed import futures_of, wait
+
+        tmpname = storename + ".tmp"
+        if os.path.exists(tmpname):
+            shutil.rmtree(tmpname)
+        try:
+            for index, (data, caption) in enumerate(batches):
+                if index == 0:
+                    delayed = data.to_zarr(
+                        tmpname,
+                        mode="w",
+                        encoding=encoding,
+                        compute=not is_dask,
+                        zarr_format=2,
+                    )
+                else:
+                    delayed = data.to_zarr(
+                        tmpname,
+                        append_dim=append_dim,
+                        compute=not is_dask,
+                        zarr_format=2,
+                    )
+                if is_dask:
+                    tqdm_dask(result := dask.persist(delayed), desc=caption)
+                    # the progress bar completes on errors too, raise the failed writes
+                    futures = futures_of(result)
+                    wait(futures)
+                    for future in futures:
+                        if future.status == "error":
+                            raise future.exception()
+                    del delayed, result, futures
+        except BaseException:
+            shutil.rmtree(tmpname, ignore_errors=True)
+            raise
+        if os.path.exists(storename):
+            shutil.rmtree(storename)
+        os.replace(tmpname, storename)
+
     def get_filenames(self, pairs, name, add_subswath=False):
         """
         Get the filenames of the data grids. The filenames are determined by the subswath, pairs, and name parameters.
@@ -312,14 +406,27 @@ class IO(datagrid):
         if not isinstance(subswaths, (str, int)):
             subswaths = "".join(map(str, subswaths))
 
+        # DEM extent in radar coordinates, merged reference PRM required
+        # print ('minx, miny, maxx, maxy', minx, miny, maxx, maxy)
+        extent_ra = np.round(self.get_extent_ra().bounds).astype(int)
+        # minx, miny, maxx, maxy = extent_ra
+        # first pixel index inside the extent for the pixel centers coordinates 0.5, 1.5, ...
+        origin = (int(np.ceil(extent_ra[1] - 0.5)), int(np.ceil(extent_ra[0] - 0.5)))
+
+        def read_SLC(prm, shape, origin=None):
+            if scale is None:
+                # there is no complex int16 datatype, so return two variables for real and imag parts
+                return prm.read_SLC_int(scale=None, shape=shape)
+            # scale and convert to complex values chunk by chunk, zero means NODATA
+            return prm.read_SLC_complex(scale=scale, shape=shape, origin=origin)
+
         if len(subswaths) == 1:
             # stack single subswath
             stack = []
             shape = None
             for date in dates:
                 prm = self.PRM(date, subswath=int(subswaths))
-                # disable scaling
-                slc = prm.read_SLC_int(scale=scale, shape=shape)
+                slc = read_SLC(prm, shape, origin)
                 stack.append(slc.assign_coords(date=date))
                 if shape is None:
                     shape = (slc.y.size, slc.x.size)
@@ -347,16 +454,15 @@ class IO(datagrid):
                 ):
                     # print (date, subswath)
                     prm = self.PRM(date, subswath=int(subswath))
-                    # disable scaling
-                    slc = prm.read_SLC_int(scale=scale, shape=(ylim, xlim))
+                    slc = read_SLC(prm, (ylim, xlim))
                     slc = slc.isel(x=slice(left, right)).assign_coords(y=slc.y + bottom)
                     slcs.append(slc)
                     prms.append(prm)
 
-                # check and merge SLCs, use zero fill for np.int16 datatype
-                slc = xr.concat(slcs, dim="x", fill_value=0).assign_coords(
-                    x=0.5 + np.arange(maxx)
-                )
+                # check and merge SLCs, use zero fill for np.int16 datatype and NaN for complex one
+                slc = xr.concat(
+                    slcs, dim="x", fill_value=0 if scale is None else np.nan
+                ).assign_coords(x=0.5 + np.arange(maxx))
 
                 if debug:
                     print("assert slc.y.size == maxy", slc.y.size, maxy)
@@ -371,28 +477,149 @@ class IO(datagrid):
                 stack.append(slc.assign_coords(date=date))
                 del slc
 
-        # DEM extent in radar coordinates, merged reference PRM required
-        # print ('minx, miny, maxx, maxy', minx, miny, maxx, maxy)
-        extent_ra = np.round(self.get_extent_ra().bounds).astype(int)
-        # minx, miny, maxx, maxy = extent_ra
+        # the single subswath chunks are aligned to the extent so rechunking is a no-op there
         ds = (
             xr.concat(stack, dim="date")
-            .assign(date=pd.to_datetime(dates))
+            .assign_coords(date=pd.to_datetime(dates))
             .sel(
                 y=slice(extent_ra[1], extent_ra[3]), x=slice(extent_ra[0], extent_ra[2])
             )
             .chunk({"y": self.chunksize, "x": self.chunksize})
         )
         del stack
+        return ds
+
+    def open_bursts(self, date=None, subswath=None, scale=2.5e-07):
+        """
+        Open Sentinel-1 bursts directly from the original measurement TIFF files.
 
-        if scale is None:
-            # there is no complex int16 datatype, so return two variables for real and imag parts
-            return ds
-        # scale and return as complex values
-        ds_complex = ds.re.astype(np.float32) + 1j * ds.im.astype(np.float32)
-        del ds
-        # zero in np.int16 type means NODATA
-        return ds_complex.where(ds_complex != 0).rename("data")
+        The burst line ranges and valid samples are resolved from the scene annotation and the complex int16
+        samples are memory-mapped straight out of the uncompressed TIFF strips, one task per chunk, without
+        conversion to GMTSAR SLC files. The valid lines of the bursts are stacked as is, without TOPS deramping
+        and alignment, so the result is intended for the processing that does not require the aligned stack.
+        The reader is opt-in: open_data() and compute_reframe() still use the aligned GMTSAR SLC files.
+
+        Parameters
+        ----------
+        date : str, optional
+            The scene date. Default is the reference date.
+        subswath : int, optional
+            The subswath number. Default is the only subswath of the stack.
+        scale : float, optional
+            Scale factor applied to the int16 samples. Default is 2.5e-07.
+
+        Returns
+        -------
+        xarray.DataArray
+            2D complex64 array in the TIFF range and burst lines coordinates with the burst number coordinate
+            for the lines and NaN for invalid samples. The array has no lines when no valid burst lines are found.
+
+        Examples
+        --------
+        slc = stack.open_bursts('2023-05-20', subswath=1)
+        """
+        import xarray as xr
+        import numpy as np
+        import dask.array as da
+        from .S1 import S1
+
+        if subswath is None:
+            subswaths = self.get_subswaths()
+            assert (
+                len(subswaths) == 1
+            ), f"Multiple subswaths {subswaths} found, specify one of them"
+            subswath = subswaths[0]
+        if date is None or date == self.reference:
+            df = self.get_reference(subswath)
+        else:
+            df = self.get_repeat(subswath, date)
+        scale = np.float32(1 if scale is None else scale)
+
+        # lines of the valid burst rows: file number, byte offset, burst and valid samples range
+        filenames, widths, rows = [], [], []
+        burst_time = None
+        for record in df.sort_values("datetime").itertuples():
+            offset, (length, width) = S1.read_tiff_layout(record.datapath)
+            bursts = S1.get_bursts(record.metapath)
+            for burst in bursts.itertuples():
+                # adjacent scenes can include the same bursts
+                if burst_time is not None and burst.azimuthTime <= burst_time:
+                    continue
+                burst_time = burst.azimuthTime
+                lines = burst.line + np.arange(
+                    burst.firstValidLine, burst.lastValidLine + 1
+                )
+                if lines.size and lines[-1] >= length:
+                    raise ValueError(
+                        f"Burst {burst.Index} lines exceed {length} TIFF lines: {record.datapath}"
+                    )
+                rows.append(
+                    np.column_stack(
+                        [
+                            np.full(lines.size, len(filenames)),
+                            # the strips are contiguous so the lines are addressed from the TIFF data offset
+                            offset + lines * width * 4,
+                            np.full(lines.size, len(rows)),
+                            burst.firstValidSample[lines - burst.line],
+                            burst.lastValidSample[lines - burst.line],
+                        ]
+                    )
+                )
+            filenames.append(record.datapath)
+            widths.append(width)
+        # the empty selection produces the array without lines
+        rows = np.concatenate(rows or [np.empty((0, 5))]).astype(np.int64)
+        xdim = max(widths, default=0)
+
+        def read_bursts_block(block_info=None):
+            (y0, y1), (x0, x1) = block_info[None]["array-location"]
+            out = np.zeros((y1 - y0, x1 - x0, 2), dtype=np.float32)
+            block = rows[y0:y1]
+            for fileidx in np.unique(block[:, 0]):
+                width = widths[fileidx]
+                if x0 >= width:
+                    continue
+                mask = block[:, 0] == fileidx
+                offsets = block[mask, 1]
+                # [real_0, imag_0, real_1, imag_1, ...] as (lines, samples, 2) view
+                pairs = np.memmap(
+                    filenames[fileidx],
+                    dtype=np.int16,
+                    mode="r",
+                    offset=offsets.min(),
+                    shape=(
+                        (offsets.max() - offsets.min()) // (width * 4) + 1,
+                        width,
+                        2,
+                    ),
+                )
+                lines = (offsets - offsets.min()) // (width * 4)
+                out[mask, : min(x1, width) - x0] = np.multiply(
+                    pairs[lines, x0 : min(x1, width)], scale, dtype=np.float32
+                )
+                del pairs
+            out = out.view(np.complex64)[..., 0]
+            # invalid samples and zero in np.int16 type mean NODATA
+            xs = np.arange(x0, x1)
+            invalid = (xs < block[:, 3:4]) | (xs > block[:, 4:5]) | (out == 0)
+            out[invalid] = np.nan
+            return out
+
+        if len(rows) == 0:
+            data = da.zeros((0, xdim), dtype=np.complex64)
+        else:
+            data = da.map_blocks(
+                read_bursts_block,
+                chunks=da.core.normalize_chunks(self.chunksize, (len(rows), xdim)),
+                dtype=np.complex64,
+                meta=np.empty((0, 0), dtype=np.complex64),
+            )
+        coords = {
+            "y": np.arange(len(rows)) + 0.5,
+            "x": np.arange(xdim) + 0.5,
+            "burst": ("y", rows[:, 2]),
+        }
+        return xr.DataArray(data, coords=coords, dims=("y", "x")).rename("data")
 
     #     def open_geotif(self, dates=None, subswath=None, intensity=False, chunksize=None):
     #         """
@@ -433,11 +660,12 @@ class IO(datagrid):
 
     def open_cube(self, name):
         """
-        Opens an xarray 2D/3D Dataset or dataArray from a NetCDF file.
+        Opens an xarray 2D/3D Dataset or dataArray from a NetCDF file or a Zarr store.
 
         This function takes the name of the model to be opened, reads the NetCDF file, and re-chunks
         the dataset according to the provided chunksize or the default value from the 'stack' object.
-        The 'date' dimension is always chunked with a size of 1.
+        The 'date' dimension is always chunked with a size of 1. The complete Zarr store is preferred when
+        both formats exist, so the cubes saved before switching datagrid.storage_backend stay readable.
 
         Parameters
         ----------
@@ -455,11 +683,16 @@ class IO(datagrid):
         import numpy as np
         import os
 
-        filename = self.get_filename(name)
-        assert os.path.exists(filename), f"ERROR: The NetCDF file is missed: {filename}"
-
-        # Workaround: open the dataset without chunking
-        data = xr.open_dataset(filename, engine=self.netcdf_engine)
+        filename = self.get_cubename(name)
+        if filename.endswith(".zarr"):
+            # lazy Zarr store, chunking is defined below
+            data = xr.open_zarr(filename, chunks=None)
+        else:
+            assert os.path.exists(
+                filename
+            ), f"ERROR: The NetCDF file is missed: {filename}"
+            # Workaround: open the dataset without chunking
+            data = xr.open_dataset(filename, engine=self.netcdf_engine)
 
         if "stack" in data.dims:
             if "y" in data.coords and "x" in data.coords:
@@ -532,9 +765,10 @@ class IO(datagrid):
 
     def save_cube(self, data, name=None, caption="Saving NetCDF 2D/3D Dataset"):
         """
-        Save a lazy and not lazy 2D/3D xarray Dataset or DataArray to a NetCDF file.
+        Save a lazy and not lazy 2D/3D xarray Dataset or DataArray to a NetCDF file or a Zarr store.
 
-        The 'date' or 'pair' dimension is always chunked with a size of 1.
+        The 'date' or 'pair' dimension is always chunked with a size of 1. The output format is defined
+        by datagrid.storage_backend and the other format file for the same name is removed after saving.
 
         Parameters
         ----------
@@ -563,7 +797,9 @@ class IO(datagrid):
         import xarray as xr
         import pandas as pd
         import dask
+        import dask.array
         import os
+        import shutil
         import warnings
 
         # suppress Dask warning "RuntimeWarning: invalid value encountered in divide"
@@ -619,6 +855,28 @@ class IO(datagrid):
             data = data.to_dataset().assign_attrs({"dataarray": data.name})
 
         is_dask = isinstance(data[list(data.data_vars)[0]].data, dask.array.Array)
+        filename = self.get_filename(name)
+        storename = self.get_storename(name)
+
+        if self.storage_backend == "zarr":
+            encoding = {
+                varname: self._zarr_compression(
+                    data[varname].shape, chunksize=chunksize
+                )
+                for varname in data.data_vars
+            }
+            if is_dask:
+                # align Dask chunks to Zarr chunks for lock-free parallel writes
+                for varname in data.data_vars:
+                    data[varname] = data[varname].chunk(
+                        dict(zip(data[varname].dims, encoding[varname]["chunks"]))
+                    )
+            # save to Zarr store
+            self._save_zarr([(data, caption)], storename, encoding, is_dask=is_dask)
+            if os.path.exists(filename):
+                os.remove(filename)
+            return
+
         encoding = {
             varname: self._compression(data[varname].shape, chunksize=chunksize)
             for varname in data.data_vars
@@ -627,7 +885,6 @@ class IO(datagrid):
         # print ('is_dask', is_dask, 'encoding', encoding)
 
         # save to NetCDF file
-        filename = self.get_filename(name)
         if os.path.exists(filename):
             os.remove(filename)
         delayed = data.to_netcdf(
@@ -640,14 +897,21 @@ class IO(datagrid):
             import gc
 
             gc.collect()
+        if os.path.exists(storename):
+            shutil.rmtree(storename)
 
     def delete_cube(self, name):
         import os
+        import shutil
 
         filename = self.get_filename(name)
         # print ('filename', filename)
         if os.path.exists(filename):
             os.remove(filename)
+        storename = self.get_storename(name)
+        for path in [storename, storename + ".tmp"]:
+            if os.path.exists(path):
+                shutil.rmtree(path)
 
     def sync_stack(
         self, data, name=None, caption="Saving 2D Stack", queue=None, timeout=300
@@ -674,13 +938,43 @@ class IO(datagrid):
         stack.open_stack('phase15m')
         stack.open_stack('intf90m',[['2018-02-21','2018-03-11']])
         stack.open_stack('intf90m', stack.get_pairs([['2018-02-21','2018-03-11']]))
+
+        The single Zarr store is preferred when it is complete, otherwise the per-date or per-pair NetCDF files
+        are opened, so the stacks saved before switching datagrid.storage_backend stay readable.
         """
         import xarray as xr
         import pandas as pd
         import numpy as np
         import glob
+        import os
 
-        if stack is None:
+        storename = self.get_storename(name)
+        if self.is_store(storename):
+            # lazy Zarr store with the stack dimension, no per-file open overhead
+            data = xr.open_zarr(storename, chunks=None)
+            if stack is not None:
+                stackvar = "date" if "date" in data.dims else "pair"
+                if stackvar == "date":
+                    stackvals = [[date] for date in data.date.dt.date.values]
+                else:
+                    stackvals = [[pair.split(" ")] for pair in data.pair.values]
+                # match the requested items by the NetCDF filenames to use the same selection rules
+                keys = [self.get_filenames(val, name)[0] for val in stackvals]
+                if (
+                    isinstance(stack, (list, tuple, np.ndarray))
+                    and len(np.asarray(stack).shape) == 1
+                ):
+                    filenames = self.get_filenames(np.asarray(stack), name)
+                else:
+                    filenames = self.get_filenames(stack, name)
+                missed = [filename for filename in filenames if filename not in keys]
+                assert (
+                    len(missed) == 0
+                ), f"ERROR: The Zarr store {storename} misses the items: {missed}"
+                data = data.isel(
+                    {stackvar: [keys.index(filename) for filename in filenames]}
+                )
+        elif stack is None:
             # look for all stack files
             # filenames = self.get_filenames(['*'], name)[0]
             # filenames = self.get_filename(f'{name}_????????_????????')
@@ -697,13 +991,14 @@ class IO(datagrid):
             filenames = self.get_filenames(stack, name)
         # print ('filenames', filenames)
 
-        data = xr.open_mfdataset(
-            filenames,
-            engine=self.netcdf_engine,
-            parallel=True,
-            concat_dim="stackvar",
-            combine="nested",
-        )
+        if not self.is_store(storename):
+            data = xr.open_mfdataset(
+                filenames,
+                engine=self.netcdf_engine,
+                parallel=True,
+                concat_dim="stackvar",
+                combine="nested",
+            )
 
         if "stack" in data.dims:
             if "y" in data.coords and "x" in data.coords:
@@ -716,12 +1011,23 @@ class IO(datagrid):
             data = (
                 data.assign_coords(stack=multi_index)
                 .set_index({"stack": ["y", "x"]})
-                .chunk({"stack": self.chunksize1d})
+                .chunk(
+                    {
+                        dim: (
+                            1
+                            if dim in ["stackvar", "pair", "date"]
+                            else self.chunksize1d
+                        )
+                        for dim in data.dims
+                    }
+                )
             )
         else:
-            dims = list(data.dims)
             data = data.chunk(
-                {dims[0]: 1, dims[1]: self.chunksize, dims[2]: self.chunksize}
+                {
+                    dim: 1 if dim in ["stackvar", "pair", "date"] else self.chunksize
+                    for dim in data.dims
+                }
             )
 
         # revert dataarray converted to dataset
@@ -755,7 +1061,8 @@ class IO(datagrid):
                 del data.attrs[f"size_{dim}"]
 
         for dim in ["pair", "date"]:
-            if dim in data.coords:
+            # Zarr store keeps the stack dimension as is
+            if dim in data.coords and "stackvar" in data.dims:
                 if data[dim].shape == () or "stack" in data.dims:
                     if data[dim].shape == ():
                         data = data.assign_coords(pair=("stackvar", [data[dim].values]))
@@ -913,6 +1220,9 @@ class IO(datagrid):
 
         if isinstance(data, xr.DataArray):
             data = data.to_dataset().assign_attrs({"dataarray": data.name})
+        if self.storage_backend == "zarr":
+            self._save_stack_zarr(data, name, stackvar, is_dask, caption, queue)
+            return
         encoding = {
             varname: self._compression(data[varname].shape[1:])
             for varname in data.data_vars
@@ -962,6 +1272,62 @@ class IO(datagrid):
             # update chunks counter
             counter += len(chunk)
 
+        # remove outdated Zarr store after the NetCDF files are ready
+        storename = self.get_storename(name)
+        if os.path.exists(storename):
+            import shutil
+
+            shutil.rmtree(storename)
+
+    def _save_stack_zarr(self, data, name, stackvar, is_dask, caption, queue):
+        """
+        Save the prepared stack Dataset to a single Zarr store appending the stack dimension by queue items.
+
+        Dask chunks are aligned to the Zarr chunks so the workers write the chunks in parallel without locks,
+        and no garbage collection or workers restart is required between the batches.
+        """
+        import numpy as np
+        import os
+
+        stacksize = data[stackvar].size
+        encoding = {}
+        for varname in data.data_vars:
+            opts = self._zarr_compression(data[varname].shape[1:])
+            encoding[varname] = dict(opts, chunks=(1,) + tuple(opts["chunks"]))
+        if is_dask:
+            for varname in data.data_vars:
+                data[varname] = data[varname].chunk(
+                    dict(zip(data[varname].dims, encoding[varname]["chunks"]))
+                )
+        # print ('save_stack encoding', encoding)
+
+        digits = len(str(stacksize))
+        n_chunks = stacksize // queue if stacksize > queue else 1
+
+        def batches():
+            counter = 0
+            for chunk in np.array_split(range(stacksize), n_chunks):
+                if n_chunks > 1:
+                    chunk_caption = f"{caption}: {(counter+1):0{digits}}...{(counter+len(chunk)):0{digits}} from {stacksize}"
+                else:
+                    chunk_caption = caption
+                yield data.isel({stackvar: chunk}), chunk_caption
+                counter += len(chunk)
+
+        # the first batch creates the store and the next ones extend it
+        self._save_zarr(
+            batches(),
+            self.get_storename(name),
+            encoding,
+            append_dim=stackvar,
+            is_dask=is_dask,
+        )
+
+        # remove outdated NetCDF files after the Zarr store is ready
+        for filename in self._glob_re(name + "_[0-9]{8}(_[0-9]{8})*.grd"):
+            if os.path.exists(filename):
+                os.remove(filename)
+
     #     # alternative realization
     #     def save_stack(self, data, name, caption='Saving 2D Stack', queue=50):
     #         import numpy as np
@@ -1057,9 +1423,14 @@ class IO(datagrid):
 
     def delete_stack(self, name):
         import os
+        import shutil
 
         filenames = self._glob_re(name + "_[0-9]{8}(_[0-9]{8})*.grd")
         # print ('filenames', filenames)
         for filename in filenames:
             if os.path.exists(filename):
                 os.remove(filename)
+        storename = self.get_storename(name)
+        for path in [storename, storename + ".tmp"]:
+            if os.path.exists(path):
+                shutil.rmtree(path)
@@ -1004,6 +1004,95 @@ class PRM(datagrid, PRM_gmtsar):
             return scale * (xr.merge([re, im]).astype(np.float32))
         return xr.merge([re, im])
 
+    def read_SLC_complex(self, scale=2.5e-07, shape=None, origin=None):
+        """
+        Read SLC (Single Look Complex) data as scaled complex values.
+
+        Each output chunk memory-maps its own row range of the binary SLC file as interleaved
+        int16 (real, imaginary) pairs and converts it to complex64 in a single ufunc call,
+        so the task graph holds one task per chunk and no intermediate int16 arrays.
+
+        Parameters
+        ----------
+        scale : float, optional
+            Scale factor applied to the int16 samples. Default is 2.5e-07.
+        shape : tuple, optional
+            Output (azimuth, range) shape to crop or zero-pad the data to. Default is the SLC file shape.
+        origin : tuple, optional
+            (azimuth, range) pixel indices the chunk grid is aligned to, so a subsequent crop
+            starting there keeps whole chunks. Default is (0, 0).
+
+        Returns
+        -------
+        xarray.DataArray
+            2D complex64 array chunked by datagrid.chunksize with NaN for zero (NODATA) samples.
+
+        Example
+        -------
+        >>> prm = PRM.from_file(filename)
+        >>> slc = prm.read_SLC_complex()
+        """
+        import xarray as xr
+        import numpy as np
+        import dask.array as da
+        import os
+
+        prm = PRM.from_file(self.filename)
+        slc_filename, xdim, ydim = prm.get("SLC_file", "num_rng_bins", "num_valid_az")
+        slc_filename = os.path.join(os.path.dirname(self.filename), slc_filename)
+        ysize, xsize = (ydim, xdim) if shape is None else shape
+        scale = np.float32(1 if scale is None else scale)
+
+        def read_SLC_block(block_info=None):
+            (y0, y1), (x0, x1) = block_info[None]["array-location"]
+            out = np.zeros((y1 - y0, x1 - x0, 2), dtype=np.float32)
+            # rows and columns outside of the SLC file are zero padded
+            ys, xs = slice(y0, min(y1, ydim)), slice(x0, min(x1, xdim))
+            if ys.stop > ys.start and xs.stop > xs.start:
+                # [real_0, imag_0, real_1, imag_1, ...] as (rows, columns, 2) view
+                pairs = np.memmap(
+                    slc_filename,
+                    dtype=np.int16,
+                    mode="r",
+                    offset=ys.start * xdim * 4,
+                    shape=(ys.stop - ys.start, xdim, 2),
+                )
+                np.multiply(
+                    pairs[:, xs],
+                    scale,
+                    out=out[: ys.stop - ys.start, : xs.stop - xs.start],
+                    dtype=np.float32,
+                )
+                del pairs
+            out = out.view(np.complex64)[..., 0]
+            # zero in np.int16 type means NODATA
+            out[out == 0] = np.nan
+            return out
+
+        def chunks(size, start):
+            # chunk boundaries on both sides of the origin
+            start = min(max(start, 0), size)
+            bounds = np.unique(
+                np.concatenate(
+                    [
+                        [0],
+                        np.arange(start % self.chunksize, size, self.chunksize),
+                        [size],
+                    ]
+                )
+            )
+            return tuple(np.diff(bounds).tolist())
+
+        y0, x0 = (0, 0) if origin is None else origin
+        data = da.map_blocks(
+            read_SLC_block,
+            chunks=(chunks(ysize, y0), chunks(xsize, x0)),
+            dtype=np.complex64,
+            meta=np.empty((0, 0), dtype=np.complex64),
+        )
+        coords = {"y": np.arange(ysize) + 0.5, "x": np.arange(xsize) + 0.5}
+        return xr.DataArray(data, coords=coords).rename("data")
+
     def read_LED(self):
         """
         Read an associated LED file and extract the metadata and data into a dictionary and a DataFrame.
@@ -1035,8 +1124,12 @@ class PRM(datagrid, PRM_gmtsar):
         """
         import pandas as pd
         from datetime import datetime, timedelta
+        import os
 
         led_file = self.get("led_file")
+        if self.filename is not None:
+            # LED filename is relative to PRM file directory
+            led_file = os.path.join(os.path.dirname(self.filename), led_file)
         with open(led_file, "r") as file:
             first_line = file.readline()
         columns = ["nd", "iy", "id", "isec", "idsec"]
@@ -1085,6 +1178,274 @@ class PRM(datagrid, PRM_gmtsar):
         re = 1 / np.sqrt(arg)
         return r - re, re
 
+    def get_orbit(self, degree=8, samples=256):
+        """
+        Fit satellite orbit polynomial around the scene time span.
+
+        The LED orbit state vectors are interpolated by 6-point Hermite polynomials like to GMTSAR
+        interpolate_ALOS_orbit() and the densified orbit is fitted by Chebyshev series
+        to evaluate the positions, velocities and accelerations at any time.
+
+        Parameters
+        ----------
+        degree : int, optional
+            Chebyshev series degree. Default is 8.
+        samples : int, optional
+            Number of the densified orbit points. Default is 256.
+
+        Returns
+        -------
+        tuple
+            Scene start time in seconds and Chebyshev series for X, Y, Z satellite coordinates.
+        """
+        import numpy as np
+
+        led = self.read_LED()
+        ts = led["clock"].values
+        ps = led[["px", "py", "pz"]].values
+        vs = led[["vx", "vy", "vz"]].values
+
+        start, end = self.get_seconds()
+        # extend the orbit to cover the targets outside of the scene
+        span = max(end - start, 1.0)
+        times = np.linspace(start - span, end + span, samples)
+
+        # 6-point Hermite interpolation using the positions and the velocities
+        nval = 6
+        i0 = np.clip(np.searchsorted(ts, times) - nval // 2, 0, ts.size - nval)
+        idx = i0[:, None] + np.arange(nval)
+        x = ts[idx]
+        dx = times[:, None] - x
+        # Lagrange basis polynomials and their derivatives at the nodes
+        diff = x[:, :, None] - x[:, None, :] + np.eye(nval)
+        lagrange = np.prod(
+            np.where(
+                np.eye(nval, dtype=bool),
+                1,
+                (times[:, None, None] - x[:, None, :]) / diff,
+            ),
+            axis=2,
+        )
+        dlagrange = np.sum(np.where(np.eye(nval, dtype=bool), 0, 1 / diff), axis=2)
+        h = (1 - 2 * dx * dlagrange) * lagrange**2
+        hv = dx * lagrange**2
+        xyz = np.einsum("ti,tik->tk", h, ps[idx]) + np.einsum("ti,tik->tk", hv, vs[idx])
+
+        return start, [
+            np.polynomial.Chebyshev.fit(times - start, xyz[:, k], degree)
+            for k in range(3)
+        ]
+
+    def llt2rat(self, coords, precise=1, maxiter=16):
+        """
+        Convert longitude, latitude, and elevation (LLT) coordinates to radar (RAT) coordinates in-process.
+
+        This is vectorized NumPy range-Doppler solver equivalent to GMTSAR SAT_llt2rat: the zero-Doppler time is
+        found by Newton iterations on the polynomial orbit for all the points at once. The range and azimuth
+        shifts and the azimuth stretch of the aligned scenes are applied like to the binary.
+
+        Parameters
+        ----------
+        coords : array_like
+            The LLT coordinates with shape (N, 3) in the format [longitude, latitude, elevation].
+        precise : int, optional
+            Only the precise solution (1) is supported. Default is 1.
+        maxiter : int, optional
+            Maximum number of Newton iterations. Default is 16.
+
+        Returns
+        -------
+        numpy.ndarray
+            The array of shape (N, 5) in the format [range, azimuth, elevation, longitude, latitude] where
+            the elevation is referenced to the PRM earth radius.
+
+        Raises
+        ------
+        ValueError
+            If the approximate solution (precise=0) is requested.
+
+        Examples
+        --------
+        coords = prm.llt2rat([-115.588333, 32.758333, -42.441303])
+        """
+        import numpy as np
+
+        # constant from GMTSAR code
+        SOL = 299792456.0
+
+        if precise != 1:
+            raise ValueError(
+                f"Only the precise solution (precise=1) is supported, got precise={precise}"
+            )
+
+        coords = np.asarray(coords, dtype=np.float64)
+        llt = coords.reshape(-1, 3)
+        xyz = self._llt2xyz(llt)
+
+        start, orbit, t = self._zero_doppler(xyz, maxiter)
+        dp = np.stack([poly(t) for poly in orbit], axis=-1) - xyz
+        rng = np.sqrt(np.sum(dp * dp, axis=-1))
+
+        near_range, fs, rshift, sub_int_r, earth_radius = self.get(
+            "near_range", "rng_samp_rate", "rshift", "sub_int_r", "earth_radius"
+        )
+        clock_start, nrows, num_valid_az, prf = self.get(
+            "clock_start", "nrows", "num_valid_az", "PRF"
+        )
+        ashift, sub_int_a, stretch_a, a_stretch_a = self.get(
+            "ashift", "sub_int_a", "stretch_a", "a_stretch_a"
+        )
+        # the first valid line time without the azimuth shift, see SAT_llt2rat.c
+        t1 = (24 * 60 * 60) * clock_start + (nrows - num_valid_az) / (2 * prf)
+        rng = (rng - near_range) / (0.5 * SOL / fs) - (rshift + sub_int_r)
+        azi = (start + t - t1) * prf
+        azi = azi - (ashift + sub_int_a) - stretch_a * rng - a_stretch_a * azi
+        out = np.column_stack(
+            [
+                rng,
+                azi,
+                np.sqrt(np.sum(xyz * xyz, axis=-1)) - earth_radius,
+                llt[:, 0],
+                llt[:, 1],
+            ]
+        )
+        return out[0] if coords.ndim == 1 else out
+
+    def _zero_doppler(self, xyz, maxiter=16):
+        """
+        Solve the zero-Doppler times of ECEF points by Newton iterations on the polynomial orbit.
+
+        Returns the orbit start time in seconds, the orbit Chebyshev series and the times relative to the start.
+        """
+        import numpy as np
+
+        start, orbit = self.get_orbit()
+        velocity = [poly.deriv() for poly in orbit]
+        acceleration = [poly.deriv(2) for poly in orbit]
+
+        end = self.get_seconds()[1]
+        t = np.full(xyz.shape[0], (end - start) / 2)
+        for _ in range(maxiter):
+            dp = np.stack([poly(t) for poly in orbit], axis=-1) - xyz
+            v = np.stack([poly(t) for poly in velocity], axis=-1)
+            a = np.stack([poly(t) for poly in acceleration], axis=-1)
+            # zero-Doppler condition (P(t) - X)·V(t) = 0
+            dt = np.sum(dp * v, axis=-1) / (
+                np.sum(v * v, axis=-1) + np.sum(dp * a, axis=-1)
+            )
+            t -= dt
+            if np.nanmax(np.abs(dt), initial=0) < 1e-9:
+                break
+        return start, orbit, t
+
+    def llt2look(self, coords):
+        """
+        Compute the satellite look vector in-process.
+
+        This is vectorized NumPy equivalent of GMTSAR SAT_look using the same zero-Doppler solver as llt2rat().
+
+        Parameters
+        ----------
+        coords : array_like
+            The LLT coordinates with shape (N, 3) in the format [longitude, latitude, elevation].
+
+        Returns
+        -------
+        numpy.ndarray
+            The array of shape (N, 6) in the format [longitude, latitude, elevation, look_E, look_N, look_U]
+            where the look vector is the unit vector from the ground point to the satellite.
+
+        Examples
+        --------
+        look = prm.llt2look([-115.588333, 32.758333, -42.441303])
+        """
+        import numpy as np
+
+        coords = np.asarray(coords, dtype=np.float64)
+        llt = coords.reshape(-1, 3)
+        xyz = self._llt2xyz(llt)
+
+        _, orbit, t = self._zero_doppler(xyz)
+        look = np.stack([poly(t) for poly in orbit], axis=-1) - xyz
+        look /= np.sqrt(np.sum(look * look, axis=-1))[:, None]
+
+        lon, lat = np.radians(llt[:, 0]), np.radians(llt[:, 1])
+        east = -np.sin(lon) * look[:, 0] + np.cos(lon) * look[:, 1]
+        north = (
+            -np.sin(lat) * np.cos(lon) * look[:, 0]
+            - np.sin(lat) * np.sin(lon) * look[:, 1]
+            + np.cos(lat) * look[:, 2]
+        )
+        up = (
+            np.cos(lat) * np.cos(lon) * look[:, 0]
+            + np.cos(lat) * np.sin(lon) * look[:, 1]
+            + np.sin(lat) * look[:, 2]
+        )
+        out = np.column_stack([llt, east, north, up])
+        return out[0] if coords.ndim == 1 else out
+
+    def _llt2xyz(self, llt):
+        """
+        Convert longitude, latitude, and ellipsoidal height to ECEF coordinates (plh2xyz() in GMTSAR).
+        """
+        import numpy as np
+
+        ra, rc = self.get("equatorial_radius", "polar_radius")
+        e2 = 1 - rc**2 / ra**2
+        lon, lat, h = np.radians(llt[:, 0]), np.radians(llt[:, 1]), llt[:, 2]
+        n = ra / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+        return np.column_stack(
+            [
+                (n + h) * np.cos(lat) * np.cos(lon),
+                (n + h) * np.cos(lat) * np.sin(lon),
+                (n * (1 - e2) + h) * np.sin(lat),
+            ]
+        )
+
+    def check_llt2rat(self, coords, tolerance=0.01, look=False, debug=False):
+        """
+        Validate the in-process solver against GMTSAR SAT_llt2rat or SAT_look binary on sample points.
+
+        Parameters
+        ----------
+        coords : array_like
+            The LLT coordinates with shape (N, 3) in the format [longitude, latitude, elevation].
+        tolerance : float, optional
+            Maximum allowed absolute difference of the outputs. Default is 0.01.
+        look : bool, optional
+            If True, check llt2look() against SAT_look. Default is False to check llt2rat() against SAT_llt2rat.
+        debug : bool, optional
+            If True, print the differences. Default is False.
+
+        Returns
+        -------
+        bool
+            True when the outputs match. False when they differ, there are no sample points
+            or the GMTSAR binary is not available, so the solver is never used unvalidated.
+        """
+        import numpy as np
+
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        if coords.shape[0] == 0:
+            return False
+        try:
+            if look:
+                expected = self.SAT_look(coords)
+            else:
+                expected = self.SAT_llt2rat(coords, precise=1)
+        except FileNotFoundError:
+            if debug:
+                print("DEBUG: check_llt2rat GMTSAR binary is not available")
+            return False
+        if expected is None:
+            return False
+        expected = expected.reshape(coords.shape[0], -1)
+        actual = self.llt2look(coords) if look else self.llt2rat(coords)
+        error = np.nanmax(np.abs(actual - expected), axis=0)
+        if debug:
+            print("DEBUG: check_llt2rat max absolute errors", error)
+        return bool(np.all(error <= tolerance))
+
     # baseline can be scalar or vector
     def get_baseline_projections(self, other, baseline, alpha):
         import scipy
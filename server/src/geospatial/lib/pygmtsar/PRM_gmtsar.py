@@ -13,6 +13,108 @@ from src.geospatial.lib.pygmtsar.config import env
 
 class PRM_gmtsar:
 
+    # GMTSAR tools outputs memoized by the input PRM and LED files content
+    gmtsar_cache = "~/.cache/pygmtsar/gmtsar"
+    gmtsar_cache_size = 64 * 1024 * 1024
+
+    def _gmtsar_cached(self, name, texts, compute, debug=False):
+        """
+        Return memoized GMTSAR tool output for the same inputs or compute and store it.
+
+        The least recently used outputs are evicted when the cache size exceeds PRM_gmtsar.gmtsar_cache_size bytes.
+
+        Parameters
+        ----------
+        name : str
+            GMTSAR tool name.
+        texts : list of str
+            The tool input PRM texts and arguments. The referenced LED files content is added to the key.
+        compute : callable
+            Function to run the tool and return its text output.
+        debug : bool, optional
+            If True, debug information will be printed. Default is False.
+
+        Returns
+        -------
+        str
+            The tool text output.
+        """
+        import hashlib
+        import os
+        import re
+
+        cwd = os.path.dirname(self.filename) if self.filename is not None else "."
+        digest = hashlib.md5(name.encode("utf8"))
+        for text in texts:
+            digest.update(text.encode("utf8") + b"\0")
+            led_file = re.search(r"^led_file\s+=\s+(\S+)", text, re.MULTILINE)
+            if led_file is None:
+                continue
+            try:
+                with open(os.path.join(cwd, led_file.group(1)), "rb") as fd:
+                    digest.update(fd.read())
+            except OSError:
+                # the tool fails on missing LED file, do not memoize it
+                return compute()
+
+        cache_dir = os.path.expanduser(self.gmtsar_cache)
+        filename = os.path.join(cache_dir, f"{name}_{digest.hexdigest()}.PRM")
+        if os.path.exists(filename):
+            if debug:
+                print(f"DEBUG: {name} cached", filename)
+            try:
+                with open(filename) as fd:
+                    stdout_data = fd.read()
+            except FileNotFoundError:
+                # evicted by another process
+                pass
+            else:
+                try:
+                    # update modification time for the least recently used outputs eviction
+                    os.utime(filename)
+                except OSError:
+                    # read-only cache directory
+                    pass
+                return stdout_data
+
+        stdout_data = compute()
+        if len(stdout_data) > 0:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(filename + ".tmp", "w") as fd:
+                    fd.write(stdout_data)
+                os.replace(filename + ".tmp", filename)
+                self._evict_gmtsar_cache()
+            except OSError:
+                # read-only cache directory
+                pass
+        return stdout_data
+
+    def _evict_gmtsar_cache(self):
+        """
+        Remove the least recently used outputs when the cache exceeds PRM_gmtsar.gmtsar_cache_size bytes.
+        """
+        import os
+
+        cache_dir = os.path.expanduser(self.gmtsar_cache)
+        outputs = []
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                outputs.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in outputs)
+        for _, size, path in sorted(outputs):
+            if total <= self.gmtsar_cache_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
     def calc_dop_orb(
         self, earth_radius=0, doppler_centroid=0, inplace=False, debug=False
     ):
@@ -42,24 +144,33 @@ class PRM_gmtsar:
         from src.geospatial.lib.pygmtsar import PRM
 
         cwd = os.path.dirname(self.filename) if self.filename is not None else "."
-        p = subprocess.Popen(
-            [
-                "calc_dop_orb",
-                "/dev/stdin",
-                "/dev/stdout",
-                str(earth_radius),
-                str(doppler_centroid),
-            ],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=cwd,
-            encoding="utf8",
-            env=env,
+        argv = [
+            "calc_dop_orb",
+            "/dev/stdin",
+            "/dev/stdout",
+            str(earth_radius),
+            str(doppler_centroid),
+        ]
+
+        def compute():
+            p = subprocess.Popen(
+                argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=cwd,
+                encoding="utf8",
+                env=env,
+            )
+            stdout_data, stderr_data = p.communicate(input=self.to_str())
+            if len(stderr_data) > 0 and debug:
+                print("DEBUG: calc_dop_orb", stderr_data)
+            return stdout_data
+
+        # the output is fixed for the same input PRM and LED files
+        stdout_data = self._gmtsar_cached(
+            "calc_dop_orb", [self.to_str(), *argv[3:]], compute, debug=debug
         )
-        stdout_data, stderr_data = p.communicate(input=self.to_str())
-        if len(stderr_data) > 0 and debug:
-            print("DEBUG: calc_dop_orb", stderr_data)
         prm = PRM.from_str(stdout_data)
         if inplace:
             return self.set(prm)
@@ -96,34 +207,43 @@ class PRM_gmtsar:
         if not isinstance(other, PRM):
             raise Exception('Argument "other" should be PRM class instance')
 
-        pipe1 = os.pipe()
-        os.write(pipe1[1], bytearray(self.to_str(), "utf8"))
-        os.close(pipe1[1])
-        # print ('descriptor 1', str(pipe1[0]))
-
-        pipe2 = os.pipe()
-        os.write(pipe2[1], bytearray(other.to_str(), "utf8"))
-        os.close(pipe2[1])
-        # print ('descriptor 2', str(pipe2[0]))
-
-        argv = ["SAT_baseline", f"/dev/fd/{pipe1[0]}", f"/dev/fd/{pipe2[0]}"]
-        if debug:
-            print("DEBUG: argv", argv)
-        cwd = os.path.dirname(self.filename) if self.filename is not None else "."
-        p = subprocess.Popen(
-            argv,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            pass_fds=[pipe1[0], pipe2[0]],
-            cwd=cwd,
-            encoding="utf8",
-            env=env,
+        def compute():
+            pipe1 = os.pipe()
+            os.write(pipe1[1], bytearray(self.to_str(), "utf8"))
+            os.close(pipe1[1])
+            # print ('descriptor 1', str(pipe1[0]))
+
+            pipe2 = os.pipe()
+            os.write(pipe2[1], bytearray(other.to_str(), "utf8"))
+            os.close(pipe2[1])
+            # print ('descriptor 2', str(pipe2[0]))
+
+            argv = ["SAT_baseline", f"/dev/fd/{pipe1[0]}", f"/dev/fd/{pipe2[0]}"]
+            if debug:
+                print("DEBUG: argv", argv)
+            cwd = os.path.dirname(self.filename) if self.filename is not None else "."
+            p = subprocess.Popen(
+                argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=[pipe1[0], pipe2[0]],
+                cwd=cwd,
+                encoding="utf8",
+                env=env,
+            )
+            stdout_data, stderr_data = p.communicate()
+            os.close(pipe1[0])
+            os.close(pipe2[0])
+            # print ('stdout_data', stdout_data)
+            if len(stderr_data) > 0 and debug:
+                print("DEBUG: SAT_baseline", stderr_data)
+            return stdout_data
+
+        # the output is fixed for the same pair of PRM and LED files
+        stdout_data = self._gmtsar_cached(
+            "SAT_baseline", [self.to_str(), other.to_str()], compute, debug=debug
         )
-        stdout_data, stderr_data = p.communicate()
-        # print ('stdout_data', stdout_data)
-        if len(stderr_data) > 0 and debug:
-            print("DEBUG: SAT_baseline", stderr_data)
         prm = PRM.from_str(stdout_data)
         # replacement for SAT_baseline $1 $2 | tail -n9
         if tail is not None:
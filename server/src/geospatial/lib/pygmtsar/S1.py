@@ -29,6 +29,11 @@ class S1(tqdm_joblib):
     # less strict rule allows to find the required orbits
     orbit_offset_start = timedelta(seconds=3600)
     orbit_offset_end = timedelta(seconds=300)
+    # daily orbits index listings and orbit files cache shared by all the stacks
+    orbits_cache = "~/.cache/pygmtsar/orbits"
+    orbits_index_ttl = timedelta(hours=12)
+    # sidecar file in the scanned directory to store the parsed scene annotations
+    scan_cache = ".scan_slc.json"
 
     """
     find . -type f -name '*.tiff' -exec basename {} .tiff \; \
@@ -41,12 +46,15 @@ class S1(tqdm_joblib):
         basedir: str,
         scenes: list | pd.DataFrame,
         n_jobs: int = 8,
-        joblib_backend="loky",
+        joblib_backend="threading",
         skip_exist: bool = True,
     ):
         """
         Downloads orbit files corresponding to the specified Sentinel-1 scenes.
 
+        The daily orbit index listings and the orbit files are cached in S1.orbits_cache directory,
+        so the same days and orbits are not requested again for the next stacks.
+
         Parameters
         ----------
         basedir : str
@@ -56,7 +64,7 @@ class S1(tqdm_joblib):
         n_jobs : int, optional
             The number of concurrent download jobs. Default is 8.
         joblib_backend : str, optional
-            The backend for parallel processing. Default is 'loky'.
+            The backend for parallel processing. Default is 'threading' to share the HTTP connections pool.
         skip_exist : bool, optional
             If True, skips downloading orbits that already exist. Default is True.
 
@@ -71,15 +79,11 @@ class S1(tqdm_joblib):
             If an invalid scenes argument is provided or no suitable orbit files are found.
         """
         import pandas as pd
-        import requests
         import os
-        import re
         import glob
+        import shutil
         from datetime import datetime
         import joblib
-        import zipfile
-        from io import BytesIO
-        import xmltodict
         from tqdm.auto import tqdm
 
         # create the directory if needed
@@ -118,109 +122,247 @@ class S1(tqdm_joblib):
         df = df.groupby(["date", "mission"])["datetime"].first().reset_index()
         del df["date"]
 
-        def download_index(mission, dt, orbit_offset_start, orbit_offset_end):
-            url = S1.orbits_url.format(
-                mission=mission,
-                year=dt.date().year,
-                month=dt.date().month,
-                day=dt.date().day,
-            )
-            # print ('url', url + 'index.csv')
-            with requests.get(url + "index.csv", timeout=S1.http_timeout) as response:
-                response.raise_for_status()
-                # the most recent orbits preferred
-                lines = sorted(response.text.splitlines(), reverse=True)
-                orbits = pd.DataFrame(lines, columns=["orbit"]).dropna()
-                orbits["product"] = orbits["orbit"].apply(
-                    lambda name: name.split("_")[3]
-                )
-                orbits["mission"] = orbits["orbit"].apply(lambda name: name[:3])
-                orbits["time"] = orbits["orbit"].apply(
-                    lambda name: datetime.strptime(name.split("_")[5], "%Y%m%dT%H%M%S")
-                )
-            # detect suitable orbit and select the first one
-            for orbit in orbits.itertuples():
-                # print ('orbit', orbit)
-                orbit_parts = orbit.orbit.split(".")[0].split("_")
-                # print ('orbit_parts', orbit_parts)
-                if orbit.product == "RESORB":
-                    # select the one covering the interval
-                    time_start = (
-                        datetime.strptime(orbit_parts[6][1:], "%Y%m%dT%H%M%S")
-                        + orbit_offset_start
-                    )
-                    time_end = (
-                        datetime.strptime(orbit_parts[7], "%Y%m%dT%H%M%S")
-                        - orbit_offset_end
-                    )
-                    # print ('time_start', time_start, 'time_end', time_end)
-                    if not ((time_start <= dt) & (time_end >= dt)):
-                        continue
-                    return (orbit.orbit, url)
-                elif orbit.product == "POEORB":
-                    # select the most recent one
-                    return (orbit.orbit, url)
-                else:
-                    # in case of data parse or another error
-                    raise ValueError(f"Unexpected orbit product {orbit.product}")
-            # downloading is not possible
-            raise ValueError(
-                f"Orbit product not found for mission {mission} and timestamp {dt}"
-            )
+        session = S1._orbits_session(n_jobs)
+        cache_dir = os.path.expanduser(S1.orbits_cache)
+        os.makedirs(cache_dir, exist_ok=True)
 
-        # TODO: unzip files
-        def download_orbit(basedir, url):
-            filename = os.path.join(basedir, os.path.basename(os.path.splitext(url)[0]))
-            # print ('url', url, 'filename', filename)
-            with requests.get(url, timeout=S1.http_timeout) as response:
-                response.raise_for_status()
-                with open(filename, "wb") as f:
-                    with zipfile.ZipFile(BytesIO(response.content), "r") as zip_in:
-                        zip_files = zip_in.namelist()
-                        if len(zip_files) == 0:
-                            raise Exception(
-                                "ERROR: Downloaded file is empty zip archive."
-                            )
-                        if len(zip_files) > 1:
-                            raise Exception(
-                                "NOTE: Downloaded zip archive includes multiple files."
-                            )
-                        # extract specific file content
-                        orbit_content = zip_in.read(zip_files[0])
-                        # check XML validity
-                        xmltodict.parse(orbit_content)
-                        f.write(orbit_content)
-
-        # download orbits index files and detect the orbits.
-        # joblib reads the class file from disk,
-        # and to allow modification of orbit_offset_* on the fly, add them to the arguments
+        # download or read from cache orbits index files for the unique days
+        days = (
+            df[["mission"]].assign(day=df["datetime"].dt.floor("D")).drop_duplicates()
+        )
         with S1.tqdm_joblib(
-            tqdm(desc="Downloading Sentinel-1 Orbits Index:", total=len(df))
+            tqdm(desc="Downloading Sentinel-1 Orbits Index:", total=len(days))
         ) as progress_bar:
-            orbits = joblib.Parallel(n_jobs=n_jobs, backend=joblib_backend)(
-                joblib.delayed(download_index)(
-                    scene.mission,
-                    scene.datetime,
-                    S1.orbit_offset_start,
-                    S1.orbit_offset_end,
+            catalogs = joblib.Parallel(n_jobs=n_jobs, backend=joblib_backend)(
+                joblib.delayed(S1._orbits_index)(
+                    day.mission, day.day, session, cache_dir
                 )
-                for scene in df.itertuples()
+                for day in days.itertuples()
             )
-        # convert to dataframe for processing
-        orbits = pd.DataFrame(orbits, columns=["orbit", "url"])
-        # exclude duplicates if needed
-        # orbits = orbits.groupby(['orbit']).first().reset_index()
+        catalog = pd.concat(catalogs, ignore_index=True)
+        # joblib reads the class file from disk,
+        # and to allow modification of orbit_offset_* on the fly, add them to the arguments
+        orbits = S1._select_orbits(
+            catalog, df, S1.orbit_offset_start, S1.orbit_offset_end
+        )
 
-        # download orbits index files and detect the orbits
+        def download_orbit(basedir, url):
+            name = os.path.basename(os.path.splitext(url)[0])
+            filename = os.path.join(basedir, name)
+            if os.path.exists(filename):
+                return
+            cached = os.path.join(cache_dir, name)
+            if not os.path.exists(cached):
+                S1._download_orbit(session, url, cached)
+            shutil.copyfile(cached, filename)
+
+        # download orbits files
         with S1.tqdm_joblib(
             tqdm(desc="Downloading Sentinel-1 Orbits:", total=len(orbits))
         ) as progress_bar:
             joblib.Parallel(n_jobs=n_jobs, backend=joblib_backend)(
                 joblib.delayed(download_orbit)(basedir, orbit.url + orbit.orbit)
-                for orbit in orbits.itertuples()
+                for orbit in orbits.drop_duplicates("orbit").itertuples()
             )
         return orbits["orbit"]
 
+    @staticmethod
+    def _orbits_session(pool_size=8):
+        """
+        Create HTTP session with connections pool shared by the concurrent requests.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        retry = Retry(
+            total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _orbits_index(mission, day, session, cache_dir):
+        """
+        Return the parsed orbits index for the mission and day using the cached listing when it is fresh.
+
+        The listings including precise POEORB orbits are final and never expire,
+        the listings including only restituted RESORB orbits expire after S1.orbits_index_ttl.
+        """
+        import os
+        import time
+
+        url = S1.orbits_url.format(
+            mission=mission, year=day.year, month=day.month, day=day.day
+        )
+        filename = os.path.join(
+            cache_dir, f"{mission}_{day.year}{day.month:02}{day.day:02}_index.csv"
+        )
+        text = None
+        if os.path.exists(filename):
+            with open(filename) as fd:
+                text = fd.read()
+            age = time.time() - os.path.getmtime(filename)
+            if "_POEORB_" not in text and age > S1.orbits_index_ttl.total_seconds():
+                text = None
+        if text is None:
+            with session.get(url + "index.csv", timeout=S1.http_timeout) as response:
+                response.raise_for_status()
+                text = response.text
+            with open(filename + ".tmp", "w") as fd:
+                fd.write(text)
+            os.replace(filename + ".tmp", filename)
+        return S1._parse_orbits_index(text, mission, day, url)
+
+    @staticmethod
+    def _parse_orbits_index(text, mission, day, url):
+        """
+        Parse the orbits index listing to the table of orbit names, products and validity intervals.
+
+        Parameters
+        ----------
+        text : str
+            The index listing with one orbit filename per line like
+            S1A_OPER_AUX_POEORB_OPOD_20210301T130653_V20140406T225944_20140408T005944.EOF.zip
+        mission : str
+            The mission name of the listing.
+        day : pandas.Timestamp
+            The day of the listing.
+        url : str
+            The listing directory URL.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The table with columns orbit, url, mission, day, product, time, start, end.
+        """
+        import pandas as pd
+
+        lines = pd.Series(text.splitlines(), dtype=str).str.strip()
+        orbits = pd.DataFrame({"orbit": lines[lines != ""]}).reset_index(drop=True)
+        parts = orbits["orbit"].str.split(".", n=1).str[0].str.split("_", expand=True)
+        if len(orbits) and parts.shape[1] < 8:
+            raise ValueError(f"Unexpected orbits index content in {url}")
+        orbits["url"] = url
+        orbits["mission"] = mission
+        orbits["day"] = pd.Series([day] * len(orbits), dtype="datetime64[ns]")
+        if len(orbits) == 0:
+            empty = pd.Series([], dtype="datetime64[ns]")
+            return orbits.assign(
+                product=pd.Series([], dtype=object), time=empty, start=empty, end=empty
+            )
+        fmt = "%Y%m%dT%H%M%S"
+        orbits["product"] = parts[3]
+        orbits["time"] = pd.to_datetime(parts[5], format=fmt)
+        orbits["start"] = pd.to_datetime(parts[6].str[1:], format=fmt)
+        orbits["end"] = pd.to_datetime(parts[7], format=fmt)
+        return orbits
+
+    @staticmethod
+    def _select_orbits(catalog, scenes, orbit_offset_start, orbit_offset_end):
+        """
+        Select the orbit for every scene from the orbits catalog.
+
+        The catalog is sorted by (mission, day) listing once and the listing for every scene is
+        found by binary search. In the listing, the most recent restituted RESORB orbit covering
+        the scene timestamp is preferred and the most recent precise POEORB orbit is used otherwise.
+
+        Parameters
+        ----------
+        catalog : pandas.DataFrame
+            The parsed orbits index listings, see S1._parse_orbits_index().
+        scenes : pandas.DataFrame
+            The scenes with columns mission and datetime.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The selected orbit names and the listing URLs, one record per scene.
+        """
+        import numpy as np
+        import pandas as pd
+
+        unexpected = catalog[~catalog["product"].isin(["RESORB", "POEORB"])]
+        if len(unexpected):
+            # in case of data parse or another error
+            raise ValueError(
+                f"Unexpected orbit product {unexpected['product'].iloc[0]}"
+            )
+
+        if len(catalog) == 0:
+            # empty listings, downloading is not possible
+            mission = scenes["mission"].iloc[0]
+            dt = np.datetime64(pd.to_datetime(scenes["datetime"].iloc[0]))
+            raise ValueError(
+                f"Orbit product not found for mission {mission} and timestamp {dt}"
+            )
+
+        # the most recent orbits preferred
+        catalog = catalog.sort_values(
+            ["mission", "day", "orbit"], ascending=[True, True, False]
+        ).reset_index(drop=True)
+        keys = (catalog["mission"] + catalog["day"].dt.strftime("%Y%m%d")).values
+        dts = pd.to_datetime(scenes["datetime"]).reset_index(drop=True)
+        scene_keys = (
+            scenes["mission"].reset_index(drop=True) + dts.dt.strftime("%Y%m%d")
+        ).values
+        # locate the listing for every scene
+        lows = np.searchsorted(keys, scene_keys, side="left")
+        highs = np.searchsorted(keys, scene_keys, side="right")
+
+        resorb = (catalog["product"] == "RESORB").values
+        starts = (catalog["start"] + orbit_offset_start).values
+        ends = (catalog["end"] - orbit_offset_end).values
+        covers = np.zeros(len(catalog), dtype=bool)
+        records = []
+        for mission, dt, low, high in zip(scenes["mission"], dts, lows, highs):
+            dt = np.datetime64(dt)
+            covers[low:high] = (starts[low:high] <= dt) & (ends[low:high] >= dt)
+            candidates = np.flatnonzero(resorb[low:high] & covers[low:high])
+            if len(candidates) == 0:
+                candidates = np.flatnonzero(~resorb[low:high])
+            if len(candidates) == 0:
+                # downloading is not possible
+                raise ValueError(
+                    f"Orbit product not found for mission {mission} and timestamp {dt}"
+                )
+            orbit = catalog.iloc[low + candidates[0]]
+            records.append((orbit["orbit"], orbit["url"]))
+        return pd.DataFrame(records, columns=["orbit", "url"])
+
+    @staticmethod
+    def _download_orbit(session, url, filename):
+        """
+        Download zipped orbit file and extract it to the specified filename.
+        """
+        import os
+        import zipfile
+        from io import BytesIO
+        import xmltodict
+
+        with session.get(url, timeout=S1.http_timeout) as response:
+            response.raise_for_status()
+            with zipfile.ZipFile(BytesIO(response.content), "r") as zip_in:
+                zip_files = zip_in.namelist()
+                if len(zip_files) == 0:
+                    raise Exception("ERROR: Downloaded file is empty zip archive.")
+                if len(zip_files) > 1:
+                    raise Exception(
+                        "NOTE: Downloaded zip archive includes multiple files."
+                    )
+                # extract specific file content
+                orbit_content = zip_in.read(zip_files[0])
+        # check XML validity
+        xmltodict.parse(orbit_content)
+        with open(filename + ".tmp", "wb") as f:
+            f.write(orbit_content)
+        os.replace(filename + ".tmp", filename)
+
     @staticmethod
     def scan_slc(
         datadir,
@@ -229,6 +371,7 @@ class S1(tqdm_joblib):
         subswath=None,
         polarization=None,
         calibration=False,
+        cache=True,
     ):
         """
         Scans the specified directory for Sentinel-1 SLC (Single Look Complex) data and filters it based on the provided parameters.
@@ -245,6 +388,9 @@ class S1(tqdm_joblib):
             Filter for subswath number. Use a single or sequential numbers 1, 2, 3, 12, 23, 123, or None for no filter. Default is None.
         polarization : str, optional
             Filter for polarization. Use 'VV', 'VH', 'HH', 'HV', or None for no filter. Default is None.
+        cache : bool, optional
+            If True, reuse the parsed scene annotations stored in the sidecar file in the data directory.
+            The records are invalidated when the annotation file modification time or size changes. Default is True.
 
         Returns
         -------
@@ -257,11 +403,9 @@ class S1(tqdm_joblib):
             If the filtered scenes contain inconsistencies, such as mismatched .tiff and .xml files, or if invalid filter parameters are provided.
         """
         import os
-        import shutil
-        from glob import glob
+        from fnmatch import fnmatchcase
         import pandas as pd
         import geopandas as gpd
-        import shapely
         import numpy as np
         from datetime import datetime
         from dateutil.relativedelta import relativedelta
@@ -294,10 +438,11 @@ class S1(tqdm_joblib):
                 return dt.date()
             return dt
 
+        # walk the directory tree once and match all the patterns on the collected file names
+        files = S1._scan_files(datadir)
+
         def pattern2paths(pattern):
-            path_pattern = os.path.join(datadir, "**", pattern)
-            paths = glob(path_pattern, recursive=True)
-            return paths
+            return [path for name, path in files if fnmatchcase(name, pattern)]
 
         assert (
             orbit is None or orbit == "A" or orbit == "D"
@@ -440,17 +585,10 @@ class S1(tqdm_joblib):
         # print ('geolocs', geolocs)
         # df = gpd.GeoDataFrame(df, geometry=geolocs)
 
-        bursts = [S1.geoloc2bursts(path) for path in metapaths]
-        df = gpd.GeoDataFrame(df, geometry=bursts)
-
-        # define orbit directions
-        orbits = [
-            S1.read_annotation(path)["product"]["generalAnnotation"][
-                "productInformation"
-            ]["pass"][:1]
-            for path in metapaths
-        ]
-        df["orbit"] = orbits
+        # bursts locations and orbit directions
+        annotations = S1._scan_annotations(datadir, metapaths, cache=cache)
+        df = gpd.GeoDataFrame(df, geometry=[bursts for bursts, _ in annotations])
+        df["orbit"] = [orbit for _, orbit in annotations]
         # filter orbits
         if orbit is not None:
             df = df[df.orbit == orbit]
@@ -502,14 +640,96 @@ class S1(tqdm_joblib):
 
         return df
 
+    @staticmethod
+    def _scan_files(datadir):
+        """
+        Walk the directory tree once and return (filename, path) pairs for all the files.
+
+        Hidden files and directories are skipped the same way as for recursive glob search.
+        """
+        import os
+
+        files = []
+        for root, dirs, names in os.walk(datadir, followlinks=True):
+            dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+            files.extend(
+                (name, os.path.join(root, name))
+                for name in sorted(names)
+                if not name.startswith(".")
+            )
+        return files
+
+    @staticmethod
+    def _scan_annotations(datadir, metapaths, cache=True):
+        """
+        Return the bursts locations and the orbit direction for every XML scene annotation.
+
+        The parsed results are stored in the sidecar JSON file in the data directory and
+        reused while the annotation file modification time and size are the same.
+        """
+        import os
+        import json
+        import shapely
+
+        cache_filename = os.path.join(datadir, S1.scan_cache)
+        records = {}
+        if cache and os.path.exists(cache_filename):
+            try:
+                with open(cache_filename) as fd:
+                    records = json.load(fd)
+            except (OSError, ValueError):
+                # broken cache file is rebuilt
+                records = {}
+
+        modified = False
+        outs = []
+        keys = set()
+        for metapath in metapaths:
+            key = os.path.abspath(metapath)
+            keys.add(key)
+            stat = os.stat(metapath)
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            record = records.get(key)
+            if record is None or record["stamp"] != stamp:
+                annotation = S1.read_annotation(metapath)
+                record = {
+                    "stamp": stamp,
+                    "bursts": shapely.to_wkb(S1.geoloc2bursts(annotation), hex=True),
+                    "orbit": annotation["product"]["generalAnnotation"][
+                        "productInformation"
+                    ]["pass"][:1],
+                }
+                records[key] = record
+                modified = True
+            outs.append((shapely.from_wkb(record["bursts"]), record["orbit"]))
+
+        # forget the removed files
+        removed = [
+            key for key in records if key not in keys and not os.path.exists(key)
+        ]
+        if cache and (modified or removed):
+            for key in removed:
+                del records[key]
+            try:
+                with open(cache_filename + ".tmp", "w") as fd:
+                    json.dump(records, fd)
+                os.replace(cache_filename + ".tmp", cache_filename)
+            except OSError:
+                # read-only data directory
+                pass
+        return outs
+
     @staticmethod
     def geoloc2bursts(metapath):
         """
-        Read approximate bursts locations
+        Read approximate bursts locations from XML scene annotation filename or parsed annotation.
         """
         from shapely.geometry import LineString, Polygon, MultiPolygon
 
-        df = S1.get_geoloc(S1.read_annotation(metapath))
+        annotation = (
+            S1.read_annotation(metapath) if isinstance(metapath, str) else metapath
+        )
+        df = S1.get_geoloc(annotation)
         # this code line works for a single scene
         # lines = df.groupby('line')['geometry'].apply(lambda x: LineString(x.tolist()))
         # more complex code is required for stitched scenes processing with repeating 'line' series
@@ -553,6 +773,143 @@ class S1(tqdm_joblib):
             doc = xmltodict.parse(fd.read().replace("/></", "></"))
         return doc
 
+    @staticmethod
+    def get_bursts(annotation):
+        """
+        Return bursts line and valid samples ranges from XML scene annotation.
+
+        Parameters
+        ----------
+        annotation : dict or str
+            The parsed XML scene annotation or its filename.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A DataFrame indexed by burst number with azimuthTime, byteOffset, the burst first TIFF line,
+            the first and last valid lines within the burst and the per-line first and last valid samples.
+
+        Examples
+        --------
+        S1.get_bursts(S1.read_annotation(metapath))
+        """
+        import numpy as np
+        import pandas as pd
+
+        if isinstance(annotation, str):
+            annotation = S1.read_annotation(annotation)
+        timing = annotation["product"]["swathTiming"]
+        lines = int(timing["linesPerBurst"])
+        bursts = timing["burstList"]["burst"]
+        # single burst is parsed as a dictionary
+        if isinstance(bursts, dict):
+            bursts = [bursts]
+
+        records = []
+        for burst, record in enumerate(bursts):
+            first = np.fromstring(
+                record["firstValidSample"]["#text"], dtype=int, sep=" "
+            )
+            last = np.fromstring(record["lastValidSample"]["#text"], dtype=int, sep=" ")
+            # -1 marks the burst lines without valid samples
+            valid = np.flatnonzero((first >= 0) & (last >= first))
+            records.append(
+                {
+                    "burst": burst,
+                    "azimuthTime": pd.to_datetime(record["azimuthTime"]),
+                    "byteOffset": int(record["byteOffset"]),
+                    "line": burst * lines,
+                    "firstValidLine": valid[0] if valid.size else 0,
+                    "lastValidLine": valid[-1] if valid.size else -1,
+                    "firstValidSample": first,
+                    "lastValidSample": last,
+                }
+            )
+        return pd.DataFrame(records).set_index("burst")
+
+    @staticmethod
+    def read_tiff_layout(filename):
+        """
+        Return the data offset and shape of uncompressed Sentinel-1 measurement TIFF.
+
+        The measurement TIFF stores complex int16 samples in fixed strips one after another,
+        so the whole raster can be addressed by a single byte offset.
+
+        Parameters
+        ----------
+        filename : str
+            The filename of the measurement TIFF.
+
+        Returns
+        -------
+        tuple
+            Byte offset of the first sample and (lines, samples) raster shape.
+
+        Raises
+        ------
+        ValueError
+            If the TIFF is compressed, is not complex int16 or its strips are not contiguous.
+
+        Examples
+        --------
+        offset, shape = S1.read_tiff_layout(datapath)
+        """
+        import numpy as np
+        import struct
+
+        # TIFF tags
+        WIDTH, LENGTH, BITS, COMPRESSION, OFFSETS, SAMPLES, COUNTS, FORMAT = (
+            256,
+            257,
+            258,
+            259,
+            273,
+            277,
+            279,
+            339,
+        )
+        # TIFF field types to struct formats
+        types = {1: "B", 3: "H", 4: "I"}
+
+        with open(filename, "rb") as fd:
+            order = {b"II": "<", b"MM": ">"}.get(fd.read(2))
+            if order is None or struct.unpack(order + "H", fd.read(2))[0] != 42:
+                raise ValueError(f"Not a classic TIFF file: {filename}")
+            fd.seek(struct.unpack(order + "I", fd.read(4))[0])
+            (count,) = struct.unpack(order + "H", fd.read(2))
+            tags = {}
+            for _ in range(count):
+                tag, dtype, size, value = struct.unpack(order + "HHI4s", fd.read(12))
+                if dtype not in types:
+                    continue
+                fmt = order + str(size) + types[dtype]
+                nbytes = struct.calcsize(fmt)
+                if nbytes > 4:
+                    # the values are stored by the offset
+                    pos = fd.tell()
+                    fd.seek(struct.unpack(order + "I", value)[0])
+                    value = fd.read(nbytes)
+                    fd.seek(pos)
+                tags[tag] = struct.unpack(fmt, value[:nbytes])
+
+        shape = (tags[LENGTH][0], tags[WIDTH][0])
+        if tags.get(COMPRESSION, (1,))[0] != 1:
+            raise ValueError(f"Compressed TIFF is not supported: {filename}")
+        if (
+            tags.get(SAMPLES, (1,))[0] != 1
+            or tags.get(BITS, (0,))[0] != 32
+            or tags.get(FORMAT, (0,))[0] != 5
+        ):
+            raise ValueError(f"TIFF data type is not complex int16: {filename}")
+        offsets = np.asarray(tags[OFFSETS], dtype=np.int64)
+        counts = np.asarray(tags[COUNTS], dtype=np.int64)
+        if (
+            np.any(offsets[1:] != offsets[:-1] + counts[:-1])
+            or counts.sum() != 4 * shape[0] * shape[1]
+        ):
+            raise ValueError(f"TIFF strips are not contiguous: {filename}")
+        return int(offsets[0]), shape
+
     @staticmethod
     def get_geoloc(annotation):
         """
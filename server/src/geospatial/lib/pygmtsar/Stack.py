@@ -70,6 +70,40 @@ class Stack(Stack_export):
             self.reference = self.df.index[0]
         return self
 
+    def add_scenes(self, scenes):
+        """
+        Append the scenes for new dates to the Stack, the dates already present are ignored.
+
+        This allows to ingest the scenes date by date while the rest of the stack is downloading.
+
+        Parameters
+        ----------
+        scenes : GeoPandas Dataframe
+            Sentinel-1 scenes with bursts geometries and orbits in structured format.
+
+        Returns
+        -------
+        Stack
+            Modified instance of the Stack class.
+
+        Examples
+        --------
+        stack.add_scenes(S1.scan_slc(datadir).loc[['2023-02-10']])
+        """
+        import pandas as pd
+
+        if self.df is None:
+            return self.set_scenes(scenes)
+        scenes = scenes[~scenes.index.isin(self.df.index)]
+        if len(scenes) == 0:
+            return self
+        assert (
+            len(scenes[scenes.orbitpath.isna()]) == 0
+        ), 'ERROR: orbits missed, check "orbitpath" column.'
+        # keep the scanning order (date, subswath)
+        self.df = pd.concat([self.df, scenes]).sort_index(kind="stable")
+        return self
+
     #    def make_gaussian_filter(self, range_dec, azi_dec, wavelength, debug=False):
     #        """
     #        Wrapper for PRM.make_gaussian_filter() and sonamed command line tool. Added for development purposes only.
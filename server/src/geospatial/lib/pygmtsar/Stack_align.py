@@ -458,6 +458,77 @@ class Stack_align(Stack_dem):
                 for subswath in subswaths
             )
 
+        self._merge_subswaths()
+
+    def align_date(self, date, n_jobs=-1, degrees=12.0 / 3600, debug=False):
+        """
+        Align all the subswaths for a single date.
+
+        The reference date is prepared and the repeat dates are aligned to it, so the dates can be
+        processed one by one as soon as the scenes and orbits are available. The reference date
+        should be processed first and the DEM loaded before aligning the repeat dates.
+        Call Stack._merge_subswaths() when all the dates are aligned.
+
+        Parameters
+        ----------
+        date : str
+            The date to process.
+        n_jobs : int, optional
+            Number of parallel processing jobs. n_jobs=-1 means all processor cores are used. Default is -1.
+        degrees : float, optional
+            Degrees per pixel resolution for the coarse DEM. Default is 12.0/3600.
+        debug : bool, optional
+            Enable debug mode. Default is False.
+
+        Returns
+        -------
+        None
+
+        Examples
+        --------
+        stack.align_date(stack.reference)
+        stack.align_date('2023-02-10')
+        """
+        from tqdm.auto import tqdm
+        import joblib
+        import warnings
+
+        # supress warnings about unary_union/union_all() future behaviour to replace None by empty collection
+        warnings.filterwarnings("ignore")
+
+        subswaths = self.get_subswaths()
+
+        if n_jobs is None or debug == True:
+            joblib_backend = "sequential"
+        else:
+            joblib_backend = None
+
+        if date == self.reference:
+            with self.tqdm_joblib(
+                tqdm(desc="Preparing Reference", total=len(subswaths))
+            ) as progress_bar:
+                joblib.Parallel(n_jobs=n_jobs, backend=joblib_backend)(
+                    joblib.delayed(self._align_ref_subswath)(subswath, debug=debug)
+                    for subswath in subswaths
+                )
+            return
+
+        with self.tqdm_joblib(
+            tqdm(desc=f"Aligning Repeat {date}", total=len(subswaths))
+        ) as progress_bar:
+            joblib.Parallel(n_jobs=n_jobs, backend=joblib_backend)(
+                joblib.delayed(self._align_rep_subswath)(
+                    subswath, date, degrees=degrees, debug=debug
+                )
+                for subswath in subswaths
+            )
+
+    def _merge_subswaths(self):
+        """
+        Merge the aligned subswaths records into a single record per date.
+        """
+        import geopandas as gpd
+
         # merge subswaths, datapath and metapath converted to lists even for a single subswath, geometry merges bursts
         df = self.df.groupby(self.df.index).agg(
             {
@@ -171,13 +171,12 @@ class Stack_detrend(Stack_unwrap):
         import xarray as xr
         import dask
 
-        # 'linear'
-        from sklearn.linear_model import LinearRegression
-
-        # 'sgd'
-        from sklearn.linear_model import SGDRegressor
-        from sklearn.pipeline import make_pipeline
-        from sklearn.preprocessing import StandardScaler
+        algorithm = kwargs.pop("algorithm", "linear")
+        if algorithm not in ["linear", "sgd"]:
+            raise ValueError(
+                f"Unsupported algorithm {algorithm}. Should be 'linear' or 'sgd'"
+            )
+        sgd_kwargs = kwargs
 
         # find stack dim
         stackvar = data.dims[0] if len(data.dims) >= 3 else "stack"
@@ -227,28 +226,13 @@ class Stack_detrend(Stack_unwrap):
                 Y = data_values.reshape(-1, 1).astype(np.float64)
             del data_values
 
-            # build prediction model with or without plane removal (fit_intercept)
-            algorithm = kwargs.pop("algorithm", "linear")
-            if algorithm == "sgd":
-                regr = make_pipeline(StandardScaler(), SGDRegressor(**kwargs))
-                fit_params = (
-                    {"sgdregressor__sample_weight": weight_values[~nanmask]}
-                    if weight.size > 1
-                    else {}
-                )
-            elif algorithm == "linear":
-                regr = make_pipeline(
-                    StandardScaler(), LinearRegression(**kwargs, copy_X=False, n_jobs=1)
-                )
-                fit_params = (
-                    {"linearregression__sample_weight": weight_values[~nanmask]}
-                    if weight.size > 1
-                    else {}
-                )
-            else:
-                raise ValueError(
-                    f"Unsupported algorithm {kwargs['algorithm']}. Should be 'linear' or 'sgd'"
-                )
+            # build prediction model with data normalization
+            regr = make_pipeline(StandardScaler(), SGDRegressor(**sgd_kwargs))
+            fit_params = (
+                {"sgdregressor__sample_weight": weight_values[~nanmask]}
+                if weight.size > 1
+                else {}
+            )
             del weight_values
 
             regr.fit(variables_values[:, ~nanmask].T, Y[~nanmask], **fit_params)
@@ -303,6 +287,20 @@ class Stack_detrend(Stack_unwrap):
         else:
             weight_stack = None
 
+        if algorithm == "linear":
+            return Stack_detrend.regression_normal(
+                data,
+                variables_stack,
+                weight_stack,
+                wrap=wrap,
+                valid_pixels_threshold=valid_pixels_threshold,
+                **kwargs,
+            )
+
+        from sklearn.linear_model import SGDRegressor
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
         # xarray wrapper
         model = xr.apply_ufunc(
             regression_block,
@@ -312,12 +310,162 @@ class Stack_detrend(Stack_unwrap):
             dask="parallelized",
             vectorize=False,
             output_dtypes=[np.float32],
-            dask_gufunc_kwargs={**kwargs},
         )
         del variables_stack
 
         return model
 
+    @staticmethod
+    def regression_normal(
+        data,
+        variables,
+        weight=None,
+        wrap=False,
+        valid_pixels_threshold=1000,
+        fit_intercept=True,
+    ):
+        """
+        Weighted linear regression of the data on the variables using the normal equations.
+
+        The data blocks accumulate the weighted normal matrices X^T W X and X^T W y by a tree reduction over all
+        the chunks, the small systems are solved once per pair on the standardized variables (like to the scikit-learn
+        StandardScaler and LinearRegression pipeline), and the prediction is applied by a fused blockwise operation.
+        All the pairs are processed in a single pass.
+
+        Parameters
+        ----------
+        data : xarray.DataArray
+            The target 2D or 3D data array to fit.
+        variables : list of xarray.DataArray
+            Predictor variables as 2D arrays or 3D arrays with the data stack dimension.
+        weight : xarray.DataArray, optional
+            Weights for each data point.
+        wrap : bool, optional
+            Fit sine and cosine of the data and return the wrapped phase (default is False).
+        valid_pixels_threshold : int, optional
+            Minimum number of valid pixels required for the regression (default is 1000).
+        fit_intercept : bool, optional
+            Whether to calculate the intercept (default is True).
+
+        Returns
+        -------
+        xarray.DataArray
+            The predicted values with the data coordinates.
+        """
+        import numpy as np
+        import xarray as xr
+        import dask
+
+        def as_dask(grid, chunks):
+            array = dask.array.asarray(grid.data)
+            if array.ndim == 3:
+                return array.rechunk(chunks), "pyx"
+            return array.rechunk(chunks[1:]), "yx"
+
+        data_array = dask.array.asarray(data.data)
+        if data.ndim == 2:
+            data_array = data_array[None]
+        chunks = data_array.chunks
+        args = [arg for v in variables for arg in as_dask(v, chunks)]
+        weight_args = as_dask(weight, chunks) if weight is not None else (None, None)
+        # variables and intercept
+        nvars = len(variables) + 1
+        # target values or sine and cosine for wrapped phase
+        ntargets = 2 if wrap else 1
+
+        def block_design(args, idx, shape):
+            values = [np.ones(np.prod(shape))]
+            for arg in args:
+                values.append((arg[idx] if arg.ndim == 3 else arg).ravel())
+            return np.stack(values).astype(np.float64)
+
+        def block_normal(data, weight, *args):
+            out = np.zeros((data.shape[0], 1, 1, nvars, nvars + ntargets + 2))
+            for idx in range(data.shape[0]):
+                X = block_design(args, idx, data.shape[1:])
+                values = data[idx].ravel().astype(np.float64)
+                valid = np.isfinite(values) & np.all(np.isfinite(X), axis=0)
+                if weight is not None:
+                    weights = (weight[idx] if weight.ndim == 3 else weight).ravel()
+                    valid &= np.isfinite(weights)
+                    weights = weights[valid].astype(np.float64)
+                else:
+                    weights = 1.0
+                X = X[:, valid]
+                values = values[valid]
+                Y = np.stack([np.sin(values), np.cos(values)]) if wrap else values[None]
+                XW = X * weights
+                out[idx, 0, 0, :, :nvars] = XW @ X.T
+                out[idx, 0, 0, :, nvars : nvars + ntargets] = XW @ Y.T
+                # not weighted sums for the variables standardization
+                out[idx, 0, 0, :, -2] = X.sum(axis=1)
+                out[idx, 0, 0, :, -1] = np.square(X).sum(axis=1)
+                del X, XW, Y, values, valid, weights
+            return out
+
+        def block_solve(normal):
+            coeffs = np.full((normal.shape[0], nvars, ntargets), np.nan)
+            for idx, stats in enumerate(normal):
+                count = stats[0, -2]
+                if count < max(valid_pixels_threshold, 1):
+                    continue
+                mean = stats[:, -2] / count
+                scale = np.sqrt(np.maximum(stats[:, -1] / count - mean**2, 0))
+                # StandardScaler keeps the constant variables unscaled
+                scale[scale == 0] = 1
+                mean[0], scale[0] = 0, 1
+                # transform to the standardized variables and intercept
+                transform = np.diag(1 / scale)
+                transform[0, 1:] = -mean[1:] / scale[1:]
+                if not fit_intercept:
+                    transform = transform[:, 1:]
+                lhs = transform.T @ stats[:, :nvars] @ transform
+                rhs = transform.T @ stats[:, nvars : nvars + ntargets]
+                coeffs[idx] = transform @ np.linalg.lstsq(lhs, rhs, rcond=None)[0]
+            return coeffs
+
+        def block_predict(coeffs, *args):
+            shape = args[0].shape[-2:]
+            out = np.full((coeffs.shape[0],) + shape, np.nan, dtype=np.float32)
+            for idx in range(coeffs.shape[0]):
+                X = block_design(args, idx, shape)
+                valid = np.all(np.isfinite(X), axis=0)
+                pred = coeffs[idx].T @ X[:, valid]
+                if wrap:
+                    pred = np.arctan2(pred[0], pred[1])
+                out[idx].reshape(-1)[valid] = pred.ravel()
+                del X, valid, pred
+            return out
+
+        normal = dask.array.blockwise(
+            block_normal,
+            "pyxab",
+            data_array,
+            "pyx",
+            *weight_args,
+            *args,
+            new_axes={"a": nvars, "b": nvars + ntargets + 2},
+            adjust_chunks={"y": 1, "x": 1},
+            dtype=np.float64,
+        ).sum(axis=(1, 2))
+        coeffs = normal.map_blocks(
+            block_solve,
+            chunks=(normal.chunks[0], (nvars,), (ntargets,)),
+            dtype=np.float64,
+        )
+        model = dask.array.blockwise(
+            block_predict,
+            "pyx",
+            coeffs,
+            "pab",
+            *args,
+            concatenate=True,
+            dtype=np.float32,
+        )
+        if data.ndim == 2:
+            model = model[0]
+        return xr.DataArray(model, coords=data.coords, dims=data.dims, name=data.name)
+
     def regression_linear(
         self,
         data,
@@ -341,7 +489,7 @@ class Stack_detrend(Stack_unwrap):
             data,
             variables,
             weight,
-            valid_pixels_threshold,
+            valid_pixels_threshold=valid_pixels_threshold,
             algorithm="linear",
             fit_intercept=fit_intercept,
         )
@@ -397,7 +545,7 @@ class Stack_detrend(Stack_unwrap):
             data,
             variables,
             weight,
-            valid_pixels_threshold,
+            valid_pixels_threshold=valid_pixels_threshold,
             algorithm="sgd",
             max_iter=max_iter,
             tol=tol,
@@ -1139,7 +1287,171 @@ class Stack_detrend(Stack_unwrap):
 
         return phase_turbo.rename("turbulence")
 
-    def velocity(self, data):
+    @staticmethod
+    def polyfit1d(data, x, degree=1, uncertainty=False):
+        """
+        Fit polynomials to many series sharing the same coordinate at once.
+
+        The Vandermonde matrix depends on the coordinate only, so its pseudo-inverse is computed once and applied
+        to all the complete series by a single float32 matrix product. The series with missing values are solved by
+        batched normal equations, and the series with less than degree+1 valid values are not fitted (NaN).
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Series array of shape (n, pixels).
+        x : numpy.ndarray
+            Coordinate values of shape (n,).
+        degree : int, optional
+            Polynomial degree (default is 1).
+        uncertainty : bool, optional
+            Compute the coefficients standard deviations (default is False).
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            Polynomial coefficients of shape (degree+1, pixels) with the highest power first, see numpy.polyfit,
+            the fitted values of the data shape, and the coefficients standard deviations or None.
+        """
+        import numpy as np
+        from scipy.special import comb
+
+        data = np.asarray(data, dtype=np.float32)
+        x = np.asarray(x, dtype=np.float64)
+        # centered and scaled coordinate for the numerical stability
+        x0 = x.mean()
+        scale = np.abs(x - x0).max() or 1.0
+        vander = np.vander((x - x0) / scale, degree + 1)
+        # transform the coefficients to the original coordinate
+        transform = np.zeros((degree + 1, degree + 1))
+        for k in range(degree + 1):
+            for j in range(k + 1):
+                transform[degree - j, degree - k] = (
+                    comb(k, j) * (-x0) ** (k - j) / scale**k
+                )
+
+        coeffs = np.full((degree + 1, data.shape[1]), np.nan, dtype=np.float32)
+        # (V^T V)^-1 for every pixel
+        cov = np.full((data.shape[1], degree + 1, degree + 1), np.nan)
+        valid = np.isfinite(data)
+        complete = valid.all(axis=0)
+        if complete.any():
+            # the same pseudo-inverse for all the complete series
+            pinv = np.linalg.pinv(vander)
+            coeffs[:, complete] = pinv.astype(np.float32) @ data[:, complete]
+            cov[complete] = pinv @ pinv.T
+            del pinv
+        partial = np.flatnonzero(~complete & (valid.sum(axis=0) > degree))
+        if partial.size:
+            # normal equations for the series with missing values
+            mask = valid[:, partial].astype(np.float64)
+            values = np.where(valid[:, partial], data[:, partial], 0).astype(np.float64)
+            powers = np.vander((x - x0) / scale, 2 * degree + 1)
+            moments = (powers.T @ mask).T
+            idx = np.add.outer(np.arange(degree + 1), np.arange(degree + 1))
+            # highest power first like to the Vandermonde matrix columns
+            normal = moments[:, idx]
+            rhs = (vander.T @ values).T
+            solvable = np.linalg.matrix_rank(normal, hermitian=True) == degree + 1
+            partial = partial[solvable]
+            coeffs[:, partial] = np.linalg.solve(
+                normal[solvable], rhs[solvable][..., None]
+            )[..., 0].T
+            if uncertainty:
+                cov[partial] = np.linalg.inv(normal[solvable])
+            del mask, values, moments, normal, rhs, solvable
+        fit = vander.astype(np.float32) @ coeffs
+        std = None
+        if uncertainty:
+            dof = valid.sum(axis=0) - (degree + 1)
+            resid = np.where(valid, data - fit, 0)
+            variance = np.square(resid, dtype=np.float64).sum(axis=0) / np.where(
+                dof > 0, dof, np.nan
+            )
+            # the covariance for the original coordinate
+            cov = transform @ cov @ transform.T
+            std = np.sqrt(np.diagonal(cov, axis1=1, axis2=2).T * variance).astype(
+                np.float32
+            )
+            del resid, variance
+        del cov
+        coeffs = (transform @ coeffs).astype(np.float32)
+        return coeffs, fit, std
+
+    @staticmethod
+    def _polyfit1d(data, dim, x, degree=1, uncertainty=False):
+        """
+        Apply Stack.polyfit1d() to the data chunks along the dimension.
+        """
+        import xarray as xr
+        import numpy as np
+
+        def polyfit_block(block):
+            # the core dimension is the last one
+            shape = block.shape
+            coeffs, fit, std = Stack_detrend.polyfit1d(
+                block.reshape(-1, shape[-1]).T, x, degree, uncertainty
+            )
+            out = [
+                coeffs.T.reshape(*shape[:-1], degree + 1),
+                fit.T.reshape(shape),
+            ]
+            if uncertainty:
+                out.append(std.T.reshape(*shape[:-1], degree + 1))
+            return tuple(out)
+
+        if data.chunks is not None:
+            data = data.chunk({dim: -1})
+        output_core_dims = [["degree"], [dim]] + ([["degree"]] if uncertainty else [])
+        out = xr.apply_ufunc(
+            polyfit_block,
+            data,
+            dask="parallelized",
+            input_core_dims=[[dim]],
+            output_core_dims=output_core_dims,
+            output_dtypes=[np.float32] * len(output_core_dims),
+            dask_gufunc_kwargs={"output_sizes": {"degree": degree + 1}},
+        )
+        degrees = np.arange(degree, -1, -1)
+        coeffs = out[0].assign_coords(degree=degrees).transpose("degree", ...)
+        fit = out[1].transpose(*data.dims)
+        std = (
+            out[2].assign_coords(degree=degrees).transpose("degree", ...)
+            if uncertainty
+            else None
+        )
+        return coeffs, fit, std
+
+    @staticmethod
+    def _polyfit_coord(values):
+        """
+        Convert coordinate values to numbers like to xarray polyfit and polyval.
+        """
+        import numpy as np
+
+        values = np.asarray(values)
+        if np.issubdtype(values.dtype, np.datetime64):
+            # nanoseconds since 1970-01-01
+            return values.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+        return values.astype(np.float64)
+
+    def velocity(self, data, uncertainty=False):
+        """
+        Compute the linear trend slope per year along the date dimension.
+
+        Parameters
+        ----------
+        data : xarray.DataArray
+            Input data with the 'date' dimension.
+        uncertainty : bool, optional
+            Return also the slope standard deviation as 'trend_std' variable (default is False).
+
+        Returns
+        -------
+        xarray.DataArray or xarray.Dataset
+            The slope per year, and its standard deviation when uncertainty=True.
+        """
+        import xarray as xr
         import pandas as pd
         import numpy as np
 
@@ -1156,9 +1468,16 @@ class Stack_detrend(Stack_unwrap):
         # velocity = nanoseconds*data.polyfit('date', 1).polyfit_coefficients.sel(degree=1)/years
         nanoseconds_per_year = 365.25 * 24 * 60 * 60 * 1e9
         # calculate slope per year
-        velocity = nanoseconds_per_year * data.polyfit(
-            "date", 1
-        ).polyfit_coefficients.sel(degree=1).astype(np.float32).rename("trend")
+        coeffs, _, std = self._polyfit1d(
+            data, "date", self._polyfit_coord(data.date), 1, uncertainty
+        )
+        velocity = (nanoseconds_per_year * coeffs.sel(degree=1)).astype(np.float32)
+        velocity = velocity.drop_vars("degree").rename("trend")
+        if uncertainty:
+            velocity_std = (nanoseconds_per_year * std.sel(degree=1)).astype(np.float32)
+            velocity = xr.merge(
+                [velocity, velocity_std.drop_vars("degree").rename("trend_std")]
+            )
         if multi_index is not None:
             return velocity.assign_coords(stack=multi_index)
         return velocity
@@ -1246,7 +1565,7 @@ class Stack_detrend(Stack_unwrap):
         print("NOTE: Function is deprecated. Use Stack.regression1d() instead.")
         return self.regression1d(data=data, dim=dim, degree=degree)
 
-    def regression1d(self, data, dim="auto", degree=1, wrap=False):
+    def regression1d(self, data, dim="auto", degree=1, wrap=False, uncertainty=False):
         import xarray as xr
         import pandas as pd
         import numpy as np
@@ -1282,9 +1601,9 @@ class Stack_detrend(Stack_unwrap):
                 dim_da = xr.DataArray(dim.values, dims=[stackdim])
             else:
                 dim_da = xr.DataArray(dim, dims=[stackdim])
-            data_dim = data.assign_coords(polyfit_coord=dim_da).swap_dims(
-                {"pair": "polyfit_coord"}
-            )
+            dim_values = self._polyfit_coord(dim_da)
+        else:
+            dim_values = self._polyfit_coord(data[dim])
 
         if wrap:
             # wrap to prevent outrange
@@ -1300,30 +1619,14 @@ class Stack_detrend(Stack_unwrap):
             # wrap to prevent outrange
             return self.wrap(fit)
 
-        # add new coordinate using 'dim' values
-        if not isinstance(dim, str):
-            # fit the specified values
-            # Polynomial coefficients, highest power first, see numpy.polyfit
-            fit_coeff = data_dim.polyfit(
-                "polyfit_coord", degree
-            ).polyfit_coefficients.astype(np.float32)
-            fit = (
-                xr.polyval(data_dim["polyfit_coord"], fit_coeff)
-                .swap_dims({"polyfit_coord": stackdim})
-                .drop_vars("polyfit_coord")
-                .astype(np.float32)
-                .rename("trend")
-            )
-            out = xr.merge([fit, fit_coeff]).rename(polyfit_coefficients="coefficients")
-            if multi_index is not None:
-                return out.assign_coords(stack=multi_index)
-            return out
-
-        # fit existing coordinate values
         # Polynomial coefficients, highest power first, see numpy.polyfit
-        fit_coeff = data.polyfit(dim, degree).polyfit_coefficients.astype(np.float32)
-        fit = xr.polyval(data[dim], fit_coeff).astype(np.float32).rename("trend")
-        out = xr.merge([fit, fit_coeff]).rename(polyfit_coefficients="coefficients")
+        fit_coeff, fit, fit_std = self._polyfit1d(
+            data, stackdim, dim_values, degree, uncertainty
+        )
+        out = [fit.rename("trend"), fit_coeff.rename("coefficients")]
+        if uncertainty:
+            out.append(fit_std.rename("coefficients_std"))
+        out = xr.merge(out)
         if multi_index is not None:
             return out.assign_coords(stack=multi_index)
         return out
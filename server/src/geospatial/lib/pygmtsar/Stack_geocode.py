@@ -158,6 +158,194 @@ class Stack_geocode(Stack_sbas):
         else:
             return geoms[0]
 
+    ##########################################################################################
+    # geocoding index
+    ##########################################################################################
+    def _geocode_index(self, name, trans, ys, xs, yvar, xvar):
+        """
+        Build or reuse the nearest neighbour geocoding index for the transform grid.
+
+        The index is int32 flat index of the source grid pixel (ys, xs) for every transform grid pixel
+        and -1 marks the invalid pixels. It is stored next to the transform NetCDF file or Zarr store and
+        it is reused while the transform and the both grids are the same. The indices built for
+        the previous transform are removed when the transform is rebuilt.
+
+        Parameters
+        ----------
+        name : str
+            The transform name, 'trans' or 'trans_inv'.
+        trans : xarray.Dataset
+            The (decimated) transform defining the output grid.
+        ys, xs : numpy.ndarray
+            The source grid coordinates.
+        yvar, xvar : str
+            The transform variables for the source grid coordinates like 'azi' and 'rng'.
+
+        Returns
+        -------
+        str
+            The geocoding index NumPy file name.
+        """
+        import numpy as np
+        import hashlib
+        import os
+
+        assert (
+            ys.size * xs.size < 2**31
+        ), f"ERROR: The grid {ys.size}x{xs.size} is too large for the geocoding index"
+
+        ydim, xdim = trans[yvar].dims
+        # the transform is saved as NetCDF file or Zarr store, see open_cube()
+        trans_filename = self.get_cubename(name)
+        if self.is_store(trans_filename):
+            trans_filename = os.path.join(trans_filename, ".zmetadata")
+        stamp = hashlib.md5(
+            repr(os.path.getmtime(trans_filename)).encode()
+        ).hexdigest()[:8]
+        key = []
+        for coords in [trans[ydim].values, trans[xdim].values, ys, xs]:
+            key += [coords[0], coords[-1], coords.size]
+        digest = hashlib.md5(
+            repr(np.asarray(key, dtype=np.float64).tolist()).encode()
+        ).hexdigest()
+        filename = os.path.join(self.basedir, f"{name}_index_{stamp}_{digest[:16]}.npy")
+        if os.path.exists(filename):
+            return filename
+        # remove the outdated indices for the previous transform
+        for outdated in self._glob_re(name + "_index_[0-9a-f]{8}_[0-9a-f]{16}.npy$"):
+            if not os.path.basename(outdated).startswith(f"{name}_index_{stamp}_"):
+                os.remove(outdated)
+
+        y0, dy = ys[0], ys[1] - ys[0]
+        x0, dx = xs[0], xs[1] - xs[0]
+        ymin, ymax = min(ys[0], ys[-1]), max(ys[0], ys[-1])
+        xmin, xmax = min(xs[0], xs[-1]), max(xs[0], xs[-1])
+
+        def index_block(y, x):
+            # NaN coordinates are excluded by the comparisons
+            valid = (y >= ymin) & (y <= ymax) & (x >= xmin) & (x <= xmax)
+            # the ties are resolved to the lower index like to RegularGridInterpolator
+            iy = np.ceil((np.where(valid, y, y0) - y0) / dy - 0.5).astype(np.int64)
+            ix = np.ceil((np.where(valid, x, x0) - x0) / dx - 0.5).astype(np.int64)
+            return np.where(valid, iy * xs.size + ix, -1).astype(np.int32)
+
+        # compute the index by row bands to limit the memory consumption
+        tmp_filename = filename[:-4] + ".tmp.npy"
+        index = np.lib.format.open_memmap(
+            tmp_filename,
+            mode="w+",
+            dtype=np.int32,
+            shape=(trans[ydim].size, trans[xdim].size),
+        )
+        for start in range(0, trans[ydim].size, self.chunksize):
+            band = trans[[yvar, xvar]].isel(
+                {ydim: slice(start, start + self.chunksize)}
+            )
+            band = band.compute()
+            index[start : start + self.chunksize] = index_block(
+                band[yvar].values, band[xvar].values
+            )
+            del band
+        index.flush()
+        del index
+        os.replace(tmp_filename, filename)
+        return filename
+
+    def _geocode_gather(self, data, name, trans, yvar, xvar):
+        """
+        Geocode 2D or 3D grid by the nearest neighbour geocoding index.
+
+        The output blocks are gathered by the cached index from the source grid subsets,
+        see Stack._geocode_index() for the details.
+        """
+        import dask
+        import xarray as xr
+        import numpy as np
+
+        sdim, ydim, xdim = data.dims if len(data.dims) == 3 else ("stack",) + data.dims
+        ys = data[ydim].values
+        xs = data[xdim].values
+        filename = self._geocode_index(name, trans, ys, xs, yvar, xvar)
+        out_ydim, out_xdim = trans[yvar].dims
+
+        @dask.delayed
+        def gather_block(rows, cols, stackval=None):
+            shape = (rows.stop - rows.start, cols.stop - cols.start)
+            grid = np.full(shape, np.nan, dtype=np.float32)
+            index = np.load(filename, mmap_mode="r")[rows, cols]
+            valid = index >= 0
+            if not valid.any():
+                return grid
+            iys, ixs = np.divmod(index[valid].astype(np.int64), xs.size)
+            del index
+            # use outer variables
+            block_grid = data.sel({sdim: stackval}) if stackval is not None else data
+            ymin, ymax = iys.min(), iys.max() + 1
+            xmin, xmax = ixs.min(), ixs.max() + 1
+            values = (
+                block_grid.isel({ydim: slice(ymin, ymax), xdim: slice(xmin, xmax)})
+                .compute(n_workers=1)
+                .values
+            )
+            del block_grid
+            grid[valid] = np.take(values, (iys - ymin) * (xmax - xmin) + (ixs - xmin))
+            del values, iys, ixs, valid
+            return grid
+
+        # split to equal chunks and rest
+        nrows, ncols = trans[out_ydim].size, trans[out_xdim].size
+        rows_blocks = [
+            slice(start, min(start + self.chunksize, nrows))
+            for start in range(0, nrows, self.chunksize)
+        ]
+        cols_blocks = [
+            slice(start, min(start + self.chunksize, ncols))
+            for start in range(0, ncols, self.chunksize)
+        ]
+
+        stack = []
+        for stackval in data[sdim].values if len(data.dims) == 3 else [None]:
+            # per-block processing
+            blocks_total = []
+            for rows in rows_blocks:
+                blocks = []
+                for cols in cols_blocks:
+                    block = dask.array.from_delayed(
+                        gather_block(rows, cols, stackval),
+                        shape=(rows.stop - rows.start, cols.stop - cols.start),
+                        dtype=np.float32,
+                    )
+                    blocks.append(block)
+                    del block
+                blocks_total.append(blocks)
+                del blocks
+            dask_block = dask.array.block(blocks_total)
+            coords = {
+                out_ydim: trans.coords[out_ydim],
+                out_xdim: trans.coords[out_xdim],
+            }
+            if len(data.dims) == 3:
+                da = xr.DataArray(
+                    dask_block[None, :], coords={sdim: [stackval], **coords}
+                )
+            else:
+                da = xr.DataArray(dask_block, coords=coords)
+            stack.append(da)
+            del blocks_total, dask_block
+
+        # wrap lazy Dask array to Xarray dataarray
+        if len(data.dims) == 2:
+            out = stack[0]
+        else:
+            out = xr.concat(stack, dim=sdim)
+        del stack
+
+        # append source grid coordinates excluding removed ones
+        for k, v in data.coords.items():
+            if k not in [ydim, xdim]:
+                out[k] = v
+        return out.rename(data.name)
+
     ##########################################################################################
     # ra2ll
     ##########################################################################################
@@ -184,8 +372,6 @@ class Stack_geocode(Stack_sbas):
         # or use "geocode" option for open_grids() instead:
         unwraps_ll = stack.open_grids(pairs, 'unwrap', geocode=True)
         """
-        import dask
-        import xarray as xr
         import numpy as np
 
         if "stack" in data.dims and "y" in data.coords and "x" in data.coords:
@@ -202,84 +388,6 @@ class Stack_geocode(Stack_sbas):
         # get complete transform table
         trans = self.get_trans()
 
-        @dask.delayed
-        def intf_block(lats_block, lons_block, stackval=None):
-            from scipy.interpolate import RegularGridInterpolator
-
-            # use outer variables
-            block_grid = (
-                data.sel({stackvar: stackval}) if stackval is not None else data
-            ).compute(n_workers=1)
-            trans_block = trans.sel(lat=lats_block, lon=lons_block).compute(n_workers=1)
-
-            # check if the data block exists
-            if not (trans_block.lat.size > 0 and trans_block.lon.size > 0):
-                del block_grid, trans_block
-                return np.nan * np.zeros(
-                    (lats_block.size, lons_block.size), dtype=np.float32
-                )
-
-            # use trans table subset
-            y = trans_block.azi.values.ravel()
-            x = trans_block.rng.values.ravel()
-            points = np.column_stack([y, x])
-            del trans_block
-
-            # get interferogram full grid
-            ys = data.y.values
-            xs = data.x.values
-
-            # this code spends additional time for the checks to exclude warnings
-            if np.all(np.isnan(y)):
-                del block_grid, ys, xs, points
-                return np.nan * np.zeros(
-                    (lats_block.size, lons_block.size), dtype=np.float32
-                )
-
-            # calculate trans grid subset extent
-            ymin, ymax = np.nanmin(y), np.nanmax(y)
-            xmin, xmax = np.nanmin(x), np.nanmax(x)
-            del y, x
-            # and spacing
-            dy = ys[1] - ys[0]
-            dx = xs[1] - xs[0]
-
-            # select required interferogram grid subset
-            ys_subset = ys[(ys > ymin - dy) & (ys < ymax + dy)]
-            xs_subset = xs[(xs > xmin - dx) & (xs < xmax + dx)]
-            del ymin, ymax, xmin, xmax, dy, dx, ys, xs
-
-            # for cropped interferogram we can have no valid pixels for the processing
-            if ys_subset.size == 0 or xs_subset.size == 0:
-                del ys_subset, xs_subset, points, block_grid
-                return np.nan * np.zeros(
-                    (lats_block.size, lons_block.size), dtype=np.float32
-                )
-
-            # Wall time: 1min 25s
-
-            values = (
-                block_grid.sel(y=ys_subset, x=xs_subset)
-                .compute(n_workers=1)
-                .data.astype(np.float64)
-            )
-            del block_grid
-
-            # Wall time: 7min 47s
-            # distributed.worker.memory - WARNING - Worker is at 81% memory usage.
-
-            # perform interpolation
-            interp = RegularGridInterpolator(
-                (ys_subset, xs_subset), values, method="nearest", bounds_error=False
-            )
-            grid_ll = (
-                interp(points)
-                .reshape(lats_block.size, lons_block.size)
-                .astype(np.float32)
-            )
-            del ys_subset, xs_subset, points, values
-            return grid_ll
-
         # analyse grid and transform matrix spacing
         grid_dy = np.diff(data.y)[0]
         grid_dx = np.diff(data.x)[0]
@@ -302,63 +410,8 @@ class Stack_geocode(Stack_sbas):
                 lat=trans.lat[step_y // 2 :: step_y],
                 lon=trans.lon[step_x // 2 :: step_x],
             )
-        # define output geographic coordinates grid
-        lats = trans.lat
-        lons = trans.lon
-
-        # select required variables only
-        trans = trans[["azi", "rng"]]
-
-        # split to equal chunks and rest
-        lats_blocks = np.array_split(lats, np.arange(0, lats.size, self.chunksize)[1:])
-        lons_blocks = np.array_split(lons, np.arange(0, lons.size, self.chunksize)[1:])
-
-        # find stack dim
-        stackvar = data.dims[0] if len(data.dims) == 3 else "stack"
-        # print ('stackvar', stackvar)
-
-        stack = []
-        for stackval in data[stackvar].values if len(data.dims) == 3 else [None]:
-            # per-block processing
-            blocks_total = []
-            for lats_block in lats_blocks:
-                blocks = []
-                for lons_block in lons_blocks:
-                    block = dask.array.from_delayed(
-                        intf_block(lats_block, lons_block, stackval),
-                        shape=(lats_block.size, lons_block.size),
-                        dtype=np.float32,
-                    )
-                    blocks.append(block)
-                    del block
-                blocks_total.append(blocks)
-                del blocks
-            dask_block = dask.array.block(blocks_total)
-            if len(data.dims) == 3:
-                coords = {
-                    stackvar: [stackval],
-                    "lat": trans.coords["lat"],
-                    "lon": trans.coords["lon"],
-                }
-                da = xr.DataArray(dask_block[None, :], coords=coords)
-            else:
-                coords = {"lat": trans.coords["lat"], "lon": trans.coords["lon"]}
-                da = xr.DataArray(dask_block, coords=coords)
-            stack.append(da)
-            del blocks_total, dask_block
-
-        # wrap lazy Dask array to Xarray dataarray
-        if len(data.dims) == 2:
-            out = stack[0]
-        else:
-            out = xr.concat(stack, dim=stackvar)
-        del stack
-
-        # append source grid coordinates excluding removed y, x ones
-        for k, v in data.coords.items():
-            if k not in ["y", "x"]:
-                out[k] = v
-        return out.rename(data.name)
+        # nearest neighbour gathering by the cached geocoding index
+        return self._geocode_gather(data, "trans", trans, "azi", "rng")
 
     ##########################################################################################
     # ll2ra
@@ -384,8 +437,6 @@ class Stack_geocode(Stack_sbas):
         Inverse geocode 2D land mask grid:
         landmask_ra = stack.ll2ra(stack.get_landmask())
         """
-        import dask
-        import xarray as xr
         import numpy as np
 
         if "stack" in data.dims and "lat" in data.coords and "lon" in data.coords:
@@ -404,81 +455,6 @@ class Stack_geocode(Stack_sbas):
         # get complete inverse transform table
         trans_inv = self.get_trans_inv()
 
-        @dask.delayed
-        def geo_block(ys_block, xs_block, stackval=None):
-            from scipy.interpolate import RegularGridInterpolator
-
-            def nangrid():
-                return np.nan * np.zeros(
-                    (ys_block.size, xs_block.size), dtype=np.float32
-                )
-
-            # use outer variables
-            block_grid = (
-                data.sel({stackvar: stackval}) if stackval is not None else data
-            )
-            trans_inv_block = trans_inv.sel(y=ys_block, x=xs_block).compute(n_workers=1)
-
-            # check if the data block exists
-            if not (trans_inv_block.y.size > 0 and trans_inv_block.x.size > 0):
-                del block_grid, trans_inv_block
-                return nangrid()
-
-            # use trans table subset
-            y = trans_inv_block.lt.values.ravel()
-            x = trans_inv_block.ll.values.ravel()
-            points = np.column_stack([y, x])
-            del trans_inv_block
-
-            # get interferogram full grid
-            ys = data.lat.values
-            xs = data.lon.values
-
-            # this code spends additional time for the checks to exclude warnings
-            if np.all(np.isnan(y)):
-                del block_grid, ys, xs, points
-                return nangrid()
-
-            # calculate trans grid subset extent
-            ymin, ymax = np.nanmin(y), np.nanmax(y)
-            xmin, xmax = np.nanmin(x), np.nanmax(x)
-            del y, x
-            # and spacing
-            dy = ys[1] - ys[0]
-            dx = xs[1] - xs[0]
-
-            # select required interferogram grid subset
-            ys_subset = ys[(ys > ymin - dy) & (ys < ymax + dy)]
-            xs_subset = xs[(xs > xmin - dx) & (xs < xmax + dx)]
-            del ymin, ymax, xmin, xmax, dy, dx, ys, xs
-
-            # for cropped interferogram we can have no valid pixels for the processing
-            if ys_subset.size == 0 or xs_subset.size == 0:
-                del ys_subset, xs_subset, points, block_grid
-                return nangrid()
-
-            # Wall time: 1min 25s
-
-            values = (
-                block_grid.sel(lat=ys_subset, lon=xs_subset)
-                .compute(n_workers=1)
-                .data.astype(np.float64)
-            )
-            del block_grid
-
-            # Wall time: 7min 47s
-            # distributed.worker.memory - WARNING - Worker is at 81% memory usage.
-
-            # perform interpolation
-            interp = RegularGridInterpolator(
-                (ys_subset, xs_subset), values, method="nearest", bounds_error=False
-            )
-            grid_ra = (
-                interp(points).reshape(ys_block.size, xs_block.size).astype(np.float32)
-            )
-            del ys_subset, xs_subset, points, values
-            return grid_ra
-
         # analyse grid and transform matrix spacing
         grid_dlat = np.diff(data.lat)[0]
         grid_dlon = np.diff(data.lon)[0]
@@ -501,57 +477,5 @@ class Stack_geocode(Stack_sbas):
                 y=trans_inv.y[step_lat // 2 :: step_lat],
                 x=trans_inv.x[step_lon // 2 :: step_lon],
             )
-        # define output geographic coordinates grid
-        lats = trans_inv.y
-        lons = trans_inv.x
-
-        # split to equal chunks and rest
-        lats_blocks = np.array_split(lats, np.arange(0, lats.size, self.chunksize)[1:])
-        lons_blocks = np.array_split(lons, np.arange(0, lons.size, self.chunksize)[1:])
-
-        # find stack dim
-        stackvar = data.dims[0] if len(data.dims) == 3 else "stack"
-        # print ('stackvar', stackvar)
-
-        stack = []
-        for stackval in data[stackvar].values if len(data.dims) == 3 else [None]:
-            # per-block processing
-            blocks_total = []
-            for lats_block in lats_blocks:
-                blocks = []
-                for lons_block in lons_blocks:
-                    block = dask.array.from_delayed(
-                        geo_block(lats_block, lons_block, stackval),
-                        shape=(lats_block.size, lons_block.size),
-                        dtype=np.float32,
-                    )
-                    blocks.append(block)
-                    del block
-                blocks_total.append(blocks)
-                del blocks
-            dask_block = dask.array.block(blocks_total)
-            if len(data.dims) == 3:
-                coords = {
-                    stackvar: [stackval],
-                    "y": trans_inv.coords["y"],
-                    "x": trans_inv.coords["x"],
-                }
-                da = xr.DataArray(dask_block[None, :], coords=coords)
-            else:
-                coords = {"y": trans_inv.coords["y"], "x": trans_inv.coords["x"]}
-                da = xr.DataArray(dask_block, coords=coords)
-            stack.append(da)
-            del blocks_total, dask_block
-
-        # wrap lazy Dask array to Xarray dataarray
-        if len(data.dims) == 2:
-            out = stack[0]
-        else:
-            out = xr.concat(stack, dim=stackvar)
-        del stack
-
-        # append source grid coordinates excluding removed y, x ones
-        for k, v in data.coords.items():
-            if k not in ["lat", "lon"]:
-                out[k] = v
-        return out.rename(data.name)
+        # nearest neighbour gathering by the cached geocoding index
+        return self._geocode_gather(data, "trans_inv", trans_inv, "lt", "ll")
@@ -484,20 +484,38 @@ class Stack_incidence(Stack_geocode):
         # ..., look_E, look_N, look_U
         satlook_map = {0: "look_E", 1: "look_N", 2: "look_U"}
 
+        prm = self.PRM_merged()
+
         def SAT_look(z, lat, lon):
             coords = np.column_stack([lon.ravel(), lat.ravel(), z.ravel()])
+            if llt2look:
+                # in-process vectorized solver
+                look = prm.llt2look(coords)
+            else:
+                look = prm.SAT_look(coords, binary=True)
             # look_E look_N look_U
-            look = (
-                self.PRM_merged()
-                .SAT_look(coords, binary=True)
-                .astype(np.float32)
-                .reshape(z.shape[0], z.shape[1], 6)[..., 3:]
-            )
-            return look
+            return look.astype(np.float32).reshape(z.shape[0], z.shape[1], 6)[..., 3:]
 
         # reference grid
         trans_inv = self.get_trans_inv()[["lt", "ll", "ele"]]
 
+        # validate the in-process solver against GMTSAR binary on the sparse grid points
+        sample = trans_inv.isel(
+            y=slice(None, None, max(1, trans_inv.y.size // 8)),
+            x=slice(None, None, max(1, trans_inv.x.size // 8)),
+        ).compute()
+        coords = np.column_stack(
+            [
+                sample.ll.values.ravel(),
+                sample.lt.values.ravel(),
+                sample.ele.values.ravel(),
+            ]
+        )
+        llt2look = prm.check_llt2rat(
+            coords[np.isfinite(coords).all(axis=1)], tolerance=1e-4, look=True
+        )
+        del sample, coords
+
         # xarray wrapper for the valid area only
         enu = xr.apply_ufunc(
             SAT_look,
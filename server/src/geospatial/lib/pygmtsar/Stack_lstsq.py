@@ -87,6 +87,85 @@ class Stack_lstsq(Stack_tidal):
         # mask produced cumsum zeroes by NaNs where model[0] is the timeseries values
         return np.where(~np.isnan(model[0]), np.nancumsum(model[0], axis=0), np.nan)
 
+    @staticmethod
+    def lstsq_batch(x, w, matrix, cumsum=True, batchsize=4096):
+        """
+        Compute the least squares solution (or weighted least squares if weights are provided) for many pixels at once.
+
+        The weighted normal equations are built for the pixels batch and solved by batched np.linalg.solve, while
+        the rank-deficient systems fall back to lstsq1d() per pixel. The results are equal to lstsq1d() applied
+        to every pixel.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Input data array of shape (pixels, pairs).
+        w : numpy.ndarray or None
+            Weights array of shape (pixels, pairs) or (pairs,) for weighted least squares.
+            If None, non-weighted least squares is used.
+        matrix : numpy.ndarray
+            Input matrix for which the least squares solution is computed.
+        cumsum : bool, optional
+            Return the cumulative sum of the solution. Default is True.
+        batchsize : int, optional
+            Number of pixels to solve at once for per-pixel weights. Default is 4096.
+
+        Returns
+        -------
+        numpy.ndarray
+            Least squares solutions array of shape (pixels, dates).
+        """
+        import numpy as np
+
+        matrix = np.asarray(matrix, dtype=np.float64)
+        pixel_weights = w is not None and np.ndim(w) == 2
+        # keep the original values for the per-pixel fallback
+        x0, w0 = x, w
+        if w is None:
+            w = np.ones(x.shape[1])
+        nanmask = np.isnan(x) | np.isnan(w)
+        # prevent weight=1 and convert to weighted least squares multipliers like to lstsq1d()
+        w = (1 - 1e-6) * np.asarray(w, dtype=np.float64)
+        W = np.where(nanmask, 0, w / np.sqrt(1 - w**2))
+        x = np.where(nanmask, 0, x)
+
+        out = np.full((x.shape[0], matrix.shape[1]), np.nan)
+        # limit the normal equations matrices size for the large stacks
+        batchsize = max(1, min(batchsize, 2**24 // matrix.shape[1] ** 2))
+        for start in range(0, x.shape[0], batchsize):
+            batch = slice(start, start + batchsize)
+            W2 = W[batch] ** 2
+            # weighted normal equations A^T W^2 A and A^T W^2 x for every pixel
+            N = np.einsum("pk,ki,kj->pij", W2, matrix, matrix)
+            b = np.einsum("pk,ki,pk->pi", W2, matrix, x[batch])
+            # the matrix columns without the valid rows are zeroes in the minimum norm solution
+            diag = np.einsum("pii->pi", N)
+            unused = diag == 0
+            diag.setflags(write=True)
+            diag[unused] = 1
+            del W2, diag
+            empty = nanmask[batch].all(axis=1)
+            solvable = ~empty & (
+                np.linalg.matrix_rank(N, hermitian=True) == matrix.shape[1]
+            )
+            if solvable.any():
+                out[batch][solvable] = np.linalg.solve(
+                    N[solvable], b[solvable][..., None]
+                )[..., 0]
+            # rank-deficient systems
+            for pixel in start + np.flatnonzero(~empty & ~solvable):
+                out[pixel] = Stack_lstsq.lstsq1d(
+                    x0[pixel],
+                    w0[pixel] if pixel_weights else w0,
+                    matrix,
+                    cumsum=False,
+                )
+            del N, b
+        if not cumsum:
+            return out
+        # mask produced cumsum zeroes by NaNs where out is the timeseries values
+        return np.where(~np.isnan(out), np.nancumsum(out, axis=1), np.nan)
+
     def lstsq_matrix(self, pairs):
         """
         Create a matrix for use in the least squares computation based on interferogram date pairs.
@@ -285,29 +364,25 @@ class Stack_lstsq(Stack_tidal):
                     )
                 # weight=1 is not allowed for the used weighted least squares calculation function
                 weight_block = np.where(weight_block >= 1, 1, weight_block)
-                # Vectorize vec_lstsq
-                vec_lstsq = np.vectorize(
-                    lambda x, w: self.lstsq1d(x, w, matrix, cumsum),
-                    signature="(n),(n)->(m)",
-                )
-                # Apply vec_lstsq to data_block and weight_block and revert the original dimensions order
-                if stacks is None:
-                    block = vec_lstsq(data_block, weight_block).transpose(2, 0, 1)
-                else:
-                    block = vec_lstsq(data_block, weight_block).transpose(1, 0)
-                del weight_block, vec_lstsq
+                weight_block = weight_block.reshape(-1, weight_block.shape[-1])
             else:
-                # Vectorize vec_lstsq
-                vec_lstsq = np.vectorize(
-                    lambda x: self.lstsq1d(x, weight, matrix, cumsum),
-                    signature="(n)->(m)",
+                weight_block = weight
+            # solve all the block pixels at once and revert the original dimensions order
+            block = (
+                self.lstsq_batch(
+                    data_block.reshape(-1, data_block.shape[-1]),
+                    weight_block,
+                    matrix,
+                    cumsum,
                 )
-                # Apply vec_lstsq to data_block and weight_block and revert the original dimensions order
-                if stacks is None:
-                    block = vec_lstsq(data_block).transpose(2, 0, 1)
-                else:
-                    block = vec_lstsq(data_block).transpose(1, 0)
-                del vec_lstsq
+                .astype(np.float32)
+                .reshape(*data_block.shape[:-1], -1)
+            )
+            del weight_block
+            if stacks is None:
+                block = block.transpose(2, 0, 1)
+            else:
+                block = block.transpose(1, 0)
             del data_block
             return block
 
@@ -333,19 +333,30 @@ class Stack_multilooking(Stack_phasediff):
 
         # process a slice of dataarray
         def process_slice(slice_data):
+            if coarsen:
+                # filter and decimate at once without full resolution filtered grid
+                return utils.nanconvolve2d_gaussian_decimate(
+                    slice_data, weight, sigmas, coarsen
+                )
             conv = utils.nanconvolve2d_gaussian(slice_data, weight, sigmas)
             return xr.DataArray(conv, dims=slice_data.dims, name=slice_data.name)
 
         # process stack of dataarray slices
         def process_slice_var(dataarray):
+            # the decimated grid has own spatial coordinates
+            coords = {
+                k: v
+                for k, v in dataarray.coords.items()
+                if not coarsen or not set(v.dims) & {"y", "x"}
+            }
             if stackvar:
                 stack = [
                     process_slice(dataarray[ind])
                     for ind in range(len(dataarray[stackvar]))
                 ]
-                return xr.concat(stack, dim=stackvar).assign_coords(dataarray.coords)
+                return xr.concat(stack, dim=stackvar).assign_coords(coords)
             else:
-                return process_slice(dataarray).assign_coords(dataarray.coords)
+                return process_slice(dataarray).assign_coords(coords)
 
         if isinstance(data, xr.Dataset):
             ds = xr.Dataset(
@@ -359,11 +370,4 @@ class Stack_multilooking(Stack_phasediff):
 
         # Set chunk size
         chunksizes = {"y": self.chunksize, "x": self.chunksize}
-        if coarsen:
-            return (
-                ds.coarsen({"y": coarsen[0], "x": coarsen[1]}, boundary="trim")
-                .mean()
-                .chunk(chunksizes)
-            )
-
         return ds.chunk(chunksizes)
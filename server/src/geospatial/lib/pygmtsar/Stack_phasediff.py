@@ -90,35 +90,24 @@ class Stack_phasediff(Stack_topo):
             data = self.open_data(dates, debug=debug)
             if weight is not None:
                 data = data.reindex_like(weight, fill_value=np.nan)
-            intensity = np.square(np.abs(data))
-            # Gaussian filtering 200m cut-off wavelength with optional range multilooking on Sentinel-1 amplitudes
-            intensity_look = self.multilooking(
-                intensity, wavelength=wavelength, coarsen=coarsen, debug=debug
-            )
-            del intensity
-            # calculate phase difference with topography correction
-            phasediff = self.phasediff(
+            # phase difference with topography correction, Gaussian filtering 200m cut-off wavelength
+            # with optional range multilooking for phase difference and Sentinel-1 amplitudes
+            # and correlation computed together in a single pass
+            product = self.phasediff_multilooking(
                 chunk,
                 data,
                 topo=topo,
                 phase=phase,
-                method=method,
-                joblib_backend=joblib_backend,
-                debug=debug,
-            )
-            del data
-            # Gaussian filtering 200m cut-off wavelength with optional range multilooking
-            phasediff_look = self.multilooking(
-                phasediff,
                 weight=weight,
                 wavelength=wavelength,
                 coarsen=coarsen,
+                method=method,
                 debug=debug,
             )
-            del phasediff
-            # correlation with optional range decimation
-            corr_look = self.correlation(phasediff_look, intensity_look, debug=debug)
-            del intensity_look
+            del data
+            phasediff_look = product.phase
+            corr_look = product.correlation
+            del product
             if psize is not None:
                 # Goldstein filter in psize pixel patch size on square grid cells produced using 1:4 range multilooking
                 phasediff_look_goldstein = self.goldstein(
@@ -310,6 +299,235 @@ class Stack_phasediff(Stack_topo):
 
         return xr.concat(stack, dim="pair").rename("correlation")
 
+    def phasediff_multilooking(
+        self,
+        pairs,
+        data="auto",
+        topo="auto",
+        phase=None,
+        weight=None,
+        wavelength=None,
+        coarsen=None,
+        method="nearest",
+        debug=False,
+    ):
+        """
+        Compute multilooking phase difference, correlation and intensity in a single pass.
+
+        This is the fused equivalent of phasediff(), multilooking() for the phase difference and
+        the intensities and correlation() calls. Every block of the SLC stack is read once for all
+        the pairs, the phase difference and intensities are filtered and decimated together and
+        the full resolution phase difference grids are never produced.
+
+        Parameters
+        ----------
+        pairs : list, numpy.ndarray or pandas.DataFrame
+            The interferogram pairs.
+        data : xarray.DataArray or str, optional
+            The SLC stack, 'auto' opens the data for the pairs dates.
+        topo : xarray.DataArray or str, optional
+            The topography or topography phase, 'auto' uses Stack.get_topo().
+        phase : xarray.DataArray, optional
+            The additional phase correction for the pairs.
+        weight : xarray.DataArray, optional
+            2D weights for the phase difference.
+        wavelength : float, optional
+            The Gaussian filter cut-off wavelength in meters.
+        coarsen : int or (int, int), optional
+            The decimation factors.
+        method : str, optional
+            The interpolation method for the topography. Default is 'nearest'.
+        debug : bool, optional
+            Whether to print debug information.
+
+        Returns
+        -------
+        xarray.Dataset
+            The lazy dataset with complex 'phase' and 'correlation' for the pairs and 'intensity' for the dates.
+
+        Examples
+        --------
+        product = stack.phasediff_multilooking(pairs, wavelength=200, coarsen=(1,4))
+        intf = stack.interferogram(product.phase)
+        corr = product.correlation
+        """
+        import dask.array as da
+        import xarray as xr
+        import numpy as np
+        import pandas as pd
+
+        if debug:
+            print("DEBUG: phasediff_multilooking")
+
+        # GMTSAR constant 5.3 defines half-gain at filter_wavelength
+        cutoff = 5.3
+
+        # convert pairs (list, array, dataframe) to 2D numpy array
+        pairs, dates = self.get_pairs(pairs, dates=True)
+        pairs = pairs[["ref", "rep"]].astype(str).values
+
+        if isinstance(data, str) and data == "auto":
+            # open datafiles required for all the pairs
+            data = self.open_data(dates)
+        if weight is not None:
+            # for InSAR processing expect 2D weights
+            assert (
+                isinstance(weight, xr.DataArray) and len(weight.dims) == 2
+            ), "ERROR: multilooking weight should be 2D DataArray"
+            assert (
+                data.shape[1:] == weight.shape
+            ), f"ERROR: multilooking data slice and weight variables have different shape \
+                ({data.shape[1:]} vs {weight.shape})"
+
+        # expand simplified definition of coarsen
+        if coarsen is None:
+            coarsen = (1, 1)
+        elif not isinstance(coarsen, (list, tuple, np.ndarray)):
+            coarsen = (coarsen, coarsen)
+        coarsen = [int(_coarsen) for _coarsen in coarsen]
+        # calculate sigmas based on wavelength or coarsen
+        if wavelength is not None:
+            dy, dx = self.get_spacing(data)
+            sigmas = [wavelength / cutoff / dy, wavelength / cutoff / dx]
+        else:
+            sigmas = [coarsen[0] / cutoff, coarsen[1] / cutoff]
+        if debug:
+            print(
+                f"DEBUG: phasediff_multilooking sigmas ({sigmas[0]:.2f}, {sigmas[1]:.2f}), coarsen {coarsen}"
+            )
+        gausses, kernels, depth = utils._gaussian_decimate_kernels(sigmas, coarsen)
+
+        # topography phase with optional real phase correction for the pairs
+        phase_topo, phase_real = self._phasediff_correction(
+            pairs, data, topo=topo, phase=phase, method=method
+        )
+        correction = (phase_topo * np.exp(-1j * phase_real)).astype(np.complex64)
+        del phase_topo, phase_real
+
+        # pairs dates indices in the data stack
+        data_dates = pd.to_datetime(data.date.values)
+        indices = [
+            (
+                data_dates.get_loc(pd.Timestamp(ref)),
+                data_dates.get_loc(pd.Timestamp(rep)),
+            )
+            for ref, rep in pairs
+        ]
+        npairs, ndates = len(pairs), data.date.size
+
+        def block_phasediff_multilooking(block):
+            import numpy as np
+
+            # the dates, the pairs corrections and optional weight are stacked together
+            data = block[:ndates]
+            correction = block[ndates : ndates + npairs]
+            weight = block[-1].real if weight_layer else None
+
+            def filter_ratio(planes):
+                # the last plane is the weights plane
+                return utils._gaussian_decimate_ratio(planes, gausses, kernels, coarsen)
+
+            # filter and decimate every date and pair planes separately to hold a few full resolution planes only
+            intensity = []
+            for slc in data:
+                planes = np.empty((2,) + slc.shape, dtype=np.float32)
+                planes[0] = np.square(np.abs(slc))
+                planes[1] = np.isfinite(planes[0])
+                planes[0][planes[1] == 0] = 0
+                intensity.append(filter_ratio(planes)[0])
+                del planes
+            intensity = np.stack(intensity)
+
+            real, imag = [], []
+            for (idx1, idx2), shift in zip(indices, correction):
+                product = data[idx1] * shift * np.conj(data[idx2])
+                planes = np.empty((3,) + product.shape, dtype=np.float32)
+                valid = np.isfinite(product)
+                if weight is not None:
+                    valid &= np.isfinite(weight)
+                    planes[2] = np.where(valid, weight, 0)
+                else:
+                    planes[2] = valid
+                product[~valid] = 0
+                planes[0] = product.real * planes[2]
+                planes[1] = product.imag * planes[2]
+                del product, valid
+                phase = filter_ratio(planes)
+                real.append(phase[0])
+                imag.append(phase[1])
+                del planes, phase
+            real, imag = np.stack(real), np.stack(imag)
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                corr = np.abs(real + 1j * imag) / np.sqrt(
+                    np.stack(
+                        [intensity[idx1] * intensity[idx2] for idx1, idx2 in indices]
+                    )
+                )
+            corr = np.where(corr > 1, 1, corr)
+            return np.concatenate([real, imag, corr, intensity]).astype(np.float32)
+
+        # stack the dates, the pairs corrections and optional weight to process them by the same blocks
+        weight_layer = weight is not None
+        layers = [da.asarray(data.data), da.asarray(correction.data)] + (
+            [da.asarray(weight.data)[None].astype(np.complex64)] if weight_layer else []
+        )
+        # the block holds all the layers, reduce its spatial size to keep the memory usage
+        # like to a few of the regular chunks and split the regular chunks to equal parts
+        nlayers = ndates + npairs
+        blocksize = self.chunksize // int(np.ceil(np.sqrt(nlayers / 3)))
+        chunks, out_chunks = utils._gaussian_decimate_chunks(
+            data.shape[1:], (blocksize, blocksize), depth, coarsen
+        )
+        block = da.concatenate(layers, axis=0)
+        block = block.rechunk(((block.shape[0],),) + chunks)
+        del layers
+        out = da.map_overlap(
+            block_phasediff_multilooking,
+            block,
+            depth={0: 0, 1: depth[0], 2: depth[1]},
+            boundary="reflect",
+            trim=False,
+            chunks=((3 * npairs + ndates,),) + out_chunks,
+            dtype=np.float32,
+            meta=np.empty((0, 0, 0), dtype=np.float32),
+        )
+        del block
+
+        # decimated grid coordinates as the blocks centers
+        coords = {
+            dim: data[dim].coarsen({dim: _coarsen}, boundary="trim").mean().values
+            for dim, _coarsen in zip(["y", "x"], coarsen)
+        }
+        pair_coords = {
+            k: v for k, v in correction.coords.items() if v.dims == ("pair",)
+        }
+        date_coords = {k: v for k, v in data.coords.items() if v.dims == ("date",)}
+        phase_look = xr.DataArray(
+            (out[:npairs] + 1j * out[npairs : 2 * npairs]).astype(np.complex64),
+            coords={**pair_coords, **coords},
+            dims=("pair", "y", "x"),
+        )
+        corr_look = xr.DataArray(
+            out[2 * npairs : 3 * npairs],
+            coords={**pair_coords, **coords},
+            dims=("pair", "y", "x"),
+        )
+        intensity_look = xr.DataArray(
+            out[3 * npairs :],
+            coords={**date_coords, **coords},
+            dims=("date", "y", "x"),
+        )
+        del out
+        chunksizes = {"y": self.chunksize, "x": self.chunksize}
+        return xr.Dataset(
+            {
+                "phase": phase_look.chunk(chunksizes),
+                "correlation": corr_look.chunk(chunksizes),
+                "intensity": intensity_look.chunk(chunksizes),
+            }
+        )
+
     #     def phasediff(self, pairs, data='auto', topo='auto', method='cubic', debug=False):
     #         import pandas as pd
     #         import dask
@@ -556,35 +774,15 @@ class Stack_phasediff(Stack_topo):
     #
     #         return xr.concat(stack, dim='pair').assign_coords(ref=coord_ref, rep=coord_rep, pair=coord_pair).rename('phasediff')
 
-    def phasediff(
-        self,
-        pairs,
-        data="auto",
-        topo="auto",
-        phase=None,
-        method="nearest",
-        joblib_backend=None,
-        debug=False,
+    def _phasediff_correction(
+        self, pairs, data, topo="auto", phase=None, method="nearest"
     ):
-        # import dask
+        """
+        Return the topography phase and the optional real phase correction for the pairs on the data grid.
+        """
         import dask.array as da
         import xarray as xr
         import numpy as np
-        import pandas as pd
-
-        if debug:
-            print("DEBUG: phasediff")
-
-        if joblib_backend is None and debug:
-            joblib_backend = "sequential"
-
-        # convert pairs (list, array, dataframe) to 2D numpy array
-        pairs, dates = self.get_pairs(pairs, dates=True)
-        pairs = pairs[["ref", "rep"]].astype(str).values
-
-        if isinstance(data, str) and data == "auto":
-            # open datafiles required for all the pairs
-            data = self.open_data(dates)
 
         # interpret the topo argument as topography, otherwise, use it as topography phase
         if isinstance(topo, str) and topo == "auto":
@@ -623,6 +821,42 @@ class Stack_phasediff(Stack_topo):
             phase_real = 0
             # phase_real = len(pairs)*[0]
 
+        return phase_topo, phase_real
+
+    def phasediff(
+        self,
+        pairs,
+        data="auto",
+        topo="auto",
+        phase=None,
+        method="nearest",
+        joblib_backend=None,
+        debug=False,
+    ):
+        # import dask
+        import dask.array as da
+        import xarray as xr
+        import numpy as np
+        import pandas as pd
+
+        if debug:
+            print("DEBUG: phasediff")
+
+        if joblib_backend is None and debug:
+            joblib_backend = "sequential"
+
+        # convert pairs (list, array, dataframe) to 2D numpy array
+        pairs, dates = self.get_pairs(pairs, dates=True)
+        pairs = pairs[["ref", "rep"]].astype(str).values
+
+        if isinstance(data, str) and data == "auto":
+            # open datafiles required for all the pairs
+            data = self.open_data(dates)
+
+        phase_topo, phase_real = self._phasediff_correction(
+            pairs, data, topo=topo, phase=phase, method=method
+        )
+
         # calculate phase difference
         data1 = data.sel(date=pairs[:, 0]).drop_vars("date").rename({"date": "pair"})
         data2 = data.sel(date=pairs[:, 1]).drop_vars("date").rename({"date": "pair"})
@@ -13,6 +13,14 @@ from .PRM import PRM
 
 class Stack_prm(Stack_base):
 
+    def __getstate__(self):
+        """
+        Exclude the parsed PRM files cache from the pickled state sent to dask tasks.
+        """
+        state = self.__dict__.copy()
+        state.pop("_prm_cache", None)
+        return state
+
     def PRM(self, date=None, subswath=None):
         """
         Open a PRM (Parameter) file.
@@ -42,7 +50,38 @@ class Stack_prm(Stack_base):
 
         prefix = self.get_subswath_prefix(subswath, date)
         filename = os.path.join(self.basedir, f"{prefix}.PRM")
-        return PRM.from_file(filename)
+        return self._PRM_cached(filename)
+
+    def _PRM_cached(self, filename):
+        """
+        Open a PRM file using the parsed PRM files cache.
+
+        The cache is keyed by the file path and modification time, so the changed file is parsed again.
+        The cache is process local and it is not pickled with the stack.
+        The cached values are never modified, and every call returns a new PRM object with their own copy.
+
+        Parameters
+        ----------
+        filename : str
+            The PRM filename.
+
+        Returns
+        -------
+        PRM
+            An instance of the PRM class representing the opened PRM file.
+        """
+        import os
+
+        stat = os.stat(filename)
+        key = (stat.st_mtime_ns, stat.st_size)
+        cache = self.__dict__.setdefault("_prm_cache", {})
+        path = os.path.abspath(filename)
+        if path not in cache or cache[path][0] != key:
+            cache[path] = (key, PRM.from_file(filename).df)
+        prm = PRM()
+        prm.df = cache[path][1].copy()
+        prm.filename = filename
+        return prm
 
     def PRM_merged(self, date=None, offsets="auto"):
 
@@ -25,14 +25,74 @@ class Stack_ps(Stack_stl):
     # ps_decimator = stack.pixel_decimator(resolution=60, grid=adi, debug=True)
     # adi_dec = adi.coarsen({'y': 4, 'x': 16}, boundary='trim').min()
     # adi_dec
+    @staticmethod
+    def intensity(data):
+        """
+        Compute SLC intensities as squared complex amplitudes fused into the data blocks reading.
+
+        Parameters
+        ----------
+        data : xarray.DataArray
+            Complex SLC data.
+
+        Returns
+        -------
+        xarray.DataArray
+            Float32 intensities.
+        """
+        import numpy as np
+
+        def block_intensity(block):
+            return (np.square(block.real) + np.square(block.imag)).astype(np.float32)
+
+        return data.copy(
+            data=data.data.map_blocks(block_intensity, dtype=np.float32)
+        ).rename(None)
+
     # define PS candidates using Amplitude Dispersion Index (ADI)
     def compute_ps(
-        self, geometry=None, dates=None, data="auto", name="ps", interactive=False
+        self,
+        geometry=None,
+        dates=None,
+        data="auto",
+        name="ps",
+        interactive=False,
+        append=False,
     ):
+        """
+        Compute the amplitude stability measures for PS candidates selection in a single pass over the dates.
+
+        Every date is read once: its intensities are normalized by the date spatial average and folded into
+        per-pixel Welford accumulators (count, mean, M2). The normalization by the stack average is applied to
+        the final statistics, so new dates can be appended to an existing cube without rereading the historic stack.
+        The dates already accumulated in the cube are skipped in append mode, so they are never counted twice.
+
+        Parameters
+        ----------
+        geometry : geopandas.GeoDataFrame or xarray.DataArray, optional
+            Area of interest to process.
+        dates : list, optional
+            Dates to process. By default, all the stack dates or the dates missed in the existing cube for append mode.
+        data : xarray.DataArray or str, optional
+            Intensities stack. By default, it is computed from the SLC data.
+        name : str, optional
+            Output cube name (default is 'ps').
+        interactive : bool, optional
+            Return the result instead of saving it (default is False). The accumulators are computed and persisted
+            date by date in any case, only the final normalization is left lazy.
+        append : bool, optional
+            Update the existing cube by the specified dates (default is False).
+
+        Returns
+        -------
+        xarray.Dataset or None
+            Dataset with average, deviation, count and stack_average variables when interactive=True.
+        """
         import xarray as xr
         import numpy as np
+        import pandas as pd
         import dask
-        import os
+        from tqdm.auto import tqdm
         import warnings
 
         # suppress Dask warning "RuntimeWarning: invalid value encountered in divide"
@@ -40,9 +100,25 @@ class Stack_ps(Stack_stl):
         warnings.filterwarnings("ignore", module="dask")
         warnings.filterwarnings("ignore", module="dask.core")
 
+        ps = None
+        if append:
+            ps = self.get_ps(name)
+            if isinstance(data, str) and data == "auto":
+                if dates is None:
+                    dates = np.unique(self.df.index.values)
+                # do not read the dates already accumulated in the cube
+                dates = [
+                    date
+                    for date in dates
+                    if pd.Timestamp(date) not in ps.date.to_index()
+                ]
+                if len(dates) == 0:
+                    print("Note: there are no new dates to append")
+                    return ps if interactive else None
+
         if isinstance(data, str) and data == "auto":
             # open SLC data as real intensities
-            data = np.square(np.abs(self.open_data(dates=dates)))
+            data = self.intensity(self.open_data(dates=dates))
 
         if geometry is not None:
             bounds = self.get_bounds(geometry)
@@ -52,24 +128,77 @@ class Stack_ps(Stack_stl):
             if isinstance(geometry, xr.DataArray):
                 data = data.where(geometry).where(np.isfinite(geometry))
 
-        # normalize image amplitudes (intensities)
-        tqdm_dask(
-            mean := dask.persist(data.mean(dim=["y", "x"])),
-            desc="Intensity Normalization",
-        )
-        # dask.persist returns tuple
-        norm = mean[0].mean(dim="date") / mean[0]
-        # compute average and std.dev.
-        stats = (norm * data).pipe(lambda x: (x.mean(dim="date"), x.std(dim="date")))
-        del data, norm
+        if ps is not None:
+            # skip the accumulated and the repeated dates of the user-defined data
+            index = data.date.to_index()
+            skip = index.isin(ps.date.to_index()) | index.duplicated()
+            if skip.any():
+                print(
+                    f"Note: skip {skip.sum()} dates already present in the cube: {', '.join(index[skip].strftime('%Y-%m-%d'))}"
+                )
+                data = data.isel(date=np.flatnonzero(~skip))
+            if data.date.size == 0:
+                print("Note: there are no new dates to append")
+                return ps if interactive else None
+            # use the existing cube grid
+            data = data.sel(y=ps.y, x=ps.x)
+            stack_average = ps.stack_average.compute()
+            # restore the accumulators from the stack average normalized statistics
+            scale = stack_average.mean(dim="date")
+            if "count" in ps:
+                count = ps["count"].astype(np.float32)
+            else:
+                count = xr.where(
+                    np.isfinite(ps.average), np.float32(stack_average.date.size), 0
+                ).astype(np.float32)
+            mean = (ps.average / scale).fillna(0).astype(np.float32)
+            m2 = (count * np.square(ps.deviation / scale)).fillna(0).astype(np.float32)
+            averages = [stack_average]
+            del scale
+        else:
+            count = xr.zeros_like(data.isel(date=0), dtype=np.float32)
+            mean = xr.zeros_like(count)
+            m2 = xr.zeros_like(count)
+            averages = []
+        count, mean, m2 = [
+            grid.drop_vars("date", errors="ignore").rename(None)
+            for grid in (count, mean, m2)
+        ]
+
+        with tqdm(desc="Amplitude Dispersion Statistics", total=data.date.size) as pbar:
+            for date in data.date.values:
+                intensity = data.sel(date=date)
+                # normalize image intensities
+                average = intensity.mean(dim=["y", "x"])
+                norm = (intensity / average).drop_vars("date", errors="ignore")
+                valid = np.isfinite(norm)
+                count_next = count + valid
+                delta = xr.where(valid, norm - mean, 0)
+                mean_next = xr.where(valid, mean + delta / count_next, mean)
+                m2_next = xr.where(valid, m2 + delta * (norm - mean_next), m2)
+                # every date is read once
+                count, mean, m2, average = dask.persist(
+                    count_next, mean_next, m2_next, average
+                )
+                averages.append(average.compute())
+                del intensity, norm, valid, count_next, mean_next, m2_next, delta
+                pbar.update(1)
+        del data
+
+        stack_average = xr.concat(averages, dim="date").sortby("date")
+        del averages
+        # the stack average normalization
+        scale = stack_average.mean(dim="date")
+        count = count.where(count > 0)
         ds = xr.merge(
             [
-                stats[0].rename("average"),
-                stats[1].rename("deviation"),
-                mean[0].rename("stack_average"),
+                (scale * mean).where(count > 0).rename("average"),
+                (scale * np.sqrt(m2 / count)).rename("deviation"),
+                count.fillna(0).astype(np.uint16).rename("count"),
+                stack_average.rename("stack_average"),
             ]
         )
-        del stats, mean
+        del count, mean, m2, stack_average, scale
         if interactive:
             return ds
         self.save_cube(ds, name, "Compute Stability Measures")
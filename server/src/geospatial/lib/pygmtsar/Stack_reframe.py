@@ -358,7 +358,14 @@ class Stack_reframe(Stack_reframe_gmtsar):
         return out
 
     def compute_reframe(
-        self, geometry=None, n_jobs=-1, queue=16, caption="Reframing", **kwargs
+        self,
+        geometry=None,
+        dates=None,
+        geometries=None,
+        n_jobs=-1,
+        queue=16,
+        caption="Reframing",
+        **kwargs,
     ):
         """
         Reorder bursts from sequential scenes to cover the full orbit area or some bursts only.
@@ -367,6 +374,13 @@ class Stack_reframe(Stack_reframe_gmtsar):
         ----------
         geometry: shapely.geometry of geopandas.GeoSeries or geopandas.GeoDataFrame
             Optional geometry covering required bursts to crop the area.
+        dates : list or None, optional
+            List of dates to process. If None, process all scenes. The records for the other dates
+            are kept as is which allows to reframe the dates one by one as they are downloaded.
+        geometries : dict or None, optional
+            The approximate subswath geometries as {subswath: geometry}. If None, the bursts of the processed
+            dates are merged. Use the geometries of all the stack scenes to reframe the dates one by one
+            the same way as all the dates together.
         n_jobs : int, optional
             Number of parallel processing jobs. n_jobs=-1 means all the processor cores are used.
 
@@ -401,13 +415,16 @@ class Stack_reframe(Stack_reframe_gmtsar):
         else:
             joblib_backend = "loky"
 
-        dates = self.df.index.unique().values
+        if dates is None:
+            dates = self.df.index.unique().values
+        df = self.df[self.df.index.isin(dates)]
         subswaths = self.get_subswaths()
         # approximate subswath geometries from GCP
-        geometries = {
-            subswath: self.df[self.df.subswath == subswath].geometry.union_all()
-            for subswath in subswaths
-        }
+        if geometries is None:
+            geometries = {
+                subswath: df[df.subswath == subswath].geometry.union_all()
+                for subswath in subswaths
+            }
 
         records = []
         # Applying iterative processing to prevent Dask scheduler deadlocks.
@@ -458,4 +475,7 @@ class Stack_reframe(Stack_reframe_gmtsar):
                 records.extend(chunk_records)
             counter += len(chunk)
 
-        self.df = pd.concat(records)
+        # keep the records for the other dates and the scanning order (date, subswath)
+        self.df = pd.concat([self.df[~self.df.index.isin(dates)]] + records).sort_index(
+            kind="stable"
+        )
@@ -13,6 +13,9 @@ from .tqdm_dask import tqdm_dask
 
 class Stack_stl(Stack_lstsq):
 
+    # STL decomposition operators for the non-robust fitting by the series length and the period
+    _stl_operators = {}
+
     @staticmethod
     def stl1d(ts, dt, dt_periodic, periods=52, robust=False):
         """
@@ -70,6 +73,262 @@ class Stack_stl(Stack_lstsq):
 
         return res.trend, res.seasonal, res.resid
 
+    @staticmethod
+    def _stl_est(y, len_, ideg, xs, nleft, nright, rw=None):
+        """
+        LOESS estimates at the positions xs for all the series at once, see statsmodels.tsa.stl._stl.STL._est.
+
+        Parameters
+        ----------
+        y : numpy.ndarray
+            Series array of shape (..., n).
+        len_ : int
+            LOESS window length.
+        ideg : int
+            Degree of locally-fitted polynomial, 0 or 1.
+        xs : numpy.ndarray
+            1-based estimation positions.
+        nleft, nright : numpy.ndarray
+            1-based windows boundaries for the estimation positions, the windows have the same length.
+        rw : numpy.ndarray or None, optional
+            Robustness weights of the series shape.
+
+        Returns
+        -------
+        numpy.ndarray
+            Estimates array of shape (..., len(xs)), NaN where all the window weights are zeroes.
+        """
+        import numpy as np
+
+        n = y.shape[-1]
+        xs = np.asarray(xs, dtype=np.float64)[:, None]
+        nleft = np.asarray(nleft)
+        nright = np.asarray(nright)
+        idx = nleft[:, None] - 1 + np.arange(nright[0] - nleft[0] + 1)
+        pos = idx + 1.0
+        h = np.maximum(xs[:, 0] - nleft, nright - xs[:, 0])[:, None]
+        if len_ > n:
+            h += (len_ - n) // 2
+        r = np.abs(pos - xs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w = np.where(
+                r <= 0.999 * h,
+                np.where(r <= 0.001 * h, 1.0, (1.0 - (r / h) ** 3) ** 3),
+                0.0,
+            )
+        if rw is not None:
+            w = w * rw[..., idx]
+        a = w.sum(axis=-1)
+        valid = a > 0
+        w = w / np.where(valid, a, 1)[..., None]
+        if ideg > 0:
+            a = (w * pos).sum(axis=-1)[..., None]
+            c = (w * (pos - a) ** 2).sum(axis=-1)[..., None]
+            fit = (h > 0) & (np.sqrt(c) > 0.001 * (n - 1.0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                w = np.where(fit, w * ((xs - a) / c * (pos - a) + 1.0), w)
+            del a, c, fit
+        ys = (w * y[..., idx]).sum(axis=-1)
+        return np.where(valid, ys, np.nan)
+
+    @staticmethod
+    def _stl_ess(y, len_, ideg, rw=None):
+        """
+        LOESS smoothing for all the series at once, see statsmodels.tsa.stl._stl.STL._ess (no jumps).
+        """
+        import numpy as np
+
+        n = y.shape[-1]
+        if n < 2:
+            return y.copy()
+        xs = np.arange(1, n + 1)
+        if len_ >= n:
+            nleft = np.ones(n, dtype=int)
+        else:
+            nleft = 1 + np.clip(xs - (len_ + 2) // 2, 0, n - len_)
+        nright = nleft + min(len_, n) - 1
+        ys = Stack_stl._stl_est(y, len_, ideg, xs, nleft, nright, rw)
+        return np.where(np.isnan(ys), y, ys)
+
+    @staticmethod
+    def _stl_ss(y, period, len_, ideg, rw=None):
+        """
+        Seasonal smoothing of the cycle-subseries extended by one period on both sides for all the series at once,
+        see statsmodels.tsa.stl._stl.STL._ss.
+        """
+        import numpy as np
+
+        n = y.shape[-1]
+        season = np.empty(y.shape[:-1] + (n + 2 * period,))
+        phases = np.arange(period)
+        sizes = (n - (phases + 1)) // period + 1
+        for k in np.unique(sizes):
+            # all the cycle-subseries of the same length are processed together
+            idx = phases[sizes == k][:, None] + period * np.arange(k)
+            sub = y[..., idx]
+            subrw = rw[..., idx] if rw is not None else None
+            ys = Stack_stl._stl_ess(sub, len_, ideg, subrw)
+            left = Stack_stl._stl_est(sub, len_, ideg, [0], [1], [min(len_, k)], subrw)
+            left = np.where(np.isnan(left), ys[..., :1], left)
+            right = Stack_stl._stl_est(
+                sub, len_, ideg, [k + 1], [max(1, k - len_ + 1)], [k], subrw
+            )
+            right = np.where(np.isnan(right), ys[..., -1:], right)
+            idx = phases[sizes == k][:, None] + period * np.arange(k + 2)
+            season[..., idx] = np.concatenate([left, ys, right], axis=-1)
+            del sub, subrw, ys, left, right
+        return season
+
+    @staticmethod
+    def _stl_fit(y, period, seasonal=7, robust=False):
+        """
+        STL decomposition with statsmodels.tsa.seasonal.STL defaults for all the series at once.
+
+        Parameters
+        ----------
+        y : numpy.ndarray
+            Series array of shape (..., n).
+        period : int
+            Periodicity of the series.
+        seasonal : int, optional
+            Length of the seasonal smoother (default is 7).
+        robust : bool, optional
+            Whether to use the robust fitting procedure (default is False).
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            Trend and seasonal components of the series shape.
+        """
+        import numpy as np
+
+        def ma(x, len_):
+            x = np.cumsum(x, axis=-1)
+            x = np.concatenate(
+                [x[..., len_ - 1 : len_], x[..., len_:] - x[..., :-len_]], axis=-1
+            )
+            return x / len_
+
+        n = y.shape[-1]
+        trend_len = int(np.ceil(1.5 * period / (1 - 1.5 / seasonal)))
+        trend_len += trend_len % 2 == 0
+        low_pass_len = period + 1
+        low_pass_len += low_pass_len % 2 == 0
+
+        trend = np.zeros_like(y)
+        rw = None
+        for outer in range((16 if robust else 1)):
+            if outer > 0:
+                # robustness weights
+                r = np.abs(y - trend - season)
+                mid = [n // 2, n - n // 2 - 1]
+                part = np.partition(r, mid, axis=-1)
+                cmad = 3.0 * (part[..., mid[0]] + part[..., mid[1]])[..., None]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    rw = np.where(
+                        r <= 0.001 * cmad,
+                        1.0,
+                        np.where(r <= 0.999 * cmad, (1.0 - (r / cmad) ** 2) ** 2, 0.0),
+                    )
+                rw = np.where(cmad == 0, 1.0, rw)
+                del r, part, cmad
+            for inner in range((2 if robust else 5)):
+                cycle = Stack_stl._stl_ss(y - trend, period, seasonal, 1, rw)
+                low_pass = ma(ma(ma(cycle, period), period), 3)
+                low_pass = Stack_stl._stl_ess(low_pass, low_pass_len, 1)
+                season = cycle[..., period : period + n] - low_pass
+                trend = Stack_stl._stl_ess(y - season, trend_len, 1, rw)
+                del cycle, low_pass
+        return trend, season
+
+    @staticmethod
+    def _stl_operator(n, period, batchsize):
+        """
+        Return the trend and seasonal STL operators of shape (n, n) for the non-robust fitting.
+
+        Without robust fitting STL is a linear operator on the series, so the operators rows are the decompositions
+        of the unit series. They are evaluated once per process by the batches of the unit series and reused.
+        """
+        import numpy as np
+
+        key = (n, period)
+        operator = Stack_stl._stl_operators.get(key)
+        if operator is None:
+            operator = np.empty((2, n, n))
+            for start in range(0, n, batchsize):
+                batch = slice(start, start + batchsize)
+                operator[0, batch], operator[1, batch] = Stack_stl._stl_fit(
+                    np.eye(n)[batch], period
+                )
+            if len(Stack_stl._stl_operators) >= 4:
+                Stack_stl._stl_operators.clear()
+            Stack_stl._stl_operators[key] = operator
+        return operator
+
+    @staticmethod
+    def stl_batch(ts, dt, dt_periodic, periods=52, robust=False, batchsize=None):
+        """
+        Perform Seasonal-Trend decomposition using LOESS (STL) on many time series at once.
+
+        The time series are resampled to the periodic time values by the nearest values gather and the LOESS passes
+        are calculated as array operations over the batches of the series, so the memory usage is bounded by
+        the batch size and it does not depend on the block size. Without robust fitting the decomposition is
+        applied by matrix products with the cached STL operators. The results are equal to stl1d() applied
+        to every series.
+
+        Parameters
+        ----------
+        ts : numpy.ndarray
+            Input time series data array of shape (pixels, dates).
+        dt : numpy.ndarray
+            Corresponding time values for the input time series data.
+        dt_periodic : numpy.ndarray
+            Periodic time values for interpolation.
+        periods : int
+            Number of periods for seasonal decomposition.
+        robust : bool, optional
+            Whether to use a robust fitting procedure for the STL decomposition (default is False).
+        batchsize : int, optional
+            Number of series to process at once. By default, it is defined by the series and LOESS windows lengths.
+
+        Returns
+        -------
+        numpy.ndarray
+            Trend, seasonal, and residual components array of shape (3, pixels, len(dt_periodic)).
+        """
+        import numpy as np
+
+        dt = np.asarray(dt, dtype=np.float64)
+        dt_periodic = np.asarray(dt_periodic, dtype=np.float64)
+        # nearest values interpolation like to scipy.interpolate.interp1d(kind='nearest', fill_value='extrapolate')
+        idx = np.searchsorted(dt[1:] / 2.0 + dt[:-1] / 2.0, dt_periodic, side="left")
+
+        out = np.full((3, ts.shape[0], dt_periodic.size), np.nan)
+        valid = ~np.isnan(ts).any(axis=1)
+        if not valid.any():
+            return out
+        y = np.asarray(ts[valid], dtype=np.float64)[:, idx]
+        if batchsize is None:
+            # the largest LOESS window is the trend smoother one, see Stack_stl._stl_fit()
+            window = int(np.ceil(1.5 * periods / (1 - 1.5 / 7))) + 1
+            # about 128 MB for every (series, dates, window) float64 temporary array
+            batchsize = max(1, 2**24 // (idx.size * min(window, idx.size)))
+        if not robust:
+            operator = Stack_stl._stl_operator(idx.size, periods, batchsize)
+            trend, season = y @ operator[0], y @ operator[1]
+        else:
+            trend = np.empty_like(y)
+            season = np.empty_like(y)
+            for start in range(0, y.shape[0], batchsize):
+                batch = slice(start, start + batchsize)
+                trend[batch], season[batch] = Stack_stl._stl_fit(
+                    y[batch], periods, robust=True
+                )
+        out[0, valid] = trend
+        out[1, valid] = season
+        out[2, valid] = y - trend - season
+        return out
+
     @staticmethod
     def stl_periodic(dates, freq="W"):
         import pandas as pd
@@ -95,7 +354,7 @@ class Stack_stl(Stack_lstsq):
         The function performs the following steps:
         1. Convert the 'date' coordinate to valid dates.
         2. Unify date intervals to a specified frequency (e.g., weekly) for a mix of time intervals.
-        3. Apply the Stack.stl1d function in parallel using Dask.
+        3. Apply the Stack.stl_batch function to the data blocks in parallel using Dask.
         4. Rename the output date dimension to match the original irregular date dimension.
         5. Return the STL decomposition results as an xarray Dataset.
 
@@ -199,15 +458,19 @@ class Stack_stl(Stack_lstsq):
                     .compute(n_workers=1)
                     .values.transpose(1, 0)
                 )
-            # Vectorize vec_lstsq
-            # vec_stl = np.vectorize(lambda data: self.stl(data, dt, dt_periodic, periods, robust), signature='(n)->(3,m)')
-            vec_stl = np.vectorize(
-                lambda data: self.stl1d(data, dt, dt_periodic, periods, robust),
-                signature="(n)->(m),(m),(m)",
+            # decompose all the block pixels at once and revert the original dimensions order
+            block = (
+                self.stl_batch(
+                    data_block.reshape(-1, data_block.shape[-1]),
+                    dt,
+                    dt_periodic,
+                    periods,
+                    robust,
+                )
+                .astype(np.float32)
+                .reshape(3, *data_block.shape[:-1], -1)
             )
-            # Apply vec_lstsq to data_block and revert the original dimensions order
-            block = np.asarray(vec_stl(data_block))
-            del vec_stl, data_block
+            del data_block
             if stacks is None:
                 return block.transpose(0, 3, 1, 2)
             return block.transpose(0, 2, 1)
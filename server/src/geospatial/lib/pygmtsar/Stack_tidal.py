@@ -323,11 +323,433 @@ class Stack_tidal(Stack_incidence):
         ds = xr.Dataset(das)
         return ds
 
+    @staticmethod
+    def solid_tide_ephemeris(clocks):
+        """
+        Compute low precision Sun and Moon ephemerides once per epoch for the solid Earth tide model.
+
+        Parameters
+        ----------
+        clocks : array_like
+            UTC epochs in GMTSAR SC_clock format yyyyddd.fffffff (day of year with fraction).
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            Earth-fixed Sun and Moon positions [m] with shape (N, 3), Julian centuries since MJD 51544.0 (TT)
+            and TT hours of day with shape (N,) for the frequency dependent corrections.
+
+        Notes
+        -----
+        The ephemerides follow the GMTSAR solid_tide (D. Milbert solid.f) implementation: Montenbruck and Pfleger
+        low precision series with the Greenwich hour angle computed from UTC and polar motion neglected.
+        The returned time arguments follow solid.f step 2 which counts the centuries from MJD 51544.0
+        rather than J2000.
+        """
+        import numpy as np
+        import datetime
+
+        deg = np.pi / 180
+        clocks = np.atleast_1d(np.asarray(clocks, dtype=np.float64))
+        years = (clocks // 1000).astype(int)
+        fmjd = clocks % 1
+        mjd = np.array(
+            [
+                (datetime.date(year, 1, 1) - datetime.date(1858, 11, 17)).days
+                for year in years
+            ]
+        ) + (clocks % 1000 // 1 - 1)
+        # TT - UTC = TAI - UTC + 32.184s, the leap seconds since 1999
+        leaps = np.searchsorted([53736, 54832, 56109, 57204, 57754], mjd, side="right")
+        fmjd_tt = fmjd + (32 + leaps + 32.184) / 86400
+        t = (mjd - 51544.5 + fmjd_tt) / 36525
+        # Greenwich hour angle
+        ghar = (
+            (280.460618375040 + 360.98564736628620 * (mjd - 51544 + fmjd - 0.5))
+            % 360
+            * deg
+        )
+        cosg, sing = np.cos(ghar), np.sin(ghar)
+        cose, sine = np.cos(23.43929111 * deg), np.sin(23.43929111 * deg)
+
+        # Sun mean anomaly, ecliptic longitude and distance
+        em = (357.5256 + 35999.049 * t) * deg
+        rs = (149.619 - 2.499 * np.cos(em) - 0.021 * np.cos(2 * em)) * 1e9
+        slon = (
+            282.94
+            + em / deg
+            + (6892 * np.sin(em) + 72 * np.sin(2 * em)) / 3600
+            + 1.3972 * t
+        ) * deg
+        xs, ys, zs = (
+            rs * np.cos(slon),
+            rs * np.sin(slon) * cose,
+            rs * np.sin(slon) * sine,
+        )
+        sun = np.column_stack([cosg * xs + sing * ys, -sing * xs + cosg * ys, zs])
+
+        # Moon mean longitude and fundamental arguments
+        el0 = 218.31617 + 481267.88088 * t - 1.3972 * t
+        el = (134.96292 + 477198.86753 * t) * deg
+        elp = (357.52543 + 35999.04944 * t) * deg
+        f = (93.27283 + 483202.01873 * t) * deg
+        d = (297.85027 + 445267.11135 * t) * deg
+        dlon = (
+            22640 * np.sin(el)
+            + 769 * np.sin(2 * el)
+            - 4586 * np.sin(el - 2 * d)
+            + 2370 * np.sin(2 * d)
+            - 668 * np.sin(elp)
+            - 412 * np.sin(2 * f)
+            - 212 * np.sin(2 * el - 2 * d)
+            - 206 * np.sin(el + elp - 2 * d)
+            + 192 * np.sin(el + 2 * d)
+            - 165 * np.sin(elp - 2 * d)
+            + 148 * np.sin(el - elp)
+            - 125 * np.sin(d)
+            - 110 * np.sin(el + elp)
+            - 55 * np.sin(2 * f - 2 * d)
+        ) / 3600
+        q = (412 * np.sin(2 * f) + 541 * np.sin(elp)) / 3600
+        mlat = (
+            (
+                18520 * np.sin(f + (dlon + q) * deg)
+                - 526 * np.sin(f - 2 * d)
+                + 44 * np.sin(el + f - 2 * d)
+                - 31 * np.sin(-el + f - 2 * d)
+                - 25 * np.sin(-2 * el + f)
+                - 23 * np.sin(elp + f - 2 * d)
+                + 21 * np.sin(-el + f)
+                + 11 * np.sin(-elp + f - 2 * d)
+            )
+            / 3600
+            * deg
+        )
+        # mean longitude referred to the equinox of date
+        mlon = (el0 + dlon + 1.3972 * t) * deg
+        rm = (
+            385000
+            - 20905 * np.cos(el)
+            - 3699 * np.cos(2 * d - el)
+            - 2956 * np.cos(2 * d)
+            - 570 * np.cos(2 * el)
+            + 246 * np.cos(2 * el - 2 * d)
+            - 205 * np.cos(elp - 2 * d)
+            - 171 * np.cos(el + 2 * d)
+            - 152 * np.cos(el + elp - 2 * d)
+        ) * 1e3
+        xm = rm * np.cos(mlat) * np.cos(mlon)
+        ym = rm * np.cos(mlat) * np.sin(mlon)
+        zm = rm * np.sin(mlat)
+        ym, zm = cose * ym - sine * zm, sine * ym + cose * zm
+        moon = np.column_stack([cosg * xm + sing * ym, -sing * xm + cosg * ym, zm])
+        return sun, moon, (mjd - 51544.0 + fmjd_tt) / 36525, 24 * fmjd_tt
+
+    @staticmethod
+    def solid_tide_block(lon, lat, sun, moon, t, fhr):
+        """
+        Compute IERS solid Earth tide displacements for all the epochs and points at once.
+
+        Parameters
+        ----------
+        lon, lat : numpy.ndarray
+            Geodetic longitudes and latitudes [deg] of the points on the GRS80 ellipsoid.
+        sun, moon, t, fhr : numpy.ndarray
+            Epoch ephemerides as returned by solid_tide_ephemeris().
+
+        Returns
+        -------
+        numpy.ndarray
+            East, north and up displacements [m] with shape (epochs,) + lon.shape + (3,).
+
+        Notes
+        -----
+        The model follows the GMTSAR solid_tide (D. Milbert solid.f, IERS Conventions 2003 section 7.1.2):
+        degree 2 and 3 in-phase Love and Shida terms with latitude dependence, out-of-phase diurnal and
+        semidiurnal terms, the l1 latitude dependence and the frequency dependent diurnal and long-period
+        corrections. The permanent tide is not removed.
+        """
+        import numpy as np
+
+        deg = np.pi / 180
+        lon = np.asarray(lon, dtype=np.float64)[None] * deg
+        lat = np.asarray(lat, dtype=np.float64)[None] * deg
+        # expand epoch values to broadcast over the points
+        shape = (-1,) + (1,) * (lon.ndim - 1)
+        sun, moon = [v.reshape(shape + (3,)) for v in (sun, moon)]
+        t, fhr = t.reshape(shape), fhr.reshape(shape)
+
+        # Earth-fixed station coordinates on GRS80 ellipsoid
+        n = 6378137.0 / np.sqrt(1 - 0.00669438002290 * np.sin(lat) ** 2)
+        xsta = np.stack(
+            np.broadcast_arrays(
+                n * np.cos(lat) * np.cos(lon),
+                n * np.cos(lat) * np.sin(lon),
+                n * (1 - 0.00669438002290) * np.sin(lat),
+            ),
+            axis=-1,
+        )
+        rsta = np.linalg.norm(xsta, axis=-1)
+        # geocentric latitude and longitude
+        sinphi = xsta[..., 2] / rsta
+        cosphi = np.hypot(xsta[..., 0], xsta[..., 1]) / rsta
+        sinla, cosla = np.sin(lon), np.cos(lon)
+        cos2phi = cosphi**2 - sinphi**2
+        cos2la, sin2la = cosla**2 - sinla**2, 2 * cosla * sinla
+
+        # nominal second degree Love and Shida numbers with latitude dependence
+        h2 = 0.6078 - 0.0006 * (1 - 1.5 * cosphi**2)
+        l2 = 0.0847 + 0.0002 * (1 - 1.5 * cosphi**2)
+        h3, l3 = 0.292, 0.015
+        re = 6378136.55
+
+        dxtide = 0
+        dr = dn = de = 0
+        for body, mass_ratio in ((sun, 332946.0482), (moon, 0.0123000371)):
+            rbody = np.linalg.norm(body, axis=-1)
+            scalar = (xsta * body).sum(axis=-1) / rsta / rbody
+            fac2 = mass_ratio * re * (re / rbody) ** 3
+            fac3 = fac2 * (re / rbody)
+            # step 1: in-phase degree 2 and degree 3 terms
+            p2 = 3 * (h2 / 2 - l2) * scalar**2 - h2 / 2
+            p3 = 2.5 * (h3 - 3 * l3) * scalar**3 + 1.5 * (l3 - h3) * scalar
+            x2 = 3 * l2 * scalar
+            x3 = 1.5 * l3 * (5 * scalar**2 - 1)
+            dxtide = (
+                dxtide
+                + ((fac2 * x2 + fac3 * x3) / rbody)[..., None] * body
+                + ((fac2 * p2 + fac3 * p3) / rsta)[..., None] * xsta
+            )
+            # step 1: out-of-phase and l1 latitude dependence terms in local frame
+            xb, yb, zb = body[..., 0], body[..., 1], body[..., 2]
+            fac = fac2 / rbody**2
+            diu_sin = fac * zb * (xb * sinla - yb * cosla)
+            diu_cos = fac * zb * (xb * cosla + yb * sinla)
+            sem_sin = fac * ((xb**2 - yb**2) * sin2la - 2 * xb * yb * cos2la)
+            sem_cos = fac * ((xb**2 - yb**2) * cos2la + 2 * xb * yb * sin2la)
+            dr = dr + 0.0075 * sinphi * cosphi * diu_sin + 0.00165 * cosphi**2 * sem_sin
+            # l1 = 0.0012 for the diurnal and l1 = 0.0024 for the semidiurnal band
+            dn = (
+                dn
+                + 0.0021 * cos2phi * diu_sin
+                - 0.00105 * sinphi * cosphi * sem_sin
+                - 0.0036 * sinphi**2 * diu_cos
+                - 0.0036 * sinphi * cosphi * sem_cos
+            )
+            de = (
+                de
+                + 0.0021 * sinphi * diu_cos
+                + 0.00105 * cosphi * sem_cos
+                + 0.0036 * sinphi * cos2phi * diu_sin
+                - 0.0036 * sinphi**2 * cosphi * sem_sin
+            )
+
+        # step 2: Doodson arguments for the frequency dependent corrections
+        s = 218.31664563 + 481267.88194 * t - 0.0014663889 * t**2 + 0.00000185139 * t**3
+        tau = (
+            fhr * 15
+            + 280.4606184
+            + 36000.7700536 * t
+            + 0.00038793 * t**2
+            - 0.0000000258 * t**3
+            - s
+        )
+        s = s + 1.396971278 * t + 0.000308889 * t**2 + 0.000000021 * t**3
+        h = 280.46645 + 36000.7697489 * t + 0.00030322222 * t**2 + 0.000000020 * t**3
+        p = 83.35324312 + 4069.01363525 * t - 0.01032172222 * t**2 - 0.0000124991 * t**3
+        zns = (
+            234.95544499
+            + 1934.13626197 * t
+            - 0.00207561111 * t**2
+            - 0.00000213944 * t**3
+        )
+        ps = 282.93734098 + 1.71945766667 * t + 0.00045688889 * t**2
+        args = np.stack([s, h, p, zns, ps], axis=-1)
+
+        # diurnal band: multipliers of s, h, p, N', ps and dR(ip), dR(op), dT(ip), dT(op) [mm]
+        diurnal = np.array(
+            [
+                [-3, 0, 2, 0, 0, -0.01, 0.0, 0.0, 0.0],
+                [-3, 2, 0, 0, 0, -0.01, 0.0, 0.0, 0.0],
+                [-2, 0, 1, -1, 0, -0.02, 0.0, 0.0, 0.0],
+                [-2, 0, 1, 0, 0, -0.08, 0.0, -0.01, 0.01],
+                [-2, 2, -1, 0, 0, -0.02, 0.0, 0.0, 0.0],
+                [-1, 0, 0, -1, 0, -0.10, 0.0, 0.0, 0.0],
+                [-1, 0, 0, 0, 0, -0.51, 0.0, -0.02, 0.03],
+                [-1, 2, 0, 0, 0, 0.01, 0.0, 0.0, 0.0],
+                [0, -2, 1, 0, 0, 0.01, 0.0, 0.0, 0.0],
+                [0, 0, -1, 0, 0, 0.02, 0.0, 0.0, 0.0],
+                [0, 0, 1, 0, 0, 0.06, 0.0, 0.0, 0.0],
+                [0, 0, 1, 1, 0, 0.01, 0.0, 0.0, 0.0],
+                [0, 2, -1, 0, 0, 0.01, 0.0, 0.0, 0.0],
+                [1, -3, 0, 0, 1, -0.06, 0.0, 0.0, 0.0],
+                [1, -2, 0, -1, 0, 0.01, 0.0, 0.0, 0.0],
+                [1, -2, 0, 0, 0, -1.23, -0.07, 0.06, 0.01],
+                [1, -1, 0, 0, -1, 0.02, 0.0, 0.0, 0.0],
+                [1, -1, 0, 0, 1, 0.04, 0.0, 0.0, 0.0],
+                [1, 0, 0, -1, 0, -0.22, 0.01, 0.01, 0.0],
+                [1, 0, 0, 0, 0, 12.00, -0.80, -0.67, -0.03],
+                [1, 0, 0, 1, 0, 1.73, -0.12, -0.10, 0.0],
+                [1, 0, 0, 2, 0, -0.04, 0.0, 0.0, 0.0],
+                [1, 1, 0, 0, -1, -0.50, -0.01, 0.03, 0.0],
+                [1, 1, 0, 0, 1, 0.01, 0.0, 0.0, 0.0],
+                [0, 1, 0, 1, -1, -0.01, 0.0, 0.0, 0.0],
+                [1, 2, -2, 0, 0, -0.01, 0.0, 0.0, 0.0],
+                [1, 2, 0, 0, 0, -0.11, 0.01, 0.01, 0.0],
+                [2, -2, 1, 0, 0, -0.01, 0.0, 0.0, 0.0],
+                [2, 0, -1, 0, 0, -0.02, 0.0, 0.0, 0.0],
+            ]
+        )
+        # the arguments are split to per epoch sums and the point longitude: sin(theta + lon) expansion
+        theta = (tau[..., None] + args @ diurnal[:, :5].T) * deg
+        sin_sum = np.sin(theta) @ diurnal[:, 5:]
+        cos_sum = np.cos(theta) @ diurnal[:, 5:]
+        sin_term = sin_sum * cosla[..., None] + cos_sum * sinla[..., None]
+        cos_term = cos_sum * cosla[..., None] - sin_sum * sinla[..., None]
+        dr = dr + 2e-3 * sinphi * cosphi * (sin_term[..., 0] + cos_term[..., 1])
+        dn = dn + 1e-3 * cos2phi * (sin_term[..., 2] + cos_term[..., 3])
+        de = de + 1e-3 * sinphi * (cos_term[..., 2] - sin_term[..., 3])
+        # long-period band: multipliers of s, h, p, N', ps and dR(ip), dT(ip), dR(op), dT(op) [mm]
+        longperiod = np.array(
+            [
+                [0, 0, 0, 1, 0, 0.47, 0.23, 0.16, 0.07],
+                [0, 2, 0, 0, 0, -0.20, -0.12, -0.11, -0.05],
+                [1, 0, -1, 0, 0, -0.11, -0.08, -0.09, -0.04],
+                [2, 0, 0, 0, 0, -0.13, -0.11, -0.15, -0.07],
+                [2, 0, 0, 1, 0, -0.05, -0.05, -0.06, -0.03],
+            ]
+        )
+        theta = (args @ longperiod[:, :5].T) * deg
+        sin_theta, cos_theta = np.sin(theta), np.cos(theta)
+        dr = dr + 0.5e-3 * (3 * sinphi**2 - 1) * (
+            cos_theta @ longperiod[:, 5] + sin_theta @ longperiod[:, 7]
+        )
+        dn = dn + 2e-3 * sinphi * cosphi * (
+            cos_theta @ longperiod[:, 6] + sin_theta @ longperiod[:, 8]
+        )
+
+        # the corrections are defined in the geocentric frame, convert them to Earth-fixed displacements
+        dx = dxtide[..., 0] + dr * cosla * cosphi - de * sinla - dn * sinphi * cosla
+        dy = dxtide[..., 1] + dr * sinla * cosphi + de * cosla - dn * sinphi * sinla
+        dz = dxtide[..., 2] + dr * sinphi + dn * cosphi
+        # rotate Earth-fixed displacements to local geodetic east, north and up
+        east = -sinla * dx + cosla * dy
+        north = -np.sin(lat) * (cosla * dx + sinla * dy) + np.cos(lat) * dz
+        up = np.cos(lat) * (cosla * dx + sinla * dy) + np.sin(lat) * dz
+        return np.stack([east, north, up], axis=-1)
+
+    def solid_tide(self, dates, grid):
+        """
+        Compute the solid Earth tide displacements for the scene center times of the dates on the grid.
+
+        Parameters
+        ----------
+        dates : list
+            Dates to compute the tides for.
+        grid : xarray.Dataset
+            2D grid with 'll' and 'lt' geographic coordinates [deg] like to get_trans_inv() output.
+
+        Returns
+        -------
+        xarray.Dataset
+            Lazy dataset with 'lon', 'lat', 'dx', 'dy', 'dz' variables where dx, dy, dz are the east, north
+            and up displacements [m], the same as produced by GMTSAR solid_tide tool for every date.
+
+        Notes
+        -----
+        The ephemerides are computed once per date and the tide model is evaluated for all the dates
+        and grid points in the single vectorized computation per grid chunk.
+        """
+        import xarray as xr
+        import pandas as pd
+        import numpy as np
+        import dask
+
+        clocks = []
+        for date in dates:
+            SC_clock_start, SC_clock_stop = self.PRM_merged(date).get(
+                "SC_clock_start", "SC_clock_stop"
+            )
+            clocks.append((SC_clock_start + SC_clock_stop) / 2)
+        sun, moon, t, fhr = self.solid_tide_ephemeris(clocks)
+
+        def tidal_block(lon, lat):
+            return self.solid_tide_block(lon, lat, sun, moon, t, fhr).astype(np.float32)
+
+        lon = grid.ll.chunk(self.chunksize).data.astype(np.float32)
+        lat = grid.lt.chunk(self.chunksize).data.astype(np.float32)
+        tidal = dask.array.map_blocks(
+            tidal_block,
+            lon,
+            lat,
+            new_axis=[0, 3],
+            chunks=((len(clocks),),) + lon.chunks + ((3,),),
+            dtype=np.float32,
+        )
+
+        coords = {"date": pd.to_datetime(dates), "y": grid.y, "x": grid.x}
+        das = {
+            v: xr.DataArray(
+                dask.array.broadcast_to(data, tidal.shape[:3], chunks=tidal.chunks[:3]),
+                coords=coords,
+            )
+            for (v, data) in [("lon", lon), ("lat", lat)]
+        }
+        das.update(
+            {
+                v: xr.DataArray(tidal[..., idx], coords=coords)
+                for (idx, v) in enumerate(["dx", "dy", "dz"])
+            }
+        )
+        return xr.Dataset(das)
+
+    def check_tidal(self, date, grid, tolerance=1e-4, debug=False):
+        """
+        Validate the in-process solid Earth tide model against GMTSAR solid_tide binary on the grid corners.
+
+        Parameters
+        ----------
+        date : str
+            Date to check.
+        grid : xarray.Dataset
+            2D grid with 'll' and 'lt' geographic coordinates [deg].
+        tolerance : float, optional
+            Maximum allowed absolute difference of the displacements [m]. Default is 1e-4.
+        debug : bool, optional
+            If True, print the differences. Default is False.
+
+        Returns
+        -------
+        bool
+            True when the outputs match and False otherwise, including when the GMTSAR binary is not available.
+        """
+        import numpy as np
+
+        corners = (
+            grid[["ll", "lt"]]
+            .isel(y=[0, grid.y.size - 1], x=[0, grid.x.size - 1])
+            .compute()
+        )
+        try:
+            expected = self._tidal(date, corners)
+        except FileNotFoundError:
+            if debug:
+                print("DEBUG: check_tidal GMTSAR solid_tide binary is not available")
+            return False
+        actual = self.solid_tide([date], corners).compute()
+        error = np.nanmax(
+            [np.abs(actual[v] - expected[v]).max().item() for v in ["dx", "dy", "dz"]]
+        )
+        if debug:
+            print("DEBUG: check_tidal max absolute error", error)
+        return bool(error <= tolerance)
+
     def compute_tidal(self, dates=None, coarsen=32, n_jobs=-1, interactive=False):
         import xarray as xr
         import numpy as np
         from tqdm.auto import tqdm
         import joblib
+        import shutil
 
         if dates is None:
             dates = self.df.index.unique()
@@ -352,17 +774,30 @@ class Stack_tidal(Stack_incidence):
             y=trans_inv.y[step_y // 2 :: step_y], x=trans_inv.x[step_x // 2 :: step_x]
         )
 
-        def tidal(date):
-            return self._tidal(date, grid)
-
-        with self.tqdm_joblib(
-            tqdm(desc="Tidal Computation", total=len(dates))
-        ) as progress_bar:
-            outs = joblib.Parallel(n_jobs=n_jobs)(
-                joblib.delayed(tidal)(date) for date in dates
+        # validate the in-process model against GMTSAR binary on the grid corners
+        if self.check_tidal(dates[0], grid):
+            ds = self.solid_tide(dates, grid)
+        elif shutil.which("solid_tide") is None:
+            print(
+                "NOTE: GMTSAR solid_tide is not available, use the unvalidated in-process solid tide model"
             )
+            ds = self.solid_tide(dates, grid)
+        else:
+            print(
+                "NOTE: in-process solid tide model does not match GMTSAR solid_tide, use the binary tool"
+            )
+
+            def tidal(date):
+                return self._tidal(date, grid)
+
+            with self.tqdm_joblib(
+                tqdm(desc="Tidal Computation", total=len(dates))
+            ) as progress_bar:
+                outs = joblib.Parallel(n_jobs=n_jobs)(
+                    joblib.delayed(tidal)(date) for date in dates
+                )
 
-        ds = xr.concat(outs, dim="date")
+            ds = xr.concat(outs, dim="date")
         if interactive:
             return ds
         self.save_cube(ds, "tidal", "Solid Earth Tides Saving")
@@ -102,37 +102,12 @@ class Stack_topo(Stack_trans_inv):
         if grid is not None:
             topo = utils.interp2d_like(topo, grid, method=method)
 
-        # calculate the combined earth curvature and topography correction
-        def calc_drho(rho, topo, earth_radius, height, b, alpha, Bx):
-            sina = np.sin(alpha)
-            cosa = np.cos(alpha)
-            c = earth_radius + height
-            # compute the look angle using equation (C26) in Appendix C
-            # GMTSAR uses long double here
-            # ret = earth_radius + topo.astype(np.longdouble)
-            ret = earth_radius + topo
-            cost = (rho**2 + c**2 - ret**2) / (2.0 * rho * c)
-            # if (cost >= 1.)
-            #    die("calc_drho", "cost >= 0");
-            sint = np.sqrt(1.0 - cost**2)
-            # Compute the offset effect from non-parallel orbit
-            term1 = rho**2 + b**2 - 2 * rho * b * (sint * cosa - cost * sina) - Bx**2
-            drho = -rho + np.sqrt(term1)
-            del term1, sint, cost, ret, c, cosa, sina
-            return drho
-
-        # def block_phase(prm1, prm2, ylim, xlim):
-        def block_phase_dask(block_topo, y_chunk, x_chunk, prm1, prm2):
+        # the pair geometry parameters depend on the pair reference PRM only
+        # and the baseline parameters are evaluated for every pair
+        def pair_params(prm1, prm2):
             from scipy import constants
 
-            # assert 0, f'block_topo.shape: {block_topo.shape}, {block_topo}'
-            # for 3d processing
-            # block_topo = block_topo[0]
-            # prm1 = prm1[0]
-            # prm2 = prm2[0]
-
             # get full dimensions
-            xdim = prm1.get("num_rng_bins")
             ydim = prm1.get("num_patches") * prm1.get("num_valid_az")
 
             # get heights
@@ -148,7 +123,6 @@ class Stack_topo(Stack_trans_inv):
 
             # setup the default parameters
             drange = constants.speed_of_light / (2 * prm2.get("rng_samp_rate"))
-            alpha = prm2.get("alpha_start") * np.pi / 180
             # a constant that converts drho into a phase shift
             cnst = -4 * np.pi / prm2.get("radar_wavelength")
 
@@ -195,37 +169,64 @@ class Stack_topo(Stack_trans_inv):
             dht = (-3 * ht0 + 4 * htc - htf) / tspan
             ddht = (2 * ht0 - 4 * htc + 2 * htf) / (tspan * tspan)
 
-            near_range = (
-                prm1.get("near_range")
-                + x_chunk.reshape(1, -1) * (1 + prm1.get("stretch_r")) * drange
-            ) + y_chunk.reshape(-1, 1) * prm1.get("a_stretch_r") * drange
-
-            # calculate the change in baseline and height along the frame
-            time = y_chunk * tspan / (ydim - 1)
-            Bh = Bh0 + dBh * time + ddBh * time**2
-            Bv = Bv0 + dBv * time + ddBv * time**2
-            Bx = Bx0 + dBx * time + ddBx * time**2
-            B = np.sqrt(Bh * Bh + Bv * Bv)
-            alpha = np.arctan2(Bv, Bh)
-            height = ht0 + dht * time + ddht * time**2
-
-            # calculate the combined earth curvature and topography correction
-            drho = calc_drho(
-                near_range,
-                block_topo,
+            geometry = (
+                prm1.get("near_range"),
+                (1 + prm1.get("stretch_r")) * drange,
+                prm1.get("a_stretch_r") * drange,
                 prm1.get("earth_radius"),
-                height.reshape(-1, 1),
-                B.reshape(-1, 1),
-                alpha.reshape(-1, 1),
-                Bx.reshape(-1, 1),
+                ht0,
+                dht,
+                ddht,
+                tspan / (ydim - 1),
+            )
+            baseline = (Bh0, dBh, ddBh, Bv0, dBv, ddBv, Bx0, dBx, ddBx, cnst)
+            return geometry, baseline
+
+        # def block_phase(prm1, prm2, ylim, xlim):
+        def block_phase_dask(block_topo, y_chunk, x_chunk, geometry, baselines):
+            near_range, drange_x, drange_y, earth_radius, ht0, dht, ddht, tscale = (
+                geometry
             )
 
-            phase_shift = np.exp(1j * (cnst * drho))
-            del near_range, drho, height, B, alpha, Bx, Bv, Bh, time
+            rho = (near_range + x_chunk.reshape(1, -1) * drange_x) + y_chunk.reshape(
+                -1, 1
+            ) * drange_y
 
-            # for 3d processing
-            # return np.expand_dims(phase_shift.astype(np.complex64), 0)
-            return phase_shift.astype(np.complex64)
+            # calculate the change in height along the frame
+            time = (y_chunk * tscale).reshape(-1, 1)
+            c = earth_radius + ht0 + dht * time + ddht * time**2
+            # compute the look angle using equation (C26) in Appendix C
+            # GMTSAR uses long double here
+            # ret = earth_radius + topo.astype(np.longdouble)
+            ret = earth_radius + block_topo
+            cost = (rho**2 + c**2 - ret**2) / (2.0 * rho * c)
+            del c, ret
+            # if (cost >= 1.)
+            #    die("calc_drho", "cost >= 0");
+            # the pair independent terms of the non-parallel orbit offset effect
+            # rho^2 + b^2 - 2*rho*b*(sint*cosa - cost*sina) - Bx^2 where b*cosa = Bh and b*sina = Bv
+            rho_sint = 2 * rho * np.sqrt(1.0 - cost**2)
+            rho_cost = 2 * rho * cost
+            rho2 = rho**2
+            del cost
+
+            out = np.empty((len(baselines),) + block_topo.shape, dtype=np.complex64)
+            for k, (Bh0, dBh, ddBh, Bv0, dBv, ddBv, Bx0, dBx, ddBx, cnst) in enumerate(
+                baselines
+            ):
+                # calculate the change in baseline along the frame
+                Bh = Bh0 + dBh * time + ddBh * time**2
+                Bv = Bv0 + dBv * time + ddBv * time**2
+                Bx = Bx0 + dBx * time + ddBx * time**2
+                # calculate the combined earth curvature and topography correction
+                term1 = rho2 + (Bh**2 + Bv**2 - Bx**2) - Bh * rho_sint + Bv * rho_cost
+                phase = cnst * (np.sqrt(term1) - rho)
+                del term1, Bh, Bv, Bx
+                np.cos(phase, out=out[k].real)
+                np.sin(phase, out=out[k].imag)
+                del phase
+            del rho, rho2, rho_sint, rho_cost, time
+            return out
 
         # immediately prepare PRM
         # here is some delay on the function call but the actual processing is faster
@@ -242,44 +243,53 @@ class Stack_topo(Stack_trans_inv):
                     "SC_height", "SC_height_start", "SC_height_end"
                 )
             ).fix_aligned()
-            return (prm1, prm2)
+            return pair_params(prm1, prm2)
 
-        prms = joblib.Parallel(n_jobs=-1)(
+        params = joblib.Parallel(n_jobs=-1)(
             joblib.delayed(prepare_prms)(pair, offsets) for pair in pairs
         )
 
-        # fill NaNs by 0 and expand to 3d
-        topo2d = da.where(da.isnan(topo.data), 0, topo.data)
-
-        # for 3d processing
-        # topo3d = da.repeat(da.expand_dims(topo2d, 0), len(pairs), axis=0).rechunk((1, 'auto', 'auto'))
-        # out = da.blockwise(
-        #     block_phase_dask,
-        #     'kyx',
-        #     topo3d, 'kyx',
-        #     topo.y,    'y',
-        #     topo.x,    'x',
-        #     [prm[0] for prm in prms], 'k',
-        #     [prm[1] for prm in prms], 'k',
-        #     dtype=np.complex64,
-        # )
-
-        out = da.stack(
+        # group the consecutive pairs with the same geometry to compute it once per block
+        # and limit the group size to keep the block memory as for a single pair chunk
+        pairs_per_block = 16
+        groups = []
+        for geometry, baseline in params:
+            if (
+                groups
+                and groups[-1][0] == geometry
+                and len(groups[-1][1]) < pairs_per_block
+            ):
+                groups[-1][1].append(baseline)
+            else:
+                groups.append((geometry, [baseline]))
+        del params
+
+        # fill NaNs by 0 and use smaller spatial blocks for the pair groups
+        blocksize = self.chunksize // int(
+            np.ceil(np.sqrt(max(len(baselines) for _, baselines in groups)))
+        )
+        topo2d = da.where(da.isnan(topo.data), 0, topo.data).rechunk(blocksize)
+        ys = da.from_array(topo.y.values, chunks=blocksize)
+        xs = da.from_array(topo.x.values, chunks=blocksize)
+
+        out = da.concatenate(
             [
                 da.blockwise(
                     block_phase_dask,
-                    "yx",
+                    "kyx",
                     topo2d,
                     "yx",
-                    topo.y,
+                    ys,
                     "y",
-                    topo.x,
+                    xs,
                     "x",
-                    prm1=prm[0],
-                    prm2=prm[1],
+                    geometry=geometry,
+                    baselines=baselines,
+                    new_axes={"k": len(baselines)},
                     dtype=np.complex64,
+                    meta=np.empty((0, 0, 0), dtype=np.complex64),
                 )
-                for prm in prms
+                for geometry, baselines in groups
             ],
             axis=0,
         )
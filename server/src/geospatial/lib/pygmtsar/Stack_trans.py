@@ -115,12 +115,14 @@ class Stack_trans(Stack_align):
         prm = self.PRM_merged()
 
         def SAT_llt2rat(lats, lons, zs):
+            coords = np.column_stack([lons, lats, zs])
+            if llt2rat:
+                # in-process vectorized solver
+                return prm.llt2rat(coords).astype(np.float32)[..., :3]
             # for binary=True values outside of the scene missed and the array is not complete
             # 4th and 5th coordinates are the same as input lat, lon
             return (
-                prm.SAT_llt2rat(
-                    np.column_stack([lons, lats, zs]), precise=1, binary=False
-                )
+                prm.SAT_llt2rat(coords, precise=1, binary=False)
                 .astype(np.float32)
                 .reshape(zs.size, 5)[..., :3]
             )
@@ -245,6 +247,12 @@ class Stack_trans(Stack_align):
 
         # check DEM corners
         dem_corners = dem[:: dem.lat.size - 1, :: dem.lon.size - 1].compute()
+        # validate the in-process solver against GMTSAR binary on the DEM corners
+        lls, lts = np.meshgrid(dem_corners.lon.values, dem_corners.lat.values)
+        llt2rat = prm.check_llt2rat(
+            np.column_stack([lls.ravel(), lts.ravel(), dem_corners.values.ravel()])
+        )
+        del lls, lts
         rngs, azis, _ = trans_block(dem_corners.lat.values, dem_corners.lon.values)
         azi_size = abs(np.diff(azis, axis=0).mean())
         rng_size = abs(np.diff(rngs, axis=1).mean())
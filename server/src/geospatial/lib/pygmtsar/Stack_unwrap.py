@@ -10,7 +10,7 @@
 from .Stack_unwrap_snaphu import Stack_unwrap_snaphu
 
 # required for function decorators
-from numba import jit
+from numba import jit, prange
 
 # import directive is not compatible to numba
 import numpy as np
@@ -18,6 +18,82 @@ import numpy as np
 
 class Stack_unwrap(Stack_unwrap_snaphu):
 
+    # SNAPHU jobs budgets of the current process by unwrap_snaphu() call key
+    _snaphu_budgets = {}
+
+    @staticmethod
+    def _snaphu_acquire(key, cores, memory, nproc, job_memory):
+        """
+        Wait until the SNAPHU jobs budget of the current process for unwrap_snaphu() call admits the job.
+
+        The budget is created lazily inside the task, so only the key and the limits are pickled
+        to the dask workers and every worker process keeps its own budget. The budget is removed
+        from the registry by _snaphu_release() when no jobs are running or waiting for it.
+        """
+        import threading
+
+        while True:
+            # the concurrent threads get the same first created budget
+            budget, state = Stack_unwrap._snaphu_budgets.setdefault(
+                key,
+                (
+                    threading.Condition(),
+                    {"cores": cores, "memory": memory, "jobs": 0, "waiting": 0},
+                ),
+            )
+            with budget:
+                # the budget is removed from the registry already, get the new one
+                if state.get("closed"):
+                    continue
+                state["waiting"] += 1
+                budget.wait_for(
+                    lambda: state["jobs"] == 0
+                    or (state["cores"] >= nproc and state["memory"] >= job_memory)
+                )
+                state["waiting"] -= 1
+                state["cores"] -= nproc
+                state["memory"] -= job_memory
+                state["jobs"] += 1
+                return
+
+    @staticmethod
+    def _snaphu_release(key, nproc, job_memory):
+        """
+        Return the SNAPHU job resources to the budget of the current process and remove the idle budget.
+        """
+        budget, state = Stack_unwrap._snaphu_budgets[key]
+        with budget:
+            state["cores"] += nproc
+            state["memory"] += job_memory
+            state["jobs"] -= 1
+            if state["jobs"] == 0 and state["waiting"] == 0:
+                state["closed"] = True
+                del Stack_unwrap._snaphu_budgets[key]
+            budget.notify_all()
+
+    @staticmethod
+    def _snaphu_workers():
+        """
+        Return the maximum count of the dask workers per host for the active distributed client.
+
+        Returns
+        -------
+        int
+            The workers count or 1 when there is no active distributed client.
+        """
+        from collections import Counter
+
+        try:
+            from distributed import get_client
+
+            client = get_client()
+        except (ImportError, ValueError):
+            return 1
+        hosts = Counter(
+            worker["host"] for worker in client.scheduler_info()["workers"].values()
+        )
+        return max(hosts.values(), default=1)
+
     @staticmethod
     def wrap(data_pairs):
         import xarray as xr
@@ -403,6 +479,53 @@ class Stack_unwrap(Stack_unwrap_snaphu):
         # out[~nanmask] = np.where(mask[~nanmask], buffer[~nanmask], np.nan)
         return out
 
+    @staticmethod
+    @jit(nopython=True, nogil=True, parallel=True)
+    def _unwrap_pairs_kernel(unwrap_pairs, data, weight, matrix, tolerance, out):
+        # the jitted function is the argument because numba cannot resolve class attributes
+        for idx in prange(data.shape[0]):
+            out[idx] = unwrap_pairs(data[idx], weight[idx], matrix, tolerance)
+
+    @staticmethod
+    def unwrap_pairs_block(data, weight=None, matrix=None, tolerance=np.pi / 2):
+        """
+        Unwrap the pairs for all the pixels of a block in parallel threads.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Wrapped phase array of shape (..., pair).
+        weight : numpy.ndarray, optional
+            Weights array of the data shape.
+        matrix : numpy.ndarray
+            Pairs matrix from Stack.unwrap_matrix().
+        tolerance : float, optional
+            Phase closure tolerance in radians (default is pi/2).
+
+        Returns
+        -------
+        numpy.ndarray
+            Unwrapped phase float32 array of the data shape.
+        """
+        shape = data.shape
+        data = np.ascontiguousarray(data.reshape(-1, shape[-1]), dtype=np.float32)
+        if weight is None:
+            weight = np.empty((data.shape[0], 0), dtype=np.float32)
+        else:
+            weight = np.ascontiguousarray(
+                weight.reshape(-1, shape[-1]), dtype=np.float32
+            )
+        out = np.empty_like(data)
+        Stack_unwrap._unwrap_pairs_kernel(
+            Stack_unwrap.unwrap_pairs,
+            data,
+            weight,
+            np.ascontiguousarray(matrix),
+            np.float32(tolerance),
+            out,
+        )
+        return out.reshape(shape)
+
     def unwrap_matrix(self, pairs):
         """
         Create a matrix for use in the least squares computation based on interferogram date pairs.
@@ -478,11 +601,11 @@ class Stack_unwrap(Stack_unwrap_snaphu):
             input_core_dims.append(["pair"])
             # add weight to the arguments
             args.append(weight.chunk(chunks))
+        # process float32 blocks by the parallel numba kernel
         model = xr.apply_ufunc(
-            self.unwrap_pairs,
+            self.unwrap_pairs_block,
             *args,
             dask="parallelized",
-            vectorize=True,
             input_core_dims=input_core_dims,
             output_core_dims=[["pair"]],
             output_dtypes=[np.float32],
@@ -492,19 +615,90 @@ class Stack_unwrap(Stack_unwrap_snaphu):
 
         return model.rename("unwrap")
 
-    def unwrap_snaphu(self, phase, weight=None, conf=None, conncomp=False):
+    def unwrap_snaphu(
+        self,
+        phase,
+        weight=None,
+        conf=None,
+        conncomp=False,
+        n_jobs=None,
+        memory=None,
+        tmpdir=None,
+    ):
         """
-        Limit number of processes for tiled multicore SNAPHU configuration:
-        with dask.config.set(scheduler='single-threaded'):
-            stack.unwrap2d_snaphu()...).phase.compute()
-        or
-        with dask.config.set(scheduler='threads', num_workers=2):
-            stack.unwrap2d_snaphu()...).phase.plot.imshow()
-        See for reference: https://docs.dask.org/en/stable/scheduler-overview.html
+        Unwrap phase grids using SNAPHU with the jobs admitted against the global CPU cores and memory budget.
+
+        Parameters
+        ----------
+        phase : xarray.DataArray
+            The wrapped phase 2D grid or 3D grids stack.
+        weight : xarray.DataArray, optional
+            The correlation 2D grid or 3D grids stack.
+        conf : str, optional
+            The SNAPHU configuration string. Default is None to use snaphu_config(). When the tiling is not
+            defined in the configuration it is selected by snaphu_tiles() for the grid shape and the cores.
+        conncomp : bool, optional
+            If True, return connection components map, default is False.
+        n_jobs : int, optional
+            The CPU cores budget per process. Default is None to use all the cores divided by the count
+            of the active distributed client workers per host.
+        memory : int, optional
+            The memory budget per process in bytes. Default is None to use the available memory divided
+            by the count of the active distributed client workers per host.
+        tmpdir : str, optional
+            The directory to stage SNAPHU files. Default is None to use /dev/shm tmpfs when it has enough
+            free space and the Stack working directory otherwise.
+
+        Returns
+        -------
+        xarray.Dataset
+            Lazy dataset with the unwrapped phase and optional connected components.
+
+        Notes
+        -----
+        Every SNAPHU job uses the processes count and memory estimated by snaphu_resources() and it waits
+        until the budget allows to start it, so the dask scheduler workers count does not need to be
+        limited by hand. A single job exceeding the budget is started when no other jobs are running.
+        The budget is shared by the threads of a process and it is removed when no jobs are running.
+        Every process-based dask worker admits the jobs against its own copy of the budget, so the default
+        budget is the worker share of the host resources and the specified n_jobs and memory are applied
+        per worker as is.
         """
         import xarray as xr
         import numpy as np
         import dask
+        import os
+        import shutil
+        import uuid
+        import joblib
+        import psutil
+
+        shape = phase.shape[-2:]
+        workers = self._snaphu_workers()
+        if n_jobs is None or n_jobs <= 0:
+            n_jobs = max(1, joblib.cpu_count() // workers)
+        if memory is None:
+            memory = psutil.virtual_memory().available // workers
+        if conf is None:
+            conf = self.snaphu_config()
+        if "NTILEROW" not in conf.upper() and "NTILECOL" not in conf.upper():
+            for key, value in self.snaphu_tiles(shape, n_jobs).items():
+                conf += f"        {key} {value}\n"
+        nproc, job_memory = self.snaphu_resources(shape, conf)
+        # the phase, correlation and mask inputs and the outputs and tiles [bytes]
+        staging = 32 * shape[0] * shape[1]
+        if (
+            tmpdir is None
+            and os.path.isdir("/dev/shm")
+            and shutil.disk_usage("/dev/shm").free > staging * max(1, n_jobs // nproc)
+        ):
+            tmpdir = "/dev/shm"
+        if tmpdir is not None and tmpdir.startswith("/dev/shm"):
+            # tmpfs files are stored in memory
+            job_memory += staging
+
+        # the budget is not picklable, the tasks find it in the process registry by the key
+        budget_key = str(uuid.uuid4())
 
         # output dataset variables
         keys = {0: "phase", 1: "conncomp"}
@@ -520,18 +714,23 @@ class Stack_unwrap(Stack_unwrap_snaphu):
             ), "ERROR: phase and weight variables have different shape"
 
         def _snaphu(ind):
-            ds = self.snaphu(
-                self.wrap(
-                    phase.isel({stackvar: ind}) if stackvar is not None else phase
-                ),
-                (
-                    weight.isel({stackvar: ind})
-                    if stackvar is not None and weight is not None
-                    else weight
-                ),
-                conf=conf,
-                conncomp=conncomp,
-            )
+            self._snaphu_acquire(budget_key, n_jobs, memory, nproc, job_memory)
+            try:
+                ds = self.snaphu(
+                    self.wrap(
+                        phase.isel({stackvar: ind}) if stackvar is not None else phase
+                    ),
+                    (
+                        weight.isel({stackvar: ind})
+                        if stackvar is not None and weight is not None
+                        else weight
+                    ),
+                    conf=conf,
+                    conncomp=conncomp,
+                    workdir=tmpdir,
+                )
+            finally:
+                self._snaphu_release(budget_key, nproc, job_memory)
             if conncomp:
                 # # select the largest connected component
                 #                 hist = np.unique(ds.conncomp.values, return_counts=True)
@@ -575,6 +774,309 @@ class Stack_unwrap(Stack_unwrap_snaphu):
         del dask_block
         return ds
 
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def unwrap_quality_kernel(phase, quality, levels=1024):
+        """
+        Unwrap 2D phase by quality-guided flood fill using a bucket priority queue.
+
+        Parameters
+        ----------
+        phase : numpy.ndarray
+            Wrapped phase 2D array, NaN values are excluded.
+        quality : numpy.ndarray
+            Pixel quality 2D array in range [0, 1] like to correlation, NaN values are excluded.
+        levels : int, optional
+            The number of quality levels of the priority queue. Default is 1024.
+
+        Returns
+        -------
+        numpy.ndarray
+            Unwrapped phase float32 2D array. Every connected area starts from its best quality pixel.
+        """
+        ny, nx = phase.shape
+        ph = np.ascontiguousarray(phase).ravel()
+        q = np.ascontiguousarray(quality).ravel()
+        n = ny * nx
+        out = np.full(n, np.nan, dtype=np.float32)
+        visited = np.ones(n, dtype=np.bool_)
+        # quantized quality levels and the seeds ordering keys
+        bucket = np.zeros(n, dtype=np.int64)
+        keys = np.full(n, np.inf)
+        for idx in range(n):
+            if np.isnan(ph[idx]) or np.isnan(q[idx]):
+                continue
+            visited[idx] = False
+            value = min(max(q[idx], 0.0), 1.0)
+            bucket[idx] = int(value * (levels - 1))
+            keys[idx] = -value
+        # linked lists of the pixels for every quality level
+        head = np.full(levels, -1, dtype=np.int64)
+        link = np.full(n, -1, dtype=np.int64)
+        neighbors = np.empty(4, dtype=np.int64)
+        for seed in np.argsort(keys):
+            if np.isinf(keys[seed]):
+                break
+            if visited[seed]:
+                continue
+            visited[seed] = True
+            out[seed] = ph[seed]
+            head[bucket[seed]] = seed
+            top = bucket[seed]
+            while top >= 0:
+                idx = head[top]
+                if idx < 0:
+                    top -= 1
+                    continue
+                head[top] = link[idx]
+                y, x = idx // nx, idx % nx
+                count = 0
+                if y > 0:
+                    neighbors[count] = idx - nx
+                    count += 1
+                if y < ny - 1:
+                    neighbors[count] = idx + nx
+                    count += 1
+                if x > 0:
+                    neighbors[count] = idx - 1
+                    count += 1
+                if x < nx - 1:
+                    neighbors[count] = idx + 1
+                    count += 1
+                for k in range(count):
+                    jdx = neighbors[k]
+                    if visited[jdx]:
+                        continue
+                    visited[jdx] = True
+                    delta = ph[jdx] - ph[idx]
+                    delta -= 2 * np.pi * np.round(delta / (2 * np.pi))
+                    out[jdx] = out[idx] + delta
+                    level = bucket[jdx]
+                    link[jdx] = head[level]
+                    head[level] = jdx
+                    if level > top:
+                        top = level
+        return out.reshape(ny, nx)
+
+    @staticmethod
+    @jit(nopython=True, nogil=True, parallel=True)
+    def _unwrap_quality_tiles(unwrap_quality_kernel, phase, quality, bounds, out):
+        # the jitted function is the argument because numba cannot resolve class attributes
+        for idx in prange(bounds.shape[0]):
+            y0, y1, x0, x1 = bounds[idx]
+            out[idx, : y1 - y0, : x1 - x0] = unwrap_quality_kernel(
+                phase[y0:y1, x0:x1], quality[y0:y1, x0:x1], 1024
+            )
+
+    @staticmethod
+    def unwrap_quality_block(phase, quality=None, tilesize=512, overlap=64):
+        """
+        Unwrap 2D phase by quality-guided flood fill in parallel overlapped tiles.
+
+        Parameters
+        ----------
+        phase : numpy.ndarray
+            Wrapped phase 2D array.
+        quality : numpy.ndarray, optional
+            Pixel quality 2D array in range [0, 1] like to correlation. Default is None for equal quality.
+        tilesize : int, optional
+            The tile size in pixels. Default is 512.
+        overlap : int, optional
+            The tiles overlap in pixels on every side. Default is 64.
+
+        Returns
+        -------
+        numpy.ndarray
+            Unwrapped phase float32 2D array.
+
+        Notes
+        -----
+        The tiles are unwrapped independently and merged by 2*pi multiple offsets estimated as the median
+        difference on the tiles overlaps, starting from the largest tile component and following the largest
+        overlaps. Every connected component of a tile is unwrapped from its own seed, so it gets its own offset
+        estimated on its own overlaps. The components connected only outside of the processed grid
+        are not aligned to each other, the result is preview-grade.
+        """
+        import heapq
+        from scipy.ndimage import label
+
+        phase = np.ascontiguousarray(phase, dtype=np.float32)
+        if quality is None:
+            quality = np.where(np.isnan(phase), np.nan, 1).astype(np.float32)
+        quality = np.ascontiguousarray(quality, dtype=np.float32)
+        ny, nx = phase.shape
+
+        starts_y = np.arange(0, ny, tilesize)
+        starts_x = np.arange(0, nx, tilesize)
+        # tile cores and overlapped tiles bounds
+        cores = np.array(
+            [
+                (y, min(y + tilesize, ny), x, min(x + tilesize, nx))
+                for y in starts_y
+                for x in starts_x
+            ]
+        ).reshape(-1, 4)
+        bounds = cores.copy()
+        bounds[:, [0, 2]] = np.maximum(cores[:, [0, 2]] - overlap, 0)
+        bounds[:, 1] = np.minimum(cores[:, 1] + overlap, ny)
+        bounds[:, 3] = np.minimum(cores[:, 3] + overlap, nx)
+        tiles = np.full(
+            (
+                len(bounds),
+                min(ny, tilesize + 2 * overlap),
+                min(nx, tilesize + 2 * overlap),
+            ),
+            np.nan,
+            dtype=np.float32,
+        )
+        Stack_unwrap._unwrap_quality_tiles(
+            Stack_unwrap.unwrap_quality_kernel, phase, quality, bounds, tiles
+        )
+
+        def tile_view(data, idx, y0, y1, x0, x1):
+            by, bx = bounds[idx, 0], bounds[idx, 2]
+            return data[idx, y0 - by : y1 - by, x0 - bx : x1 - bx]
+
+        # the separately unwrapped connected components of every tile are the merging graph nodes
+        labels = np.zeros(tiles.shape, dtype=np.int64)
+        nodes = np.zeros(len(bounds) + 1, dtype=np.int64)
+        for idx in range(len(bounds)):
+            labels[idx], count = label(np.isfinite(tiles[idx]))
+            nodes[idx + 1] = nodes[idx] + count
+        # global node numbers with -1 for the invalid pixels
+        labels = np.where(labels > 0, labels - 1 + nodes[:-1, None, None], -1)
+        sizes = np.bincount(labels[labels >= 0], minlength=nodes[-1])
+
+        # 2*pi cycles offsets between the components of the neighboring tiles on their overlaps
+        ncols = len(starts_x)
+        edges = {node: [] for node in range(nodes[-1])}
+        for idx in range(len(bounds)):
+            for jdx in [idx + 1 if (idx + 1) % ncols else None, idx + ncols]:
+                if jdx is None or jdx >= len(bounds):
+                    continue
+                y0, y1 = max(bounds[idx, 0], bounds[jdx, 0]), min(
+                    bounds[idx, 1], bounds[jdx, 1]
+                )
+                x0, x1 = max(bounds[idx, 2], bounds[jdx, 2]), min(
+                    bounds[idx, 3], bounds[jdx, 3]
+                )
+                diff = tile_view(tiles, idx, y0, y1, x0, x1) - tile_view(
+                    tiles, jdx, y0, y1, x0, x1
+                )
+                valid = np.isfinite(diff)
+                if not valid.any():
+                    continue
+                diff = diff[valid]
+                inode = tile_view(labels, idx, y0, y1, x0, x1)[valid]
+                jnode = tile_view(labels, jdx, y0, y1, x0, x1)[valid]
+                # every pair of the overlapped components has own offset
+                pairs, inverse = np.unique(
+                    inode * nodes[-1] + jnode, return_inverse=True
+                )
+                for pair, (ind, jnd) in enumerate(zip(*np.divmod(pairs, nodes[-1]))):
+                    pair_diff = diff[inverse == pair]
+                    cycles = np.round(np.median(pair_diff) / (2 * np.pi))
+                    edges[ind].append((pair_diff.size, jnd, cycles))
+                    edges[jnd].append((pair_diff.size, ind, -cycles))
+
+        # propagate the offsets by the largest overlaps first
+        offsets = np.full(nodes[-1], np.nan)
+        for root in np.argsort(-sizes):
+            if not np.isnan(offsets[root]):
+                continue
+            offsets[root] = 0
+            queue = [(-size, jnd, root, cycles) for size, jnd, cycles in edges[root]]
+            heapq.heapify(queue)
+            while queue:
+                _, jnd, ind, cycles = heapq.heappop(queue)
+                if not np.isnan(offsets[jnd]):
+                    continue
+                offsets[jnd] = offsets[ind] + cycles
+                for size, knd, cycles in edges[jnd]:
+                    if np.isnan(offsets[knd]):
+                        heapq.heappush(queue, (-size, knd, jnd, cycles))
+
+        out = np.empty_like(phase)
+        for idx, (y0, y1, x0, x1) in enumerate(cores):
+            node = tile_view(labels, idx, y0, y1, x0, x1)
+            out[y0:y1, x0:x1] = tile_view(tiles, idx, y0, y1, x0, x1) + np.where(
+                node >= 0, 2 * np.pi * offsets[node], 0
+            ).astype(np.float32)
+        return out
+
+    def unwrap_quality(
+        self, phase, corr=None, conncomp=False, tilesize=512, overlap=64
+    ):
+        """
+        Unwrap phase grids in-process by quality-guided flood fill for preview-grade results.
+
+        Parameters
+        ----------
+        phase : xarray.DataArray
+            The wrapped phase 2D grid or 3D grids stack.
+        corr : xarray.DataArray, optional
+            The correlation 2D grid or 3D grids stack used as the pixel quality.
+        conncomp : bool, optional
+            If True, return connection components map, default is False.
+        tilesize : int, optional
+            The tile size in pixels for parallel processing. Default is 512.
+        overlap : int, optional
+            The tiles overlap in pixels. Default is 64.
+
+        Returns
+        -------
+        xarray.Dataset
+            Lazy dataset with the unwrapped phase and optional connected components like to unwrap_snaphu().
+
+        Examples
+        --------
+        Unwrap the multilooked interferogram for the quick preview:
+        unwrap = stack.unwrap_quality(intf, corr)
+
+        Notes
+        -----
+        The unwrapping starts from the best correlation pixel and follows the pixels in correlation order,
+        so the low-coherence areas are unwrapped last. That is much faster than SNAPHU and suitable for the
+        quick displacement maps while SNAPHU is recommended for the final high-quality results.
+        """
+        import xarray as xr
+        import numpy as np
+        from scipy.ndimage import label
+
+        if corr is not None:
+            assert (
+                phase.shape == corr.shape
+            ), "ERROR: phase and corr variables have different shape"
+
+        def unwrap_block(phase, corr=None):
+            return self.unwrap_quality_block(phase, corr, tilesize, overlap)
+
+        def conncomp_block(phase, corr=None):
+            valid = np.isfinite(phase)
+            if corr is not None:
+                valid &= np.isfinite(corr)
+            return label(valid)[0].astype(np.float32)
+
+        args = [self.wrap(phase).chunk({"y": -1, "x": -1})]
+        if corr is not None:
+            args.append(corr.chunk({"y": -1, "x": -1}))
+
+        outs = []
+        for func, name in [(unwrap_block, "phase"), (conncomp_block, "conncomp")]:
+            if name == "conncomp" and not conncomp:
+                continue
+            out = xr.apply_ufunc(
+                func,
+                *args,
+                input_core_dims=[["y", "x"]] * len(args),
+                output_core_dims=[["y", "x"]],
+                vectorize=True,
+                dask="parallelized",
+                output_dtypes=[np.float32],
+            )
+            outs.append(out.transpose(*phase.dims).rename(name))
+        return xr.merge(outs)
+
     def interpolate_nearest(self, data, search_radius_pixels=None):
         """
         Perform nearest neighbor interpolation on each 2D grid in a 3D grid stack.
@@ -599,8 +1101,11 @@ class Stack_unwrap(Stack_unwrap_snaphu):
         Notes
         -----
         This method performs nearest neighbor interpolation on each 2D grid (y, x) in a 3D grid stack (pair, y, x). It replaces the NaN values in each 2D grid with the nearest non-NaN values. The interpolation is performed within a specified search radius in pixels for each grid. If a search radius is not provided, the default search radius is set to the chunksize of the Stack object.
+        For regularly spaced grids the distance transform index maps are cached and reused for the pairs sharing the same NaN mask.
         """
+        import dask
         import xarray as xr
+        import numpy as np
 
         assert data.dims == (
             "pair",
@@ -608,11 +1113,39 @@ class Stack_unwrap(Stack_unwrap_snaphu):
             "x",
         ), "Input data must have dimensions (pair, y, x)"
 
-        interpolated = [
-            self.nearest_grid(data.sel(pair=pair), search_radius_pixels)
-            for pair in data.pair
-        ]
-        return xr.concat(interpolated, dim="pair")
+        if search_radius_pixels is None:
+            search_radius_pixels = self.chunksize
+        if search_radius_pixels <= 0 or not self.is_regular(data):
+            interpolated = [
+                self.nearest_grid(data.sel(pair=pair), search_radius_pixels)
+                for pair in data.pair
+            ]
+            return xr.concat(interpolated, dim="pair")
+        assert (
+            search_radius_pixels <= self.chunksize
+        ), f"ERROR: apply nearest_grid_pixels() multiple times to fill gaps more than {self.chunksize} pixels chunk size"
+
+        if data.chunks is None:
+            data = data.chunk({"pair": 1, "y": self.chunksize, "x": self.chunksize})
+        # the index maps are shared between the blocks and limited to a few per spatial block
+        cache = {}
+        cache_size = 2 * len(data.chunks[1]) * len(data.chunks[2])
+
+        def nearest_block(block):
+            if len(cache) > cache_size:
+                cache.clear()
+            return self.nearest_block(block, search_radius_pixels, cache)
+
+        depth = int(np.ceil(search_radius_pixels))
+        grid = dask.array.map_overlap(
+            nearest_block,
+            data.data,
+            depth={0: 0, 1: depth, 2: depth},
+            boundary="none",
+            dtype=np.float32,
+        )
+        # the halo merges the edge chunks smaller than the depth, restore the input chunks
+        return data.copy(data=grid.rechunk(data.data.chunks))
 
     @staticmethod
     def conncomp_main(data, start=0):
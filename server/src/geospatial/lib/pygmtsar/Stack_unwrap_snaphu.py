@@ -15,7 +15,9 @@ class Stack_unwrap_snaphu(Stack_landmask):
     # -s for SMOOTH mode and -d for DEFO mode when DEFOMAX_CYCLE should be defined in the configuration
     # DEFO mode (-d) and DEFOMAX_CYCLE=0 is equal to SMOOTH mode (-s)
     # https://web.stanford.edu/group/radar/softwareandlinks/sw/snaphu/snaphu_man1.html
-    def snaphu(self, phase, corr=None, conf=None, conncomp=False, debug=False):
+    def snaphu(
+        self, phase, corr=None, conf=None, conncomp=False, workdir=None, debug=False
+    ):
         """
         Unwraps phase using SNAPHU with the given phase and correlation data.
 
@@ -37,6 +39,10 @@ class Stack_unwrap_snaphu(Stack_landmask):
         conncomp : bool, optional
             If True, return connection components map, default is False.
 
+        workdir : str, optional
+            The directory for SNAPHU input, output and tile files like to tmpfs mount point, default is None
+            (use the Stack working directory).
+
         debug : bool, optional
             If True, print debugging information during the unwrapping process, default is False.
 
@@ -74,11 +80,17 @@ class Stack_unwrap_snaphu(Stack_landmask):
         if conf is None:
             conf = self.snaphu_config()
         # set unique processing subdirectory
-        conf += f"    TILEDIR snaphu_tiledir_{str(uuid.uuid4())}"
+        tiledir = f"snaphu_tiledir_{str(uuid.uuid4())}"
+        if workdir is not None:
+            tiledir = os.path.join(workdir, tiledir)
+        conf += f"    TILEDIR {tiledir}"
 
         # define basename for SNAPHU temp files
-        # crop .grd from filename
-        basename = self.get_filename(f"snaphu_{str(uuid.uuid4())}", "")[:-4]
+        if workdir is not None:
+            basename = os.path.join(workdir, f"snaphu_{str(uuid.uuid4())}")
+        else:
+            # crop .grd from filename
+            basename = self.get_filename(f"snaphu_{str(uuid.uuid4())}", "")[:-4]
         # print ('basename', basename)
 
         # SNAPHU input files
@@ -182,6 +194,98 @@ class Stack_unwrap_snaphu(Stack_landmask):
 
         return out
 
+    @staticmethod
+    def snaphu_tiles(shape, n_jobs=None, tilesize=1000, overlap=200):
+        """
+        Select SNAPHU tiling for the grid shape and the available CPU cores.
+
+        Parameters
+        ----------
+        shape : tuple
+            The 2D grid shape (rows, cols).
+        n_jobs : int, optional
+            The number of CPU cores to use. Default is None to use all the cores.
+        tilesize : int, optional
+            The target tile size in pixels. Default is 1000.
+        overlap : int, optional
+            The maximum tile overlap in pixels. Default is 200.
+
+        Returns
+        -------
+        dict
+            SNAPHU configuration parameters NTILEROW, NTILECOL, ROWOVRLP, COLOVRLP and NPROC.
+
+        Examples
+        --------
+        Tile 4000x6000 grid for 8 cores:
+        stack.snaphu_tiles((4000, 6000), 8)
+        {'NTILEROW': 2, 'NTILECOL': 4, 'ROWOVRLP': 200, 'COLOVRLP': 200, 'NPROC': 8}
+        """
+        import joblib
+
+        if n_jobs is None or n_jobs <= 0:
+            n_jobs = joblib.cpu_count()
+
+        rows = max(1, int(round(shape[0] / tilesize)))
+        cols = max(1, int(round(shape[1] / tilesize)))
+        # process all the tiles at once and split the longest side first
+        while rows * cols > n_jobs:
+            if cols == 1 or (rows > 1 and shape[0] / rows < shape[1] / cols):
+                rows -= 1
+            else:
+                cols -= 1
+        # overlap is limited to the quarter of the tile size
+        rowovrlp = min(overlap, shape[0] // rows // 4) if rows > 1 else 0
+        colovrlp = min(overlap, shape[1] // cols // 4) if cols > 1 else 0
+        return {
+            "NTILEROW": rows,
+            "NTILECOL": cols,
+            "ROWOVRLP": rowovrlp,
+            "COLOVRLP": colovrlp,
+            "NPROC": min(rows * cols, n_jobs),
+        }
+
+    @staticmethod
+    def snaphu_resources(shape, conf):
+        """
+        Estimate SNAPHU job processes count and memory usage for the grid shape and configuration.
+
+        Parameters
+        ----------
+        shape : tuple
+            The 2D grid shape (rows, cols).
+        conf : str
+            The SNAPHU configuration string.
+
+        Returns
+        -------
+        tuple
+            The processes count and the memory estimate in bytes.
+
+        Notes
+        -----
+        The memory estimate is a conservative empirical value: 64 bytes per pixel for the input and output arrays
+        and the main SNAPHU process, plus 96 bytes per pixel of the overlapped tile for every tile process.
+        """
+        params = {}
+        # the last definition wins like to SNAPHU configuration parsing
+        for line in conf.splitlines():
+            items = line.split()
+            if len(items) >= 2 and not items[0].startswith("#"):
+                params[items[0].upper()] = items[1]
+
+        rows = int(params.get("NTILEROW", 1))
+        cols = int(params.get("NTILECOL", 1))
+        pixels = shape[0] * shape[1]
+        if rows * cols <= 1:
+            return 1, 64 * pixels
+
+        nproc = max(1, min(int(params.get("NPROC", 1)), rows * cols))
+        tile = (shape[0] / rows + int(params.get("ROWOVRLP", 0))) * (
+            shape[1] / cols + int(params.get("COLOVRLP", 0))
+        )
+        return nproc, int(64 * pixels + 96 * tile * nproc)
+
     def snaphu_config(self, defomax=0, **kwargs):
         """
         Generate a Snaphu configuration file.
@@ -12,9 +12,10 @@ from .tqdm_joblib import tqdm_joblib
 
 
 class Tiles(datagrid, tqdm_joblib):
+    from datetime import timedelta
 
     http_timeout = 30
-    #     http_chunk_size = 8*1024**2
+    http_chunk_size = 1024**2
     # Define typical browser headers
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.150 Safari/537.36",
@@ -28,6 +29,11 @@ class Tiles(datagrid, tqdm_joblib):
         "DNT": "1",
     }
 
+    # decompressed tiles cache shared by all the downloads, one subdirectory per tiles product
+    tiles_cache = "~/.cache/pygmtsar/tiles"
+    # the missed tile markers expire to recheck the tiles later
+    tiles_missing_ttl = timedelta(days=7)
+
     def _download_tile(
         self,
         base_url,
@@ -42,16 +48,27 @@ class Tiles(datagrid, tqdm_joblib):
         debug=False,
     ):
         """
-        Download gzipped NetCDF tiles.
+        Download gzipped NetCDF tiles to the tiles cache.
+
+        The tile is decompressed on the fly into a temporary file and stored in the cache as
+        chunked compressed NetCDF grid. The offshore tiles missed by design (HTTP 404) are cached as
+        empty marker files to skip them until the markers expire after Tiles.tiles_missing_ttl.
+
+        Returns
+        -------
+        str or None
+            The cached tile NetCDF filename or None when the tile does not exist.
         """
         import rioxarray as rio
         import xarray as xr
         import requests
         import os
+        import re
+        import shutil
         import tempfile
         import zipfile
         import gzip
-        import io
+        import time
 
         product1 = int(product[0])
         if product in ["1s", "01s"]:
@@ -81,42 +98,49 @@ class Tiles(datagrid, tqdm_joblib):
         file = file_id.format(**params) if file_id is not None else None
         tile = tile_id.format(**params)
         tile_url = f"{url}/{path}/{tile}"
-        if archive is not None and len(archive) > 0:
-            # remove .gz or other archive extension
-            ext_len = len(archive) + 1
-            tile_filename = os.path.join(tempfile.gettempdir(), tile[:-ext_len])
-        else:
-            tile_filename = os.path.join(tempfile.gettempdir(), tile)
+
+        # per-product cache directory like ~/.cache/pygmtsar/tiles/copernicusdem1s.pechnikov.workers.dev
+        product_dir = re.sub(r"[^\w.-]+", "_", url.split("://")[-1]).strip("_")
+        cache_dir = os.path.join(os.path.expanduser(self.tiles_cache), product_dir)
+        cache_filename = os.path.join(cache_dir, f"{path}_{tile.split('.')[0]}.nc")
         if debug:
             print("DEBUG _download_tile: file", file)
             print("DEBUG _download_tile: tile_url", tile_url)
-            print("DEBUG _download_tile: tile_filename", tile_filename)
+            print("DEBUG _download_tile: cache_filename", cache_filename)
+        if os.path.exists(cache_filename):
+            return cache_filename
+        missing_filename = cache_filename + ".missing"
+        if os.path.exists(missing_filename):
+            age = time.time() - os.path.getmtime(missing_filename)
+            if age <= self.tiles_missing_ttl.total_seconds():
+                return None
+            os.remove(missing_filename)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        fd, tile_filename = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
         try:
-            # if archive is not None and len(archive)>0:
-            #                 with requests.get(tile_url, stream=True, headers=self.headers, timeout=self.http_timeout) as response:
-            #                     response.raise_for_status()
-            #                     # Stream the content under the context of gzip decompression
-            #                     with gzip.GzipFile(fileobj=response.raw) as gz:
-            #                         with open(tile_filename, 'wb') as f:
-            #                             while True:
-            #                                 chunk = gz.read(chunk_size)
-            #                                 if not chunk:
-            #                                     break
-            #                                 f.write(chunk)
-
-            #                 with requests.get(tile_url, stream=True, headers=self.headers, timeout=self.http_timeout) as response:
-            #                     response.raise_for_status()
-            #                     # Stream the content under the context of gzip decompression
-            #                     with gzip.GzipFile(fileobj=response.raw) as gz:
-            #                         with open(tile_filename, 'wb') as f:
-            #                             f.write(gz.read())
-            if archive is not None and archive == "zip":
-                with requests.get(
-                    tile_url, headers=self.headers, timeout=self.http_timeout
-                ) as response:
-                    response.raise_for_status()
-                    compressed_content = io.BytesIO(response.content)
-                    with zipfile.ZipFile(compressed_content, "r") as zip:
+            with requests.get(
+                tile_url,
+                stream=True,
+                headers=self.headers,
+                timeout=self.http_timeout,
+            ) as response:
+                if response.status_code in (403, 404):
+                    # offshore tiles are missed by design
+                    print(f"Tile not found {tile_url}: {response.status_code}")
+                    # 403 can be caused by rate limiting or authorization errors, do not cache it
+                    if response.status_code == 404:
+                        open(missing_filename, "w").close()
+                    return None
+                response.raise_for_status()
+                # decode HTTP transport compression only, the archives are decompressed below
+                response.raw.decode_content = True
+                if archive is not None and archive == "zip":
+                    # zip requires random access, save the archive and extract the single file
+                    with open(tile_filename + ".zip", "wb") as f:
+                        shutil.copyfileobj(response.raw, f, self.http_chunk_size)
+                    with zipfile.ZipFile(tile_filename + ".zip", "r") as zip:
                         zip_files = zip.namelist()
                         if debug:
                             print("DEBUG _download_tile: zip files", zip_files)
@@ -129,34 +153,22 @@ class Tiles(datagrid, tqdm_joblib):
                                 f"ERROR: Downloaded zip archive does not includes file {file}"
                             )
                         # extract specific file content
+                        with zip.open(file) as src, open(tile_filename, "wb") as f:
+                            shutil.copyfileobj(src, f, self.http_chunk_size)
+                elif archive is not None and archive == "gz":
+                    # stream the content under the context of gzip decompression
+                    with gzip.GzipFile(fileobj=response.raw) as gz:
                         with open(tile_filename, "wb") as f:
-                            f.write(zip.read(file))
-            elif archive is not None and archive == "gz":
-                with requests.get(
-                    tile_url, headers=self.headers, timeout=self.http_timeout
-                ) as response:
-                    response.raise_for_status()
-                    # Since we're not streaming, response.content contains the entire gzip-compressed content
-                    # We'll wrap the compressed content in BytesIO so it behaves like a file object
-                    compressed_content = io.BytesIO(response.content)
-                    # Decompress and write the content
-                    with gzip.GzipFile(fileobj=compressed_content) as gz:
-                        with open(tile_filename, "wb") as f:
-                            f.write(gz.read())
-            else:
-                #                 with requests.get(tile_url, stream=True, headers=self.headers, timeout=self.http_timeout) as response:
-                #                     response.raise_for_status()
-                #                     with open(tile_filename, 'wb') as f:
-                #                         for chunk in response.iter_content(chunk_size=self.http_chunk_size):
-                #                             f.write(chunk)
-                with requests.get(
-                    tile_url, headers=self.headers, timeout=self.http_timeout
-                ) as response:
-                    response.raise_for_status()
+                            shutil.copyfileobj(gz, f, self.http_chunk_size)
+                else:
                     with open(tile_filename, "wb") as f:
-                        f.write(response.content)
+                        for chunk in response.iter_content(
+                            chunk_size=self.http_chunk_size
+                        ):
+                            f.write(chunk)
             if filetype == "netcdf":
-                tile = xr.open_dataarray(tile_filename).load()
+                with xr.open_dataarray(tile_filename) as raster:
+                    tile = raster.load()
                 tile.attrs = {}
                 for coord in tile.coords:
                     tile.coords[coord].attrs = {}
@@ -174,17 +186,28 @@ class Tiles(datagrid, tqdm_joblib):
                 raise Exception(
                     f'ERROR:: unknown tiles file type {filetype}. Expected "netcdf" or "geotif".'
                 )
+            # store the tile as chunked compressed grid and publish it atomically
+            encoding = {"z": self._compression(tile.shape)}
+            tile.rename("z").to_netcdf(
+                tile_filename + ".nc", encoding=encoding, engine=self.netcdf_engine
+            )
+            os.replace(tile_filename + ".nc", cache_filename)
         except requests.exceptions.RequestException as e:
             # offshore tiles are missed by design
             print(f"Request error for {tile_id}: {e}")
-            tile = None
+            return None
         except Exception as e:
             print(e)
             raise
         finally:
-            if os.path.exists(tile_filename):
-                os.remove(tile_filename)
-        return tile
+            for filename in [
+                tile_filename,
+                tile_filename + ".zip",
+                tile_filename + ".nc",
+            ]:
+                if os.path.exists(filename):
+                    os.remove(filename)
+        return cache_filename
 
     def download(
         self,
@@ -204,6 +227,9 @@ class Tiles(datagrid, tqdm_joblib):
     ):
         """
         Download and merge gzipped NetCDF tiles from a defined access point.
+
+        The tiles are downloaded to the tiles cache once and the mosaic is built lazily
+        from the cached tiles, so only the grid windows covering the geometry are read.
         """
         import xarray as xr
         import numpy as np
@@ -251,7 +277,7 @@ class Tiles(datagrid, tqdm_joblib):
                 total=(right - left + 1) * (top - bottom + 1),
             )
         ) as progress_bar:
-            tile_xarrays = joblib.Parallel(n_jobs=n_jobs, backend=joblib_backend)(
+            tile_filenames = joblib.Parallel(n_jobs=n_jobs, backend=joblib_backend)(
                 joblib.delayed(self._download_tile)(
                     base_url,
                     path_id,
@@ -268,7 +294,13 @@ class Tiles(datagrid, tqdm_joblib):
                 for y in range(bottom, top + 1)
             )
 
-        tile_xarrays = [tile for tile in tile_xarrays if tile is not None]
+        tile_xarrays = [
+            xr.open_dataarray(
+                tile_filename, engine=self.netcdf_engine, chunks=self.chunksize
+            )
+            for tile_filename in tile_filenames
+            if tile_filename is not None
+        ]
         if len(tile_xarrays) == 0:
             return
         da = xr.combine_by_coords(tile_xarrays)
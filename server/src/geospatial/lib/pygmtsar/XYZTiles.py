@@ -26,6 +26,9 @@ class XYZTiles(datagrid, tqdm_joblib):
         "Upgrade-Insecure-Requests": "1",
         "DNT": "1",
     }
+    # encoded tile images cache shared by all the downloads, one subdirectory per tile map service
+    tiles_cache = "~/.cache/pygmtsar/xyztiles"
+    tiles_cache_size = 512 * 1024 * 1024
 
     def download_googlemaps(self, geometry, zoom, filename=None, **kwargs):
         kwargs["url"] = "https://mt1.google.com/vt/lyrs=r&x={x}&y={y}&z={z}"
@@ -72,11 +75,17 @@ class XYZTiles(datagrid, tqdm_joblib):
         url="https://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}",
         n_jobs=8,
         skip_exist=True,
+        cache=True,
         debug=False,
     ):
         """
         Downloads map tiles for a specified geometry and zoom level from a given tile map service.
 
+        The tiles are fetched by a bounded threads pool sharing a single HTTP session with connections pool
+        and stored as the original encoded images in XYZTiles.tiles_cache directory as {z}/{x}/{y} files
+        per tile map service. The least recently used tiles are evicted when the cache size exceeds
+        XYZTiles.tiles_cache_size bytes. The decoded tiles are placed directly into the preallocated mosaic array.
+
         Parameters
         ----------
         geometry : object
@@ -90,9 +99,11 @@ class XYZTiles(datagrid, tqdm_joblib):
             The URL template of the tile map service. The placeholders {x}, {y}, {z} should be present in the URL.
             Default is Google Satellite Hybrid 'https://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}'.
         n_jobs : int, optional
-            The number of concurrent download jobs. Default is 8.
+            The number of concurrent download threads and pooled HTTP connections. Default is 8.
         skip_exist : bool, optional
             If True, skips the download if the file already exists. Default is True.
+        cache : bool, optional
+            If True, reuse and store the tiles in the tiles cache. Default is True.
         debug : bool, optional
             If True, prints debugging information. Default is False.
 
@@ -109,13 +120,12 @@ class XYZTiles(datagrid, tqdm_joblib):
         gmap.plot.imshow()
         """
         import xarray as xr
-        import requests
         import imageio.v3 as iio
         import math
         import io
         import numpy as np
         from tqdm.auto import tqdm
-        import joblib
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         import os
 
         if filename is not None and os.path.exists(filename) and skip_exist:
@@ -133,28 +143,6 @@ class XYZTiles(datagrid, tqdm_joblib):
             y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
             return (x, y)
 
-        def download_tile(url, x, y, z, debug=False):
-            # url = f'https://mt1.google.com/vt/lyrs=y&x={x}&y={y}&z={z}'
-            url_tile = url.format(x=x, y=y, z=z)
-            if debug:
-                print("DEBUG: XYZTiles: url", url_tile)
-            response = requests.get(
-                url_tile, headers=self.headers, timeout=self.http_timeout
-            )
-            if response.status_code == 200:
-                # Check if the content type is an image
-                if "image" in response.headers.get("Content-Type", ""):
-                    image = iio.imread(io.BytesIO(response.content))
-                    return image
-                else:
-                    raise ValueError(
-                        f'Expected an image response, got {response.headers.get("Content-Type")}'
-                    )
-            else:
-                raise ValueError(
-                    f"Request for tile {url_tile} failed with status {response.status_code}"
-                )
-
         def num2deg(xtile, ytile, zoom):
             n = 2.0**zoom
             lon_deg = xtile / n * 360.0 - 180.0
@@ -162,99 +150,89 @@ class XYZTiles(datagrid, tqdm_joblib):
             lat_deg = math.degrees(lat_rad)
             return (lat_deg, lon_deg)
 
-        #         # latitudes inverted
-        #         #lat_start, lat_end = 34.42, 34.36
-        #         #lon_start, lon_end = -118.5, -118.4
-        #         if isinstance(geometry, (xr.DataArray, xr.Dataset)):
-        #             lon_start = geometry.lon.min()
-        #             lat_start = geometry.lat.min()
-        #             lon_end   = geometry.lon.max()
-        #             lat_end   = geometry.lat.max()
-        #         else:
-        #             lon_start, lat_start, lon_end, lat_end = geometry.bounds
-        #         lat_start, lat_end = lat_end, lat_start
-
         bounds = self.get_bounds(geometry)
         lon_start, lat_start, lon_end, lat_end = bounds
         # latitudes inverted
         lat_start, lat_end = lat_end, lat_start
 
-        # it produces 4 tiles for cases like (39.5, 39.5, 40.0, 40.0)
-        # left, right = int(np.floor(lon_start)), int(np.floor(lon_end))
-        # bottom, top = int(np.floor(lat_start)), int(np.floor(lat_end))
-        # enhancement to produce a single tile for cases like (39.5, 39.5, 40.0, 40.0)
-        left = np.floor(min(lon_start, lon_end))
-        right = np.ceil(max(lon_start, lon_end)) - 1
-        bottom = np.floor(min(lat_start, lat_end))
-        top = np.ceil(max(lat_start, lat_end)) - 1
-        left, right = int(left), int(right)
-        bottom, top = int(bottom), int(top)
-        # print ('left, right', left, right, 'bottom, top', bottom, top)
-
         # Calculate tile range
         x_start, y_start = deg2num(lat_start, lon_start, zoom)
         x_end, y_end = deg2num(lat_end, lon_end, zoom)
+        xs = range(x_start, x_end + 1)
+        ys = range(y_start, y_end + 1)
 
-        #     def job_tile(x, y):
-        #         tile_image = download_tile(url, x, y, zoom)
-        #         tile_array = np.array(tile_image)
-        #         lat_upper_left, lon_upper_left = num2deg(x, y, zoom)
-        #         lat_lower_right, lon_lower_right = num2deg(x + 1, y + 1, zoom)
-        #         latitudes = np.linspace(lat_upper_left, lat_lower_right, tile_array.shape[0])
-        #         longitudes = np.linspace(lon_upper_left, lon_lower_right, tile_array.shape[1])
-        #         return xr.DataArray(tile_array, dims=('lat', 'lon', 'band'),
-        #                                coords={'lat': latitudes, 'lon': longitudes}).rename('tile')
-        def job_tile(x, y, debug=False):
-            tile_image = download_tile(url, x, y, zoom, debug)
-            tile_array = np.array(tile_image)
-            lat_upper_left, lon_upper_left = num2deg(x, y, zoom)
-            lat_lower_right, lon_lower_right = num2deg(x + 1, y + 1, zoom)
-            # Exclude the endpoint to prevent overlap with the adjacent tile
-            latitudes = np.linspace(
-                lat_upper_left, lat_lower_right, tile_array.shape[0], endpoint=False
-            )
-            longitudes = np.linspace(
-                lon_upper_left, lon_lower_right, tile_array.shape[1], endpoint=False
-            )
-            return xr.DataArray(
-                tile_array,
-                dims=("lat", "lon", "band"),
-                coords={"lat": latitudes, "lon": longitudes},
-            ).rename("colors")
-
-        if n_jobs is None:
-            # do not use joblib parallel processing
-            tile_xarrays = []
-            with self.tqdm_joblib(
-                tqdm(
-                    desc=f"XYZ Tiles Downloading",
-                    total=(x_end - x_start + 1) * (y_end - y_start + 1),
-                )
-            ) as pbar:
-                for x in range(x_start, x_end + 1):
-                    for y in range(y_start, y_end + 1):
-                        tile = job_tile(x, y, debug=debug)
-                        tile_xarrays.append(tile)
-                        pbar.update(1)
-        else:
-            with self.tqdm_joblib(
-                tqdm(
-                    desc="XYZ Tiles Downloading",
-                    total=(x_end - x_start + 1) * (y_end - y_start + 1),
+        # bounded threads pool and the connections pool of the same size
+        n_threads = n_jobs if n_jobs is not None and n_jobs > 0 else 1
+        if n_jobs is not None and n_jobs < 0:
+            n_threads = max(1, os.cpu_count() + 1 + n_jobs)
+        session = self._tiles_session(n_threads)
+        cache_dir = self._tiles_cache_dir(url) if cache else None
+
+        def job_tile(x, y):
+            content = self._fetch_tile(session, url, x, y, zoom, cache_dir, debug)
+            image = iio.imread(io.BytesIO(content))
+            if image.ndim == 2:
+                image = image[..., None]
+            return x - x_start, y - y_start, image
+
+        # the mosaic is allocated for the first decoded tile size and the tiles are stored in place
+        mosaic = None
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            futures = [executor.submit(job_tile, x, y) for x in xs for y in ys]
+            with tqdm(desc="XYZ Tiles Downloading", total=len(futures)) as pbar:
+                for future in as_completed(futures):
+                    ix, iy, image = future.result()
+                    height, width, bands = image.shape
+                    if mosaic is None:
+                        mosaic = np.empty(
+                            (bands, len(ys) * height, len(xs) * width),
+                            dtype=image.dtype,
+                        )
+                    if mosaic.shape != (bands, len(ys) * height, len(xs) * width):
+                        raise ValueError(
+                            f"Inconsistent tile shape {image.shape} for tile x={ix + x_start} y={iy + y_start} z={zoom}"
+                        )
+                    mosaic[
+                        :,
+                        iy * height : (iy + 1) * height,
+                        ix * width : (ix + 1) * width,
+                    ] = np.moveaxis(image, -1, 0)
+                    pbar.update(1)
+        session.close()
+        if cache:
+            self._evict_tiles_cache()
+
+        height = mosaic.shape[1] // len(ys)
+        width = mosaic.shape[2] // len(xs)
+        # Exclude the endpoint to prevent overlap with the adjacent tile
+        lats = np.concatenate(
+            [
+                np.linspace(
+                    num2deg(0, y, zoom)[0],
+                    num2deg(0, y + 1, zoom)[0],
+                    height,
+                    endpoint=False,
                 )
-            ) as progress_bar:
-                tile_xarrays = joblib.Parallel(n_jobs=n_jobs)(
-                    joblib.delayed(job_tile)(x, y)
-                    for x in range(x_start, x_end + 1)
-                    for y in range(y_start, y_end + 1)
+                for y in ys
+            ]
+        )
+        lons = np.concatenate(
+            [
+                np.linspace(
+                    num2deg(x, 0, zoom)[1],
+                    num2deg(x + 1, 0, zoom)[1],
+                    width,
+                    endpoint=False,
                 )
-
-        da = xr.combine_by_coords(tile_xarrays)["colors"].transpose(
-            "band", "lat", "lon"
+                for x in xs
+            ]
         )
         # fix for inverted latitudes
-        if da.lat.diff("lat")[0].item() < 0:
-            da = da.reindex(lat=da.lat[::-1])
+        da = xr.DataArray(
+            mosaic[:, ::-1],
+            dims=("band", "lat", "lon"),
+            coords={"lat": lats[::-1], "lon": lons},
+        ).rename("colors")
         # crop geometry extent
         da = da.sel(lat=slice(bounds[1], bounds[3]), lon=slice(bounds[0], bounds[2]))
 
@@ -264,3 +242,102 @@ class XYZTiles(datagrid, tqdm_joblib):
             encoding = {"colors": self._compression(da.shape)}
             da.to_netcdf(filename, encoding=encoding, engine=self.netcdf_engine)
         return da
+
+    @staticmethod
+    def _tiles_session(pool_size=8):
+        """
+        Create HTTP session with connections pool shared by the concurrent tile requests.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.headers.update(XYZTiles.headers)
+        retry = Retry(
+            total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _tiles_cache_dir(self, url):
+        """
+        Return the cache directory for the tile map service defined by the URL template.
+        """
+        import hashlib
+        import os
+        from urllib.parse import urlparse
+
+        # per-service directory like ~/.cache/pygmtsar/xyztiles/mt1.google.com_5f0c3d9a
+        digest = hashlib.md5(url.encode()).hexdigest()[:8]
+        service_dir = f"{urlparse(url).netloc.replace(':', '_') or 'local'}_{digest}"
+        return os.path.join(os.path.expanduser(self.tiles_cache), service_dir)
+
+    def _fetch_tile(self, session, url, x, y, z, cache_dir=None, debug=False):
+        """
+        Return the encoded tile image content from the tiles cache or download it.
+        """
+        import os
+        import tempfile
+
+        if cache_dir is not None:
+            cache_filename = os.path.join(cache_dir, str(z), str(x), str(y))
+            if os.path.exists(cache_filename):
+                # update modification time for the least recently used tiles eviction
+                os.utime(cache_filename)
+                with open(cache_filename, "rb") as fd:
+                    return fd.read()
+
+        url_tile = url.format(x=x, y=y, z=z)
+        if debug:
+            print("DEBUG: XYZTiles: url", url_tile)
+        response = session.get(url_tile, timeout=self.http_timeout)
+        if response.status_code != 200:
+            raise ValueError(
+                f"Request for tile {url_tile} failed with status {response.status_code}"
+            )
+        # Check if the content type is an image
+        if "image" not in response.headers.get("Content-Type", ""):
+            raise ValueError(
+                f'Expected an image response, got {response.headers.get("Content-Type")}'
+            )
+        content = response.content
+
+        if cache_dir is not None:
+            tile_dir = os.path.dirname(cache_filename)
+            os.makedirs(tile_dir, exist_ok=True)
+            fd, tmp_filename = tempfile.mkstemp(dir=tile_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_filename, cache_filename)
+        return content
+
+    def _evict_tiles_cache(self):
+        """
+        Remove the least recently used tiles when the tiles cache exceeds XYZTiles.tiles_cache_size bytes.
+        """
+        import os
+
+        cache_dir = os.path.expanduser(self.tiles_cache)
+        tiles = []
+        for root, dirs, files in os.walk(cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                tiles.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in tiles)
+        for _, size, path in sorted(tiles):
+            if total <= self.tiles_cache_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
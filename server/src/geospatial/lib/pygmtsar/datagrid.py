@@ -21,6 +21,12 @@ class datagrid:
         The engine used for NetCDF file operations. Default is 'h5netcdf'.
     netcdf_complevel : int
         The compression level for data compression. Default is 3.
+    storage_backend : str
+        The storage format for saved cubes and stacks, 'netcdf' or 'zarr'. Default is 'netcdf'.
+    zarr_compression_algorithm : str
+        The Blosc compressor name for Zarr stores. Default is 'zstd'.
+    zarr_complevel : int
+        The Blosc compression level for Zarr stores. Default is 3.
     noindex : np.uint32
         The NODATA index value for transform matrices.
 
@@ -50,6 +56,12 @@ class datagrid:
     netcdf_complevel = -1
     netcdf_shuffle = True
     netcdf_queue = 16
+    # Zarr options, the stores are used by save_cube() and save_stack() when storage_backend = 'zarr'
+    storage_backend = "netcdf"
+    # storage_backend = 'zarr'
+    zarr_compression_algorithm = "zstd"
+    zarr_complevel = 3
+    zarr_shuffle = True
 
     # define lost class variables due to joblib via arguments
     def _compression(self, shape=None, chunksize=None):
@@ -125,6 +137,50 @@ class datagrid:
             opts["shuffle"] = self.netcdf_shuffle
         return opts
 
+    def _zarr_compression(self, shape=None, chunksize=None):
+        """
+        Return the Zarr encoding options for a data grid.
+
+        Parameters
+        ----------
+        shape : tuple, list, np.ndarray, optional
+            The shape of the data grid. Default is None.
+        chunksize : int or tuple, optional
+            The chunk size for data compression. If not specified, the class attribute chunksize is used.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the chunks and Blosc compressor for the data grid.
+
+        Examples
+        --------
+        >>> _zarr_compression(shape=(1000, 1000))
+        {'chunks': (512, 512), 'compressor': Blosc(cname='zstd', clevel=3, shuffle=BITSHUFFLE, blocksize=0)}
+        """
+        import xarray as xr
+        import zarr
+        from numcodecs import Blosc
+
+        # the stores are always written in Zarr format 2, zarr>=3 requires xarray>=2025.01 for that
+        if (
+            int(zarr.__version__.split(".")[0]) >= 3
+            and int(xr.__version__.split(".")[0]) < 2025
+        ):
+            raise ImportError(
+                f"ERROR: zarr {zarr.__version__} is not supported by xarray {xr.__version__}, install zarr<3"
+            )
+
+        chunks = self._compression(shape, chunksize)["chunksizes"]
+        if self.zarr_compression_algorithm is None or self.zarr_complevel < 0:
+            return dict(chunks=chunks, compressor=None)
+        compressor = Blosc(
+            cname=self.zarr_compression_algorithm,
+            clevel=self.zarr_complevel,
+            shuffle=Blosc.BITSHUFFLE if self.zarr_shuffle else Blosc.NOSHUFFLE,
+        )
+        return dict(chunks=chunks, compressor=compressor)
+
     @staticmethod
     def is_ra(grid):
         """
@@ -345,6 +401,78 @@ class datagrid:
     #         da_conv = xr.DataArray(conv.real/conv.imag, coords=dataarray.coords, name=dataarray.name)
     #         return da_conv
 
+    @staticmethod
+    def nearest_block(data, distance, cache=None):
+        """
+        Fill NaN values by the nearest valid values of the 2D grids using Euclidean distance transform.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            The input 2D grid or stack of 2D grids with the grid dimensions last.
+        distance : float
+            The interpolation distance in pixels, only the pixels closer than the distance are filled.
+        cache : dict, optional
+            The index maps cache shared between the grids with the same NaN mask. It can be shared by the threads
+            and cleared concurrently.
+
+        Returns
+        -------
+        numpy.ndarray
+            The interpolated grids.
+        """
+        from scipy.ndimage import distance_transform_edt
+        import numpy as np
+
+        if cache is None:
+            cache = {}
+        grids = data.reshape((-1,) + data.shape[-2:])
+        out = np.empty(grids.shape, dtype=np.float32)
+        for idx, grid in enumerate(grids):
+            nanmask = np.isnan(grid)
+            # all the pixels already defined or all the pixels are empty
+            if not nanmask.any() or nanmask.all():
+                out[idx] = grid
+                continue
+            key = (grid.shape, np.packbits(nanmask).tobytes())
+            # the cache can be cleared by the other threads between the checking and the reading
+            entry = cache.get(key)
+            if entry is None:
+                dist, inds = distance_transform_edt(nanmask, return_indices=True)
+                fillmask = nanmask & (dist < distance)
+                entry = (fillmask, inds[0][fillmask], inds[1][fillmask])
+                cache[key] = entry
+            fillmask, ys, xs = entry
+            out[idx] = grid
+            out[idx][fillmask] = grid[ys, xs]
+        return out.reshape(data.shape)
+
+    @staticmethod
+    def is_regular(grid):
+        """
+        Checks if the given grid has regular coordinate spacing along the 2D grid dimensions.
+
+        Parameters
+        ----------
+        grid : xarray.DataArray
+            The grid to check.
+
+        Returns
+        -------
+        bool
+            True if the coordinates are equally spaced, False otherwise.
+        """
+        import numpy as np
+
+        for dim in grid.dims[-2:]:
+            values = grid[dim].values
+            if values.size < 3:
+                continue
+            delta = np.diff(values)
+            if not np.allclose(delta, delta[0], rtol=1e-6, atol=0):
+                return False
+        return True
+
     def nearest_grid(self, in_grid, search_radius_pixels=None):
         """
         Perform nearest neighbor interpolation on a 2D grid.
@@ -371,14 +499,17 @@ class datagrid:
         This method performs nearest neighbor interpolation on a 2D grid. It replaces the NaN values in the input grid with
         the nearest non-NaN values. The interpolation is performed within a specified search radius in pixels.
         If a search radius is not provided, the default search radius is set to the chunksize of the Stack object.
+        The NumPy-backed grids are chunked by the chunksize of the Stack object and the lazy result is returned.
+        For regularly spaced grids the Euclidean distance transform is computed per chunk with the search radius halo,
+        and the KD-tree search is used for irregular coordinates only.
         """
         from scipy.spatial import cKDTree
+        import dask
         import xarray as xr
         import numpy as np
 
-        assert (
-            in_grid.chunks is not None
-        ), "nearest_grid() input grid chunks are not defined"
+        if in_grid.chunks is None:
+            in_grid = in_grid.chunk(self.chunksize)
 
         if search_radius_pixels is None:
             search_radius_pixels = self.chunksize
@@ -392,6 +523,20 @@ class datagrid:
                 search_radius_pixels <= self.chunksize
             ), f"ERROR: apply nearest_grid_pixels() multiple times to fill gaps more than {self.chunksize} pixels chunk size"
 
+        if self.is_regular(in_grid):
+            # the distance transform pixels are the same as the scaled coordinates for regular grids
+            depth = int(np.ceil(search_radius_pixels))
+            grid = dask.array.map_overlap(
+                self.nearest_block,
+                in_grid.data,
+                depth={in_grid.ndim - 2: depth, in_grid.ndim - 1: depth},
+                boundary="none",
+                dtype=np.float32,
+                distance=search_radius_pixels,
+            )
+            # the halo merges the edge chunks smaller than the depth, restore the input chunks
+            return in_grid.copy(data=grid.rechunk(in_grid.data.chunks))
+
         def func(grid, y, x, distance, scaley, scalex):
 
             grid1d = grid.reshape(-1).copy()
@@ -18,6 +18,13 @@ class tqdm_joblib:
     """
 
     import contextlib
+    import threading
+
+    # progress bars registered by the active contexts, one per calling thread,
+    # so concurrent joblib sections (e.g. downloading and processing) do not mix up
+    _tqdm_objects = {}
+    _tqdm_lock = threading.Lock()
+    _tqdm_callback = None
 
     @staticmethod
     @contextlib.contextmanager
@@ -25,12 +32,18 @@ class tqdm_joblib:
         """
         Context manager to patch `joblib` to report into `tqdm` progress bar given as argument.
 
+        The patch is installed once while any context is active and the progress is reported
+        into the progress bar of the thread which started the `joblib.Parallel` call.
+
         Parameters
         ----------
         tqdm_object : tqdm object
             The `tqdm` progress bar object to be updated.
         """
         import joblib
+        import threading
+
+        registry = tqdm_joblib._tqdm_objects
 
         class TqdmBatchCompletionCallback(joblib.parallel.BatchCompletionCallBack):
             """
@@ -40,19 +53,39 @@ class tqdm_joblib:
 
             def __init__(self, *args, **kwargs):
                 super().__init__(*args, **kwargs)
+                # batches can be dispatched from joblib internal threads,
+                # bind the progress bar to the parallel call on the first batch
+                parallel = getattr(self, "parallel", None)
+                self.tqdm_object = getattr(parallel, "_tqdm_object", None)
+                if self.tqdm_object is None:
+                    self.tqdm_object = registry.get(threading.get_ident())
+                    if parallel is not None:
+                        parallel._tqdm_object = self.tqdm_object
 
             def __call__(self, *args, **kwargs):
                 """
                 Overridden method from `joblib.parallel.BatchCompletionCallBack` to update
                 the `tqdm` progress bar and then call the super class method.
                 """
-                tqdm_object.update(n=self.batch_size)
+                if self.tqdm_object is not None:
+                    self.tqdm_object.update(n=self.batch_size)
                 return super().__call__(*args, **kwargs)
 
-        old_batch_callback = joblib.parallel.BatchCompletionCallBack
-        joblib.parallel.BatchCompletionCallBack = TqdmBatchCompletionCallback
+        thread_id = threading.get_ident()
+        with tqdm_joblib._tqdm_lock:
+            if not registry:
+                tqdm_joblib._tqdm_callback = joblib.parallel.BatchCompletionCallBack
+                joblib.parallel.BatchCompletionCallBack = TqdmBatchCompletionCallback
+            old_tqdm_object = registry.get(thread_id)
+            registry[thread_id] = tqdm_object
         try:
             yield tqdm_object
         finally:
-            joblib.parallel.BatchCompletionCallBack = old_batch_callback
+            with tqdm_joblib._tqdm_lock:
+                if old_tqdm_object is None:
+                    del registry[thread_id]
+                else:
+                    registry[thread_id] = old_tqdm_object
+                if not registry:
+                    joblib.parallel.BatchCompletionCallBack = tqdm_joblib._tqdm_callback
             tqdm_object.close()
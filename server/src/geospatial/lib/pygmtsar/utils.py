@@ -205,8 +205,46 @@ class utils:
 
     @staticmethod
     def nanconvolve2d_gaussian(
-        data, weight=None, sigma=None, mode="reflect", truncate=4.0
+        data,
+        weight=None,
+        sigma=None,
+        mode="reflect",
+        truncate=4.0,
+        fft_sigma=64,
+        max_depth=512,
     ):
+        """
+        Weighted Gaussian filtering for real or complex floats with NaNs.
+
+        The weighted values and the weights are filtered as the float planes and divided at the end.
+        For sigmas larger than fft_sigma the direct convolution becomes inefficient and the overlapping
+        chunks with the halo of truncate*sigma pixels are filtered in the frequency domain.
+        When the halo exceeds max_depth pixels the weighted values and the weights are summed by blocks,
+        the decimated grid is filtered with the reduced sigma and the result is linearly upsampled,
+        so the halo is bounded by max_depth pixels of the decimated grid.
+
+        Parameters
+        ----------
+        data : xarray.DataArray
+            2D grid to be filtered.
+        weight : xarray.DataArray, optional
+            2D weights of the same shape as data.
+        sigma : float or (float, float)
+            The Gaussian standard deviations in pixels.
+        mode : str, optional
+            The boundary mode for scipy.ndimage.gaussian_filter. Default is 'reflect'.
+        truncate : float, optional
+            The filter is truncated at this many standard deviations. Default is 4.0.
+        fft_sigma : float, optional
+            The sigma threshold to use FFT filtering. Default is 64.
+        max_depth : int, optional
+            The maximum chunks overlap in pixels to use the decimated grid filtering. Default is 512.
+
+        Returns
+        -------
+        xarray.DataArray
+            The filtered grid.
+        """
         import numpy as np
         import xarray as xr
 
@@ -218,62 +256,144 @@ class utils:
         depth = [np.ceil(_sigma * truncate).astype(int) for _sigma in sigma]
         # print ('sigma', sigma, 'depth', depth)
 
-        # weighted Gaussian filtering for real floats with NaNs
-        def nanconvolve2d_gaussian_floating_dask_chunk(data, weight=None, **kwargs):
+        if max(depth) > max_depth:
+            return utils._nanconvolve2d_gaussian_pyramid(
+                data, weight, sigma, mode, truncate, fft_sigma, max_depth
+            )
+
+        # weighted values and weights planes for real or complex floats with NaNs
+        def nanconvolve2d_gaussian_planes(data, weight=None):
             import numpy as np
-            from scipy.ndimage import gaussian_filter
 
-            assert not np.issubdtype(data.dtype, np.complexfloating)
-            assert np.issubdtype(data.dtype, np.floating)
+            rdtype = (
+                np.float32 if data.dtype in [np.float32, np.complex64] else np.float64
+            )
+            valid = np.isfinite(data)
             if weight is not None:
                 assert not np.issubdtype(weight.dtype, np.complexfloating)
                 assert np.issubdtype(weight.dtype, np.floating)
-            # replace nan + 1j to to 0.+0.j
-            data_complex = (1j + data) * (weight if weight is not None else 1)
-            conv_complex = gaussian_filter(np.nan_to_num(data_complex, 0), **kwargs)
-            # conv = conv_complex.real/conv_complex.imag
-            # to prevent "RuntimeWarning: invalid value encountered in divide" even when warning filter is defined
-            conv = np.where(
-                conv_complex.imag == 0,
-                np.nan,
-                conv_complex.real / (conv_complex.imag + 1e-17),
-            )
-            del data_complex, conv_complex
-            return conv
+                valid &= np.isfinite(weight)
+                weight = np.where(valid, weight, 0).astype(rdtype)
+            else:
+                weight = valid.astype(rdtype)
+            parts = [data.real, data.imag] if np.iscomplexobj(data) else [data]
+            planes = [
+                np.where(valid, part, 0).astype(rdtype) * weight for part in parts
+            ]
+            return planes + [weight]
+
+        def nanconvolve2d_gaussian_ratio(planes, dtype):
+            import numpy as np
 
+            # to prevent "RuntimeWarning: invalid value encountered in divide"
+            with np.errstate(invalid="ignore", divide="ignore"):
+                conv = [
+                    np.where(planes[-1] == 0, np.nan, plane / planes[-1])
+                    for plane in planes[:-1]
+                ]
+            if len(conv) == 2:
+                return (conv[0] + 1j * conv[1]).astype(dtype)
+            return conv[0].astype(dtype)
+
+        # weighted Gaussian filtering for real or complex floats by overlapping chunks
         def nanconvolve2d_gaussian_dask_chunk(data, weight=None, **kwargs):
-            import numpy as np
+            from scipy.ndimage import gaussian_filter
+
+            assert np.issubdtype(data.dtype, np.inexact)
+            planes = [
+                gaussian_filter(plane, **kwargs)
+                for plane in nanconvolve2d_gaussian_planes(data, weight)
+            ]
+            return nanconvolve2d_gaussian_ratio(planes, data.dtype)
 
-            if np.issubdtype(data.dtype, np.complexfloating):
-                # print ('complexfloating')
-                real = nanconvolve2d_gaussian_floating_dask_chunk(
-                    data.real, weight, **kwargs
+        # weighted Gaussian filtering for real or complex floats in frequency domain
+        def nanconvolve2d_gaussian_fft_chunk(
+            data, weight=None, sigma=None, mode="reflect", truncate=4.0
+        ):
+            import scipy.fft
+            from scipy.ndimage import maximum_filter
+
+            assert np.issubdtype(data.dtype, np.inexact)
+            # scipy.ndimage and numpy.pad boundary modes
+            pad_mode = {
+                "reflect": "symmetric",
+                "mirror": "reflect",
+                "nearest": "edge",
+                "constant": "constant",
+                "wrap": "wrap",
+            }[mode]
+            pad = [(_depth, _depth) for _depth in depth]
+            planes = nanconvolve2d_gaussian_planes(data, weight)
+            # the same as for truncated kernel support of the valid pixels
+            radius = [int(truncate * float(_sigma) + 0.5) for _sigma in sigma]
+            support = maximum_filter(
+                planes[-1] != 0, size=[2 * _radius + 1 for _radius in radius], mode=mode
+            )
+            shape = [
+                scipy.fft.next_fast_len(size + 2 * _depth, real=True)
+                for size, _depth in zip(data.shape, depth)
+            ]
+            # the truncated kernels spectra like to scipy.ndimage.gaussian_filter
+            spectra = []
+            for axis, kernel in enumerate(
+                utils._gaussian_decimate_kernels(sigma, (1, 1), truncate)[0]
+            ):
+                # the kernel is centered at the first pixel for the circular convolution
+                kernel = np.roll(
+                    np.pad(kernel, (0, shape[axis] - kernel.size)), -(kernel.size // 2)
                 )
-                imag = nanconvolve2d_gaussian_floating_dask_chunk(
-                    data.imag, weight, **kwargs
+                fft = scipy.fft.fft if axis == 0 else scipy.fft.rfft
+                spectra.append(fft(kernel).real)
+            gauss = spectra[0][:, None] * spectra[1][None, :]
+            del spectra
+            convs = []
+            for plane in planes:
+                # double precision is required for the weights far tails
+                spectrum = scipy.fft.rfft2(
+                    np.pad(plane.astype(np.float64), pad, mode=pad_mode),
+                    s=shape,
+                    workers=-1,
                 )
-                conv = real + 1j * imag
-                del real, imag
-            else:
-                # print ('floating')
-                conv = nanconvolve2d_gaussian_floating_dask_chunk(
-                    data.real, weight, **kwargs
+                conv = scipy.fft.irfft2(spectrum * gauss, s=shape, workers=-1)
+                convs.append(
+                    conv[
+                        depth[0] : depth[0] + data.shape[0],
+                        depth[1] : depth[1] + data.shape[1],
+                    ]
                 )
-            return conv
+                del spectrum, conv
+            convs[-1] = np.where(support, convs[-1], 0)
+            return nanconvolve2d_gaussian_ratio(convs, data.dtype)
 
         # weighted Gaussian filtering for real or complex floats
         def nanconvolve2d_gaussian_dask(data, weight, **kwargs):
             import dask.array as da
 
+            arrays = [da.asarray(data)] + (
+                [da.asarray(weight)] if weight is not None else []
+            )
+            if max(sigma) > fft_sigma:
+                # large halo, the overlapping chunks are filtered in frequency domain and
+                # the chunks smaller than the halo are enlarged by Dask to limit the memory usage
+                return da.map_overlap(
+                    nanconvolve2d_gaussian_fft_chunk,
+                    *arrays,
+                    depth={0: depth[0], 1: depth[1]},
+                    boundary="none",
+                    dtype=data.dtype,
+                    meta=arrays[0]._meta,
+                    **kwargs,
+                )
+
             # ensure both dask arrays have the same chunk structure
             # use map_overlap with the custom function to handle both arrays
             return da.map_overlap(
                 nanconvolve2d_gaussian_dask_chunk,
-                *([data, weight] if weight is not None else [data]),
+                *arrays,
                 depth={0: depth[0], 1: depth[1]},
                 boundary="none",
                 dtype=data.dtype,
-                meta=data._meta,
+                meta=arrays[0]._meta,
                 **kwargs,
             )
 
@@ -289,6 +409,347 @@ class utils:
             name=data.name,
         )
 
+    @staticmethod
+    def _nanconvolve2d_gaussian_pyramid(
+        data, weight, sigma, mode, truncate, fft_sigma, max_depth
+    ):
+        """
+        Weighted Gaussian filtering on the decimated grid for the halo larger than max_depth pixels.
+
+        The weighted values and the weights are summed by blocks, the weighted mean decimated grid
+        is filtered by nanconvolve2d_gaussian() with the reduced sigma and linearly upsampled from
+        the blocks centers.
+        """
+        import numpy as np
+        import xarray as xr
+        import dask.array as da
+
+        factors = [
+            max(int(np.ceil(np.ceil(_sigma * truncate) / max_depth)), 1)
+            for _sigma in sigma
+        ]
+        shape = data.shape
+        values = da.asarray(data.data)
+        chunksize = values.chunksize
+        rdtype = (
+            np.float32 if values.dtype in [np.float32, np.complex64] else np.float64
+        )
+        valid = da.isfinite(values)
+        if weight is not None:
+            weight = da.asarray(weight.data)
+            valid &= da.isfinite(weight)
+            weight = da.where(valid, weight, 0).astype(rdtype)
+        else:
+            weight = valid.astype(rdtype)
+        values = da.where(valid, values, 0) * weight
+        del valid
+
+        # the chunks should be multiple of the decimation factors
+        pad = [(0, -size % factor) for size, factor in zip(shape, factors)]
+        chunks = [
+            int(np.ceil(chunk / factor)) * factor
+            for chunk, factor in zip(values.chunksize, factors)
+        ]
+        axes = {0: factors[0], 1: factors[1]}
+        values, weight = [
+            da.coarsen(np.sum, da.pad(array, pad).rechunk(chunks), axes)
+            for array in [values, weight]
+        ]
+        # to prevent "RuntimeWarning: invalid value encountered in divide"
+        values = da.where(
+            weight == 0, np.nan, values / da.where(weight == 0, 1, weight)
+        ).astype(data.dtype)
+        conv = utils.nanconvolve2d_gaussian(
+            xr.DataArray(values.rechunk(chunksize), dims=data.dims),
+            xr.DataArray(weight.rechunk(chunksize), dims=data.dims),
+            [_sigma / factor for _sigma, factor in zip(sigma, factors)],
+            mode=mode,
+            truncate=truncate,
+            fft_sigma=fft_sigma,
+            max_depth=max_depth,
+        ).data
+        del values, weight
+
+        # linear interpolation from the blocks centers
+        def upsample_chunk(block):
+            import numpy as np
+
+            for axis, factor in enumerate(factors):
+                size = (block.shape[axis] - 2) * factor
+                # the block coordinates in the decimated pixels including the overlap
+                coords = (np.arange(size) - (factor - 1) / 2) / factor + 1
+                index = np.floor(coords).astype(int)
+                frac = (coords - index).astype(rdtype)
+                frac = frac[:, None] if axis == 0 else frac[None, :]
+                lower = np.take(block, index, axis=axis)
+                upper = np.take(block, index + 1, axis=axis)
+                # the exact blocks centers are not affected by NaN neighbours
+                block = np.where(frac == 0, lower, lower + frac * (upper - lower))
+            return block.astype(data.dtype)
+
+        conv = da.map_overlap(
+            upsample_chunk,
+            conv,
+            depth=1,
+            boundary="nearest",
+            trim=False,
+            chunks=tuple(
+                tuple(chunk * factor for chunk in axis_chunks)
+                for axis_chunks, factor in zip(conv.chunks, factors)
+            ),
+            dtype=data.dtype,
+            meta=np.empty((0, 0), dtype=data.dtype),
+        )
+        conv = conv[: shape[0], : shape[1]].rechunk(chunksize)
+        return xr.DataArray(conv, coords=data.coords, name=data.name)
+
+    @staticmethod
+    def _gaussian_decimate_kernels(sigma, coarsen, truncate=4.0):
+        """
+        Return 1D Gaussian kernels, the kernels convolved with the decimation box and the required overlap depths.
+
+        The kernel radius is defined the same way as in scipy.ndimage.gaussian_filter.
+        """
+        import numpy as np
+
+        gausses, kernels = [], []
+        for _sigma, _coarsen in zip(sigma, coarsen):
+            radius = int(truncate * float(_sigma) + 0.5)
+            if _sigma > 0:
+                gauss = np.exp(-0.5 * (np.arange(-radius, radius + 1) / _sigma) ** 2)
+            else:
+                gauss = np.ones(1)
+            gausses.append(gauss / gauss.sum())
+            kernel = np.convolve(gauss, np.ones(_coarsen))
+            kernels.append(kernel / kernel.sum())
+        depth = [gauss.size // 2 for gauss in gausses]
+        return gausses, kernels, depth
+
+    @staticmethod
+    def _gaussian_decimate_planes(planes, kernels, coarsen):
+        """
+        Filter and decimate 3D stack of 2D planes with overlap by the kernels from _gaussian_decimate_kernels().
+        """
+        import numpy as np
+
+        # start from the larger decimation to reduce the next pass size
+        for axis in sorted([0, 1], key=lambda axis: -coarsen[axis]):
+            kernel, step = kernels[axis].astype(planes.dtype), coarsen[axis]
+            size = (planes.shape[axis + 1] - kernel.size) // step + 1
+            if axis == 1 and step > 1:
+                # polyphase filtering on contiguous rows: split the rows to the output pixels blocks
+                # and apply the kernel parts to the blocks by matrix-vector products
+                nparts = int(np.ceil(kernel.size / step))
+                kernel = np.pad(kernel, (0, nparts * step - kernel.size))
+                blocks = size + nparts - 1
+                rows = planes[..., : blocks * step]
+                if rows.shape[-1] < blocks * step:
+                    pad = [(0, 0)] * (planes.ndim - 1) + [
+                        (0, blocks * step - rows.shape[-1])
+                    ]
+                    rows = np.pad(rows, pad)
+                rows = rows.reshape(rows.shape[:-1] + (blocks, step))
+                conv = rows[..., :size, :] @ kernel[:step]
+                for part in range(1, nparts):
+                    conv += (
+                        rows[..., part : part + size, :]
+                        @ kernel[part * step : (part + 1) * step]
+                    )
+                del rows
+            else:
+                conv = np.zeros(
+                    planes.shape[: axis + 1] + (size,) + planes.shape[axis + 2 :],
+                    dtype=planes.dtype,
+                )
+                for offset, coeff in enumerate(kernel):
+                    index = [slice(None)] * planes.ndim
+                    index[axis + 1] = slice(offset, offset + size * step, step)
+                    conv += coeff * planes[tuple(index)]
+            planes = conv
+            del conv
+        return planes
+
+    @staticmethod
+    def _gaussian_decimate_ratio(planes, gausses, kernels, coarsen):
+        """
+        Filter and decimate 3D stack of weighted values planes with overlap normalized by the last weights plane.
+
+        For constant weights the fused filtering and decimation is normalized by the block sums,
+        otherwise every pixel is filtered and normalized at full resolution and the blocks are averaged
+        the same way as for nanconvolve2d_gaussian() followed by coarsen(boundary='trim').mean().
+        """
+        import numpy as np
+        import warnings
+        from scipy.ndimage import correlate1d
+
+        if planes[-1].min() == planes[-1].max():
+            # the normalization commutes with the filtering and decimation
+            planes = utils._gaussian_decimate_planes(planes, kernels, coarsen)
+            # to prevent "RuntimeWarning: invalid value encountered in divide"
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(planes[-1] == 0, np.nan, planes[:-1] / planes[-1])
+
+        # filter the overlapping block and drop the overlap
+        for axis, gauss in enumerate(gausses):
+            radius = gauss.size // 2
+            index = [slice(None)] * planes.ndim
+            index[axis + 1] = slice(radius, planes.shape[axis + 1] - radius)
+            planes = correlate1d(
+                planes, gauss.astype(planes.dtype), axis=axis + 1, mode="constant"
+            )[tuple(index)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            conv = np.where(planes[-1] == 0, np.nan, planes[:-1] / planes[-1])
+        del planes
+        # the incomplete blocks are trimmed
+        ny, nx = conv.shape[1] // coarsen[0], conv.shape[2] // coarsen[1]
+        conv = conv[:, : ny * coarsen[0], : nx * coarsen[1]].reshape(
+            (len(conv), ny, coarsen[0], nx, coarsen[1])
+        )
+        with warnings.catch_warnings():
+            # suppress "RuntimeWarning: Mean of empty slice"
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return np.nanmean(conv, axis=(2, 4))
+
+    @staticmethod
+    def _gaussian_decimate_chunks(shape, chunksize, depth, coarsen):
+        """
+        Return the input and output chunks for the filtering and decimation by the overlapping blocks.
+
+        The chunks should be multiple of the decimation factors and not smaller than the overlap,
+        the incomplete blocks are trimmed the same way as coarsen(boundary='trim')
+        but the remaining pixels are used for the filtering.
+        """
+        import numpy as np
+
+        chunks = []
+        for axis, size in enumerate(shape):
+            if size < coarsen[axis] or size <= depth[axis]:
+                raise ValueError(
+                    f"ERROR: the grid size {size} is too small for the decimation {coarsen[axis]} and the overlap {depth[axis]}"
+                )
+            trimmed = size // coarsen[axis] * coarsen[axis]
+            chunk = max(chunksize[axis], depth[axis], 1)
+            chunk = int(np.ceil(chunk / coarsen[axis])) * coarsen[axis]
+            axis_chunks = [chunk] * (trimmed // chunk)
+            rest = trimmed - chunk * len(axis_chunks)
+            if rest > 0 and (rest >= depth[axis] or not axis_chunks):
+                axis_chunks.append(rest)
+            elif rest > 0:
+                axis_chunks[-1] += rest
+            axis_chunks[-1] += size - trimmed
+            chunks.append(tuple(axis_chunks))
+        out_chunks = [
+            tuple(chunk // _coarsen for chunk in axis_chunks)
+            for axis_chunks, _coarsen in zip(chunks, coarsen)
+        ]
+        return tuple(chunks), tuple(out_chunks)
+
+    @staticmethod
+    def nanconvolve2d_gaussian_decimate(
+        data, weight=None, sigma=None, coarsen=None, truncate=4.0
+    ):
+        """
+        Weighted Gaussian filtering for real or complex floats with NaNs fused with block mean decimation.
+
+        The result is the same as for nanconvolve2d_gaussian() followed by coarsen(boundary='trim').mean().
+        For the blocks with constant weights like to the grids without NaNs the separable Gaussian kernels
+        are convolved with the decimation box and evaluated only at the output pixels so the full resolution
+        filtered grid is never produced, the other blocks are normalized at full resolution.
+        The grids smaller than the decimation or the filter radius are processed at once.
+
+        Parameters
+        ----------
+        data : xarray.DataArray
+            2D grid to be filtered.
+        weight : xarray.DataArray, optional
+            2D weights of the same shape as data.
+        sigma : float or (float, float)
+            The Gaussian standard deviations in pixels.
+        coarsen : int or (int, int)
+            The decimation factors.
+        truncate : float, optional
+            The filter is truncated at this many standard deviations. Default is 4.0.
+
+        Returns
+        -------
+        xarray.DataArray
+            The filtered and decimated grid.
+        """
+        import numpy as np
+        import xarray as xr
+        import dask.array as da
+
+        if not isinstance(sigma, (list, tuple, np.ndarray)):
+            sigma = (sigma, sigma)
+        if not isinstance(coarsen, (list, tuple, np.ndarray)):
+            coarsen = (coarsen, coarsen)
+        coarsen = [int(_coarsen) for _coarsen in coarsen]
+        gausses, kernels, depth = utils._gaussian_decimate_kernels(
+            sigma, coarsen, truncate
+        )
+
+        def nanconvolve2d_gaussian_decimate_dask_chunk(data, weight=None):
+            import numpy as np
+
+            rdtype = (
+                np.float32 if data.dtype in [np.float32, np.complex64] else np.float64
+            )
+            valid = np.isfinite(data)
+            if weight is not None:
+                valid &= np.isfinite(weight)
+                weight = np.where(valid, weight, 0).astype(rdtype)
+            else:
+                weight = valid.astype(rdtype)
+            parts = [data.real, data.imag] if np.iscomplexobj(data) else [data]
+            # weighted values and weights are filtered together
+            planes = np.stack(
+                [np.where(valid, part, 0).astype(rdtype) * weight for part in parts]
+                + [weight]
+            )
+            del valid, weight, parts
+            conv = utils._gaussian_decimate_ratio(planes, gausses, kernels, coarsen)
+            del planes
+            if len(conv) == 2:
+                return (conv[0] + 1j * conv[1]).astype(data.dtype)
+            return conv[0].astype(data.dtype)
+
+        arrays = [data, weight] if weight is not None else [data]
+        if any(
+            size < _coarsen or size <= _depth
+            for size, _coarsen, _depth in zip(data.shape, coarsen, depth)
+        ):
+            # the small grid is reflected like to scipy.ndimage 'reflect' mode and processed at once
+            pad = [(_depth, _depth) for _depth in depth]
+            conv = nanconvolve2d_gaussian_decimate_dask_chunk(
+                *[np.pad(np.asarray(array), pad, mode="symmetric") for array in arrays]
+            )
+        else:
+            arrays = [da.asarray(array.data) for array in arrays]
+            chunks, out_chunks = utils._gaussian_decimate_chunks(
+                data.shape, arrays[0].chunksize, depth, coarsen
+            )
+            arrays = [array.rechunk(chunks) for array in arrays]
+
+            conv = da.map_overlap(
+                nanconvolve2d_gaussian_decimate_dask_chunk,
+                *arrays,
+                depth={0: depth[0], 1: depth[1]},
+                boundary="reflect",
+                trim=False,
+                chunks=out_chunks,
+                dtype=data.dtype,
+                meta=np.empty((0, 0), dtype=data.dtype),
+            )
+        del arrays
+
+        # decimated grid coordinates as the blocks centers
+        ydim, xdim = data.dims
+        coords = {
+            dim: data[dim].coarsen({dim: _coarsen}, boundary="trim").mean().values
+            for dim, _coarsen in zip([ydim, xdim], coarsen)
+        }
+        return xr.DataArray(conv, coords=coords, dims=(ydim, xdim), name=data.name)
+
     @staticmethod
     def histogram(data, bins, range):
         """
@@ -0,0 +1,179 @@
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.geospatial.lib.pygmtsar.IO import IO
+from src.geospatial.lib.pygmtsar.S1 import S1
+
+LINES_PER_BURST = 6
+WIDTH = 10
+
+
+def write_tiff(filename, data):
+    """
+    Write (lines, samples, 2) int16 array as uncompressed complex int16 TIFF with one strip per line.
+    """
+    lines, samples, _ = data.shape
+    data_offset = 8
+    strip = samples * 4
+    offsets_pos = data_offset + lines * strip
+    counts_pos = offsets_pos + 4 * lines
+    ifd_pos = counts_pos + 4 * lines
+    # tag, type, count, value or offset
+    tags = [
+        (256, 4, 1, samples),
+        (257, 4, 1, lines),
+        (258, 3, 1, 32),
+        (259, 3, 1, 1),
+        (273, 4, lines, offsets_pos),
+        (277, 3, 1, 1),
+        (278, 3, 1, 1),
+        (279, 4, lines, counts_pos),
+        (339, 3, 1, 5),
+    ]
+    with open(filename, "wb") as fd:
+        fd.write(b"II" + struct.pack("<HI", 42, ifd_pos))
+        fd.write(data.astype("<i2").tobytes())
+        fd.write(struct.pack(f"<{lines}I", *(data_offset + strip * np.arange(lines))))
+        fd.write(struct.pack(f"<{lines}I", *([strip] * lines)))
+        fd.write(struct.pack("<H", len(tags)))
+        for tag, dtype, count, value in tags:
+            fmt = "<HHIHH" if dtype == 3 and count == 1 else "<HHII"
+            fd.write(
+                struct.pack(
+                    fmt, tag, dtype, count, value, *([0] if fmt == "<HHIHH" else [])
+                )
+            )
+        fd.write(struct.pack("<I", 0))
+
+
+def write_annotation(filename, times, first, last):
+    bursts = ""
+    for burst, time in enumerate(times):
+        bursts += f"""
+        <burst>
+          <azimuthTime>{time}</azimuthTime>
+          <byteOffset>{8 + burst * LINES_PER_BURST * WIDTH * 4}</byteOffset>
+          <firstValidSample count="{LINES_PER_BURST}">{' '.join(map(str, first))}</firstValidSample>
+          <lastValidSample count="{LINES_PER_BURST}">{' '.join(map(str, last))}</lastValidSample>
+        </burst>"""
+    with open(filename, "w") as fd:
+        fd.write(
+            f"""<product><swathTiming>
+            <linesPerBurst>{LINES_PER_BURST}</linesPerBurst>
+            <burstList count="{len(times)}">{bursts}</burstList>
+            </swathTiming></product>"""
+        )
+
+
+# the first and the last burst lines are invalid, the valid samples are [2, 7]
+FIRST = [-1, 2, 2, 2, 2, -1]
+LAST = [-1, 7, 7, 7, 7, -1]
+
+
+def make_scene(tmp_path, name, times, seed):
+    data = np.random.default_rng(seed).integers(
+        1, 1000, (len(times) * LINES_PER_BURST, WIDTH, 2), dtype=np.int16
+    )
+    datapath = str(tmp_path / f"{name}.tiff")
+    metapath = str(tmp_path / f"{name}.xml")
+    write_tiff(datapath, data)
+    write_annotation(metapath, times, FIRST, LAST)
+    return data, datapath, metapath
+
+
+class Stack(IO):
+    reference = "2023-01-01"
+    chunksize = 4
+
+    def __init__(self, df):
+        self.df = df
+
+    def get_subswaths(self):
+        return [1]
+
+    def get_reference(self, subswath):
+        return self.df
+
+
+def test_read_tiff_layout(tmp_path):
+    data, datapath, _ = make_scene(tmp_path, "scene", ["2023-01-01T00:00:00"], 0)
+    offset, shape = S1.read_tiff_layout(datapath)
+    assert offset == 8
+    assert shape == data.shape[:2]
+    pairs = np.memmap(
+        datapath, dtype=np.int16, mode="r", offset=offset, shape=data.shape
+    )
+    np.testing.assert_array_equal(pairs, data)
+
+
+def test_open_bursts(tmp_path):
+    times1 = ["2023-01-01T00:00:00", "2023-01-01T00:00:03"]
+    # the first burst of the next scene duplicates the last burst of the previous one
+    times2 = ["2023-01-01T00:00:03", "2023-01-01T00:00:06", "2023-01-01T00:00:09"]
+    data1, datapath1, metapath1 = make_scene(tmp_path, "scene1", times1, 1)
+    data2, datapath2, metapath2 = make_scene(tmp_path, "scene2", times2, 2)
+    df = pd.DataFrame(
+        {
+            "datetime": pd.to_datetime(["2023-01-01T00:00:00", "2023-01-01T00:00:03"]),
+            "datapath": [datapath1, datapath2],
+            "metapath": [metapath1, metapath2],
+        }
+    )
+
+    bursts = Stack(df).open_bursts(scale=1)
+    # 4 bursts with 4 valid lines each
+    assert bursts.shape == (16, WIDTH)
+    np.testing.assert_array_equal(bursts.burst.values, np.repeat(np.arange(4), 4))
+
+    def expected(data, burst):
+        lines = data[burst * LINES_PER_BURST + 1 : (burst + 1) * LINES_PER_BURST - 1]
+        values = (lines[..., 0] + 1j * lines[..., 1]).astype(np.complex64)
+        values[:, :2] = np.nan
+        values[:, 8:] = np.nan
+        return values
+
+    values = np.concatenate(
+        [expected(data1, 0), expected(data1, 1), expected(data2, 1), expected(data2, 2)]
+    )
+    np.testing.assert_array_equal(bursts.values, values)
+
+
+def test_open_bursts_truncated(tmp_path):
+    times = ["2023-01-01T00:00:00", "2023-01-01T00:00:03"]
+    data, datapath, metapath = make_scene(tmp_path, "scene", times, 0)
+    # the TIFF includes the first burst only
+    write_tiff(datapath, data[:LINES_PER_BURST])
+    df = pd.DataFrame(
+        {
+            "datetime": pd.to_datetime(["2023-01-01"]),
+            "datapath": [datapath],
+            "metapath": [metapath],
+        }
+    )
+    with pytest.raises(ValueError, match="exceed 6 TIFF lines"):
+        Stack(df).open_bursts()
+
+
+def test_open_bursts_empty(tmp_path):
+    # the bursts without valid lines
+    times = ["2023-01-01T00:00:00", "2023-01-01T00:00:03"]
+    _, datapath, metapath = make_scene(tmp_path, "scene", times, 0)
+    write_annotation(metapath, times, [-1] * LINES_PER_BURST, [-1] * LINES_PER_BURST)
+    df = pd.DataFrame(
+        {
+            "datetime": pd.to_datetime(["2023-01-01"]),
+            "datapath": [datapath],
+            "metapath": [metapath],
+        }
+    )
+    bursts = Stack(df).open_bursts()
+    assert bursts.shape == (0, WIDTH) and bursts.dtype == np.complex64
+    assert bursts.burst.size == 0
+    assert bursts.compute().shape == (0, WIDTH)
+
+    # no scenes selected
+    bursts = Stack(df.iloc[:0]).open_bursts()
+    assert bursts.shape == (0, 0)
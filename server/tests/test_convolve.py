@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+import xarray as xr
+from scipy.ndimage import gaussian_filter
+
+from src.geospatial.lib.pygmtsar.utils import utils
+
+
+def make_grid(shape, complex=True, chunksize=128, seed=0):
+    rng = np.random.default_rng(seed)
+    yy, xx = np.meshgrid(np.arange(shape[0]), np.arange(shape[1]), indexing="ij")
+    # the smooth signal and the noise
+    values = np.sin(yy / 37.0) + np.cos(xx / 53.0) + rng.normal(size=shape)
+    if complex:
+        values = np.exp(1j * values) * (1 + 0.1 * rng.normal(size=shape))
+    values = values.astype(np.complex64 if complex else np.float32)
+    # the real and imaginary parts are invalid both
+    nan = np.nan + 1j * np.nan if complex else np.nan
+    values[rng.random(shape) < 0.05] = nan
+    values[100:160, 200:420] = nan
+    # the invalid area larger than the filter support
+    values[-90:, :150] = nan
+    return xr.DataArray(
+        values,
+        coords={"y": np.arange(shape[0]) * 2.0, "x": np.arange(shape[1]) * 1.0},
+        dims=("y", "x"),
+        name="phase",
+    ).chunk(chunksize)
+
+
+def old_nanconvolve2d_gaussian(data, weight, sigma, truncate=4.0):
+    """
+    The previous filtering of the real and imaginary parts by the complex weights trick.
+    """
+
+    def floating(values):
+        data_complex = (1j + values) * (weight if weight is not None else 1)
+        conv_complex = gaussian_filter(
+            np.nan_to_num(data_complex, 0), sigma, mode="reflect", truncate=truncate
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(
+                conv_complex.imag == 0,
+                np.nan,
+                conv_complex.real / (conv_complex.imag + 1e-17),
+            )
+
+    values = data.values
+    if weight is not None:
+        weight = weight.values
+    if np.iscomplexobj(values):
+        return floating(values.real) + 1j * floating(values.imag)
+    return floating(values)
+
+
+def assert_close(actual, expected, atol):
+    actual = actual.compute().values
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=atol)
+
+
+@pytest.mark.parametrize("complex", [False, True])
+@pytest.mark.parametrize("sigma", [(2.5, 9.0), (12.0, 20.0)])
+def test_nanconvolve2d_gaussian_spatial(sigma, complex):
+    data = make_grid((500, 700), complex=complex)
+    out = utils.nanconvolve2d_gaussian(data, None, sigma)
+    assert out.dims == data.dims and out.name == "phase"
+    assert out.dtype == data.dtype
+    assert_close(out, old_nanconvolve2d_gaussian(data, None, sigma), atol=1e-5)
+
+
+@pytest.mark.parametrize("complex", [False, True])
+def test_nanconvolve2d_gaussian_fft(complex):
+    data = make_grid((500, 700), complex=complex)
+    weight = np.abs(make_grid((500, 700), complex=False, seed=1)).fillna(0) + 0.5
+    # the previous filtering counts the weights of NaN pixels when the weights are not NaN
+    weight = weight.where(data.notnull())
+    sigma = (14.0, 22.0)
+    out = utils.nanconvolve2d_gaussian(data, weight, sigma, fft_sigma=10)
+    assert out.dtype == data.dtype
+    assert_close(out, old_nanconvolve2d_gaussian(data, weight, sigma), atol=1e-5)
+
+
+@pytest.mark.parametrize("fft_sigma", [10, 64])
+@pytest.mark.parametrize("complex", [False, True])
+def test_nanconvolve2d_gaussian_pyramid(complex, fft_sigma):
+    data = make_grid((500, 700), complex=complex)
+    sigma = (6.0, 24.0)
+    # the halo of 96 pixels is bounded by 32 pixels on the grid decimated by 3 along x
+    out = utils.nanconvolve2d_gaussian(
+        data, None, sigma, fft_sigma=fft_sigma, max_depth=32
+    )
+    assert out.dims == data.dims and out.name == "phase"
+    assert out.dtype == data.dtype
+    expected = old_nanconvolve2d_gaussian(data, None, sigma)
+    out = out.compute().values
+    # the filter support is defined by the decimated blocks
+    assert np.mean(np.isnan(out) != np.isnan(expected)) < 0.005
+    # the filtered valid pixels weights
+    support = gaussian_filter(np.isfinite(data.values).astype(np.float64), sigma) > 0.01
+    assert np.isfinite(out[support]).all()
+    error = np.abs(out[support] - expected[support])
+    assert error.max() < 0.02 and error.mean() < 0.001
+
+
+def test_nanconvolve2d_gaussian_numpy():
+    data = make_grid((300, 400)).compute()
+    sigma = (3.0, 60.0)
+    expected = old_nanconvolve2d_gaussian(data, None, sigma)
+    out = utils.nanconvolve2d_gaussian(data, None, sigma, max_depth=128)
+    assert np.nanmean(np.abs(out.values - expected)) < 0.001
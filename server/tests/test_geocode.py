@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+from scipy.interpolate import RegularGridInterpolator
+
+from src.geospatial.lib.pygmtsar.Stack import Stack
+
+
+def make_trans(shift=0.0):
+    """
+    Transform from the geographic grid to radar coordinates with the invalid corner.
+    """
+    lat = 40 + np.arange(70) * 0.01
+    lon = 30 + np.arange(90) * 0.01
+    lats, lons = np.meshgrid(lat - 40, lon - 30, indexing="ij")
+    azi = 2 + 300 * lats + 40 * lons + 50 * lats * lons + shift
+    rng = -5 + 20 * lats + 250 * lons - 30 * lats**2
+    # the exact ties between the radar pixels
+    azi[10, :20] = np.round(azi[10, :20] / 2) * 2 + 1
+    rng[:20, 10] = np.round(rng[:20, 10] / 2) * 2 + 1
+    azi[-15:, -15:] = np.nan
+    rng[-15:, -15:] = np.nan
+    return xr.Dataset(
+        {
+            "azi": (("lat", "lon"), azi),
+            "rng": (("lat", "lon"), rng),
+        },
+        coords={"lat": lat, "lon": lon},
+    )
+
+
+def make_data(stack=None):
+    rng = np.random.default_rng(0)
+    y = np.arange(0, 220, 2.0)
+    x = np.arange(0, 260, 2.0)
+    shape = (y.size, x.size) if stack is None else (stack, y.size, x.size)
+    values = rng.normal(size=shape).astype(np.float32)
+    values[..., 20:30, 40:60] = np.nan
+    dims = ("y", "x") if stack is None else ("pair", "y", "x")
+    coords = {"y": y, "x": x}
+    if stack is not None:
+        coords["pair"] = [f"pair{index}" for index in range(stack)]
+    return xr.DataArray(values, coords=coords, dims=dims, name="phase").chunk(
+        {"y": 32, "x": 32}
+    )
+
+
+def nearest(data, trans):
+    """
+    The previous geocoding by nearest neighbour interpolation of the complete grid.
+    """
+    interp = RegularGridInterpolator(
+        (data.y.values, data.x.values),
+        data.values.astype(np.float64),
+        method="nearest",
+        bounds_error=False,
+    )
+    points = np.column_stack([trans.azi.values.ravel(), trans.rng.values.ravel()])
+    # NaN coordinates are invalid
+    valid = np.isfinite(points).all(axis=1)
+    out = np.full(points.shape[0], np.nan)
+    out[valid] = interp(points[valid])
+    return out.reshape(trans.azi.shape).astype(np.float32)
+
+
+@pytest.fixture
+def stack(tmp_path):
+    stack = Stack(str(tmp_path / "work"))
+    stack.chunksize = 32
+    stack.save_cube(make_trans(), "trans")
+    return stack
+
+
+def test_geocode_gather(stack):
+    data = make_data()
+    trans = stack.get_trans()
+    out = stack._geocode_gather(data, "trans", trans, "azi", "rng")
+    assert out.dims == ("lat", "lon")
+    assert out.name == "phase"
+    expected = nearest(data, trans)
+    # some transform pixels are outside of the radar grid
+    assert np.isnan(expected).sum() > 15 * 15 + 20 * 10
+    np.testing.assert_array_equal(out.values, expected)
+
+
+def test_geocode_gather_stack(stack):
+    data = make_data(stack=3)
+    trans = stack.get_trans()
+    # decimated transform like for ra2ll autoscale
+    trans = trans.sel(lat=trans.lat[1::3], lon=trans.lon[1::3])
+    out = stack._geocode_gather(data, "trans", trans, "azi", "rng")
+    assert out.dims == ("pair", "lat", "lon")
+    np.testing.assert_array_equal(out.pair, data.pair)
+    for index in range(3):
+        np.testing.assert_array_equal(
+            out[index].values, nearest(data[index].compute(), trans)
+        )
+
+
+def test_geocode_index_cache(stack):
+    data = make_data()
+    trans = stack.get_trans()
+    ys, xs = data.y.values, data.x.values
+    filename = stack._geocode_index("trans", trans, ys, xs, "azi", "rng")
+    # the index is reused for the same transform and grids
+    mtime = os.path.getmtime(filename)
+    assert stack._geocode_index("trans", trans, ys, xs, "azi", "rng") == filename
+    assert os.path.getmtime(filename) == mtime
+    # the other grids have own indices
+    decimated = trans.sel(lat=trans.lat[::2], lon=trans.lon[::2])
+    other = stack._geocode_index("trans", decimated, ys, xs, "azi", "rng")
+    assert other != filename and os.path.exists(filename)
+
+    # the changed transform store invalidates the cached indices
+    stat = os.stat(stack.get_cubename("trans"))
+    stack.save_cube(make_trans(shift=7.0), "trans")
+    os.utime(
+        stack.get_cubename("trans"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+    )
+    trans = stack.get_trans()
+    updated = stack._geocode_index("trans", trans, ys, xs, "azi", "rng")
+    assert updated != filename
+    assert not os.path.exists(filename) and not os.path.exists(other)
+    out = stack._geocode_gather(data, "trans", trans, "azi", "rng")
+    np.testing.assert_array_equal(out.values, nearest(data, trans))
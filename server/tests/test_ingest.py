@@ -0,0 +1,259 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+import shapely
+
+from src.geospatial.helpers.common import revised_aoi
+from src.geospatial.io.downloader import asf_client
+from src.geospatial.lib.pygmtsar import S1
+from src.geospatial.lib.pygmtsar.Stack import Stack as BaseStack
+
+EVENTDATE = "2023-02-01"
+# one pre-event and two post-event dates shifted along the track
+DATES = pd.to_datetime(["2023-01-25", "2023-02-06", "2023-02-18"])
+SUBSWATHS = 12
+
+
+def scene_name(index, date):
+    start, end = f"{date:%Y%m%d}T034000", f"{date:%Y%m%d}T034027"
+    return f"S1A_IW_SLC__1SDV_{start}_{end}_046929_05A06B_000{index}"
+
+
+def subswath_name(subswath, date):
+    start, end = f"{date:%Y%m%d}t034000", f"{date:%Y%m%d}t034027"
+    return f"s1a-iw{subswath}-slc-vv-{start}-{end}-046929-05a06b-00{subswath + 3}"
+
+
+def write_annotation(filename, subswath, index):
+    # 3 bursts per subswath, the subswaths overlap in longitude
+    points = ""
+    for line in [0, 100, 200, 300]:
+        for pixel in [0, 500, 1000]:
+            lat = 40 + 0.002 * line + 0.15 * index
+            lon = 30 + 0.9 * (subswath - 1) + 0.001 * pixel - 0.0005 * line
+            points += f"""
+            <geolocationGridPoint>
+              <azimuthTime>2023-01-01T00:00:00</azimuthTime>
+              <slantRangeTime>0.005</slantRangeTime>
+              <line>{line}</line>
+              <pixel>{pixel}</pixel>
+              <latitude>{lat}</latitude>
+              <longitude>{lon}</longitude>
+              <height>0</height>
+            </geolocationGridPoint>"""
+    with open(filename, "w") as fd:
+        fd.write(
+            f"""<product>
+            <generalAnnotation><productInformation><pass>Descending</pass></productInformation></generalAnnotation>
+            <geolocationGrid><geolocationGridPointList count="12">{points}
+            </geolocationGridPointList></geolocationGrid>
+            </product>"""
+        )
+
+
+@pytest.fixture
+def source(tmp_path):
+    """
+    Scenes archive with the annotations and measurements of the subswaths.
+    """
+    source = tmp_path / "asf"
+    for index, date in enumerate(DATES):
+        safe = source / f"{scene_name(index, date)}.SAFE"
+        os.makedirs(safe / "annotation")
+        os.makedirs(safe / "measurement")
+        for subswath in [1, 2]:
+            name = subswath_name(subswath, date)
+            write_annotation(safe / "annotation" / f"{name}.xml", subswath, index)
+            (safe / "measurement" / f"{name}.tiff").write_bytes(b"tiff")
+    return source
+
+
+def copy_scenes(source, basedir, scenes, subswaths, dirs):
+    for scene in scenes:
+        for dirname in dirs:
+            path = os.path.join(f"{scene}.SAFE", dirname)
+            for name in os.listdir(source / path):
+                if name.split("-")[1][-1] not in str(subswaths):
+                    continue
+                os.makedirs(os.path.join(basedir, path), exist_ok=True)
+                shutil.copy(source / path / name, os.path.join(basedir, path, name))
+
+
+def download_orbits(basedir, scenes):
+    if isinstance(scenes, pd.DataFrame):
+        dates = pd.to_datetime(scenes.datetime).dt.floor("D")
+    else:
+        dates = pd.to_datetime([scene.split("_")[5][:8] for scene in scenes])
+    os.makedirs(basedir, exist_ok=True)
+    for date in dates:
+        start, end = date - pd.Timedelta(days=1), date + pd.Timedelta(days=1)
+        name = f"S1A_OPER_AUX_POEORB_OPOD_20230301T000000_V{start:%Y%m%d}T225942_{end:%Y%m%d}T005942.EOF"
+        open(os.path.join(basedir, name), "w").close()
+
+
+def to_wkt(geometry):
+    return shapely.to_wkt(shapely.normalize(geometry), rounding_precision=6)
+
+
+class Stack(BaseStack):
+    """
+    Stack with the GMTSAR processing replaced by the records of the inputs.
+    """
+
+    def _reframe_subswath(
+        self, subswath, date, geometry, index, total_swaths, debug=False
+    ):
+        df = self.get_repeat(subswath, date)
+        out = df.head(1).copy()
+        out["geometry"] = shapely.MultiPolygon(
+            [
+                geom
+                for bursts in df.geometry
+                for geom in bursts.geoms
+                if geom.intersects(geometry)
+            ]
+        )
+        self._record(f"{date}_F{subswath}.reframe", to_wkt(geometry))
+        return out
+
+    def _align_ref_subswath(self, subswath, debug=False):
+        self._record(f"{self.reference}_F{subswath}.PRM", self._scene(subswath))
+
+    def _align_rep_subswath(self, subswath, date, degrees=None, debug=False):
+        # the reference and the DEM are required for the repeat scenes
+        reference = os.path.join(self.basedir, f"{self.reference}_F{subswath}.PRM")
+        assert os.path.exists(reference) and self.dem_filename is not None
+        self._record(f"{date}_F{subswath}.PRM", self._scene(subswath, date))
+
+    def load_dem(self, data, geometry="auto"):
+        self.dem_filename = self._record("DEM.txt", to_wkt(geometry))
+
+    def load_landmask(self, data, geometry="auto"):
+        self.landmask_filename = self._record("landmask.txt", to_wkt(geometry))
+
+    def _scene(self, subswath, date=None):
+        record = self.get_repeat(subswath, date or self.reference).iloc[0]
+        return f"{os.path.basename(record.datapath)} {to_wkt(record.geometry)}"
+
+    def _record(self, name, text):
+        filename = os.path.join(self.basedir, name)
+        with open(filename, "w") as fd:
+            fd.write(text)
+        return filename
+
+
+class Tiles:
+    def download_dem(self, geometry, filename, product):
+        with open(filename, "w") as fd:
+            fd.write(to_wkt(geometry))
+
+    download_landmask = download_dem
+
+
+@pytest.fixture
+def downloads(source, monkeypatch):
+    scenes = [scene_name(index, date) for index, date in enumerate(DATES)]
+
+    class ASF:
+        def __init__(self, **kwargs):
+            pass
+
+        def _get_asf_session(self):
+            return None
+
+        def download_scenes(self, basedir, scenes, subswaths, session=None):
+            copy_scenes(
+                source, basedir, scenes, subswaths, ["annotation", "measurement"]
+            )
+
+    def download_annotations(file_names, subswaths, basedir, session):
+        copy_scenes(source, basedir, file_names, subswaths, ["annotation"])
+
+    monkeypatch.setattr(asf_client, "ASF", ASF)
+    monkeypatch.setattr(asf_client, "Tiles", Tiles)
+    monkeypatch.setattr(asf_client, "Stack", Stack)
+    monkeypatch.setattr(asf_client, "_select_scenes", lambda *args: scenes[::-1])
+    monkeypatch.setattr(asf_client, "_download_annotations", download_annotations)
+    monkeypatch.setattr(S1, "download_orbits", staticmethod(download_orbits))
+    return scenes
+
+
+def get_aoi(scenes):
+    aoi_gdf = revised_aoi(scenes, EVENTDATE)
+    if aoi_gdf is None:
+        return None
+    return aoi_gdf.unary_union.minimum_rotated_rectangle
+
+
+def test_scene_footprints(tmp_path, source, downloads):
+    asf_client._download_annotations(downloads, SUBSWATHS, tmp_path / "xml", None)
+    footprints = asf_client._scene_footprints(tmp_path / "xml", downloads)
+    # the same subswath geometries as for the downloaded scenes
+    download_orbits(tmp_path / "xml", downloads)
+    asf_client.ASF().download_scenes(tmp_path / "xml", downloads, SUBSWATHS)
+    scenes = S1.scan_slc(tmp_path / "xml", cache=False)
+    assert len(footprints) == len(scenes) == DATES.size * 2
+    assert footprints.subswath.tolist() == scenes.subswath.tolist()
+    assert footprints.orbit.tolist() == scenes.orbit.tolist()
+    assert footprints.datetime.tolist() == scenes.datetime.tolist()
+    assert all(footprints.geometry.values == scenes.geometry.values)
+
+    with pytest.raises(ValueError, match="annotations not found"):
+        asf_client._scene_footprints(tmp_path / "xml", downloads + ["S1A_missed"])
+
+
+def test_ingest_data(tmp_path, downloads):
+    # sequential processing
+    _, aoi_gdf = asf_client.download_data(
+        EVENTDATE, tmp_path / "work1", tmp_path / "data1", {}, {}, SUBSWATHS, None, None
+    )
+    aoi = get_aoi(aoi_gdf)
+    dem, landmask = tmp_path / "dem1.nc", tmp_path / "landmask1.nc"
+    Tiles().download_dem(aoi, filename=dem, product="1s")
+    Tiles().download_landmask(aoi, filename=landmask, product="1s")
+    sbas = Stack(tmp_path / "work1", drop_if_exists=True)
+    sbas.set_scenes(S1.scan_slc(tmp_path / "data1"))
+    sbas.compute_reframe(aoi)
+    sbas.load_dem(dem, aoi)
+    sbas.load_landmask(landmask, aoi)
+    sbas.compute_align()
+
+    # pipelined processing
+    pipelined, pipelined_aoi = asf_client.ingest_data(
+        EVENTDATE,
+        tmp_path / "work2",
+        tmp_path / "data2",
+        {},
+        {},
+        SUBSWATHS,
+        None,
+        None,
+        get_aoi=get_aoi,
+        dem=tmp_path / "dem2.nc",
+        landmask=tmp_path / "landmask2.nc",
+        queue_size=1,
+    )
+
+    assert pipelined_aoi.equals(aoi)
+    assert (tmp_path / "dem2.nc").read_text() == dem.read_text()
+    assert pipelined.reference == sbas.reference
+    columns = ["datetime", "orbit", "mission", "polarization", "subswath"]
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(pipelined.df[columns]), pd.DataFrame(sbas.df[columns])
+    )
+    assert all(pipelined.df.geometry.values == sbas.df.geometry.values)
+    for column in ["datapath", "metapath"]:
+        assert [
+            [os.path.basename(path) for path in paths] for paths in pipelined.df[column]
+        ] == [[os.path.basename(path) for path in paths] for paths in sbas.df[column]]
+
+    # the same reframed geometries and aligned scenes for every date
+    names = sorted(os.listdir(tmp_path / "work1"))
+    assert len([name for name in names if name.endswith(".PRM")]) == DATES.size * 2
+    assert sorted(os.listdir(tmp_path / "work2")) == names
+    for name in names:
+        assert (tmp_path / "work2" / name).read_text() == (
+            tmp_path / "work1" / name
+        ).read_text()
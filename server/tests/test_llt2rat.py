@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+from src.geospatial.lib.pygmtsar.PRM import PRM
+
+# circular polar orbit
+RADIUS = 7071e3
+OMEGA = np.sqrt(3.986004418e14 / RADIUS**3)
+INCLINATION = np.radians(98.2)
+RAAN = 0.3
+DAY = 123
+# orbit epoch is 01:00:00 and the scene starts 100 seconds later
+EPOCH = 3600.0
+PRF = 486.486
+LINES = 12000
+SOL = 299792456.0
+RNG_SAMP_RATE = 64345238.125714
+NEAR_RANGE = 800000
+
+
+def orbit(t):
+    u = OMEGA * t
+    x0, y0 = RADIUS * np.cos(u), RADIUS * np.sin(u)
+    vx0, vy0 = -RADIUS * OMEGA * np.sin(u), RADIUS * OMEGA * np.cos(u)
+
+    def rotate(x, y):
+        return np.stack(
+            [
+                x * np.cos(RAAN) - y * np.cos(INCLINATION) * np.sin(RAAN),
+                x * np.sin(RAAN) + y * np.cos(INCLINATION) * np.cos(RAAN),
+                y * np.sin(INCLINATION),
+            ],
+            axis=-1,
+        )
+
+    return rotate(x0, y0), rotate(vx0, vy0)
+
+
+@pytest.fixture
+def prm(tmp_path):
+    ts = np.arange(-300, 600, 10.0)
+    ps, vs = orbit(ts)
+    with open(tmp_path / "s.LED", "w") as fd:
+        fd.write(f"{ts.size} 2023 {DAY} {EPOCH - 300:.6f} 10.000000\n")
+        for t, p, v in zip(ts, ps, vs):
+            fd.write(
+                f"2023 {DAY} {EPOCH + t:.6f} {p[0]:.6f} {p[1]:.6f} {p[2]:.6f} {v[0]:.9f} {v[1]:.9f} {v[2]:.9f}\n"
+            )
+    prm = PRM.from_str(
+        f"""led_file = s.LED
+clock_start = {(DAY * 86400 + EPOCH + 100) / 86400!r}
+PRF = {PRF}
+nrows = {LINES}
+num_valid_az = {LINES}
+num_patches = 1
+ashift = 0
+sub_int_a = 0.0
+stretch_a = 0.0
+a_stretch_a = 0.0
+rshift = 0
+sub_int_r = 0.0
+near_range = {NEAR_RANGE}
+rng_samp_rate = {RNG_SAMP_RATE}
+earth_radius = 6371000
+equatorial_radius = 6378137
+polar_radius = 6356752.31424518
+"""
+    )
+    prm.filename = str(tmp_path / "s.PRM")
+    return prm
+
+
+@pytest.fixture
+def coords():
+    # ground targets on the right side of the track for the scene time span
+    rng = np.random.default_rng(0)
+    ps, _ = orbit(rng.uniform(95, 120, 200))
+    lat = np.degrees(np.arcsin(ps[:, 2] / RADIUS))
+    lon = np.degrees(np.arctan2(ps[:, 1], ps[:, 0])) + rng.uniform(2, 5, lat.size)
+    return np.column_stack([lon, lat, rng.uniform(-100, 4000, lat.size)])
+
+
+def exact_llt2rat(prm, coords):
+    """
+    Range and azimuth pixels solved by Newton iterations on the analytic orbit.
+    """
+    xyz = prm._llt2xyz(coords)
+    t = np.full(xyz.shape[0], 110.0)
+    for _ in range(20):
+        p, v = orbit(t)
+        a = -(OMEGA**2) * p
+        t -= np.sum((p - xyz) * v, axis=1) / (
+            np.sum(v * v, axis=1) + np.sum((p - xyz) * a, axis=1)
+        )
+    rng = np.linalg.norm(orbit(t)[0] - xyz, axis=1)
+    return (rng - NEAR_RANGE) / (0.5 * SOL / RNG_SAMP_RATE), (t - 100) * PRF
+
+
+def test_llt2rat(prm, coords):
+    out = prm.llt2rat(coords)
+    assert out.shape == (coords.shape[0], 5)
+    rng, azi = exact_llt2rat(prm, coords)
+    np.testing.assert_allclose(out[:, 0], rng, atol=1e-3)
+    np.testing.assert_allclose(out[:, 1], azi, atol=1e-3)
+    np.testing.assert_array_equal(out[:, 3:], coords[:, :2])
+    np.testing.assert_array_equal(prm.llt2rat(coords[0]), out[0])
+
+    look = prm.llt2look(coords)
+    np.testing.assert_allclose(np.linalg.norm(look[:, 3:], axis=1), 1)
+    # the satellite is above the ground points
+    assert np.all(look[:, 5] > 0)
+
+
+def test_llt2rat_shifts(prm, coords):
+    out = prm.llt2rat(coords)
+    prm.set(rshift=2, sub_int_r=0.25, ashift=-3, sub_int_a=0.5)
+    prm.set(stretch_a=1e-4, a_stretch_a=-2e-4)
+    shifted = prm.llt2rat(coords)
+    rng = out[:, 0] - 2.25
+    np.testing.assert_allclose(shifted[:, 0], rng, atol=1e-6)
+    np.testing.assert_allclose(
+        shifted[:, 1],
+        out[:, 1] + 2.5 - 1e-4 * rng + 2e-4 * out[:, 1],
+        atol=1e-6,
+    )
+
+
+def test_llt2rat_precise(prm, coords):
+    with pytest.raises(ValueError, match="precise=0"):
+        prm.llt2rat(coords, precise=0)
+
+
+def test_check_llt2rat_without_binary(prm, coords, tmp_path, monkeypatch):
+    # GMTSAR binaries are not available in the empty search path
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert prm.check_llt2rat(coords) is False
+    assert prm.check_llt2rat(coords, look=True) is False
+    assert prm.check_llt2rat(coords[:0]) is False
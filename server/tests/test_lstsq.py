@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.geospatial.lib.pygmtsar.Stack_lstsq import Stack_lstsq
+
+DATES = 12
+
+
+def make_matrix():
+    """
+    SBAS pairs matrix with the pairs connecting the next three dates.
+    """
+    rows = []
+    for ref in range(DATES):
+        for rep in range(ref + 1, min(ref + 4, DATES)):
+            row = np.zeros(DATES, dtype=int)
+            row[ref + 1 : rep + 1] = 1
+            rows.append(row)
+    return np.stack(rows)
+
+
+def make_data(matrix, pixels=600, seed=0):
+    rng = np.random.default_rng(seed)
+    model = rng.normal(size=(pixels, DATES))
+    x = model @ matrix.T + 0.1 * rng.normal(size=(pixels, matrix.shape[0]))
+    w = rng.uniform(0.1, 0.95, size=x.shape)
+    x[rng.random(x.shape) < 0.1] = np.nan
+    w[rng.random(w.shape) < 0.05] = np.nan
+    # the pixel without valid pairs
+    x[0] = np.nan
+    # the single valid pair
+    x[1, 1:] = np.nan
+    # no valid pairs for the last date
+    x[2, matrix[:, -1] == 1] = np.nan
+    # the valid pairs do not define the dates split
+    x[3, (matrix[:, 4] == 1) != (matrix[:, 5] == 1)] = np.nan
+    return x, w
+
+
+def lstsq1d(x, w, matrix, cumsum):
+    """
+    The previous least squares solution for every pixel.
+    """
+    return np.stack(
+        [
+            Stack_lstsq.lstsq1d(
+                x[pixel],
+                None if w is None else w[pixel] if w.ndim == 2 else w,
+                matrix,
+                cumsum=cumsum,
+            )
+            for pixel in range(x.shape[0])
+        ]
+    )
+
+
+@pytest.mark.parametrize("cumsum", [True, False])
+@pytest.mark.parametrize("weights", ["none", "vector", "pixels"])
+def test_lstsq_batch(weights, cumsum, monkeypatch):
+    matrix = make_matrix()
+    x, w = make_data(matrix)
+    if weights == "none":
+        w = None
+    elif weights == "vector":
+        w = np.nanmean(w, axis=0)
+    expected = lstsq1d(x, w, matrix, cumsum)
+    fallback = []
+    solve = Stack_lstsq.lstsq1d
+
+    def lstsq1d_fallback(*args, **kwargs):
+        fallback.append(args)
+        return solve(*args, **kwargs)
+
+    monkeypatch.setattr(Stack_lstsq, "lstsq1d", staticmethod(lstsq1d_fallback))
+    # the small batches and the batches split inside of the rank-deficient pixels
+    for batchsize in [4096, 2, 7]:
+        out = Stack_lstsq.lstsq_batch(x, w, matrix, cumsum=cumsum, batchsize=batchsize)
+        assert out.shape == (x.shape[0], DATES)
+        np.testing.assert_array_equal(np.isnan(out), np.isnan(expected))
+        np.testing.assert_allclose(out, expected, rtol=0, atol=1e-9)
+    assert np.isnan(out[0]).all()
+    # the rank-deficient systems only are solved per pixel
+    assert 0 < len(fallback) < 3 * 10
+    assert np.isfinite(out[1:4]).any(axis=1).all()
+
+
+def test_lstsq_batch_all_nan():
+    matrix = make_matrix()
+    x = np.full((5, matrix.shape[0]), np.nan)
+    out = Stack_lstsq.lstsq_batch(x, None, matrix)
+    assert out.shape == (5, DATES) and np.isnan(out).all()
@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+import pytest
+import scipy.ndimage
+import xarray as xr
+
+from src.geospatial.lib.pygmtsar.Stack import Stack
+from src.geospatial.lib.pygmtsar.utils import utils
+
+
+def make_grid(shape, complex=True, holes=True, chunksize=64, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=shape)
+    if complex:
+        values = values + 1j * rng.normal(size=shape)
+    values = values.astype(np.complex64 if complex else np.float32)
+    if holes:
+        # the isolated pixels and the block larger than the filter
+        values[rng.random(shape) < 0.02] = np.nan
+        values[40:90, 100:180] = np.nan
+    return xr.DataArray(
+        values,
+        coords={"y": np.arange(shape[0]) * 2.0, "x": np.arange(shape[1]) * 1.0},
+        dims=("y", "x"),
+        name="phase",
+    ).chunk(chunksize)
+
+
+def two_steps(data, weight, sigma, coarsen):
+    """
+    The previous multilooking by the full resolution filtering and the blocks averaging.
+    """
+    conv = utils.nanconvolve2d_gaussian(data, weight, sigma)
+    return conv.coarsen({"y": coarsen[0], "x": coarsen[1]}, boundary="trim").mean()
+
+
+def in_memory(data, sigma, coarsen):
+    """
+    The previous multilooking of the grid smaller than the filter radius without the chunks overlap.
+    """
+    values = data.values
+    valid = np.isfinite(values)
+    values = np.where(valid, values, 0)
+    planes = [values.real.astype(np.float32), values.imag.astype(np.float32)]
+    planes = [
+        scipy.ndimage.gaussian_filter(plane, sigma, mode="reflect", truncate=4.0)
+        for plane in planes + [valid.astype(np.float32)]
+    ]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        conv = (planes[0] + 1j * planes[1]) / planes[2]
+    conv = data.copy(data=np.where(planes[2] == 0, np.nan, conv).astype(data.dtype))
+    return conv.coarsen({"y": coarsen[0], "x": coarsen[1]}, boundary="trim").mean()
+
+
+def assert_close(actual, expected):
+    actual, expected = actual.compute(), expected.compute()
+    assert actual.shape == expected.shape
+    np.testing.assert_array_equal(actual.y, expected.y)
+    np.testing.assert_array_equal(actual.x, expected.x)
+    np.testing.assert_array_equal(np.isnan(actual.values), np.isnan(expected.values))
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-5, atol=2e-6)
+
+
+@pytest.mark.parametrize(
+    "sigma,coarsen",
+    [((0.19, 0.75), (1, 4)), ((0.6, 2.3), (3, 12)), ((4.0, 7.5), (2, 5))],
+)
+@pytest.mark.parametrize("holes", [False, True])
+@pytest.mark.parametrize("complex", [False, True])
+def test_gaussian_decimate(sigma, coarsen, holes, complex):
+    # the grid size is not multiple of the chunks and the decimation
+    data = make_grid((203, 397), complex=complex, holes=holes)
+    out = utils.nanconvolve2d_gaussian_decimate(data, None, sigma, coarsen)
+    assert out.name == "phase" and out.dtype == data.dtype
+    assert_close(out, two_steps(data, None, sigma, coarsen))
+
+
+@pytest.mark.parametrize("chunksize", [32, 500])
+def test_gaussian_decimate_weight(chunksize):
+    data = make_grid((203, 397), chunksize=chunksize)
+    weight = make_grid((203, 397), complex=False, holes=False, seed=1)
+    weight = np.abs(weight).chunk(chunksize)
+    sigma, coarsen = (1.5, 3.0), (2, 8)
+    out = utils.nanconvolve2d_gaussian_decimate(data, weight, sigma, coarsen)
+    assert_close(out, two_steps(data, weight, sigma, coarsen))
+
+
+@pytest.mark.parametrize("shape", [(3, 397), (203, 5), (12, 397)])
+def test_gaussian_decimate_small_grid(shape):
+    # the grid is smaller than the decimation or the filter radius
+    data = make_grid(shape, holes=False)
+    sigma, coarsen = (4.0, 7.5), (4, 8)
+    out = utils.nanconvolve2d_gaussian_decimate(data, None, sigma, coarsen)
+    assert_close(out, in_memory(data, sigma, coarsen))
+    with pytest.raises(ValueError, match="too small"):
+        utils._gaussian_decimate_chunks(shape, (64, 64), [17, 30], coarsen)
+
+
+def test_multilooking_coarsen(tmp_path):
+    stack = Stack(str(tmp_path / "work"))
+    data = xr.concat(
+        [make_grid((203, 397), seed=seed) for seed in range(2)], dim="pair"
+    ).assign_coords(pair=["pair0", "pair1"])
+    out = stack.multilooking(data, coarsen=(1, 4))
+    assert out.dims == ("pair", "y", "x")
+    for index in range(2):
+        assert_close(
+            out[index], two_steps(data[index], None, (1 / 5.3, 4 / 5.3), (1, 4))
+        )
+
+
+def test_gaussian_decimate_fused(monkeypatch):
+    data = make_grid((1200, 4800), holes=False, chunksize=512)
+    sigma, coarsen = (3 / 5.3, 12 / 5.3), (3, 12)
+    start = time.perf_counter()
+    expected = two_steps(data, None, sigma, coarsen).compute()
+    elapsed = time.perf_counter() - start
+
+    # no full resolution filtering for the grid without NaNs
+    def correlate1d(*args, **kwargs):
+        raise AssertionError("full resolution filtering")
+
+    monkeypatch.setattr(scipy.ndimage, "correlate1d", correlate1d)
+    start = time.perf_counter()
+    out = utils.nanconvolve2d_gaussian_decimate(data, None, sigma, coarsen).compute()
+    assert time.perf_counter() - start < elapsed
+    assert_close(out, expected)
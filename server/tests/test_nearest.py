@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from src.geospatial.lib.pygmtsar.datagrid import datagrid
+
+
+class ClearedCache(dict):
+    """
+    Cache cleared by a concurrent thread right after every insertion.
+    """
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.clear()
+
+
+def test_nearest_block_cleared_cache():
+    grids = np.random.default_rng(0).random((4, 32, 32)).astype(np.float32)
+    grids[:, 10:14, 5:20] = np.nan
+    grids[2, 0:3, 0:3] = np.nan
+
+    expected = datagrid.nearest_block(grids, 8)
+    out = datagrid.nearest_block(grids, 8, ClearedCache())
+    np.testing.assert_array_equal(out, expected)
+    assert np.isfinite(out).all()
+
+
+def make_patchy_grid(shape=(200, 260), seed=0):
+    """
+    Grid of the pixel indices with the random gaps, the single pixel holes and the large empty area.
+    """
+    from scipy.ndimage import binary_dilation
+
+    rng = np.random.default_rng(seed)
+    grid = np.arange(np.prod(shape), dtype=np.float32).reshape(shape)
+    gaps = binary_dilation(rng.random(shape) < 0.01, iterations=4)
+    # the gaps crossing the chunk borders
+    gaps[30:34, :] = gaps[:, 62:67] = True
+    # the pixels with equally distant neighbors
+    gaps[100:150:2, 200:250:2] = True
+    # the area larger than the search radius
+    gaps[140:200, 0:70] = True
+    grid[gaps | (rng.random(shape) < 0.2)] = np.nan
+    return grid
+
+
+def assert_nearest(actual, expected, grid, radius):
+    """
+    The same pixels are filled by the equally distant or the same neighbors.
+    """
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    valid = np.isfinite(grid)
+    np.testing.assert_array_equal(actual[valid], grid[valid])
+    filled = np.isfinite(actual) & ~valid
+    assert filled.any() and np.isnan(actual).any()
+    ys, xs = np.nonzero(filled)
+
+    def distance(values):
+        src_y, src_x = np.divmod(values[filled].astype(np.int64), grid.shape[1])
+        return np.hypot(src_y - ys, src_x - xs)
+
+    np.testing.assert_allclose(distance(actual), distance(expected), rtol=1e-12)
+    assert distance(actual).max() < radius
+
+
+@pytest.mark.parametrize("radius", [1.5, 5, 17, 32])
+@pytest.mark.parametrize("chunksize", [32, 64])
+def test_nearest_grid_kdtree(tmp_path, monkeypatch, radius, chunksize):
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+
+    grid = make_patchy_grid()
+    da = xr.DataArray(
+        grid,
+        coords={"y": np.arange(grid.shape[0]), "x": 10.0 * np.arange(grid.shape[1])},
+        dims=("y", "x"),
+    )
+    stack = Stack(str(tmp_path / "work"))
+    stack.chunksize = 32
+    actual = stack.nearest_grid(da.chunk(chunksize), radius)
+    # the previous KD-tree search used for the irregular grids
+    monkeypatch.setattr(stack, "is_regular", lambda grid: False)
+    expected = stack.nearest_grid(da.chunk(chunksize), radius)
+    assert actual.chunks == expected.chunks == da.chunk(chunksize).chunks
+    assert_nearest(actual.values, expected.values, grid, radius)
+
+
+def test_nearest_grid_numpy(tmp_path):
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+
+    grid = make_patchy_grid(shape=(90, 70))
+    da = xr.DataArray(
+        grid, coords={"y": np.arange(90), "x": np.arange(70)}, dims=("y", "x")
+    )
+    stack = Stack(str(tmp_path / "work"))
+    stack.chunksize = 32
+    out = stack.nearest_grid(da, 8)
+    assert out.chunks == ((32, 32, 26), (32, 32, 6))
+    np.testing.assert_array_equal(out.values, stack.nearest_grid(da.chunk(32), 8))
+
+
+def test_interpolate_nearest_kdtree(tmp_path, monkeypatch):
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+
+    grids = [make_patchy_grid(seed=seed) for seed in [0, 0, 1]]
+    data = xr.DataArray(
+        np.stack(grids),
+        coords={"pair": ["a", "b", "c"], "y": np.arange(200), "x": np.arange(260)},
+        dims=("pair", "y", "x"),
+    ).chunk({"pair": 1, "y": 48, "x": 48})
+    stack = Stack(str(tmp_path / "work"))
+    stack.chunksize = 32
+    actual = stack.interpolate_nearest(data, 20)
+    assert actual.chunks == data.chunks
+    monkeypatch.setattr(stack, "is_regular", lambda grid: False)
+    expected = stack.interpolate_nearest(data, 20)
+    for idx, grid in enumerate(grids):
+        assert_nearest(actual.values[idx], expected.values[idx], grid, 20)
@@ -0,0 +1,139 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.geospatial.lib.pygmtsar.S1 import S1
+
+URL = S1.orbits_url.format(mission="S1A", year=2023, month=1, day=25)
+DAY = pd.Timestamp("2023-01-25")
+
+
+def orbit_name(product, created, start, end):
+    fmt = "%Y%m%dT%H%M%S"
+    return f"S1A_OPER_AUX_{product}_OPOD_{created:{fmt}}_V{start:{fmt}}_{end:{fmt}}.EOF.zip"
+
+
+def make_listing(rng, count=12):
+    names = []
+    for _ in range(count):
+        start = DAY + pd.Timedelta(seconds=int(rng.integers(-3 * 3600, 20 * 3600)))
+        product = rng.choice(["RESORB", "POEORB"], p=[0.8, 0.2])
+        duration = pd.Timedelta(hours=3 if product == "RESORB" else 26)
+        created = start + pd.Timedelta(seconds=int(rng.integers(0, 86400)))
+        names.append(orbit_name(product, created, start, start + duration))
+    return "\n".join(names) + "\n"
+
+
+def select_orbit(text, dt, orbit_offset_start, orbit_offset_end):
+    """
+    The orbit selection of the per-scene listing scan replaced by S1._select_orbits.
+    """
+    fmt = "%Y%m%dT%H%M%S"
+    for orbit in sorted(text.splitlines(), reverse=True):
+        parts = orbit.split(".")[0].split("_")
+        if parts[3] == "RESORB":
+            time_start = pd.to_datetime(parts[6][1:], format=fmt) + orbit_offset_start
+            time_end = pd.to_datetime(parts[7], format=fmt) - orbit_offset_end
+            if not ((time_start <= dt) & (time_end >= dt)):
+                continue
+            return orbit
+        elif parts[3] == "POEORB":
+            return orbit
+    raise ValueError(f"Orbit product not found for mission S1A and timestamp {dt}")
+
+
+class Session:
+    """
+    Orbits server returning the listings and counting the requests.
+    """
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.requests = []
+
+    def get(self, url, timeout=None):
+        self.requests.append(url)
+        session = self
+
+        class Response:
+            text = session.listings[url]
+
+            def raise_for_status(self):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+        return Response()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_select_orbits(seed):
+    rng = np.random.default_rng(seed)
+    text = make_listing(rng)
+    catalog = S1._parse_orbits_index(text, "S1A", DAY, URL)
+    dts = DAY + pd.to_timedelta(rng.integers(0, 86400, 20), unit="s")
+    scenes = pd.DataFrame({"mission": "S1A", "datetime": dts})
+
+    expected = []
+    for dt in dts:
+        try:
+            expected.append(
+                select_orbit(text, dt, S1.orbit_offset_start, S1.orbit_offset_end)
+            )
+        except ValueError:
+            expected.append(None)
+    if None in expected:
+        with pytest.raises(ValueError, match="Orbit product not found"):
+            S1._select_orbits(
+                catalog, scenes, S1.orbit_offset_start, S1.orbit_offset_end
+            )
+        scenes = scenes[[orbit is not None for orbit in expected]]
+        expected = [orbit for orbit in expected if orbit is not None]
+    orbits = S1._select_orbits(
+        catalog, scenes, S1.orbit_offset_start, S1.orbit_offset_end
+    )
+    assert orbits["orbit"].tolist() == expected
+    assert (orbits["url"] == URL).all()
+
+
+def test_select_orbits_empty_listing():
+    catalog = S1._parse_orbits_index("\n", "S1A", DAY, URL)
+    scenes = pd.DataFrame({"mission": ["S1A"], "datetime": [DAY]})
+    with pytest.raises(ValueError, match="Orbit product not found"):
+        S1._select_orbits(catalog, scenes, S1.orbit_offset_start, S1.orbit_offset_end)
+
+
+def test_orbits_index_cache(tmp_path):
+    resorb = orbit_name("RESORB", DAY, DAY, DAY + pd.Timedelta(hours=3))
+    poeorb = orbit_name(
+        "POEORB", DAY, DAY - pd.Timedelta(hours=1), DAY + pd.Timedelta(hours=25)
+    )
+    session = Session({URL + "index.csv": resorb + "\n"})
+
+    def index():
+        return S1._orbits_index("S1A", DAY, session, str(tmp_path))
+
+    assert index()["orbit"].tolist() == [resorb]
+    # the fresh listing is cached
+    assert index()["orbit"].tolist() == [resorb]
+    assert len(session.requests) == 1
+
+    # the listing without precise orbits expires
+    filename = tmp_path / "S1A_20230125_index.csv"
+    stale = time.time() - S1.orbits_index_ttl.total_seconds() - 60
+    os.utime(filename, (stale, stale))
+    session.listings[URL + "index.csv"] = f"{resorb}\n{poeorb}\n"
+    assert index()["orbit"].tolist() == [resorb, poeorb]
+    assert len(session.requests) == 2
+
+    # the listing including precise orbits is final
+    os.utime(filename, (stale, stale))
+    assert index()["orbit"].tolist() == [resorb, poeorb]
+    assert len(session.requests) == 2
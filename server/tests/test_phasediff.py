@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from src.geospatial.lib.pygmtsar.Stack import Stack
+
+DATES = pd.to_datetime(["2023-01-25", "2023-02-06", "2023-02-18", "2023-03-02"])
+PAIRS = [
+    ["2023-01-25", "2023-02-06"],
+    ["2023-01-25", "2023-02-18"],
+    ["2023-02-06", "2023-03-02"],
+]
+
+
+def make_data(shape=(180, 330)):
+    """
+    SLC stack with the common deformation phase, the speckle and the invalid pixels.
+    """
+    rng = np.random.default_rng(0)
+    yy, xx = np.meshgrid(np.arange(shape[0]), np.arange(shape[1]), indexing="ij")
+    amplitude = 1 + rng.random(shape)
+    slcs = []
+    for index in range(DATES.size):
+        phase = index * (yy / 40.0 + np.sin(xx / 30.0)) + 0.5 * rng.normal(size=shape)
+        slc = amplitude * (1 + 0.2 * rng.normal(size=shape)) * np.exp(1j * phase)
+        slc[rng.random(shape) < 0.01] = np.nan
+        slc[60:80, 100 + 10 * index : 150 + 10 * index] = np.nan
+        slcs.append(slc)
+    return xr.DataArray(
+        np.stack(slcs).astype(np.complex64),
+        coords={
+            "date": DATES,
+            "y": np.arange(shape[0]) + 0.5,
+            "x": np.arange(shape[1]) + 0.5,
+        },
+        dims=("date", "y", "x"),
+        name="data",
+    ).chunk({"date": 1, "y": 64, "x": 64})
+
+
+def make_topo(data):
+    """
+    Topography phase for the pairs like to Stack.topo_phase() output.
+    """
+    pairs = pd.DataFrame(PAIRS, columns=["ref", "rep"])
+    names = [f"{ref} {rep}" for ref, rep in PAIRS]
+    xx = data.x.values[None, None, :]
+    yy = data.y.values[None, :, None]
+    scale = np.arange(1, len(PAIRS) + 1)[:, None, None]
+    phase = np.exp(1j * scale * (xx / 90.0 + yy * xx / 20000.0)).astype(np.complex64)
+    return xr.DataArray(
+        phase,
+        coords={
+            "pair": names,
+            "ref": ("pair", pd.to_datetime(pairs.ref)),
+            "rep": ("pair", pd.to_datetime(pairs.rep)),
+            "y": data.y,
+            "x": data.x,
+        },
+        dims=("pair", "y", "x"),
+        name="phase",
+    ).chunk({"y": 64, "x": 64})
+
+
+@pytest.fixture
+def stack(tmp_path, monkeypatch):
+    stack = Stack(str(tmp_path / "work"))
+    stack.chunksize = 64
+    # the ground pixel size in meters
+    monkeypatch.setattr(stack, "get_spacing", lambda grid=1: (14.0, 4.0))
+    return stack
+
+
+def separate(stack, data, topo, weight, wavelength, coarsen):
+    """
+    The previous phase difference, multilooking and correlation graphs.
+    """
+    intensity_look = stack.multilooking(
+        np.square(np.abs(data)), wavelength=wavelength, coarsen=coarsen
+    )
+    phasediff = stack.phasediff(PAIRS, data, topo=topo)
+    phasediff_look = stack.multilooking(
+        phasediff, weight=weight, wavelength=wavelength, coarsen=coarsen
+    )
+    corr_look = stack.correlation(phasediff_look, intensity_look)
+    return phasediff_look, corr_look, intensity_look
+
+
+@pytest.mark.parametrize(
+    "wavelength,coarsen,weighted",
+    [
+        (None, (1, 4), False),
+        (200, (1, 4), False),
+        (200, (2, 8), True),
+        (100, None, False),
+    ],
+)
+def test_phasediff_multilooking(stack, wavelength, coarsen, weighted):
+    data = make_data()
+    topo = make_topo(data)
+    weight = None
+    if weighted:
+        rng = np.random.default_rng(1)
+        weight = xr.DataArray(
+            rng.random(data.shape[1:]).astype(np.float32),
+            coords={"y": data.y, "x": data.x},
+            dims=("y", "x"),
+        ).chunk(64)
+    product = stack.phasediff_multilooking(
+        PAIRS, data, topo=topo, weight=weight, wavelength=wavelength, coarsen=coarsen
+    )
+    phase, corr, intensity = [
+        grid.compute()
+        for grid in separate(stack, data, topo, weight, wavelength, coarsen)
+    ]
+    out = product.compute()
+
+    assert out.phase.dims == out.correlation.dims == ("pair", "y", "x")
+    assert out.phase.pair.values.tolist() == phase.pair.values.tolist()
+    np.testing.assert_array_equal(out.y, phase.y)
+    np.testing.assert_array_equal(out.x, phase.x)
+    for actual, expected in [
+        (out.phase, phase),
+        (out.correlation, corr),
+        (out.intensity, intensity),
+    ]:
+        assert actual.shape == expected.shape
+        np.testing.assert_array_equal(
+            np.isnan(actual.values), np.isnan(expected.values)
+        )
+        np.testing.assert_allclose(actual.values, expected.values, rtol=1e-4, atol=1e-5)
+    # the correlation is bounded and not trivial
+    assert 0.05 < float(out.correlation.mean()) < 1
+    assert float(out.correlation.max()) <= 1
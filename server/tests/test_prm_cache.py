@@ -0,0 +1,67 @@
+import os
+import pickle
+
+import pytest
+
+from src.geospatial.lib.pygmtsar.PRM import PRM
+from src.geospatial.lib.pygmtsar.Stack_prm import Stack_prm
+
+
+@pytest.fixture
+def gmtsar_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(PRM, "gmtsar_cache", str(tmp_path / "gmtsar"))
+    return tmp_path / "gmtsar"
+
+
+def test_gmtsar_cached(gmtsar_cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "earth_radius = 6371000\n"
+
+    prm = PRM()
+    output = prm._gmtsar_cached("calc_dop_orb", ["a = 1"], compute)
+    # the second call is memoized
+    assert prm._gmtsar_cached("calc_dop_orb", ["a = 1"], compute) == output
+    assert len(calls) == 1
+    prm._gmtsar_cached("calc_dop_orb", ["a = 2"], compute)
+    assert len(calls) == 2
+    assert len(os.listdir(gmtsar_cache)) == 2
+
+
+def test_gmtsar_cache_eviction(gmtsar_cache, monkeypatch):
+    output = "x" * 1000
+    monkeypatch.setattr(PRM, "gmtsar_cache_size", 2500)
+    prm = PRM()
+    for value in range(5):
+        prm._gmtsar_cached("SAT_baseline", [f"a = {value}"], lambda: output)
+        # distinct modification times for the least recently used order
+        for entry in os.scandir(gmtsar_cache):
+            stat = entry.stat()
+            os.utime(entry.path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    assert len(os.listdir(gmtsar_cache)) == 2
+
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return output
+
+    # the most recent outputs are kept and the oldest are recomputed
+    prm._gmtsar_cached("SAT_baseline", ["a = 4"], compute)
+    assert calls == []
+    prm._gmtsar_cached("SAT_baseline", ["a = 0"], compute)
+    assert calls == [1]
+
+
+def test_prm_cache_not_pickled(tmp_path):
+    filename = tmp_path / "S1_20230101_ALL_F1.PRM"
+    filename.write_text("PRF = 486.486\n")
+    stack = Stack_prm()
+    assert stack._PRM_cached(str(filename)).get("PRF") == 486.486
+    assert "_prm_cache" in stack.__dict__
+
+    restored = pickle.loads(pickle.dumps(stack))
+    assert "_prm_cache" not in restored.__dict__
+    assert restored._PRM_cached(str(filename)).get("PRF") == 486.486
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from src.geospatial.lib.pygmtsar.Stack_ps import Stack_ps
+
+DATES = pd.date_range("2021-01-01", periods=12, freq="12D")
+
+
+def make_intensities():
+    rng = np.random.default_rng(0)
+    values = rng.gamma(2, 1, (DATES.size, 60, 80)) * rng.uniform(0.5, 2, (12, 1, 1))
+    values[:, :3] = np.nan
+    return xr.DataArray(
+        values.astype(np.float32),
+        dims=("date", "y", "x"),
+        coords={"date": DATES, "y": np.arange(60.0), "x": np.arange(80.0)},
+    ).chunk({"date": 1, "y": 30, "x": 40})
+
+
+def test_compute_ps():
+    data = make_intensities()
+    stack = Stack_ps()
+    ps = stack.compute_ps(data=data, interactive=True).compute()
+
+    average = data.mean(dim=["y", "x"])
+    norm = average.mean("date") / average
+    np.testing.assert_allclose(ps.average, (norm * data).mean("date"), rtol=1e-5)
+    np.testing.assert_allclose(ps.deviation, (norm * data).std("date"), rtol=1e-4)
+    assert int(ps["count"].max()) == DATES.size
+
+
+def test_compute_ps_append_overlap():
+    data = make_intensities()
+    stack = Stack_ps()
+    ps = stack.compute_ps(data=data, interactive=True).compute()
+
+    part = stack.compute_ps(data=data.isel(date=slice(0, 7)), interactive=True)
+    stack.get_ps = lambda name: part.compute().chunk()
+    # the dates 4-6 are accumulated already and they are skipped
+    appended = stack.compute_ps(
+        data=data.isel(date=slice(4, None)), append=True, interactive=True
+    ).compute()
+    assert appended.stack_average.size == DATES.size
+    assert int(appended["count"].max()) == DATES.size
+    np.testing.assert_allclose(appended.average, ps.average, rtol=1e-5)
+    np.testing.assert_allclose(appended.deviation, ps.deviation, rtol=1e-4)
+
+    # nothing to append
+    assert (
+        stack.compute_ps(
+            data=data.isel(date=slice(0, 3)), append=True, interactive=True
+        ).stack_average.size
+        == 7
+    )
@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+import xarray as xr
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.geospatial.lib.pygmtsar.Stack_detrend import Stack_detrend
+
+SHAPE = (90, 130)
+
+
+def make_grids(pairs=3, seed=0):
+    """
+    Phase stack defined by the topography and the coordinates with the noise and the invalid pixels.
+    """
+    rng = np.random.default_rng(seed)
+    y = np.arange(SHAPE[0]) * 20.0
+    x = np.arange(SHAPE[1]) * 15.0
+    yy, xx = np.meshgrid(y, x, indexing="ij")
+    topo = 500 + 300 * np.sin(yy / 400) * np.cos(xx / 300) + rng.normal(size=SHAPE)
+    topo[10:20, 30:50] = np.nan
+    coords = {"y": y, "x": x}
+    variables = [
+        xr.DataArray(grid, coords=coords, dims=("y", "x"))
+        for grid in [topo, topo * yy / 1000, xx, yy * xx / 1e6]
+    ]
+    phase = np.stack(
+        [
+            (1 + idx) * 2e-3 * topo
+            - 1e-3 * xx
+            + idx
+            + 0.5 * np.cos(yy / 200)
+            + 0.3 * rng.normal(size=SHAPE)
+            for idx in range(pairs)
+        ]
+    )
+    phase[rng.random(phase.shape) < 0.1] = np.nan
+    phase[-1, 50:70] = np.nan
+    data = xr.DataArray(
+        phase.astype(np.float32),
+        coords={"pair": [f"pair{idx}" for idx in range(pairs)], **coords},
+        dims=("pair", "y", "x"),
+        name="phase",
+    )
+    weight = xr.DataArray(
+        rng.uniform(0.1, 1.0, size=phase.shape).astype(np.float32),
+        coords=data.coords,
+        dims=data.dims,
+    )
+    weight.values[rng.random(phase.shape) < 0.05] = np.nan
+    return data, variables, weight
+
+
+def sklearn_regression(data, variables, weight, wrap, fit_intercept):
+    """
+    The scikit-learn StandardScaler and LinearRegression pipeline fitted for every pair.
+    """
+    X = np.stack([v.values.ravel() for v in variables], axis=1)
+    valid_X = np.isfinite(X).all(axis=1)
+    out = np.full(data.shape, np.nan, dtype=np.float32)
+    for idx in range(data.shape[0]):
+        values = data.values[idx].ravel().astype(np.float64)
+        valid = valid_X & np.isfinite(values)
+        fit_params = {}
+        if weight is not None:
+            weights = weight.values[idx].ravel()
+            valid &= np.isfinite(weights)
+            fit_params = {"linearregression__sample_weight": weights[valid]}
+        Y = np.column_stack([np.sin(values), np.cos(values)]) if wrap else values
+        regr = make_pipeline(
+            StandardScaler(), LinearRegression(fit_intercept=fit_intercept)
+        )
+        regr.fit(X[valid], Y[valid], **fit_params)
+        pred = regr.predict(X[valid_X])
+        if wrap:
+            pred = np.arctan2(pred[:, 0], pred[:, 1])
+        out[idx].reshape(-1)[valid_X] = pred
+    return out
+
+
+def assert_close(actual, expected, wrap):
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    if wrap:
+        actual = np.angle(np.exp(1j * (actual - expected)))
+        expected = np.where(np.isnan(expected), np.nan, 0)
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize("chunks", [-1, 32])
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("wrap", [False, True])
+def test_regression_normal(chunks, weighted, wrap):
+    data, variables, weight = make_grids()
+    if not weighted:
+        weight = None
+    data = data.chunk({"pair": 1, "y": chunks, "x": chunks})
+    out = Stack_detrend.regression_normal(data, variables, weight, wrap=wrap)
+    assert out.dims == data.dims and out.name == "phase"
+    assert out.dtype == np.float32
+    if chunks != -1:
+        # the prediction keeps the data chunks
+        assert out.chunks == data.chunks
+    assert_close(
+        out.compute().values,
+        sklearn_regression(data, variables, weight, wrap, True),
+        wrap,
+    )
+
+
+@pytest.mark.parametrize("chunks", [-1, 40])
+def test_regression_normal_no_intercept(chunks):
+    data, variables, weight = make_grids(pairs=2, seed=1)
+    # the 3D variable with the data stack dimension
+    variables[2] = (variables[2] * xr.DataArray([1.0, -2.0], dims="pair")).transpose(
+        "pair", ...
+    )
+    data = data.chunk({"y": chunks, "x": chunks})
+    out = Stack_detrend.regression_normal(
+        data, variables, weight, fit_intercept=False
+    ).compute()
+    for idx in range(2):
+        expected = sklearn_regression(
+            data[idx : idx + 1],
+            [v[idx] if v.ndim == 3 else v for v in variables],
+            weight[idx : idx + 1],
+            False,
+            False,
+        )
+        assert_close(out.values[idx : idx + 1], expected, False)
+
+
+def test_regression_normal_threshold():
+    data, variables, _ = make_grids(pairs=2)
+    # not enough valid pixels for the second pair
+    data[1, :, 3:] = np.nan
+    out = Stack_detrend.regression_normal(
+        data.chunk(32), variables, valid_pixels_threshold=2000
+    ).compute()
+    assert np.isfinite(out.values[0]).any()
+    assert np.isnan(out.values[1]).all()
+
+
+@pytest.mark.parametrize("chunks", [-1, 32])
+def test_regression(tmp_path, chunks):
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+
+    data, variables, weight = make_grids(pairs=1)
+    data, weight = data[0].chunk(chunks), weight[0]
+    stack = Stack(str(tmp_path / "work"))
+    out = stack.regression(data, variables, weight)
+    assert out.dims == ("y", "x")
+    assert_close(
+        out.compute().values,
+        sklearn_regression(
+            data.expand_dims("pair"), variables, weight.expand_dims("pair"), False, True
+        )[0],
+        False,
+    )
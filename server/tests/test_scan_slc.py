@@ -0,0 +1,117 @@
+import json
+import os
+
+import pytest
+
+from src.geospatial.lib.pygmtsar.S1 import S1
+
+DATES = ["20230125", "20230206"]
+
+
+def write_scene(datadir, date, subswath, lat=40):
+    name = f"s1a-iw{subswath}-slc-vv-{date}t034000-{date}t034027-046929-05a06b-00{subswath + 3}"
+    safe = (
+        datadir
+        / f"S1A_IW_SLC__1SDV_{date}T034000_{date}T034027_046929_05A06B_0000.SAFE"
+    )
+    os.makedirs(safe / "annotation", exist_ok=True)
+    os.makedirs(safe / "measurement", exist_ok=True)
+    points = "".join(
+        f"""<geolocationGridPoint><azimuthTime>t</azimuthTime><slantRangeTime>0</slantRangeTime>
+        <line>{line}</line><pixel>{pixel}</pixel><latitude>{lat + 0.002 * line}</latitude>
+        <longitude>{30 + 0.9 * subswath + 0.001 * pixel}</longitude></geolocationGridPoint>"""
+        for line in [0, 100, 200]
+        for pixel in [0, 1000]
+    )
+    metapath = safe / "annotation" / f"{name}.xml"
+    metapath.write_text(
+        f"""<product>
+        <generalAnnotation><productInformation><pass>Ascending</pass></productInformation></generalAnnotation>
+        <geolocationGrid><geolocationGridPointList count="6">{points}</geolocationGridPointList></geolocationGrid>
+        </product>"""
+    )
+    (safe / "measurement" / f"{name}.tiff").write_bytes(b"tiff")
+    return metapath
+
+
+@pytest.fixture
+def datadir(tmp_path):
+    for date in DATES:
+        for subswath in [1, 2]:
+            write_scene(tmp_path, date, subswath)
+        orbit = f"S1A_OPER_AUX_POEORB_OPOD_20230301T000000_V{int(date) - 1}T225942_{int(date) + 1}T005942.EOF"
+        (tmp_path / orbit).write_text("")
+    return tmp_path
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """
+    Record the parsed annotations.
+    """
+    calls = []
+    read_annotation = S1.read_annotation
+
+    def counted(filename):
+        calls.append(os.path.basename(filename))
+        return read_annotation(filename)
+
+    monkeypatch.setattr(S1, "read_annotation", staticmethod(counted))
+    return calls
+
+
+def test_scan_files(datadir):
+    os.makedirs(datadir / ".incoming" / "x.SAFE")
+    (datadir / ".incoming" / "x.SAFE" / "s1a-iw1-slc-vv-x.tiff").write_bytes(b"")
+    (datadir / ".hidden.xml").write_text("")
+    files = S1._scan_files(datadir)
+    # the hidden files and directories are skipped like for the recursive glob
+    assert len(files) == 2 * 2 * 2 + 2
+    assert all(
+        not name.startswith(".") and ".incoming" not in path for name, path in files
+    )
+    assert [name for name, _ in files] == [os.path.basename(path) for _, path in files]
+
+
+def test_scan_slc_sidecar(datadir, parsed):
+    scenes = S1.scan_slc(datadir)
+    assert len(scenes) == 4
+    assert len(parsed) == 4
+    with open(datadir / S1.scan_cache) as fd:
+        records = json.load(fd)
+    assert len(records) == 4
+
+    # all the annotations are cached
+    cached = S1.scan_slc(datadir)
+    assert len(parsed) == 4
+    assert cached.orbit.tolist() == scenes.orbit.tolist() == ["A"] * 4
+    assert all(cached.geometry.values == scenes.geometry.values)
+
+    # the modified annotation only is parsed again
+    metapath = write_scene(datadir, DATES[1], 2, lat=41)
+    stat = os.stat(metapath)
+    os.utime(metapath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    updated = S1.scan_slc(datadir)
+    assert parsed[4:] == [metapath.name]
+    assert all(updated.geometry.values[:3] == scenes.geometry.values[:3])
+    assert not updated.geometry.values[3].equals(scenes.geometry.values[3])
+
+    # the removed scenes are forgotten
+    os.remove(metapath)
+    os.remove(str(metapath).replace("annotation", "measurement")[:-4] + ".tiff")
+    assert len(S1.scan_slc(datadir)) == 3
+    with open(datadir / S1.scan_cache) as fd:
+        assert len(json.load(fd)) == 3
+
+
+def test_scan_slc_without_cache(datadir, parsed):
+    S1.scan_slc(datadir, cache=False)
+    S1.scan_slc(datadir, cache=False)
+    assert len(parsed) == 8
+    assert not os.path.exists(datadir / S1.scan_cache)
+
+    # broken sidecar file is rebuilt
+    (datadir / S1.scan_cache).write_text("{")
+    assert len(S1.scan_slc(datadir)) == 4
+    with open(datadir / S1.scan_cache) as fd:
+        assert len(json.load(fd)) == 4
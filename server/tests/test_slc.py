@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.geospatial.lib.pygmtsar.PRM import PRM
+
+YDIM, XDIM = 203, 157
+SCALE = 2.5e-07
+
+
+@pytest.fixture
+def prm(tmp_path):
+    """
+    Binary SLC file of interleaved int16 pairs with NODATA areas and the trailing data.
+    """
+    rng = np.random.default_rng(0)
+    pairs = rng.integers(-3000, 3000, size=(YDIM, XDIM, 2), dtype=np.int16)
+    pairs[:10] = 0
+    pairs[50:60, 20:40] = 0
+    # the zero real or imaginary part only is valid
+    pairs[100, :, 0] = 0
+    pairs[101, :, 1] = 0
+    # the data file can include additional data outside of the specified dimensions
+    trailing = rng.integers(-3000, 3000, size=(3, XDIM, 2), dtype=np.int16)
+    np.concatenate([pairs, trailing]).tofile(tmp_path / "F1.SLC")
+    filename = tmp_path / "F1.PRM"
+    filename.write_text(
+        "SLC_file = F1.SLC\n"
+        f"num_rng_bins = {XDIM}\n"
+        f"num_valid_az = {YDIM}\n"
+        "rshift = 0\n"
+        "ashift = 0\n"
+    )
+    prm = PRM.from_file(str(filename))
+    prm.chunksize = prm.netcdf_chunksize = 64
+    return prm
+
+
+def read_SLC_int(prm, shape=None):
+    """
+    The previous complex SLC output built from the separate real and imaginary grids.
+    """
+    ds = prm.read_SLC_int(scale=None, shape=shape)
+    ds_scaled = SCALE * (ds.re.astype(np.float32) + 1j * ds.im.astype(np.float32))
+    ds_scaled = ds_scaled.rename("data")
+    return ds_scaled.where(ds_scaled != 0)
+
+
+@pytest.mark.parametrize(
+    "shape,origin",
+    [
+        (None, None),
+        ((YDIM + 40, XDIM + 70), None),
+        ((150, 100), (30, 17)),
+        ((YDIM + 5, 100), (200, 0)),
+    ],
+)
+def test_read_SLC_complex(prm, shape, origin):
+    expected = read_SLC_int(prm, shape).compute()
+    slc = prm.read_SLC_complex(scale=SCALE, shape=shape, origin=origin)
+    assert slc.dtype == np.complex64 and slc.name == "data"
+    np.testing.assert_array_equal(slc.y, expected.y)
+    np.testing.assert_array_equal(slc.x, expected.x)
+    # the chunks are aligned to the origin
+    y0, x0 = (0, 0) if origin is None else origin
+    ybounds = np.cumsum((0,) + slc.chunks[0])
+    xbounds = np.cumsum((0,) + slc.chunks[1])
+    assert min(y0, slc.y.size) in ybounds and min(x0, slc.x.size) in xbounds
+    assert max(slc.chunks[0] + slc.chunks[1]) <= 64
+    np.testing.assert_array_equal(slc.values, expected.values.astype(np.complex64))
+    assert np.isnan(slc.values).any() and np.isfinite(slc.values[100, :XDIM]).all()
@@ -0,0 +1,110 @@
+import os
+import stat
+import sys
+
+import numpy as np
+import pytest
+import xarray as xr
+from dask.distributed import Client
+
+from src.geospatial.lib.pygmtsar.Stack_unwrap import Stack_unwrap
+
+# SNAPHU stub copies the phase input to the output and logs the job run time
+SNAPHU = """#!{python}
+import os, shutil, sys, time
+
+argv = sys.argv
+sys.stdin.read()
+start = time.time()
+time.sleep(0.3)
+shutil.copy(argv[1], argv[argv.index("-o") + 1])
+with open(os.environ["SNAPHU_LOG"], "a") as fd:
+    fd.write(f"{{start}} {{time.time()}}\\n")
+"""
+
+
+@pytest.fixture
+def snaphu(tmp_path, monkeypatch):
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    binary = bindir / "snaphu"
+    binary.write_text(SNAPHU.format(python=sys.executable))
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("SNAPHU_LOG", str(tmp_path / "snaphu.log"))
+    return tmp_path / "snaphu.log"
+
+
+@pytest.fixture
+def client(snaphu):
+    # the worker processes inherit the stub SNAPHU search path
+    client = Client(
+        processes=True, n_workers=1, threads_per_worker=4, dashboard_address=None
+    )
+    yield client
+    client.close()
+
+
+def make_phase(pairs=4):
+    rng = np.random.default_rng(0)
+    values = rng.uniform(-np.pi, np.pi, (pairs, 40, 50)).astype(np.float32)
+    values[:, :5] = np.nan
+    phase = xr.DataArray(
+        values,
+        dims=("pair", "y", "x"),
+        coords={"pair": np.arange(pairs), "y": np.arange(40.0), "x": np.arange(50.0)},
+    ).chunk({"pair": 1})
+    return values, phase
+
+
+def test_unwrap_snaphu_processes(client, snaphu, tmp_path):
+    values, phase = make_phase()
+    conf = "INFILEFORMAT FLOAT_DATA\n"
+    _, job_memory = Stack_unwrap.snaphu_resources(phase.shape[1:], conf)
+    # the memory budget admits a single job at once
+    unwrap = (
+        Stack_unwrap()
+        .unwrap_snaphu(
+            phase, conf=conf, n_jobs=4, memory=1.5 * job_memory, tmpdir=str(tmp_path)
+        )
+        .compute()
+    )
+    np.testing.assert_allclose(unwrap.phase.values, values, atol=1e-6)
+
+    runs = np.sort(np.loadtxt(snaphu), axis=0)
+    assert runs.shape == (4, 2)
+    # the jobs are not overlapped
+    assert np.all(runs[1:, 0] >= runs[:-1, 1])
+    # the budgets are removed when the jobs are done
+    assert list(client.run(lambda: len(Stack_unwrap._snaphu_budgets)).values()) == [0]
+
+
+def test_unwrap_snaphu_threads(snaphu, tmp_path):
+    values, phase = make_phase(pairs=6)
+    conf = "INFILEFORMAT FLOAT_DATA\n"
+    nproc, job_memory = Stack_unwrap.snaphu_resources(phase.shape[1:], conf)
+    # the cores budget admits two jobs at once
+    unwrap = Stack_unwrap().unwrap_snaphu(
+        phase, conf=conf, n_jobs=2 * nproc, memory=10 * job_memory, tmpdir=str(tmp_path)
+    )
+    unwrap = unwrap.compute(scheduler="threads", num_workers=6)
+    np.testing.assert_allclose(unwrap.phase.values, values, atol=1e-6)
+    assert Stack_unwrap._snaphu_budgets == {}
+
+    runs = np.loadtxt(snaphu)
+    assert runs.shape == (6, 2)
+    # the count of the jobs running at the start of every job
+    running = [
+        np.sum((runs[:, 0] <= start) & (runs[:, 1] > start)) for start in runs[:, 0]
+    ]
+    assert max(running) == 2
+
+
+def test_snaphu_workers():
+    assert Stack_unwrap._snaphu_workers() == 1
+    with Client(
+        processes=True, n_workers=2, threads_per_worker=1, dashboard_address=None
+    ):
+        # the default budget is divided between the worker processes
+        assert Stack_unwrap._snaphu_workers() == 2
+    assert Stack_unwrap._snaphu_workers() == 1
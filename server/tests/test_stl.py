@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.geospatial.lib.pygmtsar.Stack_stl import Stack_stl
+
+pytest.importorskip("statsmodels")
+
+
+def make_series(pixels=40):
+    # irregular 6 and 12 days acquisitions for 3 years
+    days = np.cumsum(np.random.default_rng(0).choice([6, 12], 160))
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(days[days < 3 * 365], "D")
+    t = (dates - dates[0]).days.values / 365.25
+    rng = np.random.default_rng(1)
+    ts = (
+        rng.normal(0, 5, (pixels, 1)) * t
+        + rng.normal(0, 10, (pixels, 1)) * np.sin(2 * np.pi * t)
+        + rng.normal(0, 2, (pixels, t.size))
+    )
+    # outliers for the robust fitting
+    ts[:, 7] += 50
+    # invalid pixel
+    ts[3, 5] = np.nan
+    return ts, dates
+
+
+@pytest.mark.parametrize("robust", [False, True])
+def test_stl_batch(robust):
+    ts, dates = make_series()
+    dt, dt_periodic = Stack_stl.stl_periodic(dates)
+    dt_periodic = dt_periodic.values
+
+    # small batches cover the remainder batch too
+    out = Stack_stl.stl_batch(ts, dt, dt_periodic, robust=robust, batchsize=16)
+    assert out.shape == (3, ts.shape[0], dt_periodic.size)
+    assert np.all(np.isnan(out[:, 3]))
+    for pixel in range(ts.shape[0]):
+        expected = Stack_stl.stl1d(ts[pixel], dt, dt_periodic, robust=robust)
+        for component in range(3):
+            np.testing.assert_allclose(
+                out[component, pixel], expected[component], rtol=1e-9, atol=1e-9
+            )
+
+
+def test_stl_batch_default_batchsize():
+    ts, dates = make_series(pixels=5)
+    dt, dt_periodic = Stack_stl.stl_periodic(dates)
+    dt_periodic = dt_periodic.values
+    out = Stack_stl.stl_batch(ts, dt, dt_periodic)
+    # the non-robust decomposition operator is built once and reused
+    assert Stack_stl._stl_operators[(dt_periodic.size, 52)].shape == (
+        2,
+        dt_periodic.size,
+        dt_periodic.size,
+    )
+    np.testing.assert_allclose(
+        out, Stack_stl.stl_batch(ts, dt, dt_periodic, batchsize=1), atol=1e-12
+    )
@@ -0,0 +1,152 @@
+import os
+
+import dask.array
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from dask.distributed import Client
+from packaging.version import Version
+
+from src.geospatial.lib.pygmtsar.IO import IO
+
+DATES = pd.to_datetime(["2023-01-01", "2023-01-13", "2023-01-25", "2023-02-06"])
+
+
+@pytest.fixture(scope="module")
+def client():
+    client = Client(
+        processes=False, n_workers=1, threads_per_worker=2, dashboard_address=None
+    )
+    yield client
+    client.close()
+
+
+def importorskip_zarr():
+    zarr = pytest.importorskip("zarr")
+    # zarr 3 stores are supported by xarray 2025.1 and later only
+    if Version(zarr.__version__).major >= 3 and Version(xr.__version__) < Version(
+        "2025.1"
+    ):
+        pytest.skip(f"zarr {zarr.__version__} requires xarray 2025.1 or later")
+
+
+@pytest.fixture(params=["netcdf", "zarr"])
+def backend(request, monkeypatch):
+    if request.param == "zarr":
+        importorskip_zarr()
+    monkeypatch.setattr(IO, "storage_backend", request.param)
+    return request.param
+
+
+@pytest.fixture
+def stack(tmp_path):
+    io = IO()
+    io.basedir = str(tmp_path)
+    return io
+
+
+def make_pairs(ny=60, nx=80):
+    ref = DATES[:-1]
+    rep = DATES[1:]
+    pairs = [f"{r.date()} {p.date()}" for r, p in zip(ref, rep)]
+    values = np.random.default_rng(0).random((len(pairs), ny, nx), dtype=np.float32)
+    return xr.DataArray(
+        values,
+        dims=("pair", "y", "x"),
+        coords={
+            "pair": pairs,
+            "ref": ("pair", ref),
+            "rep": ("pair", rep),
+            "y": np.arange(ny) * 2.0,
+            "x": np.arange(nx) * 4.0,
+        },
+        name="phase",
+    )
+
+
+def test_cube_roundtrip(client, backend, stack):
+    data = make_pairs()
+    stack.save_cube(data.chunk({"pair": 1, "y": 32, "x": 32}), "cube")
+    cube = stack.open_cube("cube")
+    assert isinstance(cube, xr.DataArray)
+    np.testing.assert_array_equal(cube.values, data.values)
+    np.testing.assert_array_equal(cube.y.values, data.y.values)
+    np.testing.assert_array_equal(cube.x.values, data.x.values)
+    assert list(cube.pair.values) == list(data.pair.values)
+
+    stack.save_cube(data.isel(pair=0), "grid")
+    grid = stack.open_cube("grid")
+    np.testing.assert_array_equal(grid.values, data.values[0])
+
+    stack.delete_cube("cube")
+    assert os.listdir(stack.basedir) == [os.path.basename(stack.get_cubename("grid"))]
+
+
+def test_stack_roundtrip(client, backend, stack):
+    data = make_pairs()
+    stack.save_stack(data.chunk({"pair": 1}), "intf", queue=2)
+    intf = stack.open_stack("intf")
+    np.testing.assert_array_equal(intf.values, data.values)
+    np.testing.assert_array_equal(intf.ref.values, data.ref.values)
+    np.testing.assert_array_equal(intf.rep.values, data.rep.values)
+    np.testing.assert_array_equal(intf.x.values, data.x.values)
+
+    pairs = [["2023-01-25", "2023-02-06"], ["2023-01-01", "2023-01-13"]]
+    selected = stack.open_stack("intf", pairs)
+    assert list(selected.pair.values) == [" ".join(pair) for pair in pairs]
+    np.testing.assert_array_equal(selected.values, data.values[[2, 0]])
+
+    dates = data.rename({"pair": "date"}).drop_vars(["ref", "rep"])
+    dates = dates.assign_coords(date=DATES[:-1]).rename("data")
+    stack.save_stack(dates.chunk({"date": 1}), "data")
+    selected = stack.open_stack("data", ["2023-01-25", "2023-01-01"])
+    np.testing.assert_array_equal(selected.date.values, DATES[[0, 2]].values)
+    np.testing.assert_array_equal(selected.values, data.values[[0, 2]])
+
+    stack.delete_stack("intf")
+    stack.delete_stack("data")
+    assert os.listdir(stack.basedir) == []
+
+
+def test_stack_migration(client, stack, monkeypatch):
+    importorskip_zarr()
+    data = make_pairs()
+    monkeypatch.setattr(IO, "storage_backend", "netcdf")
+    stack.save_stack(data.chunk({"pair": 1}), "intf")
+    assert len(os.listdir(stack.basedir)) == data.pair.size
+
+    monkeypatch.setattr(IO, "storage_backend", "zarr")
+    # the NetCDF stack is readable and it is replaced by the Zarr store
+    stack.save_stack(stack.open_stack("intf"), "intf")
+    assert os.listdir(stack.basedir) == ["intf.zarr"]
+    np.testing.assert_array_equal(stack.open_stack("intf").values, data.values)
+
+
+def test_incomplete_store_ignored(client, stack, monkeypatch):
+    importorskip_zarr()
+    data = make_pairs()
+    monkeypatch.setattr(IO, "storage_backend", "netcdf")
+    stack.save_cube(data, "cube")
+    # leftover of an interrupted write without consolidated metadata
+    os.makedirs(os.path.join(stack.basedir, "cube.zarr", "phase"))
+    assert stack.get_cubename("cube").endswith(".grd")
+    np.testing.assert_array_equal(stack.open_cube("cube").values, data.values)
+
+
+def test_failed_save_keeps_store(client, stack, monkeypatch):
+    importorskip_zarr()
+    data = make_pairs()
+    monkeypatch.setattr(IO, "storage_backend", "zarr")
+    stack.save_cube(data, "cube")
+
+    def fail(block):
+        raise RuntimeError("failed block")
+
+    broken = data.chunk({"pair": 1}).copy(
+        data=dask.array.map_blocks(fail, data.chunk({"pair": 1}).data, dtype=data.dtype)
+    )
+    with pytest.raises(RuntimeError, match="failed block"):
+        stack.save_cube(broken, "cube")
+    assert os.listdir(stack.basedir) == ["cube.zarr"]
+    np.testing.assert_array_equal(stack.open_cube("cube").values, data.values)
@@ -0,0 +1,114 @@
+import os
+import stat
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from src.geospatial.lib.pygmtsar.Stack import Stack
+
+# GMTSAR solid_tide outputs for the Sentinel-1 scene center times: lon, lat, dx, dy, dz
+REFERENCE = {
+    "2022-06-16": (
+        "16:59:13",
+        [
+            (13.400758, 47.401431, -0.066918, -0.004765, 0.016200),
+            (14.400758, 48.401431, -0.066594, -0.004782, 0.010346),
+        ],
+    ),
+    "2022-06-28": (
+        "16:59:15",
+        [
+            (13.400758, 47.401431, -0.033571, 0.012279, -0.099899),
+            (14.400758, 48.401431, -0.033011, 0.012323, -0.100986),
+        ],
+    ),
+    "2022-07-10": (
+        "16:59:15.5",
+        [
+            (13.400758, 47.401431, -0.000806, -0.007983, -0.150675),
+            (14.400758, 48.401431, -0.001107, -0.007758, -0.151605),
+        ],
+    ),
+}
+
+
+class FakePRM:
+    def __init__(self, date):
+        time = pd.Timestamp(f"{date} {REFERENCE[date][0]}")
+        day = time.dayofyear + (time - time.normalize()) / pd.Timedelta(days=1)
+        self.clock = 1000 * time.year + day
+
+    def get(self, *names):
+        # the scene center time is the middle of the start and stop times
+        return [self.clock - 1e-5, self.clock + 1e-5]
+
+
+@pytest.fixture
+def stack(tmp_path, monkeypatch):
+    stack = Stack(str(tmp_path / "work"))
+    stack.chunksize = 1
+    monkeypatch.setattr(stack, "PRM_merged", lambda date: FakePRM(date))
+    return stack
+
+
+def make_grid():
+    points = np.array(REFERENCE["2022-06-16"][1])
+    return xr.Dataset(
+        {
+            "ll": (("y", "x"), points[None, :, 0]),
+            "lt": (("y", "x"), points[None, :, 1]),
+        },
+        coords={"y": [0.0], "x": [0.0, 1.0]},
+    )
+
+
+def test_solid_tide(stack):
+    dates = list(REFERENCE)
+    out = stack.solid_tide(dates, make_grid())
+    assert set(out.data_vars) == {"lon", "lat", "dx", "dy", "dz"}
+    assert out.dx.dims == ("date", "y", "x") and out.dx.shape == (3, 1, 2)
+    out = out.compute()
+    for idx, date in enumerate(dates):
+        expected = np.array(REFERENCE[date][1])
+        actual = np.column_stack(
+            [out[v].values[idx, 0] for v in ["lon", "lat", "dx", "dy", "dz"]]
+        )
+        np.testing.assert_allclose(actual[:, :2], expected[:, :2], atol=1e-5)
+        # sub-millimeter agreement with GMTSAR solid_tide
+        np.testing.assert_allclose(actual[:, 2:], expected[:, 2:], rtol=0, atol=2e-5)
+
+
+def solid_tide_binary(path, date, shift=0):
+    """
+    Fake GMTSAR solid_tide tool printing the reference displacements for the input points.
+    """
+    table = {
+        f"{lon:.6f} {lat:.6f}": (dx + shift, dy, dz)
+        for lon, lat, dx, dy, dz in REFERENCE[date][1]
+    }
+    filename = path / "solid_tide"
+    filename.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"table = {table!r}\n"
+        "for line in sys.stdin.read().splitlines():\n"
+        "    print(line, *table[line])\n"
+    )
+    filename.chmod(filename.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.mark.parametrize("shift,valid", [(0, True), (3e-4, False)])
+def test_check_tidal(stack, tmp_path, monkeypatch, shift, valid):
+    solid_tide_binary(tmp_path, "2022-06-16", shift)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    os.makedirs(stack.basedir, exist_ok=True)
+    assert stack.check_tidal("2022-06-16", make_grid()) is valid
+
+
+def test_check_tidal_no_binary(stack, tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    os.makedirs(stack.basedir, exist_ok=True)
+    assert stack.check_tidal("2022-06-16", make_grid()) is False
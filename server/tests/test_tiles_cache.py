@@ -0,0 +1,158 @@
+import gzip
+import io
+import os
+import time
+
+import numpy as np
+import pytest
+import requests
+import xarray as xr
+from shapely.geometry import box
+
+from src.geospatial.lib.pygmtsar.Tiles import Tiles
+
+BASE_URL = "https://tiles.test/dem{product}"
+PATH_ID = "{SN2}"
+TILE_ID = "{SN2}{WE3}.nc.gz"
+
+
+def make_tile(lon, lat, size=11):
+    coords = np.linspace(0, 1, size)
+    return xr.DataArray(
+        (lat * 1000 + lon + np.add.outer(coords, coords)).astype(np.float32),
+        coords={"lat": lat + coords, "lon": lon + coords},
+        dims=("lat", "lon"),
+        name="z",
+    )
+
+
+class Response:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.raw = io.BytesIO(content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(self.status_code)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """
+    Tiles server with the tiles (30, 40) and (31, 40) and the missed offshore tiles.
+    """
+    tiles = {}
+    for lon in [30, 31]:
+        tile = make_tile(lon, 40)
+        tile.to_netcdf(tmp_path / "tile.nc", engine=Tiles.netcdf_engine)
+        tiles[f"N40E{lon:03}"] = gzip.compress((tmp_path / "tile.nc").read_bytes())
+    requested = []
+    status = {}
+
+    def get(url, stream=False, headers=None, timeout=None):
+        requested.append(url)
+        name = url.split("/")[-1].split(".")[0]
+        if name in status:
+            return Response(status[name])
+        if name not in tiles:
+            return Response(404)
+        return Response(200, tiles[name])
+
+    monkeypatch.setattr(requests, "get", get)
+    monkeypatch.setattr(Tiles, "tiles_cache", str(tmp_path / "cache"))
+    return requested, status
+
+
+def download_tile(lon, lat, product="1s"):
+    return Tiles()._download_tile(
+        BASE_URL, PATH_ID, TILE_ID, None, "gz", "netcdf", product, lon, lat
+    )
+
+
+def test_download_tile_cache(server, tmp_path):
+    requested, _ = server
+    filename = download_tile(30, 40)
+    assert filename == str(tmp_path / "cache" / "tiles.test_dem1s" / "N40_N40E030.nc")
+    with xr.open_dataarray(filename, engine=Tiles.netcdf_engine) as tile:
+        xr.testing.assert_equal(tile, make_tile(30, 40))
+    # the cached tile is reused
+    assert download_tile(30, 40) == filename
+    assert len(requested) == 1
+    # the products are cached separately
+    assert download_tile(30, 40, product="3s") != filename
+    assert len(requested) == 2
+    # no temporary files are left
+    assert sorted(os.listdir(os.path.dirname(filename))) == ["N40_N40E030.nc"]
+
+
+def test_download_tile_missing(server):
+    requested, status = server
+    assert download_tile(35, 40) is None
+    assert download_tile(35, 40) is None
+    # the missed tile marker is used
+    assert len(requested) == 1
+
+    # the marker expires
+    cache_dir = os.path.join(Tiles.tiles_cache, "tiles.test_dem1s")
+    missing = os.path.join(cache_dir, "N40_N40E035.nc.missing")
+    stale = time.time() - Tiles.tiles_missing_ttl.total_seconds() - 60
+    os.utime(missing, (stale, stale))
+    assert download_tile(35, 40) is None
+    assert len(requested) == 2
+    assert os.path.getmtime(missing) > stale
+
+    # the forbidden responses are not cached
+    status["N40E036"] = 403
+    assert download_tile(36, 40) is None
+    assert download_tile(36, 40) is None
+    assert len(requested) == 4
+    assert not os.path.exists(os.path.join(cache_dir, "N40_N40E036.nc.missing"))
+
+    # the request errors are not cached too
+    status["N40E037"] = 500
+    assert download_tile(37, 40) is None
+    assert download_tile(37, 40) is None
+    assert len(requested) == 6
+    assert sorted(os.listdir(cache_dir)) == ["N40_N40E035.nc.missing"]
+
+
+def test_download_mosaic(server, tmp_path):
+    requested, _ = server
+    geometry = box(30.25, 40.25, 32.5, 40.75)
+    filename = str(tmp_path / "dem.nc")
+    dem = Tiles().download(
+        BASE_URL,
+        PATH_ID,
+        TILE_ID,
+        "gz",
+        "netcdf",
+        geometry,
+        filename=filename,
+        joblib_backend="threading",
+    )
+    # the tile (32, 40) is missed
+    assert len(requested) == 3
+    expected = xr.combine_by_coords([make_tile(30, 40), make_tile(31, 40)]).z
+    expected = expected.sel(lon=~expected.indexes["lon"].duplicated())
+    expected = expected.sel(lat=slice(40.25, 40.75), lon=slice(30.25, 32.5))
+    np.testing.assert_array_equal(dem.values, expected.values)
+    with xr.open_dataarray(filename, engine=Tiles.netcdf_engine) as saved:
+        np.testing.assert_array_equal(saved.values, expected.values)
+
+    # the next mosaic is built from the cached tiles
+    Tiles().download(
+        BASE_URL,
+        PATH_ID,
+        TILE_ID,
+        "gz",
+        "netcdf",
+        geometry,
+        joblib_backend="threading",
+    )
+    assert len(requested) == 3
@@ -0,0 +1,220 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from scipy import constants
+
+from src.geospatial.lib.pygmtsar.Stack import Stack
+
+
+class FakePRM:
+    """
+    PRM parameters of the aligned scene defined by the date only.
+    """
+
+    def __init__(self, date=None, **params):
+        self.df = dict(params)
+        if date is not None:
+            day = pd.Timestamp(date).dayofyear
+            self.df.update(
+                num_patches=1,
+                num_valid_az=1500,
+                num_rng_bins=1200,
+                near_range=800000.0 + 3 * day,
+                stretch_r=1e-5 * day,
+                a_stretch_r=-2e-6 * day,
+                earth_radius=6371000.0 + day,
+                rng_samp_rate=64345238.0,
+                radar_wavelength=0.0555,
+                PRF=1717.0,
+                SC_clock_start=2023000.5 + day,
+                SC_clock_stop=2023000.5 + day + 3.0 / 86400,
+                day=day,
+            )
+
+    def get(self, *names):
+        if len(names) == 1:
+            return self.df[names[0]]
+        return [self.df[name] for name in names]
+
+    def set(self, other):
+        self.df.update(other.df)
+        return self
+
+    def sel(self, *names):
+        return FakePRM(**{name: self.df[name] for name in names})
+
+    def fix_aligned(self):
+        return self
+
+    def SAT_baseline(self, other, tail=None):
+        day1, day2 = self.get("day"), other.get("day")
+        delta = day2 - day1
+        return FakePRM(
+            SC_height=700000.0 + 2 * day1,
+            SC_height_start=700000.0 + 2 * day1 - 15,
+            SC_height_end=700000.0 + 2 * day1 + 12,
+            baseline_start=3.0 * delta,
+            baseline_center=3.0 * delta + 1.5 if delta % 2 else 0,
+            baseline_end=3.0 * delta + 2.0,
+            alpha_start=20.0 + delta,
+            alpha_center=21.0 + delta if delta % 2 else 0,
+            alpha_end=22.0 + delta,
+            B_offset_start=0.1 * delta,
+            B_offset_center=0.2 * delta if delta % 2 else 0,
+            B_offset_end=0.3 * delta,
+        )
+
+
+def old_topo_phase(prm1, prm2, topo, y, x):
+    """
+    The previous topographic phase evaluated for every pair separately.
+    """
+    ydim = prm1.get("num_patches") * prm1.get("num_valid_az")
+    htc = prm1.get("SC_height")
+    ht0 = prm1.get("SC_height_start")
+    htf = prm1.get("SC_height_end")
+    tspan = 86400 * abs(prm2.get("SC_clock_stop") - prm2.get("SC_clock_start"))
+    drange = constants.speed_of_light / (2 * prm2.get("rng_samp_rate"))
+    cnst = -4 * np.pi / prm2.get("radar_wavelength")
+
+    Bh0 = prm2.get("baseline_start") * np.cos(prm2.get("alpha_start") * np.pi / 180)
+    Bv0 = prm2.get("baseline_start") * np.sin(prm2.get("alpha_start") * np.pi / 180)
+    Bhf = prm2.get("baseline_end") * np.cos(prm2.get("alpha_end") * np.pi / 180)
+    Bvf = prm2.get("baseline_end") * np.sin(prm2.get("alpha_end") * np.pi / 180)
+    Bx0 = prm2.get("B_offset_start")
+    Bxf = prm2.get("B_offset_end")
+    if (
+        prm2.get("baseline_center") != 0
+        or prm2.get("alpha_center") != 0
+        or prm2.get("B_offset_center") != 0
+    ):
+        Bhc = prm2.get("baseline_center") * np.cos(
+            prm2.get("alpha_center") * np.pi / 180
+        )
+        Bvc = prm2.get("baseline_center") * np.sin(
+            prm2.get("alpha_center") * np.pi / 180
+        )
+        Bxc = prm2.get("B_offset_center")
+        dBh = (-3 * Bh0 + 4 * Bhc - Bhf) / tspan
+        dBv = (-3 * Bv0 + 4 * Bvc - Bvf) / tspan
+        ddBh = (2 * Bh0 - 4 * Bhc + 2 * Bhf) / (tspan * tspan)
+        ddBv = (2 * Bv0 - 4 * Bvc + 2 * Bvf) / (tspan * tspan)
+        dBx = (-3 * Bx0 + 4 * Bxc - Bxf) / tspan
+        ddBx = (2 * Bx0 - 4 * Bxc + 2 * Bxf) / (tspan * tspan)
+    else:
+        dBh = (Bhf - Bh0) / tspan
+        dBv = (Bvf - Bv0) / tspan
+        dBx = (Bxf - Bx0) / tspan
+        ddBh = ddBv = ddBx = 0
+    dht = (-3 * ht0 + 4 * htc - htf) / tspan
+    ddht = (2 * ht0 - 4 * htc + 2 * htf) / (tspan * tspan)
+
+    rho = (
+        prm1.get("near_range") + x.reshape(1, -1) * (1 + prm1.get("stretch_r")) * drange
+    ) + y.reshape(-1, 1) * prm1.get("a_stretch_r") * drange
+    time = y * tspan / (ydim - 1)
+    Bh = (Bh0 + dBh * time + ddBh * time**2).reshape(-1, 1)
+    Bv = (Bv0 + dBv * time + ddBv * time**2).reshape(-1, 1)
+    Bx = (Bx0 + dBx * time + ddBx * time**2).reshape(-1, 1)
+    b = np.sqrt(Bh * Bh + Bv * Bv)
+    alpha = np.arctan2(Bv, Bh)
+    c = prm1.get("earth_radius") + (ht0 + dht * time + ddht * time**2).reshape(-1, 1)
+    ret = prm1.get("earth_radius") + np.nan_to_num(topo, nan=0)
+    cost = (rho**2 + c**2 - ret**2) / (2.0 * rho * c)
+    sint = np.sqrt(1.0 - cost**2)
+    term1 = (
+        rho**2
+        + b**2
+        - 2 * rho * b * (sint * np.cos(alpha) - cost * np.sin(alpha))
+        - Bx**2
+    )
+    drho = -rho + np.sqrt(term1)
+    return np.exp(1j * (cnst * drho)).astype(np.complex64)
+
+
+def make_topo():
+    rng = np.random.default_rng(0)
+    y = np.arange(0, 1500, 7.0)
+    x = np.arange(0, 1200, 5.0)
+    yy, xx = np.meshgrid(y, x, indexing="ij")
+    topo = (
+        300 + 200 * np.sin(yy / 170.0) * np.cos(xx / 90.0) + rng.normal(size=yy.shape)
+    )
+    topo[40:60, 100:130] = np.nan
+    return xr.DataArray(
+        topo.astype(np.float32), coords={"y": y, "x": x}, dims=("y", "x"), name="topo"
+    ).chunk(64)
+
+
+@pytest.fixture
+def stack(tmp_path, monkeypatch):
+    stack = Stack(str(tmp_path / "work"))
+    stack.chunksize = 128
+    monkeypatch.setattr(stack, "prm_offsets", lambda debug=False: None)
+    monkeypatch.setattr(
+        stack, "PRM_merged", lambda date=None, offsets=None: FakePRM(date)
+    )
+    return stack
+
+
+def expected_phase(pairs, topo):
+    out = []
+    for ref, rep in pairs:
+        prm1, prm2 = FakePRM(ref), FakePRM(rep)
+        prm2.set(prm1.SAT_baseline(prm2))
+        prm1.set(
+            prm1.SAT_baseline(prm1).sel("SC_height", "SC_height_start", "SC_height_end")
+        )
+        out.append(
+            old_topo_phase(prm1, prm2, topo.values, topo.y.values, topo.x.values)
+        )
+    return np.where(np.isfinite(topo.values), np.stack(out), np.nan)
+
+
+def date(day):
+    return str((pd.Timestamp("2023-01-01") + pd.Timedelta(days=day)).date())
+
+
+@pytest.mark.parametrize(
+    "pairs,groups",
+    [
+        # the single pair
+        ([(date(0), date(12))], (1,)),
+        # the pairs with the common reference date split by the group size limit
+        ([(date(0), date(1 + day)) for day in range(20)], (16, 4)),
+        # the mixed order pairs are grouped for the consecutive common reference only
+        (
+            [
+                (date(0), date(12)),
+                (date(0), date(24)),
+                (date(12), date(24)),
+                (date(0), date(36)),
+                (date(12), date(36)),
+                (date(12), date(48)),
+                (date(24), date(48)),
+            ],
+            (2, 1, 1, 2, 1),
+        ),
+    ],
+)
+def test_topo_phase_groups(stack, pairs, groups):
+    topo = make_topo()
+    with joblib.parallel_config(backend="threading"):
+        out = stack.topo_phase(pairs, topo=topo)
+    assert out.dims == ("pair", "y", "x") and out.name == "phase"
+    assert out.dtype == np.complex64
+    # the pairs are grouped in the output blocks
+    assert out.data.chunks[0] == groups
+    assert out.pair.values.tolist() == [f"{ref} {rep}" for ref, rep in pairs]
+    np.testing.assert_array_equal(out.ref, pd.to_datetime([pair[0] for pair in pairs]))
+    np.testing.assert_array_equal(out.rep, pd.to_datetime([pair[1] for pair in pairs]))
+
+    expected = expected_phase(pairs, topo)
+    actual = out.compute().values
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    valid = np.isfinite(expected)
+    # the phase difference in radians
+    error = np.abs(np.angle(actual[valid] * np.conj(expected[valid])))
+    assert error.max() < 1e-5
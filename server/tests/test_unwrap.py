@@ -0,0 +1,257 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+from scipy.ndimage import label
+
+from src.geospatial.lib.pygmtsar.Stack_unwrap import Stack_unwrap
+
+
+def make_phase(n=256):
+    yy, xx = np.mgrid[0:n, 0:n] / n
+    truth = 40 * np.exp(-((yy - 0.5) ** 2 + (xx - 0.45) ** 2) / 0.05) + 15 * xx
+    wrapped = np.angle(np.exp(1j * truth)).astype(np.float32)
+    return truth, wrapped
+
+
+def misaligned(unwrap, truth, valid):
+    """
+    Count the pixels with 2*pi cycles differing from the majority of their connected area.
+    """
+    cycles = np.round((unwrap - truth) / (2 * np.pi))
+    components, count = label(valid)
+    bad = 0
+    for component in range(1, count + 1):
+        _, counts = np.unique(cycles[components == component], return_counts=True)
+        bad += counts.sum() - counts.max()
+    return bad
+
+
+def test_unwrap_quality_block():
+    truth, wrapped = make_phase()
+    unwrap = Stack_unwrap.unwrap_quality_block(wrapped, tilesize=64, overlap=16)
+    assert np.isfinite(unwrap).all()
+    assert misaligned(unwrap, truth, np.isfinite(wrapped)) == 0
+
+
+def test_unwrap_quality_block_split_tiles():
+    truth, wrapped = make_phase()
+    # the band splits the tiles to the disconnected parts joined on the right side only
+    wrapped[100:120, :220] = np.nan
+    # the isolated area crossing the tiles boundaries
+    wrapped[190:196, 190:] = np.nan
+    wrapped[190:, 190:196] = np.nan
+    valid = np.isfinite(wrapped)
+
+    unwrap = Stack_unwrap.unwrap_quality_block(wrapped, tilesize=64, overlap=16)
+    np.testing.assert_array_equal(np.isfinite(unwrap), valid)
+    assert misaligned(unwrap, truth, valid) == 0
+
+
+def make_pairs_stack(dates=10, shape=(23, 31), seed=0):
+    """
+    Wrapped SBAS pairs stack for the pairs connecting the next three dates.
+    """
+    rng = np.random.default_rng(seed)
+    matrix = []
+    for ref in range(dates):
+        for rep in range(ref + 1, min(ref + 4, dates)):
+            row = np.zeros(dates, dtype=int)
+            row[ref + 1 : rep + 1] = 1
+            matrix.append(row)
+    matrix = np.stack(matrix)
+    # the displacement steps up to a few cycles per date
+    steps = rng.normal(scale=4.0, size=shape + (dates,))
+    phase = steps @ matrix.T + rng.normal(scale=0.4, size=shape + (matrix.shape[0],))
+    wrapped = np.angle(np.exp(1j * phase)).astype(np.float32)
+    wrapped[rng.random(wrapped.shape) < 0.1] = np.nan
+    wrapped[0, 0] = np.nan
+    weight = rng.uniform(0.1, 1.0, size=wrapped.shape).astype(np.float32)
+    weight[rng.random(weight.shape) < 0.05] = np.nan
+    return wrapped, weight, matrix
+
+
+def unwrap_pairs(data, weight, matrix):
+    """
+    The previous unwrapping called for every pixel on float64 copies of the data.
+    """
+    out = np.empty(data.shape, dtype=np.float32)
+    for index in np.ndindex(data.shape[:-1]):
+        out[index] = Stack_unwrap.unwrap_pairs(
+            data[index].astype(np.float64),
+            (
+                np.empty(0, dtype=np.float64)
+                if weight is None
+                else weight[index].astype(np.float64)
+            ),
+            matrix,
+            np.pi / 2,
+        )
+    return out
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_unwrap_pairs_block(weighted):
+    data, weight, matrix = make_pairs_stack()
+    if not weighted:
+        weight = None
+    expected = unwrap_pairs(data, weight, matrix)
+    out = Stack_unwrap.unwrap_pairs_block(data, weight, matrix=matrix)
+    assert out.shape == data.shape and out.dtype == np.float32
+    np.testing.assert_array_equal(out, expected)
+    # some of the pairs are unwrapped and some of them are not resolved
+    assert np.isnan(out[0, 0]).all()
+    assert (np.abs(out) > np.pi + 1e-3).any()
+    assert (np.isnan(out) & np.isfinite(data)).any()
+
+    # the single pixel and the flat pixels blocks
+    np.testing.assert_array_equal(
+        Stack_unwrap.unwrap_pairs_block(
+            data[3, 5], None if weight is None else weight[3, 5], matrix=matrix
+        ),
+        expected[3, 5],
+    )
+    np.testing.assert_array_equal(
+        Stack_unwrap.unwrap_pairs_block(
+            data.reshape(-1, matrix.shape[0]),
+            None if weight is None else weight.reshape(-1, matrix.shape[0]),
+            matrix=matrix,
+        ),
+        expected.reshape(-1, matrix.shape[0]),
+    )
+
+
+def test_unwrap1d(tmp_path):
+    import pandas as pd
+    import xarray as xr
+
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+
+    data, weight, matrix = make_pairs_stack()
+    dates = pd.date_range("2023-01-01", periods=matrix.shape[1], freq="12D")
+    refs = [dates[np.argmax(row) - 1] for row in matrix]
+    reps = [dates[matrix.shape[1] - 1 - np.argmax(row[::-1])] for row in matrix]
+    coords = {
+        "pair": [f"{ref.date()} {rep.date()}" for ref, rep in zip(refs, reps)],
+        "ref": ("pair", refs),
+        "rep": ("pair", reps),
+        "y": np.arange(data.shape[0]),
+        "x": np.arange(data.shape[1]),
+    }
+    phase = xr.DataArray(
+        np.moveaxis(data, -1, 0), coords=coords, dims=("pair", "y", "x")
+    ).chunk({"y": 8, "x": 16})
+    corr = phase.copy(data=np.moveaxis(weight, -1, 0)).chunk({"y": 8, "x": 16})
+
+    stack = Stack(str(tmp_path / "work"))
+    np.testing.assert_array_equal(stack.unwrap_matrix(phase), matrix)
+    out = stack.unwrap1d(phase, corr)
+    assert out.dims == ("pair", "y", "x") and out.name == "unwrap"
+    # the phase is wrapped again before the unwrapping
+    data = np.moveaxis(stack.wrap(phase).values, 0, -1)
+    np.testing.assert_array_equal(
+        out.values, np.moveaxis(unwrap_pairs(data, weight, matrix), -1, 0)
+    )
+
+
+def make_interferogram(n=400, seed=0):
+    """
+    Noisy deformation interferogram with the correlation, the random gaps and the masked area.
+    """
+    from scipy.ndimage import gaussian_filter
+
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:n, 0:n] / n
+    truth = (
+        2
+        * np.pi
+        * 12
+        * (
+            np.exp(-((yy - 0.45) ** 2 + (xx - 0.4) ** 2) / 0.02)
+            - 0.6 * np.exp(-((yy - 0.6) ** 2 + (xx - 0.65) ** 2) / 0.015)
+        )
+        + 6 * xx
+    )
+    corr = np.clip(6 * gaussian_filter(rng.normal(size=(n, n)), 12) + 0.6, 0.05, 0.95)
+    noise = 0.35 * rng.normal(size=(n, n)) * np.sqrt(1 - corr**2) / corr
+    wrapped = np.angle(np.exp(1j * (truth + noise))).astype(np.float32)
+    wrapped[rng.random((n, n)) < 0.02] = np.nan
+    wrapped[int(0.8 * n) : int(0.9 * n), : int(0.3 * n)] = np.nan
+    return truth, wrapped, corr.astype(np.float32)
+
+
+def cycle_errors(unwrap, truth, mask):
+    """
+    The fraction of the pixels with 2*pi cycles differing from the majority.
+    """
+    _, counts = np.unique(
+        np.round((unwrap - truth) / (2 * np.pi))[mask], return_counts=True
+    )
+    return 1 - counts.max() / counts.sum()
+
+
+@pytest.mark.skipif(shutil.which("snaphu") is None, reason="SNAPHU is not available")
+@pytest.mark.parametrize("seed", [0, 1])
+def test_unwrap_quality_snaphu(tmp_path, seed):
+    import dask.array
+    import xarray as xr
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+
+    truth, wrapped, corr = make_interferogram(seed=seed)
+    coords = {"y": np.arange(truth.shape[0]), "x": np.arange(truth.shape[1])}
+    phase = xr.DataArray(wrapped, coords=coords, dims=("y", "x"))
+    corr = xr.DataArray(corr, coords=coords, dims=("y", "x"))
+    stack = Stack(str(tmp_path / "work"))
+    conf = "INFILEFORMAT FLOAT_DATA\nOUTFILEFORMAT FLOAT_DATA\nCORRFILEFORMAT FLOAT_DATA\nSTATCOSTMODE DEFO\n"
+    snaphu = stack.snaphu(phase, corr, conf=conf, workdir=str(tmp_path))
+    quality = stack.unwrap_quality(phase, corr, tilesize=256, overlap=32)
+    snaphu, quality = snaphu.phase.values, quality.phase.compute().values
+    np.testing.assert_array_equal(np.isfinite(quality), np.isfinite(snaphu))
+
+    # the preview-grade unwrapping of the coherent pixels follows SNAPHU
+    good = np.isfinite(wrapped) & (corr.values > 0.3)
+    assert cycle_errors(snaphu, truth, good) < 0.001
+    assert cycle_errors(quality, truth, good) < 0.01
+    assert cycle_errors(quality, snaphu, good) < 0.01
+    assert cycle_errors(quality, truth, np.isfinite(wrapped)) < 0.02
+
+
+def test_quick_los_displacement(tmp_path, monkeypatch):
+    import dask.array
+    import xarray as xr
+    from PIL import Image
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+    from src.geospatial.helpers.earthquake.interferogram import (
+        quick_los_displacement,
+    )
+
+    class PRM:
+        def get(self, name):
+            return 0.0555
+
+    truth, wrapped, corr = make_interferogram()
+    coords = {"y": np.arange(400.0), "x": np.arange(400.0)}
+    intf = xr.DataArray(wrapped, coords=coords, dims=("y", "x")).chunk(128)
+    corr = xr.DataArray(corr, coords=coords, dims=("y", "x")).chunk(128)
+    stack = Stack(str(tmp_path / "work"))
+    monkeypatch.setattr(stack, "PRM_merged", lambda: PRM())
+    # the geographic coordinates by the shift of the radar coordinates
+    monkeypatch.setattr(
+        stack,
+        "ra2ll",
+        lambda grid: grid.rename(y="lat", x="lon").assign_coords(
+            lat=35 + grid.y.values / 1000, lon=46 + grid.x.values / 1000
+        ),
+    )
+    filename = str(tmp_path / "intf_los.png")
+    los = quick_los_displacement(stack, intf, corr, filename)
+    assert los.dims == ("lat", "lon") and los.name == "los"
+    np.testing.assert_array_equal(np.isfinite(los.values), np.isfinite(wrapped))
+    assert Image.open(filename).size == (400, 400)
+    assert os.path.exists(filename.replace(".png", ".geojson"))
+    # the displacement follows the deformation phase up to the reference
+    error = los.values / (-79.58 * 0.0555) - truth
+    good = np.isfinite(wrapped) & (corr.values > 0.3)
+    error -= np.median(error[good])
+    assert np.mean(np.abs(error[good]) < np.pi) > 0.99
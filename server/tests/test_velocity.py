@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from src.geospatial.lib.pygmtsar.Stack_detrend import Stack_detrend
+
+NANOSECONDS_PER_YEAR = 365.25 * 24 * 60 * 60 * 1e9
+
+
+def make_series(dates=25, pixels=400, degree=1, seed=0):
+    """
+    Polynomial series with the noise, the missing values and the nearly empty series.
+    """
+    rng = np.random.default_rng(seed)
+    x = np.sort(rng.uniform(0, 3, size=dates))
+    coeffs = rng.normal(size=(degree + 1, pixels))
+    data = np.vander(x, degree + 1) @ coeffs + 0.2 * rng.normal(size=(dates, pixels))
+    data[rng.random(data.shape) < 0.15] = np.nan
+    # the complete series
+    data[:, :100] = np.vander(x, degree + 1) @ coeffs[:, :100] + 0.2 * rng.normal(
+        size=(dates, 100)
+    )
+    # the series with degree+1, degree and no valid values
+    data[:, -3:] = np.nan
+    data[:3, -3] = data[:degree, -2] = 1.0
+    data[degree + 1 :, -3] = np.nan
+    return data.astype(np.float32), x
+
+
+def numpy_polyfit(data, x, degree):
+    """
+    The coefficients, the fitted values and the coefficients standard deviations by numpy.polyfit.
+    """
+    coeffs = np.full((degree + 1, data.shape[1]), np.nan)
+    fit = np.full(data.shape, np.nan)
+    std = np.full((degree + 1, data.shape[1]), np.nan)
+    for pixel in range(data.shape[1]):
+        valid = np.isfinite(data[:, pixel])
+        if valid.sum() <= degree:
+            continue
+        values = data[valid, pixel].astype(np.float64)
+        if valid.sum() > degree + 1:
+            coeffs[:, pixel], cov = np.polyfit(x[valid], values, degree, cov=True)
+            std[:, pixel] = np.sqrt(np.diag(cov))
+        else:
+            coeffs[:, pixel] = np.polyfit(x[valid], values, degree)
+        fit[:, pixel] = np.polyval(coeffs[:, pixel], x)
+    return coeffs, fit, std
+
+
+def assert_close(actual, expected, rtol):
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    scale = np.nanmax(np.abs(expected), axis=-1, keepdims=True)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=rtol * np.nanmax(scale))
+
+
+@pytest.mark.parametrize("degree", [1, 2])
+@pytest.mark.parametrize("uncertainty", [False, True])
+def test_polyfit1d(degree, uncertainty):
+    data, x = make_series(degree=degree)
+    # the large coordinate offset like to the datetimes
+    x = 1.6e18 + 3e16 * x
+    coeffs, fit, std = Stack_detrend.polyfit1d(data, x, degree, uncertainty)
+    expected_coeffs, expected_fit, expected_std = numpy_polyfit(data, x, degree)
+    assert coeffs.shape == (degree + 1, data.shape[1]) and fit.shape == data.shape
+    assert coeffs.dtype == fit.dtype == np.float32
+    for power in range(degree + 1):
+        assert_close(coeffs[power], expected_coeffs[power], 1e-5)
+    assert_close(fit, expected_fit, 1e-5)
+    # the series with less than degree+1 valid values are not fitted
+    assert np.isnan(coeffs[:, -2:]).all() and np.isnan(fit[:, -2:]).all()
+    assert np.isfinite(coeffs[:, :-2]).all()
+    if not uncertainty:
+        assert std is None
+        return
+    assert std.shape == coeffs.shape and std.dtype == np.float32
+    # no residual degrees of freedom for degree+1 valid values
+    assert np.isnan(std[:, -3:]).all()
+    for power in range(degree + 1):
+        np.testing.assert_array_equal(
+            np.isnan(std[power]), np.isnan(expected_std[power])
+        )
+        np.testing.assert_allclose(std[power], expected_std[power], rtol=1e-4)
+
+
+def test_velocity(tmp_path):
+    from src.geospatial.lib.pygmtsar.Stack import Stack
+
+    data, x = make_series(dates=30, pixels=40 * 35)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(np.round(x * 365), unit="D")
+    # the unique dates
+    dates = dates + pd.to_timedelta(np.arange(dates.size), unit="h")
+    grid = xr.DataArray(
+        data.reshape(-1, 40, 35),
+        coords={"date": dates, "y": np.arange(40), "x": np.arange(35)},
+        dims=("date", "y", "x"),
+    ).chunk({"date": 7, "y": 16, "x": 16})
+    stack = Stack(str(tmp_path / "work"))
+    out = stack.velocity(grid, uncertainty=True)
+    assert isinstance(out, xr.Dataset) and set(out.data_vars) == {"trend", "trend_std"}
+    assert out.trend.dims == ("y", "x")
+    out = out.compute()
+
+    nanoseconds = dates.values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    coeffs, _, std = numpy_polyfit(data, nanoseconds, 1)
+    velocity = (NANOSECONDS_PER_YEAR * coeffs[0]).reshape(40, 35)
+    velocity_std = (NANOSECONDS_PER_YEAR * std[0]).reshape(40, 35)
+    assert_close(out.trend.values, velocity, 1e-5)
+    np.testing.assert_array_equal(np.isnan(out.trend_std), np.isnan(velocity_std))
+    np.testing.assert_allclose(out.trend_std, velocity_std, rtol=1e-4)
+    # the trend only
+    np.testing.assert_array_equal(stack.velocity(grid).values, out.trend.values)
@@ -0,0 +1,105 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import imageio.v3 as iio
+import numpy as np
+import pytest
+from shapely.geometry import box
+
+from src.geospatial.lib.pygmtsar.XYZTiles import XYZTiles
+
+TILE_SIZE = 256
+ZOOM = 10
+AOI = box(38.05, 37.05, 38.55, 37.45)
+
+
+def tile_image(x, y, z):
+    image = np.zeros((TILE_SIZE, TILE_SIZE, 3), dtype=np.uint8)
+    image[..., 0] = x % 256
+    image[..., 1] = y % 256
+    image[..., 2] = z
+    return iio.imwrite("<bytes>", image, extension=".png")
+
+
+@pytest.fixture
+def tile_server():
+    """
+    Offline tile map service serving generated {z}/{x}/{y}.png tiles, the tiles outside zoom 10 are missed.
+    """
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            z, x, y = [int(value) for value in self.path.strip("/")[:-4].split("/")]
+            if z != ZOOM:
+                self.send_response(404)
+                self.end_headers()
+                return
+            content = tile_image(x, y, z)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}" + "/{z}/{x}/{y}.png", requests
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tiles_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(XYZTiles, "tiles_cache", str(tmp_path / "xyztiles"))
+    return tmp_path / "xyztiles"
+
+
+def test_xyztiles_mosaic(tile_server, tiles_cache):
+    url, requests = tile_server
+    tiles = XYZTiles().download(AOI, ZOOM, url=url, n_jobs=4)
+
+    assert tiles.dims == ("band", "lat", "lon")
+    assert tiles.band.size == 3
+    assert float(tiles.lat.min()) >= 37.05 and float(tiles.lat.max()) <= 37.45
+    assert float(tiles.lon.min()) >= 38.05 and float(tiles.lon.max()) <= 38.55
+    assert np.all(tiles.values[2] == ZOOM)
+    # every requested tile is placed into the mosaic
+    fetched = {
+        tuple(map(int, path.strip("/")[:-4].split("/")[1:])) for path in requests
+    }
+    colors = set(zip(tiles.values[0].ravel(), tiles.values[1].ravel()))
+    assert colors == {(x % 256, y % 256) for x, y in fetched}
+    assert len(requests) == len(fetched)
+    # the northern tiles have smaller y numbers
+    assert tiles.values[1][0, 0] > tiles.values[1][-1, 0]
+
+
+def test_xyztiles_cache(tile_server, tiles_cache):
+    url, requests = tile_server
+    tiles = XYZTiles().download(AOI, ZOOM, url=url)
+    count = len(requests)
+    assert count > 0
+    cached = XYZTiles().download(AOI, ZOOM, url=url)
+    assert len(requests) == count
+    np.testing.assert_array_equal(cached.values, tiles.values)
+    XYZTiles().download(AOI, ZOOM, url=url, cache=False)
+    assert len(requests) == 2 * count
+
+
+def test_xyztiles_cache_eviction(tile_server, tiles_cache, monkeypatch):
+    url, requests = tile_server
+    monkeypatch.setattr(XYZTiles, "tiles_cache_size", 1)
+    XYZTiles().download(AOI, ZOOM, url=url)
+    assert [path for path in tiles_cache.rglob("*") if path.is_file()] == []
+
+
+def test_xyztiles_missed_tile(tile_server, tiles_cache):
+    url, requests = tile_server
+    with pytest.raises(ValueError, match="status 404"):
+        XYZTiles().download(AOI, ZOOM + 1, url=url)